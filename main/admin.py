@@ -375,6 +375,7 @@ class JournalEntryAdmin(HistoryPaginationMixin, admin.ModelAdmin):
     )
     list_filter = ("date", "debit_account", "credit_account")
     search_fields = ("description",)
+    readonly_fields = ("currency", "amount_minor")
 
 
 @admin.register(WorkOrder)
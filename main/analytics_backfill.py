@@ -0,0 +1,394 @@
+"""
+Historical backfill of AnalyticsSnapshot and SchedulingAnalytics rows.
+A date range is computed in one pass: source rows are bucketed by day with
+TruncDate and grouped aggregates (a handful of queries for the whole range,
+not one set per day), running totals are accumulated in Python, and rows are
+upserted with bulk_create(update_conflicts=True). Long ranges can be split
+across worker processes.
+
+Snapshot figures are as of the end of each day for what the schema records:
+statuses, quantities and activity flags have no history, so deal and project
+counts use current status, inventory uses current quantities of items that
+existed on the day, and technician totals count technicians created by then,
+of which those currently active are active (as the daily snapshot counts
+them).
+"""
+
+import logging
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Tuple
+
+from django.db import connections, models
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Greatest, TruncDate
+
+from .models import (
+    Account,
+    AnalyticsSnapshot,
+    Contact,
+    Deal,
+    Payment,
+    Project,
+    ScheduledEvent,
+    SchedulingAnalytics,
+    Technician,
+    WarehouseItem,
+    WorkOrderInvoice,
+)
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal("0.00")
+
+KINDS = ("snapshots", "scheduling")
+
+SNAPSHOT_FIELDS = [
+    "total_revenue",
+    "total_deals",
+    "won_deals",
+    "lost_deals",
+    "active_projects",
+    "completed_projects",
+    "total_contacts",
+    "total_accounts",
+    "inventory_value",
+    "outstanding_invoices",
+    "overdue_invoices",
+]
+
+SCHEDULING_FIELDS = [
+    "total_technicians",
+    "active_technicians",
+    "average_utilization_rate",
+    "total_scheduled_events",
+    "completed_events",
+    "cancelled_events",
+    "rescheduled_events",
+    "on_time_completion_rate",
+]
+
+
+def day_range(start: date, end: date) -> List[date]:
+    return [start + timedelta(days=n) for n in range((end - start).days + 1)]
+
+
+def _day(field_name: str, model):
+    """Calendar day of a date or datetime column (local time, like the daily jobs)."""
+    if isinstance(model._meta.get_field(field_name), models.DateTimeField):
+        return TruncDate(field_name)
+    return F(field_name)
+
+
+def daily_totals(queryset, day, start: date, end: date, **aggregates) -> Dict:
+    """
+    Grouped aggregates per day over start..end in one query.
+
+    Returns:
+        {day: {aggregate name: value}} for days with rows
+    """
+    rows = (
+        queryset.annotate(backfill_day=day)
+        .filter(backfill_day__range=(start, end))
+        .order_by()
+        .values("backfill_day")
+        .annotate(**aggregates)
+    )
+    return {row.pop("backfill_day"): row for row in rows}
+
+
+def running_totals(queryset, day, start: date, end: date, **aggregates) -> Dict:
+    """
+    Cumulative aggregates as of each day in start..end, in one query; rows
+    from before start are grouped into start's bucket as the opening total.
+
+    Returns:
+        {day: {aggregate name: value}} for every day in the range
+    """
+    rows = (
+        queryset.annotate(
+            backfill_day=Greatest(
+                day, models.Value(start), output_field=models.DateField()
+            )
+        )
+        .filter(backfill_day__lte=end)
+        .order_by()
+        .values("backfill_day")
+        .annotate(**aggregates)
+    )
+    by_day = {row.pop("backfill_day"): row for row in rows}
+    totals = {name: 0 for name in aggregates}
+    running = {}
+    for current in day_range(start, end):
+        for name, value in by_day.get(current, {}).items():
+            totals[name] += value or 0
+        running[current] = dict(totals)
+    return running
+
+
+def _add_interval(diff: Dict, first: date, last, amount, start: date, end: date):
+    """Add amount to every day of first..last (last None: open) within range."""
+    if last is not None and last < first:
+        return
+    if first > end or (last is not None and last < start):
+        return
+    diff[max(first, start)] += amount
+    if last is not None and last < end:
+        diff[last + timedelta(days=1)] -= amount
+
+
+def invoice_balances(start: date, end: date) -> Dict[date, Tuple[Decimal, Decimal]]:
+    """
+    Outstanding and overdue work order invoice totals at the end of each day.
+
+    An invoice is outstanding from its issue date until its paid date (paid
+    invoices without a paid date never count), and overdue from the day
+    after its due date while still outstanding.
+    """
+    rows = (
+        WorkOrderInvoice.objects.filter(issued_date__lte=end)
+        .exclude(is_paid=True, paid_date__isnull=True)
+        .order_by()
+        .values("issued_date", "due_date", "paid_date", "is_paid")
+        .annotate(total=Sum("total_amount"))
+    )
+    outstanding = defaultdict(lambda: ZERO)
+    overdue = defaultdict(lambda: ZERO)
+    for row in rows:
+        last = row["paid_date"] - timedelta(days=1) if row["is_paid"] else None
+        amount = row["total"] or ZERO
+        _add_interval(outstanding, row["issued_date"], last, amount, start, end)
+        overdue_from = max(row["issued_date"], row["due_date"] + timedelta(days=1))
+        _add_interval(overdue, overdue_from, last, amount, start, end)
+
+    balances = {}
+    open_total = overdue_total = ZERO
+    for current in day_range(start, end):
+        open_total += outstanding.get(current, ZERO)
+        overdue_total += overdue.get(current, ZERO)
+        balances[current] = (open_total, overdue_total)
+    return balances
+
+
+def snapshot_rows(start: date, end: date) -> List[AnalyticsSnapshot]:
+    """AnalyticsSnapshot rows for every day in start..end."""
+    revenue = running_totals(
+        Payment.objects, F("payment_date"), start, end, total=Sum("amount")
+    )
+    deals = running_totals(
+        Deal.objects,
+        _day("created_at", Deal),
+        start,
+        end,
+        total=Count("pk"),
+        won=Count("pk", filter=Q(status="won")),
+        lost=Count("pk", filter=Q(status="lost")),
+    )
+    projects = running_totals(
+        Project.objects,
+        _day("created_at", Project),
+        start,
+        end,
+        active=Count("pk", filter=Q(status="in_progress")),
+        completed=Count("pk", filter=Q(status="completed")),
+    )
+    contacts = running_totals(
+        Contact.objects, _day("created_at", Contact), start, end, total=Count("pk")
+    )
+    accounts = running_totals(
+        Account.objects, _day("created_at", Account), start, end, total=Count("pk")
+    )
+    inventory = running_totals(
+        WarehouseItem.objects,
+        _day("created_at", WarehouseItem),
+        start,
+        end,
+        value=Sum(
+            F("quantity") * F("unit_cost"),
+            output_field=models.DecimalField(max_digits=20, decimal_places=4),
+        ),
+    )
+    invoices = invoice_balances(start, end)
+
+    return [
+        AnalyticsSnapshot(
+            date=current,
+            total_revenue=revenue[current]["total"],
+            total_deals=deals[current]["total"],
+            won_deals=deals[current]["won"],
+            lost_deals=deals[current]["lost"],
+            active_projects=projects[current]["active"],
+            completed_projects=projects[current]["completed"],
+            total_contacts=contacts[current]["total"],
+            total_accounts=accounts[current]["total"],
+            inventory_value=Decimal(str(inventory[current]["value"])).quantize(ZERO),
+            outstanding_invoices=invoices[current][0],
+            overdue_invoices=invoices[current][1],
+        )
+        for current in day_range(start, end)
+    ]
+
+
+def scheduling_rows(start: date, end: date) -> List[SchedulingAnalytics]:
+    """SchedulingAnalytics rows for every day in start..end."""
+    events = daily_totals(
+        ScheduledEvent.objects,
+        _day("start_time", ScheduledEvent),
+        start,
+        end,
+        total=Count("pk"),
+        completed=Count("pk", filter=Q(status="completed")),
+        cancelled=Count("pk", filter=Q(status="cancelled")),
+        rescheduled=Count("pk", filter=Q(status="rescheduled")),
+        technicians=Count("technician", distinct=True),
+    )
+    technicians = running_totals(
+        Technician.objects,
+        _day("created_at", Technician),
+        start,
+        end,
+        total=Count("pk"),
+        active=Count("pk", filter=Q(is_active=True)),
+    )
+
+    rows = []
+    for current in day_range(start, end):
+        day_events = events.get(current, {})
+        total = day_events.get("total", 0)
+        completed = day_events.get("completed", 0)
+        active = technicians[current]["active"]
+        rows.append(
+            SchedulingAnalytics(
+                date=current,
+                total_technicians=technicians[current]["total"],
+                active_technicians=active,
+                average_utilization_rate=_rate(
+                    day_events.get("technicians", 0), active
+                ),
+                total_scheduled_events=total,
+                completed_events=completed,
+                cancelled_events=day_events.get("cancelled", 0),
+                rescheduled_events=day_events.get("rescheduled", 0),
+                on_time_completion_rate=_rate(completed, total),
+            )
+        )
+    return rows
+
+
+def _rate(part, whole) -> Decimal:
+    if not whole:
+        return ZERO
+    return (Decimal(part) * 100 / whole).quantize(ZERO)
+
+
+def backfill_range(
+    start: date, end: date, kinds: Iterable[str] = KINDS, batch_size: int = 1000
+) -> Dict[str, int]:
+    """
+    Compute and upsert snapshot rows for start..end in this process.
+
+    Returns:
+        {kind: rows written}
+    """
+    written = {}
+    if "snapshots" in kinds:
+        rows = snapshot_rows(start, end)
+        AnalyticsSnapshot.objects.bulk_create(
+            rows,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["date"],
+            update_fields=SNAPSHOT_FIELDS,
+        )
+        written["snapshots"] = len(rows)
+    if "scheduling" in kinds:
+        rows = scheduling_rows(start, end)
+        SchedulingAnalytics.objects.bulk_create(
+            rows,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["date"],
+            update_fields=SCHEDULING_FIELDS,
+        )
+        written["scheduling"] = len(rows)
+    return written
+
+
+def _backfill_worker(args) -> Dict[str, int]:
+    start, end, kinds, batch_size = args
+    try:
+        return backfill_range(start, end, kinds, batch_size)
+    finally:
+        connections.close_all()
+
+
+def split_range(start: date, end: date, parts: int) -> List[Tuple[date, date]]:
+    """Split start..end into at most `parts` contiguous, near-equal ranges."""
+    days = (end - start).days + 1
+    parts = max(1, min(parts, days))
+    size, extra = divmod(days, parts)
+    ranges = []
+    first = start
+    for index in range(parts):
+        last = first + timedelta(days=size + (1 if index < extra else 0) - 1)
+        ranges.append((first, last))
+        first = last + timedelta(days=1)
+    return ranges
+
+
+def backfill(
+    start: date,
+    end: date,
+    kinds: Iterable[str] = KINDS,
+    workers: int = 1,
+    batch_size: int = 1000,
+) -> Dict[str, int]:
+    """
+    Backfill AnalyticsSnapshot and/or SchedulingAnalytics for start..end.
+
+    Args:
+        start: First day
+        end: Last day
+        kinds: "snapshots" and/or "scheduling"
+        workers: Worker processes; the range is split into one contiguous
+            chunk per worker, each computed with its own grouped queries.
+            Without the fork start method (Windows) the range runs here
+        batch_size: Rows per upsert statement
+
+    Returns:
+        {kind: rows written}
+
+    Raises:
+        ValueError: If the range is empty or a kind is unknown
+    """
+    kinds = list(kinds)
+    unknown = set(kinds) - set(KINDS)
+    if unknown:
+        raise ValueError(f"Unknown snapshot kind(s): {', '.join(sorted(unknown))}")
+    if end < start:
+        raise ValueError("End date is before start date")
+
+    chunks = split_range(start, end, workers)
+    if len(chunks) > 1 and "fork" not in multiprocessing.get_all_start_methods():
+        logger.warning("Worker processes need the fork start method; backfilling here")
+        chunks = [(start, end)]
+    if len(chunks) == 1:
+        return backfill_range(start, end, kinds, batch_size)
+
+    # Forked workers must not share the parent's database connections
+    connections.close_all()
+    totals = defaultdict(int)
+    with ProcessPoolExecutor(
+        max_workers=len(chunks), mp_context=multiprocessing.get_context("fork")
+    ) as pool:
+        for written in pool.map(
+            _backfill_worker,
+            [(first, last, kinds, batch_size) for first, last in chunks],
+        ):
+            for kind, count in written.items():
+                totals[kind] += count
+    logger.info("Backfilled %s across %s workers", dict(totals), len(chunks))
+    return dict(totals)
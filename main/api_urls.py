@@ -25,6 +25,12 @@ router.register(
     basename="customfieldvalue",
 )
 router.register(r"activity-logs", api_views.ActivityLogViewSet, basename="activitylog")
+router.register(
+    r"saved-searches", search_views.SavedSearchViewSet, basename="savedsearch"
+)
+router.register(
+    r"bulk-operations", search_views.BulkOperationViewSet, basename="bulkoperation"
+)
 router.register(
     r"project-templates", api_views.ProjectTemplateViewSet, basename="projecttemplate"
 )
@@ -40,6 +46,9 @@ router.register(
 router.register(
     r"journal-entries", api_views.JournalEntryViewSet, basename="journalentry"
 )
+router.register(
+    r"ledger-periods", api_views.LedgerPeriodViewSet, basename="ledgerperiod"
+)
 router.register(r"work-orders", api_views.WorkOrderViewSet, basename="workorder")
 router.register(r"line-items", api_views.LineItemViewSet, basename="lineitem")
 router.register(r"payments", api_views.PaymentViewSet, basename="payment")
@@ -152,11 +161,25 @@ urlpatterns = [
     path("search/", api_views.GlobalSearchView.as_view(), name="api_search"),
     # Advanced search (v2)
     path("search/v2/", search_views.SearchAPIView.as_view(), name="api_search_v2"),
+    path(
+        "search/suggestions/",
+        search_views.SearchSuggestionsAPIView.as_view(),
+        name="api_search_suggestions",
+    ),
     path(
         "search/filters/",
         search_views.SearchFiltersAPIView.as_view(),
         name="api_search_filters",
     ),
+    path(
+        "bulk/update/", search_views.BulkUpdateAPIView.as_view(), name="api_bulk_update"
+    ),
+    path(
+        "bulk/delete/", search_views.BulkDeleteAPIView.as_view(), name="api_bulk_delete"
+    ),
+    path(
+        "bulk/export/", search_views.BulkExportAPIView.as_view(), name="api_bulk_export"
+    ),
     path("my-contacts/", api_views.MyContactsView.as_view(), name="my-contacts"),
     # Auth
     path("auth/login/", LoginView.as_view(), name="api_login"),
@@ -170,6 +193,12 @@ urlpatterns = [
     ),
     path("reports/pnl/", api_views.profit_loss_report, name="profit-loss"),
     path("reports/cash-flow/", api_views.cash_flow_report, name="cash-flow"),
+    path("ledger/export/", api_views.ledger_export, name="ledger-export"),
+    path(
+        "ledger/balances/export/",
+        api_views.ledger_balances_export,
+        name="ledger-balances-export",
+    ),
     # Invoice Management
     path(
         "workorders/<int:workorder_id>/generate-invoice/",
@@ -177,6 +206,7 @@ urlpatterns = [
         name="generate-workorder-invoice",
     ),
     path("invoices/overdue/", api_views.overdue_invoices, name="overdue-invoices"),
+    path("reports/ar-aging/", api_views.ar_aging_report, name="ar-aging"),
     # Tax Reporting
     path("tax-report/", api_views.tax_report, name="tax-report"),
     # Email Communication
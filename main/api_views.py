@@ -1,14 +1,15 @@
 import io
 import logging
-import os
 import re
 from datetime import datetime
+from decimal import Decimal
 
 from django.conf import settings
 from django.contrib.auth.models import Group
-from django.db import models
-from django.db.models import Count, F, Q, Sum
-from django.http import FileResponse, Http404
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, Q, Sum
+from django.http import FileResponse, Http404, StreamingHttpResponse
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from reportlab.lib.pagesizes import letter
@@ -16,10 +17,12 @@ from reportlab.pdfgen import canvas
 from rest_framework import filters, permissions, status, viewsets
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ValidationError as DRFValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .dashboard_analytics import cached_dashboard, window_days
 from .filters import AnalyticsSnapshotFilter, BudgetV2Filter, DealFilter
 from .models import (
     Account,
@@ -50,6 +53,7 @@ from .models import (
     InvoiceItem,
     JournalEntry,
     LedgerAccount,
+    LedgerPeriod,
     LineItem,
     LogEntry,
     MonthlyDistribution,
@@ -79,6 +83,20 @@ from .models import (
     WorkOrderCertificationRequirement,
     WorkOrderInvoice,
 )
+from .ledger_export import (
+    BALANCE_EXPORT_HEADER,
+    EXPORT_FORMATS,
+    JOURNAL_EXPORT_HEADER,
+    account_balance_rows,
+    encode_rows,
+    journal_entry_rows,
+)
+from .global_search import fan_out
+from .kb_index import get_kb_index
+from .ledger_service import get_ledger_service
+from .pagination import KeysetPagination
+from .posting_service import get_posting_service, is_posted, posting_key
+from .receivables_service import get_receivables_service
 from .permissions import (
     CustomFieldValuePermission,
     FinancialDataPermission,
@@ -86,7 +104,11 @@ from .permissions import (
     IsOwnerOrManager,
 )
 from .rate_limiting import rate_limit_analytics
+from .report_cache import cached_report_response
 from .reports import FinancialReports
+from .revenue_forecasting import ForecastUnavailable, generate_forecasts
+from .rollup_service import DEFAULT_TREND_METRICS, get_rollup_service
+from .rollup_service import METRICS as ROLLUP_METRICS
 from .serializers import (
     AccountSerializer,
     AccountWithCustomFieldsSerializer,
@@ -118,6 +140,7 @@ from .serializers import (
     InvoiceSerializer,
     JournalEntrySerializer,
     LedgerAccountSerializer,
+    LedgerPeriodSerializer,
     LineItemSerializer,
     LogEntrySerializer,
     MonthlyDistributionSerializer,
@@ -307,6 +330,7 @@ class PostViewSet(viewsets.ModelViewSet):
 
 class AccountViewSet(viewsets.ModelViewSet):
     queryset = Account.objects.all()
+    pagination_class = KeysetPagination
     filter_backends = [
         DjangoFilterBackend,
         filters.SearchFilter,
@@ -356,6 +380,7 @@ class AccountViewSet(viewsets.ModelViewSet):
 
 class ContactViewSet(viewsets.ModelViewSet):
     queryset = Contact.objects.all()
+    pagination_class = KeysetPagination
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [
         DjangoFilterBackend,
@@ -544,6 +569,7 @@ class DealStageViewSet(viewsets.ModelViewSet):
 
 class DealViewSet(viewsets.ModelViewSet):
     queryset = Deal.objects.all()
+    pagination_class = KeysetPagination
     serializer_class = DealSerializer
     filter_backends = [
         DjangoFilterBackend,
@@ -704,9 +730,9 @@ class InvoiceViewSet(viewsets.ModelViewSet):
                 {"detail": "Invoice already posted"}, status=status.HTTP_409_CONFLICT
             )
 
-        # Idempotency safety: also check canonical description to guard legacy runs
+        # Idempotency safety: also check the indexed posting source key
         description = f"Invoice {invoice.id} posting"
-        if JournalEntry.objects.filter(description=description).exists():
+        if is_posted("invoice", invoice.id):
             return Response(
                 {"detail": "Invoice already posted"}, status=status.HTTP_409_CONFLICT
             )
@@ -721,13 +747,21 @@ class InvoiceViewSet(viewsets.ModelViewSet):
         )
 
         # Create the journal entry (double-entry invariant enforced by single amount with DR/CR)
-        entry = JournalEntry.objects.create(
-            date=timezone.now().date(),
-            description=description,
-            debit_account=ar_acct,
-            credit_account=rev_acct,
-            amount=total,
-        )
+        try:
+            with transaction.atomic():
+                entry = JournalEntry.objects.create(
+                    date=timezone.now().date(),
+                    description=description,
+                    debit_account=ar_acct,
+                    credit_account=rev_acct,
+                    amount=total,
+                    **posting_key("invoice", invoice.id),
+                )
+        except IntegrityError:
+            # A concurrent request posted this invoice first
+            return Response(
+                {"detail": "Invoice already posted"}, status=status.HTTP_409_CONFLICT
+            )
 
         # Persist posting markers on Invoice
         try:
@@ -890,6 +924,7 @@ class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
     """
 
     serializer_class = ActivityLogSerializer
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ["user", "action", "content_type"]
     ordering = ["-timestamp"]
@@ -948,20 +983,12 @@ class KnowledgeBaseView(APIView):
     """
 
     def get(self, request, *args, **kwargs):
-        # STATICFILES_DIRS may be undefined or empty; fallback to BASE_DIR/static/kb
-        static_dirs = getattr(settings, "STATICFILES_DIRS", []) or []
-        if static_dirs:
-            kb_dir = os.path.join(static_dirs[0], "kb")
-        else:
-            kb_dir = os.path.join(settings.BASE_DIR, "static", "kb")
-        try:
-            files = [f for f in os.listdir(kb_dir) if f.endswith(".md")]
-            articles = [os.path.splitext(f)[0] for f in files]
-            return Response(articles)
-        except FileNotFoundError:
+        kb = get_kb_index()
+        if not kb.exists():
             return Response(
                 {"error": "Knowledge base directory not found."}, status=404
             )
+        return Response([article.name for article in kb.articles()])
 
 
 class MarkdownFileView(APIView):
@@ -972,26 +999,13 @@ class MarkdownFileView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, file_name):
-        # Construct the full path to the markdown file inside the static/kb directory
-        base_dir = os.path.dirname(
-            os.path.dirname(os.path.abspath(__file__))
-        )  # Go up two levels from main/api_views.py to the project root
-        file_path = os.path.join(base_dir, "static", "kb", f"{file_name}.md")
-
-        if not os.path.exists(file_path):
+        article = get_kb_index().get(file_name)
+        if article is None:
             return Response(
-                {"error": f"File not found at {file_path}"},
+                {"error": f"File not found: {file_name}.md"},
                 status=status.HTTP_404_NOT_FOUND,
             )
-
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-            return Response({"content": content})
-        except Exception as e:
-            return Response(
-                {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        return Response({"content": article.content})
 
 
 class ProjectTemplateViewSet(viewsets.ModelViewSet):
@@ -1135,147 +1149,13 @@ class GlobalSearchView(APIView):
         if not query:
             return Response([])
 
-        # Initialize an empty list to collect results
-        results = []
-
-        # Search in Posts
-        post_results = Post.objects.filter(
-            Q(title__icontains=query)
-            | Q(content__icontains=query)
-            | Q(rich_content__icontains=query)
-        ).distinct()[
-            :5
-        ]  # Limit to 5 results for performance
-
-        for post in post_results:
-            pid = getattr(post, "id", None)
-            content = getattr(post, "content", "") or ""
-            results.append(
-                {
-                    "type": "post",
-                    "id": pid,
-                    "title": post.title,
-                    "url": f"/api/posts/{pid}/",
-                    "snippet": content[:75] + "..." if content else "",
-                }
-            )
-
-        # Search in Accounts
-        # Account model doesn't have 'email' or 'phone' fields. Filter by name and
-        # phone_number for compatibility.
-        account_results = Account.objects.filter(
-            Q(name__icontains=query) | Q(phone_number__icontains=query)
-        ).distinct()[:5]
-
-        for account in account_results:
-            aid = getattr(account, "id", None)
-            desc = getattr(account, "description", "") or ""
-            results.append(
-                {
-                    "type": "account",
-                    "id": aid,
-                    "name": account.name,
-                    "url": f"/api/accounts/{aid}/",
-                    "snippet": desc[:75] + "..." if desc else "",
-                }
-            )
-
-        # Search in Contacts
-        contact_results = Contact.objects.filter(
-            Q(first_name__icontains=query)
-            | Q(last_name__icontains=query)
-            | Q(email__icontains=query)
-        ).distinct()[:5]
-
-        for contact in contact_results:
-            cid = getattr(contact, "id", None)
-            notes = getattr(contact, "notes", "") or ""
-            results.append(
-                {
-                    "type": "contact",
-                    "id": cid,
-                    "name": f"{contact.first_name} {contact.last_name}",
-                    "url": f"/api/contacts/{cid}/",
-                    "snippet": notes[:75] + "..." if notes else "",
-                }
-            )
-
-        # Search in Tasks
-        task_results = Project.objects.filter(
-            Q(title__icontains=query) | Q(description__icontains=query)
-        ).distinct()[:5]
-
-        for task in task_results:
-            tid = getattr(task, "id", None)
-            tdesc = getattr(task, "description", "") or ""
-            results.append(
-                {
-                    "type": "project",
-                    "id": tid,
-                    "title": task.title,
-                    "url": f"/api/projects/{tid}/",
-                    "snippet": tdesc[:75] + "..." if tdesc else "",
-                }
-            )
-
-        # Search in Deals (fixed invalid field references - Issue 10)
-        deal_results = Deal.objects.filter(
-            Q(title__icontains=query) | Q(account__name__icontains=query)
-        ).distinct()[:5]
-
-        for deal in deal_results:
-            did = getattr(deal, "id", None)
-            stage_label = ""
-            try:
-                if getattr(deal, "stage", None) is not None:
-                    stage_label = getattr(deal.stage, "name", "") or ""
-            except Exception:
-                stage_label = ""
-            snippet = f"Value: {deal.value}" + (
-                f" • Stage: {stage_label}" if stage_label else ""
-            )
-            results.append(
-                {
-                    "type": "deal",
-                    "id": did,
-                    "title": deal.title,
-                    "url": f"/api/deals/{did}/",
-                    "snippet": snippet,
-                }
-            )
-
-        # Search in Notes (Markdown files)
-        kb_base_path = os.path.join(settings.BASE_DIR, "static", "kb")
-        note_file_results = []
-        if os.path.exists(kb_base_path):
-            for file_name in os.listdir(kb_base_path):
-                if file_name.endswith(".md"):
-                    file_path = os.path.join(kb_base_path, file_name)
-                    with open(file_path, "r", encoding="utf-8") as file:
-                        file_content = file.read()
-                        if query.lower() in file_content.lower():
-                            note_file_results.append(
-                                {
-                                    "file_name": file_name,
-                                    "url": f"/api/knowledge_base/{file_name.replace('.md', '')}/",
-                                    "snippet": file_content[:75] + "...",
-                                }
-                            )
-
-        results.extend(
-            [
-                {
-                    "type": "note",
-                    "file_name": note["file_name"],
-                    "url": note["url"],
-                    "snippet": note["snippet"],
-                }
-                for note in note_file_results
-            ]
-        )
-
-        # Limit total results to 20 for performance
-        return Response(results[:20])
+        # Sources are queried concurrently under a deadline; any that miss it
+        # are listed in X-Search-Incomplete and left out of this response
+        results, incomplete = fan_out(query)
+        response = Response(results)
+        if incomplete:
+            response["X-Search-Incomplete"] = ",".join(incomplete)
+        return response
 
 
 class LedgerAccountViewSet(viewsets.ModelViewSet):
@@ -1308,6 +1188,139 @@ class JournalEntryViewSet(viewsets.ModelViewSet):
     serializer_class = JournalEntrySerializer
     permission_classes = [FinancialDataPermission]
 
+    def perform_destroy(self, instance):
+        try:
+            instance.delete()
+        except DjangoValidationError as exc:
+            raise DRFValidationError(exc.messages)
+
+    @action(detail=False, methods=["post"], url_path="bulk-post")
+    def bulk_post(self, request):
+        """
+        Post many invoices, payment allocations and work order completions in
+        one transaction. Already-posted items are reported, not re-posted.
+        Body: {"invoices": [ids], "payments": [ids], "work_orders": [ids]}
+        """
+        ids = {}
+        for key in ("invoices", "payments", "work_orders"):
+            value = request.data.get(key) or []
+            if not isinstance(value, list):
+                return Response(
+                    {"error": f"{key} must be a list of ids"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            try:
+                ids[key] = [int(item) for item in value]
+            except (TypeError, ValueError):
+                return Response(
+                    {"error": "Ids must be integers"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+        if not any(ids.values()):
+            return Response(
+                {"error": "Provide invoices, payments and/or work_orders"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            result = get_posting_service().post_batch(
+                invoice_ids=ids["invoices"],
+                payment_ids=ids["payments"],
+                work_order_ids=ids["work_orders"],
+                user=request.user,
+            )
+        except DjangoValidationError as exc:
+            return Response(
+                {"error": "; ".join(exc.messages)}, status=status.HTTP_400_BAD_REQUEST
+            )
+        except IntegrityError:
+            return Response(
+                {"error": "A concurrent request posted part of this batch; retry"},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class LedgerPeriodViewSet(viewsets.ReadOnlyModelViewSet):
+    """Closed accounting periods; POST close/ to close the ledger through a date."""
+
+    queryset = LedgerPeriod.objects.select_related("closed_by")
+    serializer_class = LedgerPeriodSerializer
+    permission_classes = [IsManager]
+
+    @action(detail=False, methods=["post"])
+    def close(self, request):
+        """
+        Close the ledger and snapshot per-account closing balances.
+        Body: {"period_end": "YYYY-MM-DD"} or {"month": "YYYY-MM"}
+        """
+        import calendar
+
+        period_end = None
+        try:
+            if request.data.get("month"):
+                year, month = (int(p) for p in request.data["month"].split("-"))
+                period_end = datetime(
+                    year, month, calendar.monthrange(year, month)[1]
+                ).date()
+            elif request.data.get("period_end"):
+                period_end = datetime.strptime(
+                    request.data["period_end"], "%Y-%m-%d"
+                ).date()
+        except (TypeError, ValueError):
+            period_end = None
+        if period_end is None:
+            return Response(
+                {"error": "Provide period_end (YYYY-MM-DD) or month (YYYY-MM)"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if period_end >= timezone.now().date():
+            return Response(
+                {"error": "Only past periods can be closed"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            period = get_ledger_service().close_period(period_end, user=request.user)
+        except DjangoValidationError as exc:
+            return Response(
+                {"error": "; ".join(exc.messages)}, status=status.HTTP_409_CONFLICT
+            )
+
+        log_activity(
+            request.user, "create", period, f"Closed ledger through {period_end}"
+        )
+        return Response(
+            self.get_serializer(period).data, status=status.HTTP_201_CREATED
+        )
+
+
+def _complete_work_order(work_order, description, total_cost):
+    """
+    Consume a work order's inventory and post DR COGS, CR Inventory in one
+    transaction. Returns the journal entry, or None when nothing was consumed.
+    Raises IntegrityError when a concurrent request already posted it.
+    """
+    with transaction.atomic():
+        work_order.adjust_inventory()
+        if not total_cost:
+            return None
+        cogs_acct, _ = LedgerAccount.objects.get_or_create(
+            code="5000",
+            defaults={"name": "Cost of Goods Sold", "account_type": "expense"},
+        )
+        inv_acct, _ = LedgerAccount.objects.get_or_create(
+            code="1200", defaults={"name": "Inventory", "account_type": "asset"}
+        )
+        return JournalEntry.objects.create(
+            date=timezone.now().date(),
+            description=description,
+            debit_account=cogs_acct,
+            credit_account=inv_acct,
+            amount=total_cost,
+            **posting_key("work_order", work_order.id),
+        )
+
 
 class WorkOrderViewSet(viewsets.ModelViewSet):
     queryset = WorkOrder.objects.all()
@@ -1349,20 +1362,15 @@ class WorkOrderViewSet(viewsets.ModelViewSet):
         """
         work_order = self.get_object()
 
-        # Idempotency based on description key
+        # Idempotency based on the posting source key
         desc = f"WorkOrder {work_order.id} consumption posting"
-        if JournalEntry.objects.filter(description=desc).exists():
+        if is_posted("work_order", work_order.id):
             return Response(
                 {"detail": "Work order already completed/posting recorded"},
                 status=status.HTTP_409_CONFLICT,
             )
 
-        # Adjust inventory and compute total cost consumed
-        try:
-            work_order.adjust_inventory()
-        except Exception as e:
-            return Response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
-
+        # Compute total cost consumed
         total_cost = 0
         for li in work_order.line_items.select_related("warehouse_item").all():
             wi = li.warehouse_item
@@ -1371,28 +1379,24 @@ class WorkOrderViewSet(viewsets.ModelViewSet):
             if wi.item_type in ["part", "equipment", "consumable"]:
                 total_cost += (li.quantity or 0) * (wi.unit_cost or 0)
 
-        if not total_cost:
+        # Adjust inventory and post in one transaction, so a concurrent
+        # duplicate completion rolls back its inventory consumption too
+        try:
+            entry = _complete_work_order(work_order, desc, total_cost)
+        except IntegrityError:
+            return Response(
+                {"detail": "Work order already completed/posting recorded"},
+                status=status.HTTP_409_CONFLICT,
+            )
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
+
+        if entry is None:
             log_activity(
                 request.user, "complete", work_order, "Completed without consumption"
             )
             return Response({"message": "Work order completed (no consumption)"})
 
-        # Default accounts
-        cogs_acct, _ = LedgerAccount.objects.get_or_create(
-            code="5000",
-            defaults={"name": "Cost of Goods Sold", "account_type": "expense"},
-        )
-        inv_acct, _ = LedgerAccount.objects.get_or_create(
-            code="1200", defaults={"name": "Inventory", "account_type": "asset"}
-        )
-
-        entry = JournalEntry.objects.create(
-            date=timezone.now().date(),
-            description=desc,
-            debit_account=cogs_acct,
-            credit_account=inv_acct,
-            amount=total_cost,
-        )
         log_activity(
             request.user,
             "complete",
@@ -1436,7 +1440,7 @@ class PaymentViewSet(viewsets.ModelViewSet):
 
         # Idempotency guard: do not double-post the same payment
         desc = f"Payment {payment.id} posting"
-        if JournalEntry.objects.filter(description=desc).exists():
+        if is_posted("payment", payment.id):
             return Response(
                 {
                     "payment_id": payment.id,
@@ -1447,63 +1451,58 @@ class PaymentViewSet(viewsets.ModelViewSet):
             )
 
         # Create JournalEntry DR Cash, CR AR
-        entry = JournalEntry.objects.create(
-            date=timezone.now().date(),
-            description=desc,
-            debit_account=cash_acct,
-            credit_account=ar_acct,
-            amount=payment.amount,
-        )
+        try:
+            with transaction.atomic():
+                entry = JournalEntry.objects.create(
+                    date=timezone.now().date(),
+                    description=desc,
+                    debit_account=cash_acct,
+                    credit_account=ar_acct,
+                    amount=payment.amount,
+                    **posting_key("payment", payment.id),
+                )
+        except IntegrityError:
+            # A concurrent request posted this payment first
+            return Response(
+                {
+                    "payment_id": payment.id,
+                    "allocated_amount": payment.amount,
+                    "allocation_status": "already-posted",
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
 
         # Apply to target object (Invoice or WorkOrderInvoice) with partials and overpay validation
         applied_to = getattr(payment, "content_object", None)
         open_balance = None
         new_status = None
         if isinstance(applied_to, Invoice) or isinstance(applied_to, WorkOrderInvoice):
-            # Compute total amount due
-            if isinstance(applied_to, Invoice):
-                total_due = sum(
-                    (itm.quantity or 0) * (itm.unit_price or 0)
-                    for itm in applied_to.items.all()
-                )
-            else:  # WorkOrderInvoice
-                total_due = applied_to.total_amount or 0
-
-            # Sum previous payments for this same object (generic relation)
-            from django.contrib.contenttypes.models import ContentType
-
-            ct = ContentType.objects.get_for_model(applied_to)
-            prev_paid = (
-                Payment.objects.filter(content_type=ct, object_id=applied_to.id)
-                .exclude(id=payment.id)
-                .aggregate(total=Sum("amount"))
-                .get("total")
-                or 0
-            )
+            # One indexed lookup: the maintained open item already counts this
+            # payment in total_paid. Decimal throughout; JSON renders numbers.
+            open_item = get_receivables_service().open_item(applied_to)
+            total_due = open_item.total_due
+            new_total_paid = open_item.total_paid
+            amount = payment.amount or Decimal("0.00")
+            prev_paid = new_total_paid - amount
 
-            new_total_paid = float(prev_paid) + float(payment.amount or 0)
             # Only enforce overpayment when we have a positive total_due figure
-            if float(total_due) > 0 and new_total_paid > float(total_due):
+            if total_due > 0 and new_total_paid > total_due:
                 return Response(
                     {
                         "error": "Payment exceeds open balance",
-                        "total_due": float(total_due),
-                        "previously_paid": float(prev_paid),
-                        "attempted_payment": float(payment.amount or 0),
+                        "total_due": total_due,
+                        "previously_paid": prev_paid,
+                        "attempted_payment": amount,
                     },
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            open_balance = (
-                float(total_due) - float(new_total_paid)
-                if float(total_due) > 0
-                else None
-            )
+            open_balance = total_due - new_total_paid if total_due > 0 else None
 
             # Update status flags
             if isinstance(applied_to, Invoice):
-                if float(total_due) > 0:
-                    applied_to.paid = new_total_paid == float(total_due)
+                if total_due > 0:
+                    applied_to.paid = new_total_paid == total_due
                     applied_to.save(update_fields=["paid", "updated_at"])
                     new_status = "paid" if applied_to.paid else "partial"
                 else:
@@ -1552,8 +1551,12 @@ def balance_sheet_report(request):
                 {"error": "Invalid date format. Use YYYY-MM-DD"}, status=400
             )
 
-    report_data = FinancialReports.get_balance_sheet(as_of_date)
-    return Response(report_data)
+    return cached_report_response(
+        request,
+        "balance_sheet",
+        {"as_of_date": as_of_date},
+        lambda: FinancialReports.get_balance_sheet(as_of_date),
+    )
 
 
 @api_view(["GET"])
@@ -1587,8 +1590,12 @@ def profit_loss_report(request):
                 {"error": "Invalid end_date format. Use YYYY-MM-DD"}, status=400
             )
 
-    report_data = FinancialReports.get_profit_loss(start_date, end_date)
-    return Response(report_data)
+    return cached_report_response(
+        request,
+        "profit_loss",
+        {"start_date": start_date, "end_date": end_date},
+        lambda: FinancialReports.get_profit_loss(start_date, end_date),
+    )
 
 
 @api_view(["GET"])
@@ -1622,8 +1629,71 @@ def cash_flow_report(request):
                 {"error": "Invalid end_date format. Use YYYY-MM-DD"}, status=400
             )
 
-    report_data = FinancialReports.get_cash_flow(start_date, end_date)
-    return Response(report_data)
+    return cached_report_response(
+        request,
+        "cash_flow",
+        {"start_date": start_date, "end_date": end_date},
+        lambda: FinancialReports.get_cash_flow(start_date, end_date),
+    )
+
+
+def _stream_ledger_export(request, rows_for, header, basename):
+    """
+    Shared handler for the streaming ledger exports.
+    Query parameters:
+    - start_date / end_date: YYYY-MM-DD (optional)
+    - account: ledger account code (optional)
+    - file_format: csv (default) or ndjson
+    """
+    export_format = request.query_params.get("file_format", "csv")
+    if export_format not in EXPORT_FORMATS:
+        return Response(
+            {"error": "file_format must be one of: " + ", ".join(EXPORT_FORMATS)},
+            status=400,
+        )
+
+    dates = {}
+    for param in ("start_date", "end_date"):
+        value = request.query_params.get(param)
+        dates[param] = None
+        if value:
+            try:
+                dates[param] = datetime.strptime(value, "%Y-%m-%d").date()
+            except ValueError:
+                return Response(
+                    {"error": f"Invalid {param} format. Use YYYY-MM-DD"}, status=400
+                )
+
+    rows = rows_for(
+        start_date=dates["start_date"],
+        end_date=dates["end_date"],
+        account_code=request.query_params.get("account") or None,
+    )
+    response = StreamingHttpResponse(
+        encode_rows(rows, header, export_format),
+        content_type=EXPORT_FORMATS[export_format],
+    )
+    filename = f"{basename}.{export_format}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+@api_view(["GET"])
+@permission_classes([FinancialDataPermission])
+def ledger_export(request):
+    """Stream journal entries as CSV or NDJSON without loading the full ledger."""
+    return _stream_ledger_export(
+        request, journal_entry_rows, JOURNAL_EXPORT_HEADER, "general_ledger"
+    )
+
+
+@api_view(["GET"])
+@permission_classes([FinancialDataPermission])
+def ledger_balances_export(request):
+    """Stream per-account debit, credit and balance totals as CSV or NDJSON."""
+    return _stream_ledger_export(
+        request, account_balance_rows, BALANCE_EXPORT_HEADER, "ledger_balances"
+    )
 
 
 # Expense and Budget API Views
@@ -1830,102 +1900,94 @@ def overdue_invoices(request):
     return Response(serializer.data)
 
 
+class AgingPagination(PageNumberPagination):
+    """Customers per page for the AR aging report."""
+
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+
+@api_view(["GET"])
+@permission_classes([FinancialDataPermission])
+def ar_aging_report(request):
+    """
+    Accounts-receivable aging per customer account
+    Query parameters:
+    - as_of_date: Date in YYYY-MM-DD format (optional, defaults to today)
+    - page, page_size: Customer pagination
+
+    Buckets are current, 1-30, 31-60, 61-90 and 90+ days past due, summed from
+    maintained open items in the database; "totals" covers every account.
+    Balances are current: as_of_date moves the bucket cut-offs and leaves out
+    invoices issued after it, but does not add back later payments.
+    """
+    as_of_date_str = request.query_params.get("as_of_date")
+    as_of_date = timezone.now().date()
+    if as_of_date_str:
+        try:
+            as_of_date = datetime.strptime(as_of_date_str, "%Y-%m-%d").date()
+        except ValueError:
+            return Response(
+                {"error": "Invalid date format. Use YYYY-MM-DD"}, status=400
+            )
+
+    receivables = get_receivables_service()
+    paginator = AgingPagination()
+    page = paginator.paginate_queryset(
+        receivables.aging_by_account(as_of_date), request
+    )
+    response = paginator.get_paginated_response(page)
+    response.data["as_of_date"] = as_of_date
+    response.data["totals"] = receivables.aging_totals(as_of_date)
+    return response
+
+
 # Tax Report API View
+# Upper bound on years per tax report request
+MAX_TAX_REPORT_YEARS = 20
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def tax_report(request):
     """
-    Generate tax report data for a specific year
+    Generate tax report data
+    Query parameters:
+    - year: Single tax year (optional, defaults to the current year)
+    - years: Comma-separated years, or start_year/end_year for a range
+    - quarterly: "true" to add a per-quarter breakdown to each year
+
+    A single year returns that year's report; several return {"years": [...]}.
     """
-    year = request.query_params.get("year", timezone.now().year)
+    params = request.query_params
     try:
-        year = int(year)
+        if params.get("years"):
+            years = [int(y) for y in params["years"].split(",") if y.strip()]
+        elif params.get("start_year") or params.get("end_year"):
+            start_year = int(params.get("start_year") or params.get("end_year"))
+            end_year = int(params.get("end_year") or start_year)
+            years = list(range(start_year, end_year + 1))
+        else:
+            years = [int(params.get("year", timezone.now().year))]
     except ValueError:
         return Response({"error": "Invalid year format"}, status=400)
-
-    # Calculate date range for the tax year
-    start_date = timezone.datetime(year, 1, 1).date()
-    end_date = timezone.datetime(year, 12, 31).date()
-
-    # Get contractor payments (from invoices paid to contractors)
-    contractor_payments = (
-        WorkOrderInvoice.objects.filter(
-            work_order__assigned_to__isnull=False,  # Has an assigned contractor
-            is_paid=True,
-            paid_date__range=(start_date, end_date),
-        )
-        .values(
-            "work_order__assigned_to__first_name",
-            "work_order__assigned_to__last_name",
-            "work_order__assigned_to",
-        )
-        .annotate(total_payments=Sum("total_amount"))
-        .order_by("-total_payments")
-    )
-
-    # Format contractor data
-    contractors = []
-    for payment in contractor_payments:
-        user = CustomUser.objects.get(id=payment["work_order__assigned_to"])
-        contractors.append(
-            {
-                "id": getattr(user, "id", None),
-                "name": f"{user.first_name} {user.last_name}",
-                "tax_id": getattr(user, "tax_id", None),
-                "total_payments": payment["total_payments"],
-            }
+    if not years or len(years) > MAX_TAX_REPORT_YEARS:
+        return Response(
+            {"error": f"Request between 1 and {MAX_TAX_REPORT_YEARS} years"},
+            status=400,
         )
+    quarterly = params.get("quarterly", "").lower() in ("1", "true", "yes")
+    years = sorted(set(years))
 
-    # Calculate sales tax using configurable rate from settings (default to 8.5% if not set)
-    sales_tax_rate = getattr(settings, "SALES_TAX_RATE", 0.085)
-    total_sales = (
-        Invoice.objects.filter(
-            created_at__date__range=(start_date, end_date)
-        ).aggregate(total=Sum("total_amount"))["total"]
-        or 0
-    )
-
-    tax_collected = total_sales * sales_tax_rate
+    def build():
+        report = FinancialReports.get_tax_report(years, quarterly=quarterly)
+        return report[0] if len(report) == 1 else {"years": report}
 
-    # Get expenses by category
-    expenses_by_category = (
-        Expense.objects.filter(date__range=(start_date, end_date), approved=True)
-        .values("category")
-        .annotate(total=Sum("amount"))
-        .order_by("-total")
+    return cached_report_response(
+        request, "tax_report", {"years": years, "quarterly": quarterly}, build
     )
 
-    # Calculate totals
-    total_expenses = sum(cat["total"] for cat in expenses_by_category)
-    total_revenue = (
-        Invoice.objects.filter(
-            created_at__date__range=(start_date, end_date)
-        ).aggregate(total=Sum("total_amount"))["total"]
-        or 0
-    )
-
-    net_income = total_revenue - total_expenses
-    # Use configurable tax rate from settings or default to 25%
-    tax_rate = getattr(settings, "TAX_RATE", 0.25)
-    estimated_tax = max(0, net_income * tax_rate)
-
-    tax_data = {
-        "year": year,
-        "contractorPayments": contractors,
-        "salesTax": {
-            "total_sales": total_sales,
-            "tax_collected": tax_collected,
-            "tax_rate": sales_tax_rate,
-        },
-        "expensesByCategory": list(expenses_by_category),
-        "totalExpenses": total_expenses,
-        "totalRevenue": total_revenue,
-        "netIncome": net_income,
-        "estimatedTax": estimated_tax,
-    }
-
-    return Response(tax_data)
-
 
 # Analytics API Views
 @api_view(["GET"])
@@ -1934,175 +1996,14 @@ def dashboard_analytics(request):
     """
     Provide cross-module analytics for dashboard.
     Implements REQ-205: cross-module analytics.
+    Query parameters:
+    - days: Window length ending today (defaults to DASHBOARD_ANALYTICS_DAYS)
     """
-    # Date range - last 30 days by default
-    end_date = timezone.now().date()
-    start_date = end_date - timezone.timedelta(days=30)
-
-    # Sales Analytics
-    total_deals = Deal.objects.filter(
-        created_at__date__range=(start_date, end_date)
-    ).count()
-    won_deals = Deal.objects.filter(
-        status="won", created_at__date__range=(start_date, end_date)
-    ).count()
-    total_deal_value = (
-        Deal.objects.filter(
-            status="won", created_at__date__range=(start_date, end_date)
-        ).aggregate(total=Sum("value"))["total"]
-        or 0
-    )
-
-    # Project Analytics
-    total_projects = Project.objects.filter(
-        created_at__date__range=(start_date, end_date)
-    ).count()
-    completed_projects = Project.objects.filter(
-        status="completed", created_at__date__range=(start_date, end_date)
-    ).count()
-    overdue_projects = Project.objects.filter(
-        status__in=["pending", "in_progress"], due_date__lt=timezone.now().date()
-    ).count()
-
-    # Financial Analytics
-    total_revenue = (
-        WorkOrderInvoice.objects.filter(
-            issued_date__range=(start_date, end_date), is_paid=True
-        ).aggregate(total=Sum("total_amount"))["total"]
-        or 0
-    )
-    total_expenses = (
-        Expense.objects.filter(
-            date__range=(start_date, end_date), approved=True
-        ).aggregate(total=Sum("amount"))["total"]
-        or 0
-    )
-
-    # Customer Lifetime Value (CLV) - simplified calculation
-    customers = (
-        Account.objects.annotate(
-            total_value=Sum("deals__value", filter=Q(deals__status="won"))
-        )
-        .filter(total_value__gt=0)
-        .order_by("-total_value")[:10]
-    )
-
-    clv_data = []
-    for account in customers:
-        value = getattr(account, "total_value", 0)
-        deal_count = Deal.objects.filter(account=account, status="won").count()
-        clv_data.append(
-            {
-                "account": account.name,
-                "total_value": value,
-                "deal_count": deal_count,
-            }
-        )
-
-    # Project Profitability
-    projects_with_costs = (
-        Project.objects.filter(created_at__date__range=(start_date, end_date))
-        .annotate(
-            revenue=Sum("work_orders__invoices__total_amount"),
-            costs=Sum("work_orders__line_items__total"),
-        )
-        .filter(revenue__isnull=False)
-    )
-
-    project_profitability = []
-    for project in projects_with_costs:
-        revenue = getattr(project, "revenue", 0) or 0
-        costs = getattr(project, "costs", 0) or 0
-        profit = revenue - costs
-        margin = (profit / revenue * 100) if revenue > 0 else 0
-
-        project_profitability.append(
-            {
-                "project": project.title,
-                "revenue": revenue,
-                "costs": costs,
-                "profit": profit,
-                "margin": round(margin, 2),
-            }
-        )
-
-    # Time tracking analytics
-    total_hours_logged = (
-        TimeEntry.objects.filter(date__range=(start_date, end_date)).aggregate(
-            total=Sum("hours")
-        )["total"]
-        or 0
-    )
-
-    billable_hours = (
-        TimeEntry.objects.filter(
-            date__range=(start_date, end_date), billable=True
-        ).aggregate(total=Sum("hours"))["total"]
-        or 0
-    )
-
-    # Inventory analytics (if warehouse exists)
-    low_stock_items = []
     try:
-        low_stock_items = list(
-            WarehouseItem.objects.filter(quantity__lte=F("minimum_stock")).values(
-                "name", "quantity", "minimum_stock", "warehouse__name"
-            )
-        )
-    except Exception:
-        pass  # Warehouse models might not be available yet
-
-    analytics_data = {
-        "period": {"start_date": start_date, "end_date": end_date},
-        "sales": {
-            "total_deals": total_deals,
-            "won_deals": won_deals,
-            "win_rate": round(
-                (won_deals / total_deals * 100) if total_deals > 0 else 0, 2
-            ),
-            "total_value": total_deal_value,
-        },
-        "projects": {
-            "total_projects": total_projects,
-            "completed_projects": completed_projects,
-            "completion_rate": round(
-                (completed_projects / total_projects * 100)
-                if total_projects > 0
-                else 0,
-                2,
-            ),
-            "overdue_projects": overdue_projects,
-        },
-        "financial": {
-            "total_revenue": total_revenue,
-            "total_expenses": total_expenses,
-            "net_income": total_revenue - total_expenses,
-            "profit_margin": round(
-                ((total_revenue - total_expenses) / total_revenue * 100)
-                if total_revenue > 0
-                else 0,
-                2,
-            ),
-        },
-        "time_tracking": {
-            "total_hours": float(total_hours_logged),
-            "billable_hours": float(billable_hours),
-            "billable_percentage": round(
-                (billable_hours / total_hours_logged * 100)
-                if total_hours_logged > 0
-                else 0,
-                2,
-            ),
-        },
-        "customer_lifetime_value": clv_data,
-        "project_profitability": project_profitability,
-        "inventory": {
-            "low_stock_items": low_stock_items,
-            "low_stock_count": len(low_stock_items),
-        },
-    }
-
-    return Response(analytics_data)
+        days = window_days(request.query_params.get("days"))
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+    return Response(cached_dashboard(days))
 
 
 # Phase 3: Advanced Analytics Serializers
@@ -2159,8 +2060,72 @@ class AnalyticsSnapshotViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=["get"])
     def trends(self, request):
-        """Get analytics trends and insights"""
-        return Response({"trends": [], "insights": [], "recommendations": []})
+        """
+        Daily time series from the metric rollups, with period-over-period
+        insights.
+        Query parameters:
+        - metrics: Comma-separated metric names (defaults to deal, project
+          and payment metrics)
+        - dimension: all (default), owner, stage or account; per-dimension
+          requests return one series per key
+        - key: Restrict the dimension to one owner/account id, stage or status
+        - date_from/date_to (YYYY-MM-DD), or days (default 30)
+        """
+        params = request.query_params
+        requested = params.get("metrics") or ",".join(DEFAULT_TREND_METRICS)
+        metrics = [name.strip() for name in requested.split(",") if name.strip()]
+        unknown = [name for name in metrics if name not in ROLLUP_METRICS]
+        if not metrics or unknown:
+            return Response(
+                {"error": f"Unknown metric(s): {', '.join(unknown) or '(none)'}"},
+                status=400,
+            )
+        dimension = params.get("dimension", "all")
+        if dimension != "all":
+            unsupported = [
+                name
+                for name in metrics
+                if dimension not in ROLLUP_METRICS[name]["dimensions"]
+            ]
+            if unsupported:
+                return Response(
+                    {
+                        "error": f"Dimension '{dimension}' is not available for "
+                        f"{', '.join(unsupported)}"
+                    },
+                    status=400,
+                )
+
+        max_days = getattr(settings, "ROLLUP_TRENDS_MAX_DAYS", 730)
+        try:
+            end_date = (
+                datetime.strptime(params["date_to"], "%Y-%m-%d").date()
+                if params.get("date_to")
+                else timezone.localdate()
+            )
+            if params.get("date_from"):
+                start_date = datetime.strptime(params["date_from"], "%Y-%m-%d").date()
+            else:
+                days = int(params.get("days", 30))
+                start_date = end_date - timezone.timedelta(days=days - 1)
+        except ValueError:
+            return Response({"error": "Invalid date or days"}, status=400)
+        if not 0 <= (end_date - start_date).days < max_days:
+            return Response(
+                {"error": f"Request between 1 and {max_days} days"}, status=400
+            )
+
+        rollups = get_rollup_service()
+        return Response(
+            {
+                "period": {"start_date": start_date, "end_date": end_date},
+                "trends": rollups.series(
+                    metrics, start_date, end_date, dimension, params.get("key")
+                ),
+                "insights": rollups.period_comparison(metrics, start_date, end_date),
+                "recommendations": [],
+            }
+        )
 
 
 # Phase 4: Technician & User Management API Views
@@ -2232,18 +2197,12 @@ class TechnicianViewSet(viewsets.ModelViewSet):
 
         # Idempotency: if journal already exists for this WO completion, return 409
         desc = f"WorkOrder {work_order.id} consumption posting"
-        if JournalEntry.objects.filter(description=desc).exists():
+        if is_posted("work_order", work_order.id):
             return Response(
                 {"detail": "Work order already completed/posting recorded"},
                 status=status.HTTP_409_CONFLICT,
             )
 
-        # Adjust inventory (raises on insufficient stock)
-        try:
-            work_order.adjust_inventory()
-        except Exception as e:
-            return Response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
-
         # Calculate total cost consumed (sum of quantity * unit_cost for parts/equipment/consumable)
         total_cost = 0
         for li in work_order.line_items.select_related("warehouse_item").all():
@@ -2253,31 +2212,25 @@ class TechnicianViewSet(viewsets.ModelViewSet):
             if wi.item_type in ["part", "equipment", "consumable"]:
                 total_cost += (li.quantity or 0) * (wi.unit_cost or 0)
 
+        # Adjust inventory (raises on insufficient stock) and post DR COGS,
+        # CR Inventory atomically; a concurrent duplicate completion gets 409
+        try:
+            entry = _complete_work_order(work_order, desc, total_cost)
+        except IntegrityError:
+            return Response(
+                {"detail": "Work order already completed/posting recorded"},
+                status=status.HTTP_409_CONFLICT,
+            )
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
+
         # If nothing consumed, succeed without GL posting
-        if not total_cost:
+        if entry is None:
             log_activity(
                 request.user, "complete", work_order, "Completed without consumption"
             )
             return Response({"message": "Work order completed (no consumption)"})
 
-        # Resolve default COGS and Inventory accounts
-        cogs_acct, _ = LedgerAccount.objects.get_or_create(
-            code="5000",
-            defaults={"name": "Cost of Goods Sold", "account_type": "expense"},
-        )
-        inv_acct, _ = LedgerAccount.objects.get_or_create(
-            code="1200", defaults={"name": "Inventory", "account_type": "asset"}
-        )
-
-        # Create JournalEntry DR COGS, CR Inventory
-        entry = JournalEntry.objects.create(
-            date=timezone.now().date(),
-            description=desc,
-            debit_account=cogs_acct,
-            credit_account=inv_acct,
-            amount=total_cost,
-        )
-
         log_activity(
             request.user,
             "complete",
@@ -3118,10 +3071,11 @@ def predict_deal_outcome(request, deal_id):
 @rate_limit_analytics(max_requests=15, window_seconds=60)
 def generate_revenue_forecast(request):
     """
-    Generate revenue forecast.
-    Implements Phase 5: Advanced Analytics with persistent model integration.
+    Revenue forecast for a period and method.
+    Serves the RevenueForecast rows persisted by the nightly
+    generate_revenue_forecasts task; they are computed once here only when no
+    forecast from the last 7 days exists.
     """
-    from django.utils import timezone
     from datetime import timedelta
 
     # Validate parameters
@@ -3131,68 +3085,73 @@ def generate_revenue_forecast(request):
             {"error": "Invalid parameters", "details": serializer.errors},
             status=status.HTTP_400_BAD_REQUEST,
         )
-    
+
     params = serializer.validated_data
     forecast_period = params["period"]
     forecast_method = params["method"]
 
-    # Try to get existing forecast from persistent model
-    try:
-        # Get recent forecasts (within last 7 days)
-        recent_date = timezone.now().date() - timedelta(days=7)
-        forecast_record = (
-            RevenueForecast.objects.filter(
-                forecast_period=forecast_period,
-                forecast_method=forecast_method,
-                forecast_date__gte=recent_date,
-            )
-            .order_by("-forecast_date")
-            .first()
-        )
-
-        if forecast_record:
+    recent = RevenueForecast.objects.filter(
+        forecast_method=forecast_method,
+        forecast_date__gte=timezone.now().date() - timedelta(days=7),
+    )
+    latest = (
+        recent.filter(forecast_period=forecast_period)
+        .order_by("-forecast_date")
+        .values_list("forecast_date", flat=True)
+        .first()
+    )
+    if latest is None:
+        try:
+            generate_forecasts(methods=[forecast_method])
+        except ForecastUnavailable as e:
             return Response(
                 {
-                    "forecast_period": forecast_record.forecast_period,
-                    "forecast_method": forecast_record.forecast_method,
-                    "predicted_revenue": float(forecast_record.predicted_revenue),
-                    "confidence_interval": {
-                        "lower": float(forecast_record.confidence_interval_lower),
-                        "upper": float(forecast_record.confidence_interval_upper),
-                    },
-                    "factors": forecast_record.factors,
-                    "forecast_date": forecast_record.forecast_date.isoformat(),
-                    "data_source": "persistent_model",
-                    "created_at": forecast_record.created_at.isoformat(),
+                    "forecast_period": forecast_period,
+                    "forecast_method": forecast_method,
+                    "predicted_revenue": None,
+                    "confidence_interval": None,
+                    "next_month": None,
+                    "next_quarter": None,
+                    "next_year": None,
+                    "accuracy_metrics": {},
+                    "data_source": "unavailable",
+                    "message": str(e),
                 }
             )
-    except Exception:
-        pass  # Fall back to heuristic calculation
-
-    # Fallback to heuristic forecast
-    if forecast_period == "monthly":
-        base_forecast = 150000
-    elif forecast_period == "quarterly":
-        base_forecast = 450000
-    else:  # annual
-        base_forecast = 1800000
-
-    forecast = {
-        "forecast_period": forecast_period,
-        "forecast_method": "heuristic",
-        "predicted_revenue": base_forecast,
-        "confidence_interval": {
-            "lower": base_forecast * 0.8,
-            "upper": base_forecast * 1.2,
-        },
-        "factors": {"method": "heuristic", "base_calculation": True},
-        "data_source": "heuristic_calculation",
-        "message": "Using fallback forecast. Run analytics refresh for "
-        "improved accuracy.",
-        "accuracy_metrics": {"historical_accuracy": 0.85, "confidence_interval": 0.95},
+        latest = timezone.now().date()
+
+    by_period = {
+        forecast.forecast_period: forecast
+        for forecast in recent.filter(forecast_date=latest)
     }
 
-    return Response(forecast)
+    def summary(forecast):
+        if forecast is None:
+            return None
+        result = {"predicted_revenue": float(forecast.predicted_revenue)}
+        if params["include_confidence"]:
+            result["confidence_interval"] = {
+                "lower": float(forecast.confidence_interval_lower),
+                "upper": float(forecast.confidence_interval_upper),
+            }
+        return result
+
+    forecast_record = by_period[forecast_period]
+    return Response(
+        {
+            "forecast_period": forecast_period,
+            "forecast_method": forecast_method,
+            **summary(forecast_record),
+            "factors": forecast_record.factors,
+            "forecast_date": forecast_record.forecast_date.isoformat(),
+            "next_month": summary(by_period.get("monthly")),
+            "next_quarter": summary(by_period.get("quarterly")),
+            "next_year": summary(by_period.get("annual")),
+            "accuracy_metrics": forecast_record.factors.get("backtest", {}),
+            "data_source": "persistent_model",
+            "created_at": forecast_record.created_at.isoformat(),
+        }
+    )
 
 
 # Missing Infrastructure ViewSets
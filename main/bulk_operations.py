@@ -0,0 +1,375 @@
+"""
+Background execution of bulk operations for Converge CRM.
+A BulkOperation row is queued once its creating transaction commits, either
+to a Celery task or run in-process. Matching records are walked in primary-key
+chunks (keyset, never OFFSET) and changed with set-based UPDATE/DELETE
+statements; search index updates are dispatched once per chunk. Exports
+stream matching rows through a chunked cursor into a stored file. Progress
+writes double as the cancellation check and happen at most every
+BULK_OPERATION_PROGRESS_INTERVAL seconds.
+"""
+
+import logging
+import time
+from typing import Any, Dict, List
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from . import dashboard_analytics, saved_search_cache, search_indexer
+from .pagination import Keyset
+from .rollup_service import get_rollup_service
+from .search.db_provider import DatabaseSearchProvider
+from .search_export import export_columns, write_export
+from .search_models import BulkOperation
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Seconds between progress writes (and cancellation checks)
+DEFAULT_PROGRESS_INTERVAL = 1.0
+
+ALL_FIELDS = "__all__"
+
+# Updates touching these fields go through each row's save() and post_save
+# handlers: Deal/Project save() fill defaults, a won deal opens a project and
+# work order, and invoice changes feed the ledger and receivables
+ROW_SAVE_FIELDS = {
+    "deals": {"status", "stage", "close_date"},
+    "projects": {"due_date", "assigned_to"},
+    "invoices": ALL_FIELDS,
+}
+
+
+class OperationCancelled(Exception):
+    """The operation was cancelled while running."""
+
+
+def resolve_update_fields(model, update_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate update_data against model fields (type, choices, validators) and
+    convert values to Python types.
+
+    Args:
+        model: Model being updated
+        update_data: {field name: value}; foreign keys take the related id
+
+    Returns:
+        {field name: converted value}
+
+    Raises:
+        ValueError: If a field does not exist, is not editable, or a value
+            does not fit its field
+    """
+    values = {}
+    for name, value in update_data.items():
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise ValueError(f"Unknown field '{name}' for {model.__name__}")
+        if (
+            not field.concrete
+            or field.primary_key
+            or not field.editable
+            or field.many_to_many
+        ):
+            raise ValueError(f"Field '{name}' cannot be bulk updated")
+        try:
+            values[field.name] = field.clean(value, None)
+        except ValidationError as e:
+            raise ValueError(f"Invalid value for '{name}': {'; '.join(e.messages)}")
+    return values
+
+
+def needs_row_save(entity_type: str, field_names) -> bool:
+    """Whether an update must save row by row to keep save()/signal side effects."""
+    fields = ROW_SAVE_FIELDS.get(entity_type, ())
+    return fields == ALL_FIELDS or bool(set(fields) & set(field_names))
+
+
+def queue(bulk_operation_id: int) -> None:
+    """Run a pending operation after the current transaction commits."""
+    transaction.on_commit(lambda: dispatch(bulk_operation_id))
+
+
+def dispatch(bulk_operation_id: int) -> None:
+    """Hand an operation to Celery, or run it here when configured or on failure."""
+    if getattr(settings, "BULK_OPERATION_BACKEND", "celery") == "celery":
+        try:
+            from .celery_tasks import run_bulk_operation
+
+            run_bulk_operation.delay(bulk_operation_id)
+            return
+        except Exception:
+            logger.warning(
+                "Could not queue bulk operation %s; running in-process",
+                bulk_operation_id,
+                exc_info=True,
+            )
+    run(bulk_operation_id)
+
+
+def run(bulk_operation_id: int) -> None:
+    """
+    Execute a pending update, delete or export operation.
+
+    Args:
+        bulk_operation_id: BulkOperation to run; anything not pending
+            (already running, finished or cancelled) is left alone
+    """
+    claimed = BulkOperation.objects.filter(
+        pk=bulk_operation_id, status="pending"
+    ).update(status="running", started_at=timezone.now())
+    if not claimed:
+        return
+    bulk_op = BulkOperation.objects.select_related("user").get(pk=bulk_operation_id)
+    job = _Job(bulk_op)
+    try:
+        if bulk_op.operation_type == "update":
+            job.update()
+        elif bulk_op.operation_type == "delete":
+            job.delete()
+        elif bulk_op.operation_type == "export":
+            job.export()
+        else:
+            raise ValueError(
+                f"Operation type '{bulk_op.operation_type}' cannot be run here"
+            )
+    except OperationCancelled:
+        job.write_progress(final=True, status=None)
+    except Exception as e:
+        logger.exception("Bulk operation %s failed", bulk_operation_id)
+        job.write_progress(final=True, status="failed", error_message=str(e))
+    else:
+        job.write_progress(final=True, status="completed")
+
+
+class _Job:
+    """Running state of one bulk operation."""
+
+    def __init__(self, bulk_op: BulkOperation):
+        self.bulk_op = bulk_op
+        self.options = bulk_op.operation_data or {}
+        self.chunk_size = int(
+            self.options.get("batch_size")
+            or getattr(settings, "BULK_OPERATION_CHUNK_SIZE", DEFAULT_CHUNK_SIZE)
+        )
+        self.processed = 0
+        self.successful = 0
+        self.failed = 0
+        self.chunks = 0
+        self.mode = None
+        self.output = {}
+        self.started = time.monotonic()
+        self.progress_at = self.started
+
+    @property
+    def model(self):
+        model = DatabaseSearchProvider.SEARCHABLE_MODELS.get(self.bulk_op.entity_type)
+        if model is None:
+            raise ValueError(f"Entity type '{self.bulk_op.entity_type}' not supported")
+        return model
+
+    def prepare(self, mode: str, queryset=None):
+        """Resolve the user's matching rows (unless given) and record the total."""
+        from .search_service import SearchService
+
+        self.mode = mode
+        self.content_type_id = ContentType.objects.get_for_model(self.model).id
+        if queryset is None:
+            search_service = SearchService(self.bulk_op.user)
+            queryset = search_service._get_user_queryset(self.model)
+            queryset = search_service._apply_filters(
+                queryset, self.bulk_op.filters or {}, self.model
+            )
+        self.queryset = queryset
+        BulkOperation.objects.filter(pk=self.bulk_op.pk).update(
+            total_records=self.queryset.count()
+        )
+
+    def chunks_of_ids(self):
+        """Primary keys of matching rows, chunk by chunk in pk order."""
+        last_pk = None
+        while True:
+            queryset = self.queryset
+            if last_pk is not None:
+                queryset = queryset.filter(pk__gt=last_pk)
+            ids = list(
+                queryset.order_by("pk").values_list("pk", flat=True)[: self.chunk_size]
+            )
+            if not ids:
+                return
+            yield ids
+            last_pk = ids[-1]
+            self.chunks += 1
+            self.maybe_write_progress()
+
+    def update(self):
+        values = resolve_update_fields(self.model, self.options.get("update_data", {}))
+        if needs_row_save(self.bulk_op.entity_type, values):
+            self.prepare("row")
+            self._update_rows(values)
+        else:
+            self.prepare("set")
+            self._update_set(values)
+
+    def _update_set(self, values: Dict[str, Any]):
+        # QuerySet.update() skips auto_now, so stamp those fields here
+        now = timezone.now()
+        stamps = {
+            field.name: now
+            for field in self.model._meta.concrete_fields
+            if getattr(field, "auto_now", False)
+        }
+        rollups = get_rollup_service()
+        moves_rollups = bool(set(values) & set(rollups.source_fields(self.model)))
+        for ids in self.chunks_of_ids():
+            with transaction.atomic():
+                if moves_rollups:
+                    rollups.mark_changed(self.model.objects.filter(pk__in=ids))
+                updated = self.model.objects.filter(pk__in=ids).update(
+                    **values, **stamps
+                )
+            self.processed += len(ids)
+            self.successful += updated
+            self.failed += len(ids) - updated
+            self.reindex(ids)
+
+    def _update_rows(self, values: Dict[str, Any]):
+        update_fields = list(values) + [
+            field.name
+            for field in self.model._meta.concrete_fields
+            if getattr(field, "auto_now", False) and field.name not in values
+        ]
+        for ids in self.chunks_of_ids():
+            # One transaction per chunk, so signal-queued index updates are
+            # flushed once per chunk; a savepoint per row isolates failures
+            with transaction.atomic():
+                for obj in self.model.objects.filter(pk__in=ids).order_by("pk"):
+                    try:
+                        with transaction.atomic():
+                            for name, value in values.items():
+                                setattr(obj, name, value)
+                            obj.save(update_fields=update_fields)
+                        self.successful += 1
+                    except Exception:
+                        logger.warning(
+                            "Bulk update failed for %s %s",
+                            self.model.__name__,
+                            obj.pk,
+                            exc_info=True,
+                        )
+                        self.failed += 1
+            self.processed += len(ids)
+
+    def delete(self):
+        self.prepare("set")
+        label = self.model._meta.label
+        for ids in self.chunks_of_ids():
+            with transaction.atomic():
+                _, deleted = self.model.objects.filter(pk__in=ids).delete()
+            removed = deleted.get(label, 0)
+            self.processed += len(ids)
+            self.successful += removed
+            self.failed += len(ids) - removed
+
+    def export(self):
+        export_format = self.options.get("format", "csv")
+        columns = export_columns(self.model, self.options.get("fields"))
+        provider = DatabaseSearchProvider(self.bulk_op.user)
+        self.prepare(
+            "stream",
+            provider._advanced_queryset(
+                self.bulk_op.entity_type,
+                self.options.get("query", ""),
+                self.bulk_op.filters,
+            ),
+        )
+
+        keyset = Keyset(
+            self.model,
+            self.options.get("sort_by") or "pk",
+            self.options.get("sort_order") == "desc",
+        )
+        rows = (
+            keyset.order(self.queryset)
+            .values_list(*[lookup for _, lookup in columns])
+            .iterator(chunk_size=self.chunk_size)
+        )
+        file_name, size = write_export(
+            self.counted(rows),
+            [header for header, _ in columns],
+            export_format,
+            f"{self.bulk_op.entity_type}-{self.bulk_op.pk}",
+        )
+        self.successful = self.processed
+        self.output = {
+            "file": file_name,
+            "format": export_format,
+            "size_bytes": size,
+        }
+
+    def counted(self, rows):
+        """Pass rows through, counting them and writing progress per chunk."""
+        for row in rows:
+            yield row
+            self.processed += 1
+            if self.processed % self.chunk_size == 0:
+                self.chunks += 1
+                self.maybe_write_progress()
+
+    def reindex(self, ids: List[int]):
+        """Refresh search entries and caches for rows changed without signals."""
+        search_indexer.dispatch(
+            [[self.content_type_id, pk, search_indexer.INDEX] for pk in ids]
+        )
+        saved_search_cache.bump_data_version()
+        dashboard_analytics.bump_data_version()
+
+    def maybe_write_progress(self):
+        interval = getattr(
+            settings, "BULK_OPERATION_PROGRESS_INTERVAL", DEFAULT_PROGRESS_INTERVAL
+        )
+        if time.monotonic() - self.progress_at >= interval:
+            self.write_progress()
+
+    def write_progress(self, final: bool = False, status="running", **extra):
+        """
+        Record counters and throughput.
+
+        Only a running operation is updated, so a concurrent cancel is never
+        overwritten; when that happens mid-run OperationCancelled is raised.
+        """
+        elapsed = time.monotonic() - self.started
+        fields = {
+            "processed_records": self.processed,
+            "successful_records": self.successful,
+            "failed_records": self.failed,
+            "results": {
+                **self.output,
+                "mode": self.mode,
+                "chunks": self.chunks,
+                "elapsed_seconds": round(elapsed, 3),
+                "records_per_second": round(self.processed / elapsed, 1)
+                if elapsed
+                else None,
+            },
+            **extra,
+        }
+        if final:
+            fields["completed_at"] = timezone.now()
+            if status:
+                fields["status"] = status
+            else:
+                # Cancelled: keep the status and completion time set by cancel
+                fields.pop("completed_at")
+        self.progress_at = time.monotonic()
+        queryset = BulkOperation.objects.filter(pk=self.bulk_op.pk)
+        if not final or status:
+            queryset = queryset.filter(status="running")
+        if not queryset.update(**fields) and not final:
+            raise OperationCancelled()
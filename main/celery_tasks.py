@@ -223,6 +223,116 @@ def process_post_appointment_workflow(work_order_id):
         raise
 
 
+@shared_task
+def update_search_index(items):
+    """
+    Apply a batch of queued global search index updates.
+    Queued by main.search_indexer after the writing transaction commits.
+    """
+    try:
+        from main.search_indexer import process_batch
+
+        indexed = process_batch(items)
+        logger.debug(f"Search index batch applied: {indexed} objects indexed")
+        return indexed
+
+    except Exception as e:
+        logger.error(f"Search index update task failed: {str(e)}")
+        raise
+
+
+@shared_task
+def precompute_saved_searches():
+    """
+    Write counted saved-search usage and warm the result cache for
+    the most-used saved searches.
+    """
+    try:
+        from main.saved_search_cache import precompute_popular_searches
+
+        computed = precompute_popular_searches()
+        logger.info(f"Precomputed {computed} saved searches")
+        return computed
+
+    except Exception as e:
+        logger.error(f"Saved search precompute task failed: {str(e)}")
+        raise
+
+
+@shared_task
+def run_bulk_operation(bulk_operation_id):
+    """
+    Execute a queued bulk update or delete.
+    Queued by main.bulk_operations after the creating transaction commits.
+    """
+    try:
+        from main.bulk_operations import run
+
+        run(bulk_operation_id)
+
+    except Exception as e:
+        logger.error(f"Bulk operation task failed: {str(e)}")
+        raise
+
+
+@shared_task
+def refresh_metric_rollups():
+    """
+    Recompute metric rollup days touched by deals and projects changed since
+    the last run, catching writes that skipped the rollup signals.
+    """
+    try:
+        from main.rollup_service import get_rollup_service
+
+        refreshed = get_rollup_service().refresh_changed()
+        logger.info(f"Refreshed {refreshed} metric rollup days")
+        return refreshed
+
+    except Exception as e:
+        logger.error(f"Metric rollup refresh task failed: {str(e)}")
+        raise
+
+
+@shared_task
+def recalculate_customer_lifetime_values():
+    """
+    Recalculate CustomerLifetimeValue for every contact with deals in one
+    grouped pass.
+    """
+    try:
+        from main.clv_service import calculate_all
+
+        calculated = calculate_all()
+        logger.info(f"Recalculated CLV for {calculated} contacts")
+        return calculated
+
+    except Exception as e:
+        logger.error(f"CLV recalculation task failed: {str(e)}")
+        raise
+
+
+@shared_task
+def generate_revenue_forecasts():
+    """
+    Forecast revenue for every period and method from the daily revenue
+    rollups and persist the RevenueForecast rows the forecast endpoint serves.
+    """
+    try:
+        from main.revenue_forecasting import ForecastUnavailable, generate_forecasts
+
+        try:
+            forecasts = generate_forecasts()
+        except ForecastUnavailable as e:
+            logger.warning(f"Revenue forecasts skipped: {str(e)}")
+            return 0
+        logger.info(f"Generated {len(forecasts)} revenue forecasts")
+        return len(forecasts)
+
+    except Exception as e:
+        logger.error(f"Revenue forecast task failed: {str(e)}")
+        raise
+
+
 # Celery Beat Schedule Configuration
 # Add this to your Django settings.py:
 """
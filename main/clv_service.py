@@ -0,0 +1,159 @@
+"""
+Customer lifetime value calculation for Converge CRM.
+Deal statistics for every contact come from one grouped aggregate over deals
+(streamed in chunks), CLV figures and segments are derived in Python with the
+same formula as CustomerLifetimeValue.calculate_for_contact, and each chunk is
+upserted with bulk_create(update_conflicts=True).
+"""
+
+import logging
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, Optional
+
+from django.db.models import Avg, Count, Max, Q, Sum
+from django.utils import timezone
+
+from .models import CustomerLifetimeValue, Deal
+
+logger = logging.getLogger(__name__)
+
+CENT = Decimal("0.01")
+ZERO = Decimal("0.00")
+
+# Contacts per upsert batch
+DEFAULT_CHUNK_SIZE = 2000
+
+# Per-contact deal statistics, as grouped aggregates over Deal
+DEAL_STATISTICS = {
+    "total_deals": Count("pk"),
+    "won_deals": Count("pk", filter=Q(status="won")),
+    "total_revenue": Sum("value", filter=Q(status="won")),
+    "average_deal_size": Avg("value", filter=Q(status="won")),
+    "last_deal_update": Max("updated_at"),
+}
+
+UPDATE_FIELDS = [
+    "total_revenue",
+    "total_deals",
+    "average_deal_size",
+    "deal_win_rate",
+    "customer_since",
+    "last_activity",
+    "predicted_clv",
+    "clv_confidence",
+    "segments",
+    "updated_at",
+]
+
+
+def _decimal(value) -> Decimal:
+    return Decimal(str(value or 0)).quantize(CENT)
+
+
+def clv_fields(customer_created_at, stats: Dict, today: Optional[date] = None):
+    """
+    CustomerLifetimeValue field values for one contact.
+
+    Args:
+        customer_created_at: The contact's created_at
+        stats: DEAL_STATISTICS values for the contact's deals
+        today: Reference day for tenure; today by default
+
+    Returns:
+        Dict of CustomerLifetimeValue field values (excluding contact)
+    """
+    today = today or timezone.now().date()
+    total_deals = stats["total_deals"] or 0
+    total_revenue = _decimal(stats["total_revenue"])
+    win_rate = Decimal(stats["won_deals"] or 0) / total_deals if total_deals else ZERO
+
+    customer_since = customer_created_at.date()
+    last_activity = customer_since
+    if stats["last_deal_update"]:
+        last_activity = max(customer_since, stats["last_deal_update"].date())
+
+    # Simple CLV prediction: average monthly revenue over a 3-year horizon
+    months_active = Decimal((today - customer_since).days) / 30
+    monthly_revenue = total_revenue / max(months_active, 1)
+
+    segments = []
+    if total_revenue > 10000:
+        segments.append("high_value")
+    elif total_revenue > 5000:
+        segments.append("medium_value")
+    else:
+        segments.append("low_value")
+    if win_rate > Decimal("0.7"):
+        segments.append("high_conversion")
+    if months_active > 12:
+        segments.append("loyal")
+
+    # Confidence grows with deal history
+    confidence = min(Decimal("0.90"), Decimal(total_deals) / 10)
+    return {
+        "total_revenue": total_revenue,
+        "total_deals": total_deals,
+        "average_deal_size": _decimal(stats["average_deal_size"]),
+        "deal_win_rate": win_rate.quantize(CENT),
+        "customer_since": customer_since,
+        "last_activity": last_activity,
+        "predicted_clv": (monthly_revenue * 12 * 3).quantize(CENT),
+        "clv_confidence": confidence.quantize(CENT),
+        "segments": segments,
+    }
+
+
+def calculate_all(
+    contact_ids: Optional[Iterable[int]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """
+    Recalculate CLV for every contact with deals (or the given contacts).
+
+    Args:
+        contact_ids: Restrict to these contacts; all contacts with deals by
+            default
+        chunk_size: Contacts per fetch and upsert batch
+
+    Returns:
+        Number of CustomerLifetimeValue rows written
+    """
+    deals = Deal.objects.filter(primary_contact__isnull=False)
+    if contact_ids is not None:
+        deals = deals.filter(primary_contact__in=list(contact_ids))
+    rows = (
+        deals.order_by()
+        .values("primary_contact", "primary_contact__created_at")
+        .annotate(**DEAL_STATISTICS)
+        .order_by("primary_contact")
+        .iterator(chunk_size=chunk_size)
+    )
+
+    today = timezone.now().date()
+    written = 0
+    batch = []
+    for row in rows:
+        batch.append(
+            CustomerLifetimeValue(
+                contact_id=row["primary_contact"],
+                **clv_fields(row["primary_contact__created_at"], row, today),
+            )
+        )
+        if len(batch) >= chunk_size:
+            written += _upsert(batch)
+            batch = []
+    if batch:
+        written += _upsert(batch)
+    logger.info("Calculated CLV for %s contacts", written)
+    return written
+
+
+def _upsert(batch) -> int:
+    CustomerLifetimeValue.objects.bulk_create(
+        batch,
+        update_conflicts=True,
+        unique_fields=["contact"],
+        update_fields=UPDATE_FIELDS,
+    )
+    return len(batch)
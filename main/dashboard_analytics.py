@@ -0,0 +1,271 @@
+"""
+Cross-module dashboard analytics for Converge CRM (REQ-205).
+Each source table is read once with conditional aggregates (Count/Sum with
+filter=Q) instead of one COUNT/SUM query per figure, and project
+profitability sums invoices and line items in correlated subqueries so the two
+joins cannot multiply each other's rows. The payload is the same for every
+user, so it is cached per window and day behind a version counter that saves
+and deletes of the source models bump.
+"""
+
+import time
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.utils import timezone
+
+from .models import (
+    Account,
+    Deal,
+    Expense,
+    LineItem,
+    Project,
+    TimeEntry,
+    WarehouseItem,
+    WorkOrderInvoice,
+)
+
+DATA_VERSION_KEY = "dashboard:data_version"
+
+# Days covered by the dashboard unless ?days= asks otherwise, and the cap on it
+DEFAULT_WINDOW_DAYS = 30
+DEFAULT_MAX_WINDOW_DAYS = 365
+
+# Seconds a cached dashboard payload lives
+DEFAULT_CACHE_TIMEOUT = 60
+
+# Low-stock items listed in full; the count always covers every item
+DEFAULT_LOW_STOCK_LIMIT = 50
+
+CLV_ACCOUNTS = 10
+
+
+def get_data_version() -> int:
+    """Current dashboard data version, seeded from the clock after a cache flush."""
+    version = cache.get(DATA_VERSION_KEY)
+    if version is None:
+        cache.add(DATA_VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(DATA_VERSION_KEY)
+    return version
+
+
+def bump_data_version() -> None:
+    """
+    Invalidate every cached dashboard payload.
+
+    Bumps immediately and again on commit, so a payload cached from
+    pre-commit data in between is never served.
+    """
+    _increment_version()
+    transaction.on_commit(_increment_version)
+
+
+def _increment_version():
+    try:
+        cache.incr(DATA_VERSION_KEY)
+    except ValueError:
+        get_data_version()
+        cache.incr(DATA_VERSION_KEY)
+
+
+def window_days(value: Optional[str] = None) -> int:
+    """
+    Resolve the ?days= parameter.
+
+    Raises:
+        ValueError: If the value is not a whole number of days within
+            1..DASHBOARD_ANALYTICS_MAX_DAYS
+    """
+    if value in (None, ""):
+        return getattr(settings, "DASHBOARD_ANALYTICS_DAYS", DEFAULT_WINDOW_DAYS)
+    max_days = getattr(
+        settings, "DASHBOARD_ANALYTICS_MAX_DAYS", DEFAULT_MAX_WINDOW_DAYS
+    )
+    days = int(value)
+    if not 1 <= days <= max_days:
+        raise ValueError(f"days must be between 1 and {max_days}")
+    return days
+
+
+def cached_dashboard(days: int) -> Dict[str, Any]:
+    """
+    Dashboard payload for the last `days` days, from cache when current.
+
+    The key includes today's date, so windows and overdue counts roll over
+    at midnight.
+    """
+    today = timezone.now().date()
+    key = f"dashboard:{get_data_version()}:{today.isoformat()}:{days}"
+    data = cache.get(key)
+    if data is None:
+        data = build_dashboard(days, today)
+        cache.set(
+            key,
+            data,
+            getattr(settings, "DASHBOARD_CACHE_TIMEOUT", DEFAULT_CACHE_TIMEOUT),
+        )
+    return data
+
+
+def _percent(part, whole) -> float:
+    return round((part / whole * 100) if whole > 0 else 0, 2)
+
+
+def build_dashboard(days: int, end_date=None) -> Dict[str, Any]:
+    """
+    Compute the dashboard payload.
+
+    Args:
+        days: Length of the window ending on end_date
+        end_date: Last day of the window; today by default
+
+    Returns:
+        Dict with period, sales, projects, financial, time_tracking,
+        customer_lifetime_value, project_profitability and inventory sections
+    """
+    end_date = end_date or timezone.now().date()
+    start_date = end_date - timedelta(days=days)
+    window = (start_date, end_date)
+
+    won = Q(status="won")
+    sales = Deal.objects.filter(created_at__date__range=window).aggregate(
+        total=Count("pk"),
+        won=Count("pk", filter=won),
+        won_value=Sum("value", filter=won),
+    )
+
+    # Overdue counts every open project, not only those created in the window
+    created_in_window = Q(created_at__date__range=window)
+    projects = Project.objects.aggregate(
+        total=Count("pk", filter=created_in_window),
+        completed=Count("pk", filter=created_in_window & Q(status="completed")),
+        overdue=Count(
+            "pk",
+            filter=Q(status__in=["pending", "in_progress"], due_date__lt=end_date),
+        ),
+    )
+
+    total_revenue = (
+        WorkOrderInvoice.objects.filter(
+            issued_date__range=window, is_paid=True
+        ).aggregate(total=Sum("total_amount"))["total"]
+        or 0
+    )
+    total_expenses = (
+        Expense.objects.filter(date__range=window, approved=True).aggregate(
+            total=Sum("amount")
+        )["total"]
+        or 0
+    )
+
+    hours = TimeEntry.objects.filter(date__range=window).aggregate(
+        total=Sum("hours"), billable=Sum("hours", filter=Q(billable=True))
+    )
+    total_hours = hours["total"] or 0
+    billable_hours = hours["billable"] or 0
+
+    won_deals = Q(deals__status="won")
+    customers = (
+        Account.objects.annotate(
+            total_value=Sum("deals__value", filter=won_deals),
+            deal_count=Count("deals", filter=won_deals),
+        )
+        .filter(total_value__gt=0)
+        .order_by("-total_value")
+        .values("name", "total_value", "deal_count")[:CLV_ACCOUNTS]
+    )
+    clv_data = [
+        {
+            "account": row["name"],
+            "total_value": row["total_value"],
+            "deal_count": row["deal_count"],
+        }
+        for row in customers
+    ]
+
+    project_profitability = []
+    for project in _profitability_queryset(window):
+        revenue = project["revenue"] or 0
+        costs = project["costs"] or 0
+        profit = revenue - costs
+        project_profitability.append(
+            {
+                "project": project["title"],
+                "revenue": revenue,
+                "costs": costs,
+                "profit": profit,
+                "margin": _percent(profit, revenue),
+            }
+        )
+
+    total_deals = sales["total"]
+    total_projects = projects["total"]
+    return {
+        "period": {"start_date": start_date, "end_date": end_date, "days": days},
+        "sales": {
+            "total_deals": total_deals,
+            "won_deals": sales["won"],
+            "win_rate": _percent(sales["won"], total_deals),
+            "total_value": sales["won_value"] or 0,
+        },
+        "projects": {
+            "total_projects": total_projects,
+            "completed_projects": projects["completed"],
+            "completion_rate": _percent(projects["completed"], total_projects),
+            "overdue_projects": projects["overdue"],
+        },
+        "financial": {
+            "total_revenue": total_revenue,
+            "total_expenses": total_expenses,
+            "net_income": total_revenue - total_expenses,
+            "profit_margin": _percent(total_revenue - total_expenses, total_revenue),
+        },
+        "time_tracking": {
+            "total_hours": float(total_hours),
+            "billable_hours": float(billable_hours),
+            "billable_percentage": _percent(billable_hours, total_hours),
+        },
+        "customer_lifetime_value": clv_data,
+        "project_profitability": project_profitability,
+        "inventory": _low_stock(),
+    }
+
+
+def _profitability_queryset(window):
+    """Invoiced revenue and line item costs of projects created in the window."""
+
+    def project_sum(queryset, field):
+        return Subquery(
+            queryset.filter(work_order__project=OuterRef("pk"))
+            .order_by()
+            .values("work_order__project")
+            .annotate(total=Sum(field))
+            .values("total")
+        )
+
+    return (
+        Project.objects.filter(created_at__date__range=window)
+        .annotate(
+            revenue=project_sum(WorkOrderInvoice.objects, "total_amount"),
+            costs=project_sum(LineItem.objects, "total"),
+        )
+        .filter(revenue__isnull=False)
+        .values("title", "revenue", "costs")
+    )
+
+
+def _low_stock() -> Dict[str, Any]:
+    """Items at or below minimum stock, listing at most DASHBOARD_LOW_STOCK_LIMIT."""
+    limit = getattr(settings, "DASHBOARD_LOW_STOCK_LIMIT", DEFAULT_LOW_STOCK_LIMIT)
+    low_stock = WarehouseItem.objects.filter(quantity__lte=F("minimum_stock"))
+    items = list(
+        low_stock.order_by("quantity", "pk").values(
+            "name", "quantity", "minimum_stock", "warehouse__name"
+        )[:limit]
+    )
+    count = len(items) if len(items) < limit else low_stock.count()
+    return {"low_stock_items": items, "low_stock_count": count}
@@ -0,0 +1,234 @@
+"""
+Global search fan-out for Converge CRM.
+GlobalSearchView queries several independent sources (posts, accounts,
+contacts, projects, deals and knowledge-base notes). They run concurrently on
+a shared thread pool under an overall deadline; a source that misses the
+deadline is reported as incomplete instead of holding up the response.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Tuple
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import Q
+
+from .kb_index import get_kb_index
+from .models import Account, Contact, Deal, Post, Project
+
+logger = logging.getLogger(__name__)
+
+# Seconds the whole fan-out may take before partial results are returned
+DEFAULT_DEADLINE = 0.5
+DEFAULT_WORKERS = 8
+
+# Results per source, and overall, as before the fan-out
+SOURCE_LIMIT = 5
+RESULT_LIMIT = 20
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = getattr(settings, "GLOBAL_SEARCH_WORKERS", DEFAULT_WORKERS)
+            _executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="global-search"
+            )
+    return _executor
+
+
+def _snippet(text, length=75):
+    return text[:length] + "..." if text else ""
+
+
+def search_posts(query: str) -> List[dict]:
+    posts = Post.objects.filter(
+        Q(title__icontains=query)
+        | Q(content__icontains=query)
+        | Q(rich_content__icontains=query)
+    ).distinct()[:SOURCE_LIMIT]
+    return [
+        {
+            "type": "post",
+            "id": post.id,
+            "title": post.title,
+            "url": f"/api/posts/{post.id}/",
+            "snippet": _snippet(getattr(post, "content", "") or ""),
+        }
+        for post in posts
+    ]
+
+
+def search_accounts(query: str) -> List[dict]:
+    # Account model doesn't have 'email' or 'phone' fields. Filter by name and
+    # phone_number for compatibility.
+    accounts = Account.objects.filter(
+        Q(name__icontains=query) | Q(phone_number__icontains=query)
+    ).distinct()[:SOURCE_LIMIT]
+    return [
+        {
+            "type": "account",
+            "id": account.id,
+            "name": account.name,
+            "url": f"/api/accounts/{account.id}/",
+            "snippet": _snippet(getattr(account, "description", "") or ""),
+        }
+        for account in accounts
+    ]
+
+
+def search_contacts(query: str) -> List[dict]:
+    contacts = Contact.objects.filter(
+        Q(first_name__icontains=query)
+        | Q(last_name__icontains=query)
+        | Q(email__icontains=query)
+    ).distinct()[:SOURCE_LIMIT]
+    return [
+        {
+            "type": "contact",
+            "id": contact.id,
+            "name": f"{contact.first_name} {contact.last_name}",
+            "url": f"/api/contacts/{contact.id}/",
+            "snippet": _snippet(getattr(contact, "notes", "") or ""),
+        }
+        for contact in contacts
+    ]
+
+
+def search_projects(query: str) -> List[dict]:
+    projects = Project.objects.filter(
+        Q(title__icontains=query) | Q(description__icontains=query)
+    ).distinct()[:SOURCE_LIMIT]
+    return [
+        {
+            "type": "project",
+            "id": project.id,
+            "title": project.title,
+            "url": f"/api/projects/{project.id}/",
+            "snippet": _snippet(project.description or ""),
+        }
+        for project in projects
+    ]
+
+
+def search_deals(query: str) -> List[dict]:
+    deals = (
+        Deal.objects.filter(
+            Q(title__icontains=query) | Q(account__name__icontains=query)
+        )
+        .select_related("stage")
+        .distinct()[:SOURCE_LIMIT]
+    )
+    results = []
+    for deal in deals:
+        stage_label = getattr(deal.stage, "name", "") if deal.stage_id else ""
+        snippet = f"Value: {deal.value}" + (
+            f" • Stage: {stage_label}" if stage_label else ""
+        )
+        results.append(
+            {
+                "type": "deal",
+                "id": deal.id,
+                "title": deal.title,
+                "url": f"/api/deals/{deal.id}/",
+                "snippet": snippet,
+            }
+        )
+    return results
+
+
+def search_notes(query: str) -> List[dict]:
+    """Knowledge-base notes containing the query, from the in-memory index."""
+    return [
+        {
+            "type": "note",
+            "file_name": article.file_name,
+            "url": f"/api/knowledge_base/{article.name}/",
+            "snippet": article.snippet,
+        }
+        for article in get_kb_index().search(query)
+    ]
+
+
+# Sources in response order
+SEARCH_SOURCES: Dict[str, Callable[[str], List[dict]]] = {
+    "posts": search_posts,
+    "accounts": search_accounts,
+    "contacts": search_contacts,
+    "projects": search_projects,
+    "deals": search_deals,
+    "notes": search_notes,
+}
+
+
+def _run_source(source: Callable[[str], List[dict]], query: str) -> List[dict]:
+    """Run one source on a worker thread and release its DB connection."""
+    try:
+        return source(query)
+    finally:
+        connections.close_all()
+
+
+def fan_out(
+    query: str, sources: Dict[str, Callable] = None, deadline: float = None
+) -> Tuple[List[dict], List[str]]:
+    """
+    Run every source for query and merge their results in source order.
+
+    Sources run concurrently unless the caller is inside a transaction, whose
+    uncommitted rows other connections could not see; then they run in turn
+    and sources not started by the deadline are skipped.
+
+    Returns:
+        (results capped at RESULT_LIMIT, names of sources that timed out or
+        failed)
+    """
+    sources = sources if sources is not None else SEARCH_SOURCES
+    if deadline is None:
+        deadline = getattr(settings, "GLOBAL_SEARCH_DEADLINE", DEFAULT_DEADLINE)
+    started = time.monotonic()
+    by_source: Dict[str, List[dict]] = {}
+    incomplete: List[str] = []
+
+    if connection.in_atomic_block:
+        for name, source in sources.items():
+            if time.monotonic() - started > deadline:
+                incomplete.append(name)
+                continue
+            try:
+                by_source[name] = source(query)
+            except Exception:
+                logger.exception("Global search source %s failed", name)
+                incomplete.append(name)
+    else:
+        executor = _get_executor()
+        futures = {
+            name: executor.submit(_run_source, source, query)
+            for name, source in sources.items()
+        }
+        wait(futures.values(), timeout=deadline)
+        for name, future in futures.items():
+            if not future.done():
+                # The worker finishes in the background; its result is dropped
+                incomplete.append(name)
+            elif future.exception() is not None:
+                logger.error(
+                    "Global search source %s failed",
+                    name,
+                    exc_info=future.exception(),
+                )
+                incomplete.append(name)
+            else:
+                by_source[name] = future.result()
+
+    if incomplete:
+        logger.warning("Global search returned partial results: %s", incomplete)
+    results = [row for name in sources for row in by_source.get(name, [])]
+    return results[:RESULT_LIMIT], incomplete
@@ -0,0 +1,151 @@
+"""
+In-memory knowledge-base index for Converge CRM.
+Markdown articles in static/kb are read once per process and kept with their
+title, lowercase text and snippet. The directory is re-scanned at most every
+KB_INDEX_CHECK_INTERVAL seconds and only files whose mtime or size changed
+are re-read, so listing, reading and searching articles is served from memory.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds between directory scans for changed files
+DEFAULT_CHECK_INTERVAL = 2.0
+
+SNIPPET_LENGTH = 75
+
+
+def kb_directory() -> str:
+    """static/kb under the first STATICFILES_DIRS entry, else under BASE_DIR."""
+    static_dirs = getattr(settings, "STATICFILES_DIRS", []) or []
+    if static_dirs:
+        return os.path.join(static_dirs[0], "kb")
+    return os.path.join(settings.BASE_DIR, "static", "kb")
+
+
+class KBArticle:
+    """One parsed markdown article."""
+
+    __slots__ = ("name", "file_name", "title", "content", "text", "snippet", "stamp")
+
+    def __init__(self, file_name: str, content: str, stamp):
+        self.file_name = file_name
+        self.name = os.path.splitext(file_name)[0]
+        self.content = content
+        self.text = content.lower()
+        self.title = _title(content) or self.name
+        self.snippet = content[:SNIPPET_LENGTH] + "..."
+        self.stamp = stamp
+
+
+def _title(content: str) -> str:
+    for line in content.splitlines():
+        if line.startswith("# "):
+            return line[2:].strip()
+    return ""
+
+
+class KnowledgeBaseIndex:
+    """Process-level cache of the knowledge-base articles."""
+
+    def __init__(self, directory: Optional[str] = None, check_interval=None):
+        self._directory = directory
+        self._check_interval = check_interval
+        self._articles: Dict[str, KBArticle] = {}
+        self._exists = False
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def directory(self) -> str:
+        return self._directory or kb_directory()
+
+    @property
+    def check_interval(self) -> float:
+        if self._check_interval is not None:
+            return self._check_interval
+        return getattr(settings, "KB_INDEX_CHECK_INTERVAL", DEFAULT_CHECK_INTERVAL)
+
+    def exists(self) -> bool:
+        """Whether the knowledge-base directory exists."""
+        self._ensure_fresh()
+        return self._exists
+
+    def articles(self) -> List[KBArticle]:
+        """All articles, ordered by name."""
+        self._ensure_fresh()
+        return sorted(self._articles.values(), key=lambda article: article.name)
+
+    def get(self, name: str) -> Optional[KBArticle]:
+        """Article by file name without the .md extension."""
+        self._ensure_fresh()
+        return self._articles.get(name)
+
+    def search(self, query: str) -> List[KBArticle]:
+        """Articles whose text contains query, case-insensitively, by name."""
+        needle = query.lower()
+        return [article for article in self.articles() if needle in article.text]
+
+    def refresh(self) -> None:
+        """Re-scan now, re-reading new or changed files."""
+        with self._lock:
+            self._scan()
+            self._checked_at = time.monotonic()
+
+    def _ensure_fresh(self) -> None:
+        checked_at = self._checked_at
+        if checked_at is not None and (
+            time.monotonic() - checked_at < self.check_interval
+        ):
+            return
+        self.refresh()
+
+    def _scan(self) -> None:
+        directory = self.directory
+        try:
+            entries = [
+                entry
+                for entry in os.scandir(directory)
+                if entry.name.endswith(".md") and entry.is_file()
+            ]
+        except FileNotFoundError:
+            self._exists = False
+            self._articles = {}
+            return
+
+        articles = {}
+        for entry in entries:
+            stat = entry.stat()
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            name = os.path.splitext(entry.name)[0]
+            current = self._articles.get(name)
+            if current is not None and current.stamp == stamp:
+                articles[name] = current
+                continue
+            try:
+                with open(entry.path, "r", encoding="utf-8") as f:
+                    articles[name] = KBArticle(entry.name, f.read(), stamp)
+            except (OSError, UnicodeDecodeError):
+                logger.warning("Could not read knowledge base file %s", entry.path)
+        # Swap in one assignment so readers never see a half-built index
+        self._articles = articles
+        self._exists = True
+
+
+# Singleton instance - created on first use
+kb_index: Optional[KnowledgeBaseIndex] = None
+
+
+def get_kb_index():
+    """Get knowledge-base index singleton, creating it if needed"""
+    global kb_index
+    if kb_index is None:
+        kb_index = KnowledgeBaseIndex()
+    return kb_index
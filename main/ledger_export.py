@@ -0,0 +1,118 @@
+"""
+Streaming general-ledger export for Converge CRM.
+Journal entries are read as values_list tuples through a chunked iterator
+(a server-side cursor on PostgreSQL) and encoded row by row, so exports of any
+size start immediately and hold at most one chunk in memory.
+"""
+
+import csv
+import json
+from typing import Iterable, Iterator, Optional, Sequence
+
+from django.db.models import Q
+
+from .ledger_service import get_ledger_service
+from .models import JournalEntry
+
+# Rows fetched per database round trip while streaming
+EXPORT_CHUNK_SIZE = 2000
+
+JOURNAL_EXPORT_FIELDS = (
+    "id",
+    "date",
+    "description",
+    "debit_account__code",
+    "credit_account__code",
+    "amount",
+    "source_type",
+    "source_id",
+)
+JOURNAL_EXPORT_HEADER = (
+    "id",
+    "date",
+    "description",
+    "debit_account",
+    "credit_account",
+    "amount",
+    "source_type",
+    "source_id",
+)
+BALANCE_EXPORT_HEADER = (
+    "code",
+    "name",
+    "account_type",
+    "debit",
+    "credit",
+    "balance",
+)
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def journal_entry_rows(
+    start_date=None, end_date=None, account_code: Optional[str] = None
+) -> Iterator[tuple]:
+    """
+    Yield journal entry tuples (JOURNAL_EXPORT_FIELDS order) by date then id.
+
+    account_code matches entries posted to that account on either side.
+    """
+    qs = JournalEntry.objects.all()
+    if start_date is not None:
+        qs = qs.filter(date__gte=start_date)
+    if end_date is not None:
+        qs = qs.filter(date__lte=end_date)
+    if account_code:
+        qs = qs.filter(
+            Q(debit_account__code=account_code) | Q(credit_account__code=account_code)
+        )
+    return (
+        qs.order_by("date", "id")
+        .values_list(*JOURNAL_EXPORT_FIELDS)
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+
+def account_balance_rows(
+    start_date=None, end_date=None, account_code: Optional[str] = None
+) -> Iterator[tuple]:
+    """Yield per-account balance tuples (BALANCE_EXPORT_HEADER order) by code."""
+    balances = get_ledger_service().account_balances(
+        start_date=start_date, end_date=end_date
+    )
+    for code in sorted(balances):
+        if account_code and code != account_code:
+            continue
+        row = balances[code]
+        yield (
+            code,
+            row["name"],
+            row["account_type"],
+            row["debit"],
+            row["credit"],
+            row["balance"],
+        )
+
+
+def encode_rows(
+    rows: Iterable[Sequence], header: Sequence[str], export_format: str
+) -> Iterator[str]:
+    """Encode rows lazily as CSV (with header line) or NDJSON objects."""
+    if export_format == "csv":
+        writer = csv.writer(_Echo())
+        yield writer.writerow(header)
+        for row in rows:
+            yield writer.writerow(row)
+    else:
+        for row in rows:
+            yield json.dumps(dict(zip(header, row)), default=str) + "\n"
@@ -0,0 +1,362 @@
+"""
+Ledger balance service for Converge CRM financial reporting.
+Maintains LedgerDailyBalance rows incrementally from JournalEntry writes and
+answers per-account totals with grouped aggregates over those rows. Closed
+periods (LedgerPeriod) store cumulative per-account closing balances so as-of
+reports only aggregate activity after the latest close.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from .models import JournalEntry, LedgerClosingBalance, LedgerDailyBalance, LedgerPeriod
+from .money import DEFAULT_CURRENCY, from_minor, group_sum_minor
+from .report_cache import bump_ledger_version
+
+logger = logging.getLogger(__name__)
+
+# Account types whose natural balance is debit-positive; all others are credit-positive
+DEBIT_NORMAL_TYPES = ("asset", "expense")
+
+ZERO = Decimal("0.00")
+
+# Rows per chunk when summing raw journal minor units
+MINOR_UNIT_CHUNK_SIZE = 100_000
+
+
+def natural_balance(account_type, debit_total, credit_total):
+    """Signed balance of an account in its normal direction."""
+    debit_total = debit_total or ZERO
+    credit_total = credit_total or ZERO
+    if account_type in DEBIT_NORMAL_TYPES:
+        return debit_total - credit_total
+    return credit_total - debit_total
+
+
+class LedgerService:
+    """Service for maintaining and reading materialized ledger balances"""
+
+    def record_entries(self, entries: Iterable, sign: int = 1) -> int:
+        """
+        Apply journal entries to the daily balance table.
+
+        Args:
+            entries: JournalEntry instances (or objects exposing debit_account_id,
+                credit_account_id, amount and date)
+            sign: 1 to add the entries, -1 to reverse them
+
+        Returns:
+            Number of (account, date) balance rows touched
+        """
+        deltas: Dict[Tuple[int, object], List] = defaultdict(lambda: [ZERO, ZERO, 0])
+        for entry in entries:
+            amount = Decimal(str(entry.amount or 0)) * sign
+            debit = deltas[(entry.debit_account_id, entry.date)]
+            debit[0] += amount
+            debit[2] += sign
+            credit = deltas[(entry.credit_account_id, entry.date)]
+            credit[1] += amount
+            credit[2] += sign
+
+        with transaction.atomic():
+            for (account_id, day), (debit, credit, count) in deltas.items():
+                self._apply_delta(account_id, day, debit, credit, count)
+        if deltas:
+            bump_ledger_version()
+        return len(deltas)
+
+    def _apply_delta(self, account_id, day, debit, credit, count):
+        """Increment one balance row, creating it if this is the first posting."""
+        changes = {
+            "debit_total": F("debit_total") + debit,
+            "credit_total": F("credit_total") + credit,
+            "entry_count": F("entry_count") + count,
+        }
+        rows = LedgerDailyBalance.objects.filter(account_id=account_id, date=day)
+        if rows.update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                LedgerDailyBalance.objects.create(
+                    account_id=account_id,
+                    date=day,
+                    debit_total=debit,
+                    credit_total=credit,
+                    entry_count=count,
+                )
+        except IntegrityError:
+            # A concurrent posting created the row first; fall back to increment
+            rows.update(**changes)
+
+    def account_balances(
+        self, start_date=None, end_date=None, account_types=None
+    ) -> Dict[str, Dict]:
+        """
+        Aggregate materialized totals per account.
+
+        As-of queries (no start_date) begin from the closing balances of the
+        latest period closed on or before end_date, so only the open period is
+        summed. Either way the cost is a fixed, small number of queries.
+
+        Args:
+            start_date: First posting date to include (optional)
+            end_date: Last posting date to include (optional)
+            account_types: Restrict to these LedgerAccount.account_type values
+
+        Returns:
+            Dict keyed by account code with account_id, name, account_type,
+            debit, credit and the natural-direction balance
+        """
+        totals: Dict[str, Dict] = {}
+
+        if start_date is None:
+            period = self.last_closed_period(end_date)
+            if period is not None:
+                start_date = period.period_end + timedelta(days=1)
+                closing = period.closing_balances.all()
+                if account_types:
+                    closing = closing.filter(account__account_type__in=account_types)
+                for row in closing.values(
+                    "account_id",
+                    "account__code",
+                    "account__name",
+                    "account__account_type",
+                    "debit_total",
+                    "credit_total",
+                ):
+                    _accumulate(totals, row, row["debit_total"], row["credit_total"])
+
+        qs = LedgerDailyBalance.objects.filter(entry_count__gt=0)
+        if start_date is not None:
+            qs = qs.filter(date__gte=start_date)
+        if end_date is not None:
+            qs = qs.filter(date__lte=end_date)
+        if account_types:
+            qs = qs.filter(account__account_type__in=account_types)
+        rows = (
+            qs.order_by()
+            .values(
+                "account_id",
+                "account__code",
+                "account__name",
+                "account__account_type",
+            )
+            .annotate(debit=Sum("debit_total"), credit=Sum("credit_total"))
+        )
+        for row in rows:
+            _accumulate(totals, row, row["debit"], row["credit"])
+
+        for entry in totals.values():
+            entry["balance"] = natural_balance(
+                entry["account_type"], entry["debit"], entry["credit"]
+            )
+        return totals
+
+    def last_closed_period(self, as_of=None) -> Optional[LedgerPeriod]:
+        """Latest LedgerPeriod whose period_end is on or before as_of."""
+        qs = LedgerPeriod.objects.all()
+        if as_of is not None:
+            qs = qs.filter(period_end__lte=as_of)
+        return qs.order_by("-period_end").first()
+
+    def assert_period_open(self, day) -> None:
+        """Raise ValidationError when day falls inside a closed period."""
+        if isinstance(day, str):
+            day = date.fromisoformat(day)
+        latest = self.last_closed_period()
+        if latest is not None and day is not None and day <= latest.period_end:
+            raise ValidationError(
+                f"Ledger is closed through {latest.period_end}; "
+                f"cannot change entries dated {day}."
+            )
+
+    def close_period(self, period_end, user=None) -> LedgerPeriod:
+        """
+        Close the ledger through period_end.
+
+        Writes one immutable LedgerClosingBalance per account holding the
+        cumulative debit/credit totals as of period_end. Periods must be
+        closed in chronological order.
+        """
+        with transaction.atomic():
+            latest = self.last_closed_period()
+            if latest is not None and period_end <= latest.period_end:
+                raise ValidationError(
+                    f"Ledger is already closed through {latest.period_end}."
+                )
+            balances = self.account_balances(end_date=period_end)
+            period = LedgerPeriod.objects.create(period_end=period_end, closed_by=user)
+            LedgerClosingBalance.objects.bulk_create(
+                [
+                    LedgerClosingBalance(
+                        period=period,
+                        account_id=row["account_id"],
+                        debit_total=row["debit"],
+                        credit_total=row["credit"],
+                    )
+                    for row in balances.values()
+                ]
+            )
+        logger.info(
+            "Closed ledger through %s with %s account balances",
+            period_end,
+            len(balances),
+        )
+        return period
+
+    def minor_unit_totals(
+        self,
+        start_date=None,
+        end_date=None,
+        currency: Optional[str] = None,
+        chunk_size: int = MINOR_UNIT_CHUNK_SIZE,
+    ) -> Dict[int, Dict]:
+        """
+        Per-account totals summed straight from JournalEntry.amount_minor.
+
+        Streams (debit account, credit account, minor units) tuples in chunks
+        and sums exact integers per account, vectorized with NumPy when it is
+        installed. Use it for ad-hoc ranges over raw entries; reports normally
+        read the materialized daily balances instead.
+
+        Returns:
+            Dict keyed by account id with Decimal debit/credit totals and the
+            number of entry lines
+        """
+        currency = currency or DEFAULT_CURRENCY
+        qs = JournalEntry.objects.filter(currency=currency)
+        if start_date is not None:
+            qs = qs.filter(date__gte=start_date)
+        if end_date is not None:
+            qs = qs.filter(date__lte=end_date)
+        rows = (
+            qs.order_by()
+            .values_list("debit_account_id", "credit_account_id", "amount_minor")
+            .iterator(chunk_size=chunk_size)
+        )
+
+        minor: Dict[int, List[int]] = defaultdict(lambda: [0, 0, 0])
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            debit_ids, credit_ids, amounts = zip(*chunk)
+            for side, ids in ((0, debit_ids), (1, credit_ids)):
+                for account_id, (total, count) in group_sum_minor(ids, amounts).items():
+                    minor[account_id][side] += total
+                    minor[account_id][2] += count
+
+        return {
+            account_id: {
+                "debit": from_minor(debit, currency),
+                "credit": from_minor(credit, currency),
+                "entries": count,
+            }
+            for account_id, (debit, credit, count) in minor.items()
+        }
+
+    def compute_expected_balances(self) -> Dict[Tuple[int, object], List]:
+        """Recompute every (account, date) total directly from JournalEntry."""
+        expected: Dict[Tuple[int, object], List] = defaultdict(lambda: [ZERO, ZERO, 0])
+        for side, field in ((0, "debit_account_id"), (1, "credit_account_id")):
+            rows = (
+                JournalEntry.objects.order_by()
+                .values(field, "date")
+                .annotate(total=Sum("amount"), lines=Count("id"))
+            )
+            for row in rows:
+                bucket = expected[(row[field], row["date"])]
+                bucket[side] += row["total"] or ZERO
+                bucket[2] += row["lines"]
+        return expected
+
+    def verify_balances(self) -> List[Dict]:
+        """
+        Compare materialized rows against a full recomputation.
+
+        Returns:
+            List of mismatch dicts (empty when the table is consistent)
+        """
+        expected = self.compute_expected_balances()
+        actual = {
+            (row.account_id, row.date): [
+                row.debit_total,
+                row.credit_total,
+                row.entry_count,
+            ]
+            for row in LedgerDailyBalance.objects.all()
+        }
+        mismatches = []
+        for key in set(expected) | set(actual):
+            want = expected.get(key, [ZERO, ZERO, 0])
+            have = actual.get(key, [ZERO, ZERO, 0])
+            if want != have:
+                mismatches.append(
+                    {
+                        "account_id": key[0],
+                        "date": key[1],
+                        "expected": _totals_dict(want),
+                        "actual": _totals_dict(have),
+                    }
+                )
+        mismatches.sort(key=lambda m: (m["date"], m["account_id"]))
+        return mismatches
+
+    def rebuild_balances(self, batch_size: int = 1000) -> int:
+        """Replace the materialized table with a full recomputation."""
+        expected = self.compute_expected_balances()
+        rows = [
+            LedgerDailyBalance(
+                account_id=account_id,
+                date=day,
+                debit_total=debit,
+                credit_total=credit,
+                entry_count=count,
+            )
+            for (account_id, day), (debit, credit, count) in expected.items()
+        ]
+        with transaction.atomic():
+            LedgerDailyBalance.objects.all().delete()
+            LedgerDailyBalance.objects.bulk_create(rows, batch_size=batch_size)
+        logger.info("Rebuilt %s ledger daily balance rows", len(rows))
+        return len(rows)
+
+
+def _accumulate(totals, row, debit, credit):
+    """Add one grouped row into the code-keyed totals dict."""
+    entry = totals.setdefault(
+        row["account__code"],
+        {
+            "account_id": row["account_id"],
+            "name": row["account__name"],
+            "account_type": row["account__account_type"],
+            "debit": ZERO,
+            "credit": ZERO,
+        },
+    )
+    entry["debit"] += debit or ZERO
+    entry["credit"] += credit or ZERO
+
+
+def _totals_dict(totals):
+    return {"debit": totals[0], "credit": totals[1], "entries": totals[2]}
+
+
+# Singleton instance - created on first use
+ledger_service: Optional[LedgerService] = None
+
+
+def get_ledger_service():
+    """Get ledger service singleton, creating it if needed"""
+    global ledger_service
+    if ledger_service is None:
+        ledger_service = LedgerService()
+    return ledger_service
@@ -0,0 +1,219 @@
+"""
+Management command to benchmark financial report generation.
+Seeds synthetic journal lines (rolled back afterwards unless --keep), then
+reports query count and latency for each FinancialReports statement.
+--compare-vectorized times per-row Decimal accumulation against the integer
+minor-unit path (LedgerService.minor_unit_totals) and checks they agree.
+"""
+
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from main.ledger_service import get_ledger_service
+from main.models import JournalEntry, LedgerAccount
+from main.money import numpy_available
+from main.reports import FinancialReports
+
+BENCHMARK_ACCOUNTS = [
+    ("1000", "Cash", "asset"),
+    ("1100", "Accounts Receivable", "asset"),
+    ("1200", "Inventory", "asset"),
+    ("2000", "Accounts Payable", "liability"),
+    ("3000", "Owner Equity", "equity"),
+    ("4000", "Revenue", "revenue"),
+    ("5000", "Cost of Goods Sold", "expense"),
+    ("5100", "Rent Expense", "expense"),
+]
+
+
+class Command(BaseCommand):
+    help = "Benchmark balance sheet, P&L and cash flow against synthetic journal lines"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--entries",
+            type=int,
+            default=1_000_000,
+            help="Number of synthetic journal entries to seed (default 1,000,000)",
+        )
+        parser.add_argument(
+            "--years",
+            type=int,
+            default=3,
+            help="Spread seeded entries over this many years",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Rows per bulk insert while seeding",
+        )
+        parser.add_argument(
+            "--compare-legacy",
+            action="store_true",
+            help="Also time a per-object Python fold over the same P&L range",
+        )
+        parser.add_argument(
+            "--compare-vectorized",
+            action="store_true",
+            help="Time Decimal per-row sums against integer minor-unit sums",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the seeded rows instead of rolling them back",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            end_date = date.today()
+            start_date = end_date - timedelta(days=365 * options["years"])
+
+            self.seed(options["entries"], start_date, end_date, options["batch_size"])
+            self.run_report(
+                "balance_sheet", FinancialReports.get_balance_sheet, end_date
+            )
+            self.run_report(
+                "profit_loss", FinancialReports.get_profit_loss, start_date, end_date
+            )
+            self.run_report(
+                "cash_flow", FinancialReports.get_cash_flow, start_date, end_date
+            )
+            if options["compare_legacy"]:
+                self.run_report(
+                    "profit_loss (per-object fold)",
+                    self.legacy_profit_loss,
+                    start_date,
+                    end_date,
+                )
+            if options["compare_vectorized"]:
+                self.compare_vectorized(start_date, end_date)
+
+            if not options["keep"]:
+                transaction.set_rollback(True)
+                self.stdout.write("Seeded rows rolled back (use --keep to retain)")
+
+    def seed(self, count, start_date, end_date, batch_size):
+        accounts = []
+        for code, name, account_type in BENCHMARK_ACCOUNTS:
+            account, _ = LedgerAccount.objects.get_or_create(
+                code=code, defaults={"name": name, "account_type": account_type}
+            )
+            accounts.append(account.id)
+
+        span = (end_date - start_date).days
+        rng = random.Random(42)
+        started = time.perf_counter()
+        created = 0
+        while created < count:
+            size = min(batch_size, count - created)
+            batch = []
+            for _ in range(size):
+                debit, credit = rng.sample(accounts, 2)
+                cents = rng.randint(100, 500_000)
+                batch.append(
+                    JournalEntry(
+                        date=start_date + timedelta(days=rng.randint(0, span)),
+                        description="benchmark",
+                        debit_account_id=debit,
+                        credit_account_id=credit,
+                        amount=Decimal(cents) / 100,
+                        amount_minor=cents,
+                    )
+                )
+            JournalEntry.objects.bulk_create(batch, batch_size=batch_size)
+            created += size
+
+        # bulk_create skips signals, so materialize balances in one pass
+        get_ledger_service().rebuild_balances()
+        self.stdout.write(
+            f"Seeded {created} journal entries in {time.perf_counter() - started:.1f}s"
+        )
+
+    def run_report(self, label, func, *args):
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            func(*args)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{label:32} {len(ctx.captured_queries):4d} queries  {elapsed_ms:10.1f} ms"
+            )
+        )
+
+    def compare_vectorized(self, start_date, end_date):
+        """Time both per-account summations over the range and check they agree."""
+        self.run_report(
+            "account totals (Decimal per row)",
+            self.decimal_account_totals,
+            start_date,
+            end_date,
+        )
+        engine = "NumPy" if numpy_available() else "int fold"
+        self.run_report(
+            f"account totals (minor units, {engine})",
+            get_ledger_service().minor_unit_totals,
+            start_date,
+            end_date,
+        )
+        decimal_totals = self.decimal_account_totals(start_date, end_date)
+        minor_totals = get_ledger_service().minor_unit_totals(start_date, end_date)
+        mismatched = [
+            account_id
+            for account_id, totals in decimal_totals.items()
+            if minor_totals.get(account_id, {}).get("debit") != totals["debit"]
+            or minor_totals[account_id]["credit"] != totals["credit"]
+        ]
+        if mismatched:
+            self.stdout.write(
+                self.style.ERROR(f"Totals differ for accounts {mismatched}")
+            )
+        else:
+            self.stdout.write("Minor-unit totals match Decimal totals exactly")
+
+    @staticmethod
+    def decimal_account_totals(start_date, end_date):
+        """Reference: fetch Decimal amounts and accumulate them row by row."""
+        totals = {}
+        rows = (
+            JournalEntry.objects.filter(date__range=[start_date, end_date])
+            .values_list("debit_account_id", "credit_account_id", "amount")
+            .iterator(chunk_size=5000)
+        )
+        for debit_id, credit_id, amount in rows:
+            debit = totals.setdefault(
+                debit_id, {"debit": Decimal("0.00"), "credit": Decimal("0.00")}
+            )
+            debit["debit"] += amount
+            credit = totals.setdefault(
+                credit_id, {"debit": Decimal("0.00"), "credit": Decimal("0.00")}
+            )
+            credit["credit"] += amount
+        return totals
+
+    @staticmethod
+    def legacy_profit_loss(start_date, end_date):
+        """Reference implementation: materialize every entry and fold in Python."""
+        totals = {}
+        entries = JournalEntry.objects.filter(
+            date__range=[start_date, end_date]
+        ).select_related("debit_account", "credit_account")
+        for entry in entries.iterator(chunk_size=5000):
+            for account, is_debit in (
+                (entry.debit_account, True),
+                (entry.credit_account, False),
+            ):
+                if account.account_type == "revenue":
+                    delta = -entry.amount if is_debit else entry.amount
+                elif account.account_type == "expense":
+                    delta = entry.amount if is_debit else -entry.amount
+                else:
+                    continue
+                totals[account.code] = totals.get(account.code, 0) + delta
+        return totals
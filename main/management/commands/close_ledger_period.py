@@ -0,0 +1,56 @@
+"""
+Management command to close the ledger through a month or date.
+Closing snapshots cumulative per-account balances so as-of reports only sum
+activity after the latest close.
+"""
+
+import calendar
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from main.ledger_service import get_ledger_service
+
+
+class Command(BaseCommand):
+    help = "Close the ledger through the end of a month (or a specific date)"
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group(required=True)
+        group.add_argument(
+            "--month",
+            type=str,
+            help="Month to close (YYYY-MM); closes through its last day",
+        )
+        group.add_argument(
+            "--through",
+            type=str,
+            help="Close through this date (YYYY-MM-DD)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            if options["month"]:
+                year, month = (int(p) for p in options["month"].split("-"))
+                period_end = datetime(
+                    year, month, calendar.monthrange(year, month)[1]
+                ).date()
+            else:
+                period_end = datetime.strptime(options["through"], "%Y-%m-%d").date()
+        except ValueError:
+            raise CommandError(
+                "Invalid period. Use --month YYYY-MM or --through YYYY-MM-DD"
+            )
+
+        try:
+            period = get_ledger_service().close_period(period_end)
+        except ValidationError as exc:
+            raise CommandError("; ".join(exc.messages))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Closed ledger through {period.period_end} "
+                f"({period.closing_balances.count()} account balances)"
+            )
+        )
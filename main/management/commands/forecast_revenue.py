@@ -0,0 +1,90 @@
+"""
+Management command to generate or backtest revenue forecasts.
+Forecasts are fitted on the daily revenue rollups (run rebuild_metric_rollups
+first on a new install) and persisted as RevenueForecast rows; --backtest only
+reports rolling-origin accuracy for each method and period.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.revenue_forecasting import (
+    DEFAULT_BACKTEST_FOLDS,
+    HORIZON_DAYS,
+    METHODS,
+    ForecastUnavailable,
+    backtest,
+    generate_forecasts,
+    revenue_history,
+)
+
+
+class Command(BaseCommand):
+    help = "Generate RevenueForecast rows, or backtest the forecast methods"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--method",
+            action="append",
+            choices=METHODS,
+            help="Forecast method (repeatable; all methods by default)",
+        )
+        parser.add_argument(
+            "--period",
+            action="append",
+            choices=list(HORIZON_DAYS),
+            help="Forecast period (repeatable; all periods by default)",
+        )
+        parser.add_argument(
+            "--backtest",
+            action="store_true",
+            help="Only report backtest accuracy; nothing is saved",
+        )
+        parser.add_argument(
+            "--folds",
+            type=int,
+            default=DEFAULT_BACKTEST_FOLDS,
+            help="Rolling-origin folds per backtest",
+        )
+
+    def handle(self, *args, **options):
+        methods = options["method"] or METHODS
+        periods = options["period"] or list(HORIZON_DAYS)
+
+        try:
+            if options["backtest"]:
+                _, history = revenue_history()
+                for period in periods:
+                    for method in methods:
+                        self._report(
+                            period,
+                            method,
+                            backtest(
+                                method, history, HORIZON_DAYS[period], options["folds"]
+                            ),
+                        )
+                return
+            forecasts = generate_forecasts(methods, periods)
+        except ForecastUnavailable as e:
+            raise CommandError(str(e))
+
+        for forecast in forecasts:
+            self.stdout.write(
+                f"  • {forecast.forecast_period} {forecast.forecast_method}: "
+                f"{forecast.predicted_revenue} "
+                f"({forecast.confidence_interval_lower} - "
+                f"{forecast.confidence_interval_upper})"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"Generated {len(forecasts)} revenue forecast(s)")
+        )
+
+    def _report(self, period, method, metrics):
+        if not metrics:
+            self.stdout.write(f"  • {period} {method}: not enough history")
+            return
+        mape = "n/a" if metrics["mape"] is None else f"{metrics['mape']}%"
+        self.stdout.write(
+            f"  • {period} {method}: MAPE {mape}, MAE {metrics['mae']}, "
+            f"bias {metrics['bias']}, interval coverage "
+            f"{metrics['interval_coverage']} over {metrics['folds']} fold(s)"
+        )
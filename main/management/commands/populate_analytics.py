@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 
-from main.models import AnalyticsSnapshot, CustomerLifetimeValue
+from main.clv_service import calculate_all
+from main.models import AnalyticsSnapshot
 
 
 class Command(BaseCommand):
@@ -13,24 +14,9 @@ class Command(BaseCommand):
         snapshot = AnalyticsSnapshot.create_daily_snapshot()
         self.stdout.write(f"Created analytics snapshot for {snapshot.date}")
 
-        # Calculate CLV for contacts that have deals
-        from main.models import Contact
-
-        contacts_with_deals = Contact.objects.filter(deals__isnull=False).distinct()
-
-        clv_count = 0
-        for contact in contacts_with_deals:
-            try:
-                clv = CustomerLifetimeValue.calculate_for_contact(contact)
-                clv_count += 1
-                self.stdout.write(
-                    f"Calculated CLV for {contact.first_name} "
-                    f"{contact.last_name}: ${clv.predicted_clv}"
-                )
-            except Exception as e:
-                self.stdout.write(
-                    self.style.WARNING(f"Failed to calculate CLV for {contact}: {e}")
-                )
+        # Calculate CLV for every contact with deals in one batch
+        clv_count = calculate_all()
+        self.stdout.write(f"Calculated CLV for {clv_count} contacts")
 
         self.stdout.write(
             self.style.SUCCESS(
@@ -0,0 +1,47 @@
+"""
+Management command to rebuild or verify materialized ledger balances.
+LedgerDailyBalance is maintained incrementally on posting; this command checks
+it against a full recomputation from JournalEntry and can rebuild it.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.ledger_service import get_ledger_service
+
+
+class Command(BaseCommand):
+    help = "Rebuild or verify LedgerDailyBalance against the journal"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only compare materialized totals with a full recomputation",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows per bulk insert when rebuilding",
+        )
+
+    def handle(self, *args, **options):
+        service = get_ledger_service()
+
+        if options["verify"]:
+            mismatches = service.verify_balances()
+            if not mismatches:
+                self.stdout.write(self.style.SUCCESS("Ledger balances are consistent"))
+                return
+            for mismatch in mismatches[:20]:
+                self.stdout.write(
+                    f"  • account {mismatch['account_id']} on {mismatch['date']}: "
+                    f"expected {mismatch['expected']}, found {mismatch['actual']}"
+                )
+            raise CommandError(
+                f"{len(mismatches)} ledger balance row(s) differ from the journal. "
+                "Run without --verify to rebuild."
+            )
+
+        count = service.rebuild_balances(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} ledger balance rows"))
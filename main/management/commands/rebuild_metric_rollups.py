@@ -0,0 +1,81 @@
+"""
+Management command to rebuild, refresh or verify daily metric rollups.
+MetricDailyRollup is maintained incrementally on save/delete; this command
+recomputes it from the source tables, for all history or a date range.
+"""
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.rollup_service import METRICS, get_rollup_service
+
+
+def _date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}'. Use YYYY-MM-DD format.")
+
+
+class Command(BaseCommand):
+    help = "Rebuild, refresh or verify MetricDailyRollup against source data"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", help="First day to rebuild (YYYY-MM-DD)")
+        parser.add_argument("--end", help="Last day to rebuild (YYYY-MM-DD)")
+        parser.add_argument(
+            "--metric",
+            action="append",
+            choices=sorted(METRICS),
+            help="Metric to rebuild (repeatable; all metrics by default)",
+        )
+        parser.add_argument(
+            "--changed",
+            action="store_true",
+            help="Only recompute days touched by rows changed since the last run",
+        )
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only compare stored rollups with a full recomputation",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows per bulk insert when rebuilding",
+        )
+
+    def handle(self, *args, **options):
+        service = get_rollup_service()
+
+        if options["verify"]:
+            mismatches = service.verify()
+            if not mismatches:
+                self.stdout.write(self.style.SUCCESS("Metric rollups are consistent"))
+                return
+            for mismatch in mismatches[:20]:
+                self.stdout.write(
+                    f"  • {mismatch['metric']} {mismatch['dimension']}="
+                    f"{mismatch['key']} on {mismatch['date']}: "
+                    f"expected {mismatch['expected']}, found {mismatch['actual']}"
+                )
+            raise CommandError(
+                f"{len(mismatches)} metric rollup row(s) differ from source data. "
+                "Run without --verify to rebuild."
+            )
+
+        if options["changed"]:
+            refreshed = service.refresh_changed()
+            self.stdout.write(
+                self.style.SUCCESS(f"Refreshed {refreshed} metric rollup day(s)")
+            )
+            return
+
+        start = _date(options["start"]) if options["start"] else None
+        end = _date(options["end"]) if options["end"] else None
+        count = service.rebuild(
+            start, end, options["metric"], batch_size=options["batch_size"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} metric rollup rows"))
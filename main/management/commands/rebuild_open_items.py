@@ -0,0 +1,22 @@
+"""
+Management command to rebuild receivable open items.
+ReceivableOpenItem rows are maintained from invoice, item and payment signals;
+this recreates them from scratch after bulk imports or raw SQL changes.
+"""
+
+from django.core.management.base import BaseCommand
+
+from main.receivables_service import get_receivables_service
+
+
+class Command(BaseCommand):
+    help = "Rebuild ReceivableOpenItem rows from invoices and payments"
+
+    def handle(self, *args, **options):
+        invoices, work_order_invoices = get_receivables_service().rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {invoices} invoice and {work_order_invoices} "
+                "work order invoice open items"
+            )
+        )
@@ -0,0 +1,100 @@
+"""
+Management command to rebuild the global search index.
+GlobalSearchIndex is maintained from model signals; this reindexes every
+searchable record in chunks, optionally across worker threads, and drops
+entries whose record no longer exists.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from main.search.db_provider import DatabaseSearchProvider
+from main.search_models import GlobalSearchIndex
+
+
+def _index_chunk(model, pks):
+    """Index one chunk on a worker thread, closing its own DB connection."""
+    try:
+        return GlobalSearchIndex.index_objects(model.objects.filter(pk__in=pks))
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = "Rebuild GlobalSearchIndex entries and posting lists"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--entity",
+            action="append",
+            choices=sorted(DatabaseSearchProvider.SEARCHABLE_MODELS),
+            help="Entity type to reindex (repeatable; default all)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Records indexed per chunk",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Parallel worker threads (keep 1 on SQLite)",
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        batch_size = options["batch_size"]
+        workers = options["workers"]
+        if batch_size < 1 or workers < 1:
+            raise CommandError("--batch-size and --workers must be positive")
+
+        models = DatabaseSearchProvider.SEARCHABLE_MODELS
+        entities = options["entity"] or sorted(models)
+        total = 0
+        for entity_type in entities:
+            total += self._rebuild_model(
+                entity_type, models[entity_type], batch_size, workers
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Reindexed {total} records"))
+
+    def _rebuild_model(self, entity_type, model, batch_size, workers):
+        content_type = ContentType.objects.get_for_model(model)
+        _, deleted = (
+            GlobalSearchIndex.objects.filter(content_type=content_type)
+            .exclude(object_id__in=model.objects.values("pk"))
+            .delete()
+        )
+        removed = deleted.get(GlobalSearchIndex._meta.label, 0)
+
+        pks = list(model.objects.order_by("pk").values_list("pk", flat=True))
+        chunks = [pks[i : i + batch_size] for i in range(0, len(pks), batch_size)]
+        done = 0
+        if workers == 1:
+            for chunk in chunks:
+                done += GlobalSearchIndex.index_objects(
+                    model.objects.filter(pk__in=chunk)
+                )
+                self._progress(entity_type, done, len(pks))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(_index_chunk, model, chunk) for chunk in chunks
+                ]
+                for future in as_completed(futures):
+                    done += future.result()
+                    self._progress(entity_type, done, len(pks))
+
+        self.stdout.write(
+            f"{entity_type}: indexed {done}, removed {removed} stale entries"
+        )
+        return done
+
+    def _progress(self, entity_type, done, total):
+        if self.verbosity > 1:
+            self.stdout.write(f"  {entity_type}: {done}/{total}")
@@ -0,0 +1,95 @@
+from collections import defaultdict
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_daily_balances(apps, schema_editor):
+    """Seed LedgerDailyBalance from existing journal entries."""
+    JournalEntry = apps.get_model("main", "JournalEntry")
+    LedgerDailyBalance = apps.get_model("main", "LedgerDailyBalance")
+
+    totals = defaultdict(lambda: [Decimal("0.00"), Decimal("0.00"), 0])
+    for side, field in ((0, "debit_account_id"), (1, "credit_account_id")):
+        rows = (
+            JournalEntry.objects.order_by()
+            .values(field, "date")
+            .annotate(total=Sum("amount"), lines=Count("id"))
+        )
+        for row in rows:
+            bucket = totals[(row[field], row["date"])]
+            bucket[side] += row["total"] or Decimal("0.00")
+            bucket[2] += row["lines"]
+
+    LedgerDailyBalance.objects.bulk_create(
+        [
+            LedgerDailyBalance(
+                account_id=account_id,
+                date=day,
+                debit_total=debit,
+                credit_total=credit,
+                entry_count=count,
+            )
+            for (account_id, day), (debit, credit, count) in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0044_monthlydistribution_constraints"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LedgerDailyBalance",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                (
+                    "debit_total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=16),
+                ),
+                (
+                    "credit_total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=16),
+                ),
+                ("entry_count", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_balances",
+                        to="main.ledgeraccount",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["date", "account"], name="ledger_balance_date_acct_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("account", "date"),
+                        name="ledger_daily_balance_account_date",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_daily_balances, migrations.RunPython.noop),
+    ]
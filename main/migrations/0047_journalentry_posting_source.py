@@ -0,0 +1,96 @@
+import re
+
+from django.db import migrations, models
+
+# Canonical descriptions written by the posting endpoints before source keys existed
+LEGACY_PATTERNS = (
+    ("Invoice ", re.compile(r"^Invoice (\d+) posting$"), "invoice", "posting"),
+    ("Payment ", re.compile(r"^Payment (\d+) posting$"), "payment", "posting"),
+    (
+        "WorkOrder ",
+        re.compile(r"^WorkOrder (\d+) consumption posting$"),
+        "work_order",
+        "consumption",
+    ),
+)
+
+
+def backfill_posting_sources(apps, schema_editor):
+    """Derive source keys from legacy posting descriptions; oldest entry wins."""
+    JournalEntry = apps.get_model("main", "JournalEntry")
+
+    for prefix, pattern, source_type, posting_kind in LEGACY_PATTERNS:
+        seen = set()
+        updates = []
+        rows = (
+            JournalEntry.objects.filter(description__startswith=prefix)
+            .order_by("id")
+            .only("id", "description")
+        )
+        for entry in rows.iterator(chunk_size=2000):
+            match = pattern.match(entry.description)
+            if not match:
+                continue
+            source_id = int(match.group(1))
+            if source_id in seen:
+                # Legacy duplicate posting; leave it unkeyed for manual review
+                continue
+            seen.add(source_id)
+            entry.source_type = source_type
+            entry.source_id = source_id
+            entry.posting_kind = posting_kind
+            updates.append(entry)
+        JournalEntry.objects.bulk_update(
+            updates, ["source_type", "source_id", "posting_kind"], batch_size=1000
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0046_ledgerperiod_ledgerclosingbalance"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="journalentry",
+            name="source_type",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("invoice", "Invoice"),
+                    ("payment", "Payment"),
+                    ("work_order", "Work Order"),
+                ],
+                default="",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="journalentry",
+            name="source_id",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="journalentry",
+            name="posting_kind",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("posting", "Posting"),
+                    ("consumption", "Inventory Consumption"),
+                ],
+                default="",
+                max_length=20,
+            ),
+        ),
+        migrations.RunPython(backfill_posting_sources, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="journalentry",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("source_id__isnull", False)),
+                fields=("source_type", "source_id", "posting_kind"),
+                name="journal_entry_posting_source",
+            ),
+        ),
+    ]
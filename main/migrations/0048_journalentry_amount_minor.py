@@ -0,0 +1,32 @@
+from django.db import migrations, models
+from django.db.models import BigIntegerField, F
+from django.db.models.functions import Cast, Round
+
+
+def backfill_amount_minor(apps, schema_editor):
+    """Existing entries are all USD cents: amount_minor = round(amount * 100)."""
+    JournalEntry = apps.get_model("main", "JournalEntry")
+    JournalEntry.objects.update(
+        amount_minor=Cast(Round(F("amount") * 100), output_field=BigIntegerField())
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0047_journalentry_posting_source"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="journalentry",
+            name="currency",
+            field=models.CharField(default="USD", max_length=3),
+        ),
+        migrations.AddField(
+            model_name="journalentry",
+            name="amount_minor",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_amount_minor, migrations.RunPython.noop),
+    ]
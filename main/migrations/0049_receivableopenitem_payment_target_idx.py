@@ -0,0 +1,146 @@
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum
+
+ZERO = Decimal("0.00")
+
+
+def backfill_open_items(apps, schema_editor):
+    """Create one open item per Invoice and WorkOrderInvoice."""
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    Invoice = apps.get_model("main", "Invoice")
+    InvoiceItem = apps.get_model("main", "InvoiceItem")
+    WorkOrderInvoice = apps.get_model("main", "WorkOrderInvoice")
+    Payment = apps.get_model("main", "Payment")
+    ReceivableOpenItem = apps.get_model("main", "ReceivableOpenItem")
+
+    line_total = ExpressionWrapper(
+        F("quantity") * F("unit_price"),
+        output_field=DecimalField(max_digits=16, decimal_places=2),
+    )
+    invoice_totals = dict(
+        InvoiceItem.objects.order_by()
+        .values("invoice_id")
+        .annotate(total=Sum(line_total))
+        .values_list("invoice_id", "total")
+    )
+    sources = (
+        (
+            "invoice",
+            Invoice.objects.values_list("id", "due_date", "deal__account_id"),
+            invoice_totals,
+        ),
+        (
+            "workorderinvoice",
+            WorkOrderInvoice.objects.values_list(
+                "id", "due_date", "work_order__project__account_id"
+            ),
+            dict(WorkOrderInvoice.objects.values_list("id", "total_amount")),
+        ),
+    )
+    for model_name, headers, totals in sources:
+        content_type, _ = ContentType.objects.get_or_create(
+            app_label="main", model=model_name
+        )
+        paid = dict(
+            Payment.objects.filter(content_type=content_type)
+            .order_by()
+            .values("object_id")
+            .annotate(total=Sum("amount"))
+            .values_list("object_id", "total")
+        )
+        rows = []
+        for object_id, due_date, account_id in headers.iterator(chunk_size=2000):
+            total_due = totals.get(object_id) or ZERO
+            total_paid = paid.get(object_id) or ZERO
+            rows.append(
+                ReceivableOpenItem(
+                    content_type=content_type,
+                    object_id=object_id,
+                    account_id=account_id,
+                    due_date=due_date,
+                    total_due=total_due,
+                    total_paid=total_paid,
+                    open_balance=total_due - total_paid,
+                )
+            )
+        ReceivableOpenItem.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("main", "0048_journalentry_amount_minor"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(
+                fields=["content_type", "object_id"], name="payment_target_idx"
+            ),
+        ),
+        migrations.CreateModel(
+            name="ReceivableOpenItem",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("object_id", models.PositiveIntegerField()),
+                ("due_date", models.DateField()),
+                (
+                    "total_due",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "total_paid",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "open_balance",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "account",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="open_items",
+                        to="main.account",
+                    ),
+                ),
+                (
+                    "content_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["account", "due_date"],
+                        name="open_item_account_due_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("content_type", "object_id"), name="open_item_source"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_open_items, migrations.RunPython.noop),
+    ]
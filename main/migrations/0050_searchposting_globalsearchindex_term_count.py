@@ -0,0 +1,86 @@
+import re
+from collections import Counter
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Mirrors main.search.tokenizer at the time of this migration
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _frequencies(text):
+    return Counter(
+        token[:64] for token in TOKEN_RE.findall((text or "").lower()) if len(token) >= 2
+    )
+
+
+def backfill_postings(apps, schema_editor):
+    """Build posting lists for index entries that already exist."""
+    GlobalSearchIndex = apps.get_model("main", "GlobalSearchIndex")
+    SearchPosting = apps.get_model("main", "SearchPosting")
+
+    postings = []
+    for entry in GlobalSearchIndex.objects.only("id", "search_vector").iterator(
+        chunk_size=2000
+    ):
+        frequencies = _frequencies(entry.search_vector)
+        GlobalSearchIndex.objects.filter(pk=entry.pk).update(
+            term_count=sum(frequencies.values())
+        )
+        postings.extend(
+            SearchPosting(entry_id=entry.pk, term=term, term_frequency=count)
+            for term, count in frequencies.items()
+        )
+        if len(postings) >= 5000:
+            SearchPosting.objects.bulk_create(postings)
+            postings = []
+    SearchPosting.objects.bulk_create(postings)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("main", "0049_receivableopenitem_payment_target_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="globalsearchindex",
+            name="term_count",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Number of indexed terms (document length for BM25)",
+            ),
+        ),
+        migrations.CreateModel(
+            name="SearchPosting",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("term", models.CharField(max_length=64)),
+                ("term_frequency", models.PositiveIntegerField(default=1)),
+                (
+                    "entry",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="postings",
+                        to="main.globalsearchindex",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("term", "entry"), name="search_posting_term_entry"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_postings, migrations.RunPython.noop),
+    ]
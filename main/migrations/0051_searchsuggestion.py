@@ -0,0 +1,93 @@
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Mirrors main.search.tokenizer.edge_ngrams at the time of this migration
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _edge_ngrams(value):
+    prefixes = set()
+    text = " ".join((value or "").lower().split())
+    for part in [text] + TOKEN_RE.findall(text):
+        for end in range(2, min(len(part), 20) + 1):
+            if part[end - 1] != " ":
+                prefixes.add(part[:end])
+    return prefixes
+
+
+def backfill_suggestions(apps, schema_editor):
+    """
+    Build prefixes from existing entry titles. Contact emails are added the
+    next time each contact is indexed (or by rebuild_search_index).
+    """
+    GlobalSearchIndex = apps.get_model("main", "GlobalSearchIndex")
+    SearchSuggestion = apps.get_model("main", "SearchSuggestion")
+
+    rows = []
+    for entry in GlobalSearchIndex.objects.only("id", "title", "entity_type").iterator(
+        chunk_size=2000
+    ):
+        rows.extend(
+            SearchSuggestion(
+                entry_id=entry.pk,
+                prefix=prefix,
+                label=entry.title,
+                entity_type=entry.entity_type,
+            )
+            for prefix in _edge_ngrams(entry.title)
+        )
+        if len(rows) >= 5000:
+            SearchSuggestion.objects.bulk_create(rows)
+            rows = []
+    SearchSuggestion.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("main", "0050_searchposting_globalsearchindex_term_count"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchSuggestion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("prefix", models.CharField(max_length=20)),
+                ("label", models.CharField(max_length=200)),
+                ("entity_type", models.CharField(max_length=50)),
+                (
+                    "entry",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="suggestions",
+                        to="main.globalsearchindex",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("prefix", "entry"),
+                        name="search_suggestion_prefix_entry",
+                    )
+                ],
+                "indexes": [
+                    models.Index(
+                        fields=["prefix", "entity_type", "label"],
+                        name="search_suggestion_lookup_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_suggestions, migrations.RunPython.noop),
+    ]
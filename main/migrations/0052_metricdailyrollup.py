@@ -0,0 +1,68 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("main", "0051_searchsuggestion"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MetricDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                (
+                    "metric",
+                    models.CharField(
+                        choices=[
+                            ("deals_created", "Deals Created"),
+                            ("deals_won", "Deals Won"),
+                            ("deals_lost", "Deals Lost"),
+                            ("projects_created", "Projects Created"),
+                            ("projects_completed", "Projects Completed"),
+                            ("payments_received", "Payments Received"),
+                            ("invoices_issued", "Work Order Invoices Issued"),
+                            ("expenses_approved", "Expenses Approved"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                (
+                    "dimension",
+                    models.CharField(
+                        choices=[
+                            ("all", "All"),
+                            ("owner", "Owner"),
+                            ("stage", "Stage"),
+                            ("account", "Account"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("key", models.CharField(blank=True, max_length=64)),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=16),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("metric", "dimension", "key", "date"),
+                        name="metric_rollup_series_date",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import TruncDate
+
+
+def backfill_issue_dates(apps, schema_editor):
+    """Copy each receivable's issue day onto its open item."""
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    Invoice = apps.get_model("main", "Invoice")
+    WorkOrderInvoice = apps.get_model("main", "WorkOrderInvoice")
+    ReceivableOpenItem = apps.get_model("main", "ReceivableOpenItem")
+
+    sources = (
+        ("invoice", Invoice, TruncDate("created_at")),
+        ("workorderinvoice", WorkOrderInvoice, models.F("issued_date")),
+    )
+    for model_name, model, issue_date in sources:
+        content_type = ContentType.objects.filter(
+            app_label="main", model=model_name
+        ).first()
+        if content_type is None:
+            continue
+        ReceivableOpenItem.objects.filter(content_type=content_type).update(
+            issue_date=Subquery(
+                model.objects.filter(pk=OuterRef("object_id"))
+                .annotate(issued=issue_date)
+                .values("issued")[:1]
+            )
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("main", "0052_metricdailyrollup"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="receivableopenitem",
+            name="issue_date",
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_issue_dates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0053_receivableopenitem_issue_date"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MetricRollupChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "metric",
+                    models.CharField(
+                        choices=[
+                            ("deals_created", "Deals Created"),
+                            ("deals_won", "Deals Won"),
+                            ("deals_lost", "Deals Lost"),
+                            ("projects_created", "Projects Created"),
+                            ("projects_completed", "Projects Completed"),
+                            ("payments_received", "Payments Received"),
+                            ("invoices_issued", "Work Order Invoices Issued"),
+                            ("expenses_approved", "Expenses Approved"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="MetricRollupRefresh",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("refreshed_at", models.DateTimeField(db_index=True)),
+                ("days_refreshed", models.IntegerField(default=0)),
+            ],
+        ),
+    ]
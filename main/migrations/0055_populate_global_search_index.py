@@ -0,0 +1,32 @@
+from django.core.management import call_command
+from django.db import migrations
+
+SEARCHABLE_MODELS = ("Account", "Contact", "Project", "Deal", "Quote", "Invoice")
+
+
+def populate_search_index(apps, schema_editor):
+    """
+    Index every searchable record for IndexedSearchProvider.
+
+    Before signals maintained GlobalSearchIndex only bulk_update wrote to it,
+    so most existing records have no entry. rebuild_search_index indexes them
+    in chunks through GlobalSearchIndex.index_objects, using the current
+    models; if a later migration adds columns those models read, fake this
+    migration and run `manage.py rebuild_search_index` after migrating.
+    """
+    if not any(
+        apps.get_model("main", name).objects.exists() for name in SEARCHABLE_MODELS
+    ):
+        return
+    call_command("rebuild_search_index")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0054_metricrollupchange_metricrolluprefresh"),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_search_index, migrations.RunPython.noop),
+    ]
@@ -687,10 +687,142 @@ class JournalEntry(models.Model):
     )
     amount = models.DecimalField(max_digits=12, decimal_places=2)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Posting source reference: which document this entry posts and how.
+    # Unique when set, so re-posting the same document is rejected by the DB.
+    SOURCE_TYPE_CHOICES = [
+        ("invoice", "Invoice"),
+        ("payment", "Payment"),
+        ("work_order", "Work Order"),
+    ]
+    POSTING_KIND_CHOICES = [
+        ("posting", "Posting"),
+        ("consumption", "Inventory Consumption"),
+    ]
+    source_type = models.CharField(
+        max_length=20, choices=SOURCE_TYPE_CHOICES, blank=True, default=""
+    )
+    source_id = models.PositiveIntegerField(null=True, blank=True)
+    posting_kind = models.CharField(
+        max_length=20, choices=POSTING_KIND_CHOICES, blank=True, default=""
+    )
+    # ISO 4217 code and the amount in integer minor units of that currency
+    # (kept in step with amount on save; see main.money). Entries are only
+    # written in the default currency until daily balances, reports and aging
+    # group by currency; the API and admin expose it read-only.
+    currency = models.CharField(max_length=3, default="USD")
+    amount_minor = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["source_type", "source_id", "posting_kind"],
+                condition=models.Q(source_id__isnull=False),
+                name="journal_entry_posting_source",
+            )
+        ]
 
     def __str__(self):
         return f"{self.date}: {self.description} - {self.amount}"
 
+    def save(self, *args, **kwargs):
+        from .money import to_minor
+
+        self.amount_minor = to_minor(self.amount, self.currency)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "amount" in update_fields:
+            kwargs["update_fields"] = set(update_fields) | {"amount_minor"}
+        super().save(*args, **kwargs)
+
+
+class LedgerDailyBalance(models.Model):
+    """
+    Materialized per-account debit/credit totals for one posting date.
+    Maintained incrementally from JournalEntry writes (see main.ledger_service)
+    so financial reports aggregate a few rows per account instead of every entry.
+    """
+
+    account = models.ForeignKey(
+        "LedgerAccount", on_delete=models.CASCADE, related_name="daily_balances"
+    )
+    date = models.DateField()
+    debit_total = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    credit_total = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    entry_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["account", "date"], name="ledger_daily_balance_account_date"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["date", "account"], name="ledger_balance_date_acct_idx"
+            )
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.date} {self.account_id}: "
+            f"DR {self.debit_total} / CR {self.credit_total}"
+        )
+
+
+class LedgerPeriod(models.Model):
+    """
+    A closed accounting period ending on ``period_end``.
+    Closing writes one LedgerClosingBalance per account; journal entries dated
+    on or before the latest close can no longer be posted, edited or deleted.
+    """
+
+    period_end = models.DateField(unique=True)
+    closed_at = models.DateTimeField(auto_now_add=True)
+    closed_by = models.ForeignKey(
+        "CustomUser",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="closed_ledger_periods",
+    )
+
+    class Meta:
+        ordering = ["-period_end"]
+
+    def __str__(self):
+        return f"Closed through {self.period_end}"
+
+
+class LedgerClosingBalance(models.Model):
+    """Immutable cumulative debit/credit totals per account at a period close."""
+
+    period = models.ForeignKey(
+        "LedgerPeriod", on_delete=models.CASCADE, related_name="closing_balances"
+    )
+    account = models.ForeignKey(
+        "LedgerAccount", on_delete=models.CASCADE, related_name="closing_balances"
+    )
+    debit_total = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    credit_total = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["period", "account"], name="ledger_closing_balance_period_acct"
+            )
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.period.period_end} {self.account_id}: "
+            f"DR {self.debit_total} / CR {self.credit_total}"
+        )
+
+    def save(self, *args, **kwargs):
+        if self.pk and LedgerClosingBalance.objects.filter(pk=self.pk).exists():
+            raise ValidationError("Closing balances are immutable once written.")
+        super().save(*args, **kwargs)
+
 
 class WorkOrder(models.Model):
     project = models.ForeignKey(
@@ -993,6 +1125,13 @@ class Payment(models.Model):
     object_id = models.PositiveIntegerField()
     content_object = GenericForeignKey("content_type", "object_id")
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["content_type", "object_id"], name="payment_target_idx"
+            )
+        ]
+
     def __str__(self):
         return f"Payment of {self.amount} for {self.content_object}"
 
@@ -1010,6 +1149,52 @@ class Payment(models.Model):
         super().save(*args, **kwargs)
 
 
+class ReceivableOpenItem(models.Model):
+    """
+    Maintained receivable balance for one Invoice or WorkOrderInvoice.
+    Updated in the same transaction as item and payment writes (see
+    main.receivables_service) so allocation and AR aging read one row per
+    invoice instead of summing items and payments.
+    """
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey("content_type", "object_id")
+    account = models.ForeignKey(
+        Account,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="open_items",
+    )
+    # Invoice creation day / WorkOrderInvoice issued_date; aging as of an
+    # earlier date leaves out receivables issued after it
+    issue_date = models.DateField(null=True, blank=True)
+    due_date = models.DateField()
+    total_due = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_paid = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    open_balance = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_type", "object_id"], name="open_item_source"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["account", "due_date"], name="open_item_account_due_idx"
+            )
+        ]
+
+    def __str__(self):
+        return (
+            f"Open item {self.content_type_id}:{self.object_id} "
+            f"balance {self.open_balance}"
+        )
+
+
 class Expense(models.Model):
     EXPENSE_CATEGORIES = [
         ("office_supplies", "Office Supplies"),
@@ -1470,6 +1655,82 @@ class AnalyticsSnapshot(models.Model):
         return snapshot
 
 
+class MetricDailyRollup(models.Model):
+    """
+    Daily count and amount of one business metric, overall and per owner,
+    stage and account. Maintained incrementally from source model writes (see
+    main.rollup_service) so trend queries read one row per day and series.
+    """
+
+    METRIC_CHOICES = [
+        ("deals_created", "Deals Created"),
+        ("deals_won", "Deals Won"),
+        ("deals_lost", "Deals Lost"),
+        ("projects_created", "Projects Created"),
+        ("projects_completed", "Projects Completed"),
+        ("payments_received", "Payments Received"),
+        ("invoices_issued", "Work Order Invoices Issued"),
+        ("expenses_approved", "Expenses Approved"),
+    ]
+
+    DIMENSION_CHOICES = [
+        ("all", "All"),
+        ("owner", "Owner"),
+        ("stage", "Stage"),
+        ("account", "Account"),
+    ]
+
+    date = models.DateField()
+    metric = models.CharField(max_length=30, choices=METRIC_CHOICES)
+    dimension = models.CharField(max_length=10, choices=DIMENSION_CHOICES)
+    # Owner/account id, stage id or status; empty for "all" and unset values
+    key = models.CharField(max_length=64, blank=True)
+    count = models.IntegerField(default=0)
+    amount = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["metric", "dimension", "key", "date"],
+                name="metric_rollup_series_date",
+            )
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.date} {self.metric} {self.dimension}={self.key}: "
+            f"{self.count} / {self.amount}"
+        )
+
+
+class MetricRollupChange(models.Model):
+    """
+    A metric day queued for recomputation because source rows left it through
+    a write that skipped the rollup signals (see RollupService.mark_changed).
+    """
+
+    metric = models.CharField(max_length=30, choices=MetricDailyRollup.METRIC_CHOICES)
+    date = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.metric} on {self.date}"
+
+
+class MetricRollupRefresh(models.Model):
+    """
+    One refresh_changed run; the latest run's refreshed_at is where the next
+    run starts reading changed source rows from.
+    """
+
+    refreshed_at = models.DateTimeField(db_index=True)
+    days_refreshed = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"Rollup refresh at {self.refreshed_at}: {self.days_refreshed} day(s)"
+
+
 class DealPrediction(models.Model):
     """
     Machine learning predictions for deal outcomes.
@@ -1532,74 +1793,14 @@ class CustomerLifetimeValue(models.Model):
     @classmethod
     def calculate_for_contact(cls, contact):
         """Calculate CLV for a specific contact"""
-        from django.db.models import Avg, Sum
-        from django.utils import timezone
+        from .clv_service import DEAL_STATISTICS, clv_fields
 
-        # Get deal statistics
-        deals = Deal.objects.filter(primary_contact=contact)
-        total_deals = deals.count()
-        won_deals = deals.filter(status="won")
-        total_revenue = won_deals.aggregate(total=Sum("value"))["total"] or 0
-        average_deal_size = won_deals.aggregate(avg=Avg("value"))["avg"] or 0
-        deal_win_rate = won_deals.count() / total_deals if total_deals > 0 else 0
-
-        # Calculate customer tenure
-        customer_since = contact.created_at.date()
-        last_activity = max(
-            contact.created_at.date(),
-            deals.order_by("-updated_at").first().updated_at.date()
-            if deals.exists()
-            else contact.created_at.date(),
+        stats = Deal.objects.filter(primary_contact=contact).aggregate(
+            **DEAL_STATISTICS
         )
-
-        # Simple CLV prediction (can be enhanced with ML)
-        months_active = (timezone.now().date() - customer_since).days / 30
-        monthly_revenue = total_revenue / max(months_active, 1)
-        predicted_clv = monthly_revenue * 12 * 3  # 3-year prediction
-        clv_confidence = min(0.9, total_deals / 10)  # Confidence based on deal history
-
-        # Customer segments
-        segments = []
-        if total_revenue > 10000:
-            segments.append("high_value")
-        elif total_revenue > 5000:
-            segments.append("medium_value")
-        else:
-            segments.append("low_value")
-
-        if deal_win_rate > 0.7:
-            segments.append("high_conversion")
-        if months_active > 12:
-            segments.append("loyal")
-
-        # Create or update CLV record
-        clv, created = cls.objects.get_or_create(
-            contact=contact,
-            defaults={
-                "total_revenue": total_revenue,
-                "total_deals": total_deals,
-                "average_deal_size": average_deal_size,
-                "deal_win_rate": deal_win_rate,
-                "customer_since": customer_since,
-                "last_activity": last_activity,
-                "predicted_clv": predicted_clv,
-                "clv_confidence": clv_confidence,
-                "segments": segments,
-            },
+        clv, _ = cls.objects.update_or_create(
+            contact=contact, defaults=clv_fields(contact.created_at, stats)
         )
-
-        if not created:
-            clv.total_revenue = total_revenue
-            clv.total_deals = total_deals
-            clv.average_deal_size = average_deal_size
-            clv.deal_win_rate = deal_win_rate
-            clv.customer_since = customer_since
-            clv.last_activity = last_activity
-            clv.predicted_clv = predicted_clv
-            clv.clv_confidence = clv_confidence
-            clv.segments = segments
-            clv.save()
-
         return clv
 
 
@@ -0,0 +1,92 @@
+"""
+Integer minor-unit helpers for Converge CRM ledger amounts.
+JournalEntry stores amount_minor (e.g. cents) next to the Decimal amount so
+large aggregations can sum exact integers, vectorized with NumPy when it is
+installed and with plain int arithmetic otherwise.
+"""
+
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, Iterable, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # Optional: summation falls back to Python ints
+    np = None
+
+# ISO 4217 minor-unit exponents that differ from the default of 2
+CURRENCY_EXPONENTS = {
+    "BHD": 3,
+    "JPY": 0,
+    "KRW": 0,
+    "KWD": 3,
+    "OMR": 3,
+    "TND": 3,
+    "VND": 0,
+}
+DEFAULT_EXPONENT = 2
+
+# Matches the JournalEntry.currency field default
+DEFAULT_CURRENCY = "USD"
+
+
+def currency_exponent(currency: Optional[str] = None) -> int:
+    return CURRENCY_EXPONENTS.get(currency or DEFAULT_CURRENCY, DEFAULT_EXPONENT)
+
+
+def to_minor(amount, currency: Optional[str] = None) -> int:
+    """Convert a major-unit amount (Decimal, str, int or float) to minor units."""
+    if amount is None:
+        return 0
+    exponent = currency_exponent(currency)
+    scaled = Decimal(str(amount)).scaleb(exponent)
+    return int(scaled.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_minor(units: int, currency: Optional[str] = None) -> Decimal:
+    """Convert integer minor units back to an exact Decimal amount."""
+    quantum = Decimal(1).scaleb(-currency_exponent(currency))
+    return (Decimal(int(units)) * quantum).quantize(quantum)
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+def sum_minor(values: Iterable[int]) -> int:
+    """Exact sum of minor-unit integers, vectorized when NumPy is available."""
+    if np is None:
+        return sum(values)
+    array = np.fromiter(values, dtype=np.int64)
+    return int(array.sum(dtype=np.int64))
+
+
+def group_sum_minor(keys: Sequence[int], values: Sequence[int]) -> Dict[int, tuple]:
+    """
+    Sum minor-unit values per key.
+
+    Returns:
+        Dict of key -> (exact integer total, row count). With NumPy the rows
+        are sorted by key and reduced per run; otherwise a dict fold is used.
+    """
+    if not keys:
+        return {}
+    if np is None:
+        grouped: Dict[int, list] = {}
+        for key, value in zip(keys, values):
+            bucket = grouped.setdefault(key, [0, 0])
+            bucket[0] += value
+            bucket[1] += 1
+        return {key: (total, count) for key, (total, count) in grouped.items()}
+
+    key_array = np.asarray(keys, dtype=np.int64)
+    value_array = np.asarray(values, dtype=np.int64)
+    order = np.argsort(key_array, kind="stable")
+    key_array = key_array[order]
+    value_array = value_array[order]
+    starts = np.flatnonzero(np.r_[True, key_array[1:] != key_array[:-1]])
+    sums = np.add.reduceat(value_array, starts)
+    counts = np.diff(np.r_[starts, len(key_array)])
+    return {
+        int(key): (int(total), int(count))
+        for key, total, count in zip(key_array[starts], sums, counts)
+    }
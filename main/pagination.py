@@ -0,0 +1,284 @@
+"""
+Keyset (seek) pagination for Converge CRM list and search endpoints.
+Rows are ordered by one sort column plus the primary key, and a page is
+fetched by seeking past the last row seen instead of skipping an offset, so
+page 1000 costs the same as page 1. Totals are optional: exact, capped at
+PAGINATION_COUNT_CAP rows, or the planner's estimate on PostgreSQL.
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, List, Optional, Tuple
+from uuid import UUID
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connection
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+# Rows counted at most in "capped" count mode
+DEFAULT_COUNT_CAP = 10000
+
+COUNT_EXACT = "exact"
+COUNT_CAPPED = "capped"
+COUNT_ESTIMATE = "estimate"
+COUNT_MODES = (COUNT_EXACT, COUNT_CAPPED, COUNT_ESTIMATE)
+
+
+class Keyset:
+    """
+    Ordering on one sort column plus the primary key, with nulls last.
+
+    The primary key breaks ties so every row has a unique position, which
+    lets a page start strictly after the previous page's last row.
+    """
+
+    def __init__(self, model, field_name: str = "pk", descending: bool = False):
+        self.model = model
+        self.descending = descending
+        self.field = None
+        if field_name not in ("pk", model._meta.pk.name):
+            try:
+                field = model._meta.get_field(field_name)
+            except FieldDoesNotExist:
+                raise ValueError(f"Cannot sort by '{field_name}'")
+            if not field.concrete or field.many_to_many or field.one_to_many:
+                raise ValueError(f"Cannot sort by '{field_name}'")
+            self.field = field
+
+    @classmethod
+    def from_ordering(cls, model, ordering) -> "Keyset":
+        """Keyset for the first plain field name in an order_by() list."""
+        for term in ordering or ():
+            if isinstance(term, str) and term not in ("?", ""):
+                descending = term.startswith("-")
+                try:
+                    return cls(model, term.lstrip("-"), descending)
+                except ValueError:
+                    break
+        return cls(model)
+
+    def order(self, queryset, reverse: bool = False):
+        """Order queryset by this keyset, or in the opposite direction."""
+        descending = self.descending != reverse
+        pk = "-pk" if descending else "pk"
+        if self.field is None:
+            return queryset.order_by(pk)
+        nulls = {"nulls_first": True} if reverse else {"nulls_last": True}
+        column = F(self.field.attname)
+        column = column.desc(**nulls) if descending else column.asc(**nulls)
+        return queryset.order_by(column, pk)
+
+    def seek(self, position: List[Any], reverse: bool = False) -> Q:
+        """Rows after position in this ordering, or before it if reverse."""
+        after = "lt" if self.descending != reverse else "gt"
+        if self.field is None:
+            return Q(**{f"pk__{after}": position[0]})
+
+        value, pk = position
+        name = self.field.attname
+        pk_after = Q(**{f"pk__{after}": pk})
+        if value is None:
+            # Nulls sort last: going forward only nulls remain, going back
+            # every non-null row comes first
+            rest = Q(**{f"{name}__isnull": True}) & pk_after
+            if reverse:
+                rest |= Q(**{f"{name}__isnull": False})
+            return rest
+
+        rest = Q(**{f"{name}__{after}": value}) | (Q(**{name: value}) & pk_after)
+        if not reverse and self.field.null:
+            rest |= Q(**{f"{name}__isnull": True})
+        return rest
+
+    def position(self, obj) -> List[Any]:
+        """Cursor position of a row."""
+        if self.field is None:
+            return [obj.pk]
+        return [getattr(obj, self.field.attname), obj.pk]
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    return value
+
+
+def encode_cursor(position: List[Any], reverse: bool = False) -> str:
+    """Opaque cursor for a position; reverse cursors fetch the page before."""
+    payload = {"p": [_encode_value(value) for value in position]}
+    if reverse:
+        payload["r"] = 1
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[List[Any], bool]:
+    """
+    Position and direction from a cursor built by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        position = payload["p"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(position, list) or not 1 <= len(position) <= 2:
+        raise ValueError("Invalid cursor")
+    return position, bool(payload.get("r"))
+
+
+def keyset_page(queryset, keyset: Keyset, limit: int, cursor: Optional[str] = None):
+    """
+    One page of queryset in keyset order.
+
+    Args:
+        queryset: Filtered queryset; its ordering is replaced by the keyset's
+        keyset: Sort column and direction
+        limit: Page size
+        cursor: Cursor from a previous page, or None for the first page
+
+    Returns:
+        Tuple of (rows, next cursor, previous cursor); cursors are None when
+        there is no such page
+
+    Raises:
+        ValueError: If the cursor is malformed or does not fit the keyset
+    """
+    position, reverse = decode_cursor(cursor) if cursor else (None, False)
+    expected = 1 if keyset.field is None else 2
+    if position is not None and len(position) != expected:
+        raise ValueError("Invalid cursor")
+
+    ordered = keyset.order(queryset, reverse)
+    if position is not None:
+        ordered = ordered.filter(keyset.seek(position, reverse))
+    rows = list(ordered[: limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if reverse:
+        rows.reverse()
+
+    if not rows:
+        # Past either end: point back at where we came from
+        if position is None:
+            return rows, None, None
+        if reverse:
+            return rows, encode_cursor(position), None
+        return rows, None, encode_cursor(position, reverse=True)
+
+    first, last = keyset.position(rows[0]), keyset.position(rows[-1])
+    if reverse:
+        next_cursor = encode_cursor(last)
+        previous_cursor = encode_cursor(first, reverse=True) if has_more else None
+    else:
+        next_cursor = encode_cursor(last) if has_more else None
+        previous_cursor = (
+            encode_cursor(first, reverse=True) if position is not None else None
+        )
+    return rows, next_cursor, previous_cursor
+
+
+def count_rows(queryset, mode: Optional[str]) -> Tuple[Optional[int], bool]:
+    """
+    Row count in the requested mode.
+
+    Args:
+        queryset: Filtered queryset
+        mode: "exact", "capped", "estimate", or None for no count
+
+    Returns:
+        Tuple of (count or None, whether the count is exact). A capped count
+        stops at PAGINATION_COUNT_CAP; an estimate comes from the PostgreSQL
+        planner and falls back to a capped count on other databases.
+    """
+    if mode not in COUNT_MODES:
+        return None, False
+    queryset = queryset.order_by()
+    if mode == COUNT_EXACT:
+        return queryset.count(), True
+
+    if mode == COUNT_ESTIMATE and connection.vendor == "postgresql":
+        plan = json.loads(queryset.explain(format="json"))
+        return int(plan[0]["Plan"]["Plan Rows"]), False
+
+    cap = getattr(settings, "PAGINATION_COUNT_CAP", DEFAULT_COUNT_CAP)
+    count = queryset[: cap + 1].count()
+    if count > cap:
+        return cap, False
+    return count, True
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Page-number pagination that switches to keyset pagination when the
+    request has a cursor parameter (empty for the first page).
+
+    Keyset pages follow the view's ordering (the first ordering field plus
+    id) and include a count only when asked for with ?count=exact|capped|
+    estimate, so paging deep into large tables stays constant-time.
+    """
+
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+
+    keyset_mode = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        self.keyset_mode = True
+        self.request = request
+
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        keyset = Keyset.from_ordering(queryset.model, ordering)
+        cursor = request.query_params.get(self.cursor_query_param) or None
+        try:
+            rows, self.next_cursor, self.previous_cursor = keyset_page(
+                queryset, keyset, page_size, cursor
+            )
+        except ValueError:
+            raise NotFound("Invalid cursor")
+
+        mode = request.query_params.get(self.count_query_param)
+        self.count, self.count_is_exact = count_rows(queryset, mode)
+        return rows
+
+    def get_paginated_response(self, data):
+        if not self.keyset_mode:
+            return super().get_paginated_response(data)
+        return Response(
+            {
+                "count": self.count,
+                "count_is_exact": self.count_is_exact,
+                "next": self._cursor_link(self.next_cursor),
+                "previous": self._cursor_link(self.previous_cursor),
+                "results": data,
+            }
+        )
+
+    def _cursor_link(self, cursor):
+        if cursor is None:
+            return None
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(url, self.cursor_query_param, cursor)
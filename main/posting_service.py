@@ -0,0 +1,441 @@
+"""
+Bulk GL posting service for Converge CRM.
+Posts batches of invoices, payment allocations and work order completions in
+one transaction: default ledger accounts are resolved once, idempotency is a
+single set-based lookup on the posting source key and journal entries are
+written with bulk_create.
+"""
+
+import logging
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .ledger_service import get_ledger_service
+from .models import (
+    ActivityLog,
+    Invoice,
+    JournalEntry,
+    LedgerAccount,
+    Payment,
+    WorkOrder,
+    WorkOrderInvoice,
+)
+from .money import to_minor
+from .receivables_service import get_receivables_service
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal("0.00")
+
+# Default chart-of-accounts entries used by the posting endpoints
+DEFAULT_ACCOUNTS = {
+    "1000": {"name": "Cash", "account_type": "asset"},
+    "1100": {"name": "Accounts Receivable", "account_type": "asset"},
+    "1200": {"name": "Inventory", "account_type": "asset"},
+    "4000": {"name": "Revenue", "account_type": "revenue"},
+    "5000": {"name": "Cost of Goods Sold", "account_type": "expense"},
+}
+
+# JournalEntry.posting_kind written for each source_type
+POSTING_KINDS = {
+    "invoice": "posting",
+    "payment": "posting",
+    "work_order": "consumption",
+}
+
+# Upper bound on items per request so one call cannot hold a long transaction
+MAX_BATCH_SIZE = 5000
+
+
+def posting_key(source_type, source_id) -> Dict:
+    """JournalEntry field values identifying the posting of one source document."""
+    return {
+        "source_type": source_type,
+        "source_id": source_id,
+        "posting_kind": POSTING_KINDS[source_type],
+    }
+
+
+def is_posted(source_type, source_id) -> bool:
+    """Whether a journal entry already posts this source (unique index lookup)."""
+    return JournalEntry.objects.filter(**posting_key(source_type, source_id)).exists()
+
+
+def invoice_posting_description(invoice_id) -> str:
+    return f"Invoice {invoice_id} posting"
+
+
+def payment_posting_description(payment_id) -> str:
+    return f"Payment {payment_id} posting"
+
+
+def work_order_posting_description(work_order_id) -> str:
+    return f"WorkOrder {work_order_id} consumption posting"
+
+
+class PostingService:
+    """Service for posting many source documents to the general ledger at once"""
+
+    def default_accounts(self, codes: Optional[Iterable[str]] = None) -> Dict:
+        """
+        Resolve default ledger accounts by code, creating any that are missing.
+
+        Returns:
+            Dict of code -> LedgerAccount
+        """
+        codes = list(codes or DEFAULT_ACCOUNTS)
+        accounts = {a.code: a for a in LedgerAccount.objects.filter(code__in=codes)}
+        for code in codes:
+            if code not in accounts:
+                accounts[code], _ = LedgerAccount.objects.get_or_create(
+                    code=code, defaults=DEFAULT_ACCOUNTS[code]
+                )
+        return accounts
+
+    def post_batch(
+        self,
+        invoice_ids: Iterable[int] = (),
+        payment_ids: Iterable[int] = (),
+        work_order_ids: Iterable[int] = (),
+        user=None,
+    ) -> Dict:
+        """
+        Post a batch of invoices, payments and work orders in one transaction.
+
+        Items already posted, missing or failing validation are reported and
+        skipped; they never abort the rest of the batch. Posting into a closed
+        ledger period raises ValidationError before anything is written.
+
+        Args:
+            invoice_ids: Invoice ids to post (DR AR, CR Revenue)
+            payment_ids: Payment ids to allocate (DR Cash, CR AR)
+            work_order_ids: WorkOrder ids to complete (DR COGS, CR Inventory)
+            user: User recorded on the ActivityLog audit rows
+
+        Returns:
+            Dict with per-item "results" (in request order) and a "summary"
+            of counts by status
+        """
+        invoice_ids = _unique_ints(invoice_ids)
+        payment_ids = _unique_ints(payment_ids)
+        work_order_ids = _unique_ints(work_order_ids)
+        total = len(invoice_ids) + len(payment_ids) + len(work_order_ids)
+        if total > MAX_BATCH_SIZE:
+            raise ValidationError(
+                f"Batch has {total} items; the limit is {MAX_BATCH_SIZE}."
+            )
+
+        today = timezone.now().date()
+        get_ledger_service().assert_period_open(today)
+
+        with transaction.atomic():
+            accounts = self.default_accounts()
+            already_posted = _posted_sources(
+                {
+                    "invoice": invoice_ids,
+                    "payment": payment_ids,
+                    "work_order": work_order_ids,
+                }
+            )
+
+            batch = _Batch(today, accounts, already_posted)
+            self._stage_invoices(batch, invoice_ids)
+            self._stage_payments(batch, payment_ids)
+            self._stage_work_orders(batch, work_order_ids)
+            batch.write(user)
+
+        logger.info(
+            "Bulk posted %s journal entries from %s requested items",
+            len(batch.entries),
+            total,
+        )
+        return {"results": batch.results, "summary": batch.summary()}
+
+    def _stage_invoices(self, batch, invoice_ids):
+        if not invoice_ids:
+            return
+        invoices = Invoice.objects.in_bulk(invoice_ids)
+        open_items = get_receivables_service().open_items(Invoice, invoice_ids)
+        for invoice_id in invoice_ids:
+            invoice = invoices.get(invoice_id)
+            if invoice is None:
+                batch.result("invoice", invoice_id, "not_found")
+            elif (
+                invoice.posted_journal_id
+                or ("invoice", invoice_id) in batch.already_posted
+            ):
+                batch.result("invoice", invoice_id, "already_posted")
+            else:
+                batch.stage(
+                    "invoice",
+                    invoice,
+                    invoice_posting_description(invoice_id),
+                    batch.accounts["1100"],
+                    batch.accounts["4000"],
+                    open_items[invoice_id].total_due,
+                )
+
+    def _stage_payments(self, batch, payment_ids):
+        if not payment_ids:
+            return
+        payments = Payment.objects.in_bulk(payment_ids)
+
+        # Targets and their totals, resolved per content type rather than per payment
+        invoice_ct = ContentType.objects.get_for_model(Invoice)
+        wo_invoice_ct = ContentType.objects.get_for_model(WorkOrderInvoice)
+        target_ids = defaultdict(set)
+        for payment in payments.values():
+            target_ids[payment.content_type_id].add(payment.object_id)
+        invoice_targets = Invoice.objects.in_bulk(target_ids[invoice_ct.id])
+        wo_invoice_targets = WorkOrderInvoice.objects.in_bulk(
+            target_ids[wo_invoice_ct.id]
+        )
+        # Maintained open items already hold each target's total due and paid
+        receivables = get_receivables_service()
+        open_items = {
+            (invoice_ct.id, k): v
+            for k, v in receivables.open_items(Invoice, invoice_targets).items()
+        }
+        open_items.update(
+            {
+                (wo_invoice_ct.id, k): v
+                for k, v in receivables.open_items(
+                    WorkOrderInvoice, wo_invoice_targets
+                ).items()
+            }
+        )
+
+        for payment_id in payment_ids:
+            payment = payments.get(payment_id)
+            if payment is None:
+                batch.result("payment", payment_id, "not_found")
+                continue
+            if ("payment", payment_id) in batch.already_posted:
+                batch.result("payment", payment_id, "already_posted")
+                continue
+
+            key = (payment.content_type_id, payment.object_id)
+            if payment.content_type_id == invoice_ct.id:
+                target = invoice_targets.get(payment.object_id)
+            elif payment.content_type_id == wo_invoice_ct.id:
+                target = wo_invoice_targets.get(payment.object_id)
+            else:
+                target = None
+
+            extra = {}
+            if target is not None and key in open_items:
+                amount = payment.amount or ZERO
+                total_due = open_items[key].total_due
+                total_paid = open_items[key].total_paid
+                if total_due > 0 and total_paid > total_due:
+                    batch.result(
+                        "payment",
+                        payment_id,
+                        "rejected",
+                        error="Payment exceeds open balance",
+                        total_due=f"{total_due}",
+                        previously_paid=f"{total_paid - amount}",
+                    )
+                    continue
+                extra["open_balance"] = (
+                    f"{total_due - total_paid}" if total_due > 0 else None
+                )
+                extra["settled"] = batch.settle(target, total_due, total_paid)
+
+            batch.stage(
+                "payment",
+                payment,
+                payment_posting_description(payment_id),
+                batch.accounts["1000"],
+                batch.accounts["1100"],
+                payment.amount or ZERO,
+                **extra,
+            )
+
+    def _stage_work_orders(self, batch, work_order_ids):
+        if not work_order_ids:
+            return
+        work_orders = (
+            WorkOrder.objects.select_related("project")
+            .prefetch_related("line_items__warehouse_item")
+            .in_bulk(work_order_ids)
+        )
+        for work_order_id in work_order_ids:
+            work_order = work_orders.get(work_order_id)
+            if work_order is None:
+                batch.result("work_order", work_order_id, "not_found")
+                continue
+            if ("work_order", work_order_id) in batch.already_posted:
+                batch.result("work_order", work_order_id, "already_posted")
+                continue
+
+            # Inventory consumption keeps its per-order validation; a shortfall
+            # only rolls back this order's savepoint
+            try:
+                with transaction.atomic():
+                    work_order.adjust_inventory()
+            except Exception as exc:
+                batch.result("work_order", work_order_id, "error", error=str(exc))
+                continue
+
+            total_cost = ZERO
+            for li in work_order.line_items.all():
+                wi = li.warehouse_item
+                if wi and wi.item_type in ["part", "equipment", "consumable"]:
+                    total_cost += (li.quantity or 0) * (wi.unit_cost or 0)
+            if not total_cost:
+                batch.result("work_order", work_order_id, "no_consumption")
+                continue
+
+            batch.stage(
+                "work_order",
+                work_order,
+                work_order_posting_description(work_order_id),
+                batch.accounts["5000"],
+                batch.accounts["1200"],
+                total_cost,
+            )
+
+
+class _Batch:
+    """Accumulates staged journal entries and side effects for one post_batch call"""
+
+    def __init__(self, day, accounts, already_posted):
+        self.day = day
+        self.accounts = accounts
+        self.already_posted = already_posted
+        self.results: List[Dict] = []
+        self.entries: List[JournalEntry] = []
+        self._sources: List = []
+        self._invoices_paid: List = []
+        self._wo_invoices_paid: List = []
+
+    def result(self, item_type, item_id, status, **extra):
+        row = {"type": item_type, "id": item_id, "status": status, **extra}
+        self.results.append(row)
+        return row
+
+    def stage(self, item_type, source, description, debit, credit, amount, **extra):
+        entry = JournalEntry(
+            date=self.day,
+            description=description,
+            debit_account=debit,
+            credit_account=credit,
+            amount=amount,
+            # bulk_create skips JournalEntry.save, which normally sets this
+            amount_minor=to_minor(amount),
+            **posting_key(item_type, source.id),
+        )
+        row = self.result(item_type, source.id, "posted", amount=f"{amount}", **extra)
+        self.entries.append(entry)
+        self._sources.append((item_type, source, entry, row))
+
+    def settle(self, target, total_due, total_paid):
+        """Record the paid flag a payment leaves on its target; returns the status."""
+        if isinstance(target, Invoice):
+            if total_due <= 0:
+                return "posted"
+            target.paid = total_paid == total_due
+            target.updated_at = timezone.now()
+            self._invoices_paid.append(target)
+            return "paid" if target.paid else "partial"
+        if total_paid == total_due:
+            target.is_paid = True
+            target.paid_date = self.day
+            self._wo_invoices_paid.append(target)
+            return "paid"
+        return "partial"
+
+    def write(self, user):
+        """Persist staged entries, posting markers, paid flags and audit rows."""
+        if not self.entries:
+            return
+        JournalEntry.objects.bulk_create(self.entries)
+        # bulk_create skips post_save, so apply the batch to daily balances directly
+        get_ledger_service().record_entries(self.entries)
+
+        now = timezone.now()
+        posted_invoices = []
+        logs = []
+        content_types = {}
+        for item_type, source, entry, row in self._sources:
+            row["journal_entry_id"] = entry.id
+            if item_type == "invoice":
+                source.posted_journal = entry
+                source.posted_at = now
+                source.updated_at = now
+                posted_invoices.append(source)
+            model = type(source)
+            if model not in content_types:
+                content_types[model] = ContentType.objects.get_for_model(model)
+            logs.append(
+                ActivityLog(
+                    user=user,
+                    action="complete" if item_type == "work_order" else "update",
+                    content_type=content_types[model],
+                    object_id=source.id,
+                    description=f"Bulk posted {entry.description} amount {entry.amount}",
+                )
+            )
+
+        if posted_invoices:
+            Invoice.objects.bulk_update(
+                posted_invoices, ["posted_journal", "posted_at", "updated_at"]
+            )
+        if self._invoices_paid:
+            Invoice.objects.bulk_update(self._invoices_paid, ["paid", "updated_at"])
+        if self._wo_invoices_paid:
+            WorkOrderInvoice.objects.bulk_update(
+                self._wo_invoices_paid, ["is_paid", "paid_date"]
+            )
+        ActivityLog.objects.bulk_create(logs)
+
+    def summary(self):
+        counts = defaultdict(int)
+        for row in self.results:
+            counts[row["status"]] += 1
+        return dict(counts)
+
+
+def _unique_ints(ids) -> List[int]:
+    """Deduplicate ids while keeping request order."""
+    seen = {}
+    for value in ids or ():
+        seen.setdefault(int(value), None)
+    return list(seen)
+
+
+def _posted_sources(ids_by_type) -> set:
+    """(source_type, source_id) pairs that already have a posting, in one query."""
+    condition = Q()
+    for source_type, ids in ids_by_type.items():
+        if ids:
+            condition |= Q(
+                source_type=source_type,
+                posting_kind=POSTING_KINDS[source_type],
+                source_id__in=ids,
+            )
+    if not condition:
+        return set()
+    return set(
+        JournalEntry.objects.filter(condition).values_list("source_type", "source_id")
+    )
+
+
+# Singleton instance - created on first use
+posting_service: Optional[PostingService] = None
+
+
+def get_posting_service():
+    """Get posting service singleton, creating it if needed"""
+    global posting_service
+    if posting_service is None:
+        posting_service = PostingService()
+    return posting_service
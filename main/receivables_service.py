@@ -0,0 +1,315 @@
+"""
+Receivables open-item service for Converge CRM.
+Keeps one ReceivableOpenItem per Invoice / WorkOrderInvoice with its total
+due, total paid and open balance, refreshed from signals whenever invoice
+items, invoices or payments change. Allocation and AR reports read these rows
+instead of summing line items and payments on every request.
+"""
+
+import logging
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+
+from .models import Invoice, InvoiceItem, Payment, ReceivableOpenItem, WorkOrderInvoice
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal("0.00")
+
+# Models that carry a receivable balance
+RECEIVABLE_MODELS = (Invoice, WorkOrderInvoice)
+
+# AR aging buckets as (name, min days overdue, max days overdue or None)
+AGING_BUCKETS = (
+    ("current", None, 0),
+    ("days_1_30", 1, 30),
+    ("days_31_60", 31, 60),
+    ("days_61_90", 61, 90),
+    ("days_over_90", 91, None),
+)
+
+
+class ReceivablesService:
+    """Service for maintaining and reading receivable open items"""
+
+    def refresh(self, target) -> Optional[ReceivableOpenItem]:
+        """
+        Recompute the open item for an Invoice or WorkOrderInvoice.
+
+        Args:
+            target: Invoice or WorkOrderInvoice instance
+
+        Returns:
+            The updated ReceivableOpenItem, or None if the target is gone
+        """
+        return self.refresh_for(type(target), target.pk)
+
+    def refresh_for(self, model, object_id) -> Optional[ReceivableOpenItem]:
+        """Recompute the open item for one receivable by model class and id."""
+        content_type = ContentType.objects.get_for_model(model)
+        if model is Invoice:
+            header = (
+                Invoice.objects.filter(pk=object_id)
+                .values(
+                    "due_date",
+                    issue_date=TruncDate("created_at"),
+                    account_id=F("deal__account_id"),
+                )
+                .first()
+            )
+        else:
+            header = (
+                WorkOrderInvoice.objects.filter(pk=object_id)
+                .values(
+                    "due_date",
+                    "total_amount",
+                    issue_date=F("issued_date"),
+                    account_id=F("work_order__project__account_id"),
+                )
+                .first()
+            )
+            total_due = (header or {}).get("total_amount") or ZERO
+
+        with transaction.atomic():
+            if header is None:
+                ReceivableOpenItem.objects.filter(
+                    content_type=content_type, object_id=object_id
+                ).delete()
+                return None
+            # Lock the open item before reading payments, so concurrent
+            # refreshes of one receivable apply in turn instead of
+            # overwriting each other's totals
+            item, _ = ReceivableOpenItem.objects.get_or_create(
+                content_type=content_type,
+                object_id=object_id,
+                defaults={"due_date": header["due_date"]},
+            )
+            item = ReceivableOpenItem.objects.select_for_update().get(pk=item.pk)
+            if model is Invoice:
+                total_due = _invoice_totals([object_id]).get(object_id, ZERO)
+            total_paid = (
+                Payment.objects.filter(content_type=content_type, object_id=object_id)
+                .aggregate(total=Sum("amount"))
+                .get("total")
+                or ZERO
+            )
+            item.account_id = header["account_id"]
+            item.issue_date = header["issue_date"]
+            item.due_date = header["due_date"]
+            item.total_due = total_due
+            item.total_paid = total_paid
+            item.open_balance = total_due - total_paid
+            item.save()
+        return item
+
+    def sync_account(self, model, object_ids, account_id) -> int:
+        """
+        Point the open items of some receivables at their current customer
+        account, after a deal, project or work order is re-assigned.
+
+        Args:
+            model: Invoice or WorkOrderInvoice
+            object_ids: Receivable ids (a list or a values("id") queryset)
+            account_id: The account those receivables now belong to
+
+        Returns:
+            Number of open items updated
+        """
+        return (
+            ReceivableOpenItem.objects.filter(
+                content_type=ContentType.objects.get_for_model(model),
+                object_id__in=object_ids,
+            )
+            .exclude(account_id=account_id)
+            .update(account_id=account_id)
+        )
+
+    def remove(self, target) -> None:
+        """Drop the open item of a deleted receivable."""
+        ReceivableOpenItem.objects.filter(
+            content_type=ContentType.objects.get_for_model(type(target)),
+            object_id=target.pk,
+        ).delete()
+
+    def open_item(self, target) -> Optional[ReceivableOpenItem]:
+        """Indexed lookup of one open item, building it if it is missing."""
+        item = ReceivableOpenItem.objects.filter(
+            content_type=ContentType.objects.get_for_model(type(target)),
+            object_id=target.pk,
+        ).first()
+        return item or self.refresh(target)
+
+    def open_items(
+        self, model, object_ids: Iterable[int]
+    ) -> Dict[int, ReceivableOpenItem]:
+        """
+        Open items for many receivables of one model in a single query.
+
+        Returns:
+            Dict of object_id -> ReceivableOpenItem (ids without a receivable
+            are omitted)
+        """
+        object_ids = list(object_ids)
+        if not object_ids:
+            return {}
+        content_type = ContentType.objects.get_for_model(model)
+        items = {
+            item.object_id: item
+            for item in ReceivableOpenItem.objects.filter(
+                content_type=content_type, object_id__in=object_ids
+            )
+        }
+        for object_id in object_ids:
+            if object_id not in items:
+                item = self.refresh_for(model, object_id)
+                if item is not None:
+                    items[object_id] = item
+        return items
+
+    def aging_by_account(self, as_of_date):
+        """
+        AR aging per customer account as one grouped query.
+
+        Each row holds account_id, account_name, invoice_count, total and one
+        open-balance sum per AGING_BUCKETS name, ordered by account name. The
+        queryset is lazy, so callers can paginate it in the database.
+
+        Balances are the current open balances: as_of_date sets the bucket
+        cut-offs and leaves out receivables issued after it, but payments
+        made since are not added back.
+        """
+        return (
+            _open_receivables(as_of_date)
+            .values("account_id")
+            .annotate(account_name=F("account__name"), **_aging_aggregates(as_of_date))
+            .order_by("account_name", "account_id")
+        )
+
+    def aging_totals(self, as_of_date) -> Dict[str, Decimal]:
+        """Bucket totals across all accounts, matching aging_by_account rows."""
+        return _open_receivables(as_of_date).aggregate(**_aging_aggregates(as_of_date))
+
+    def rebuild(self) -> Tuple[int, int]:
+        """
+        Recreate every open item from invoices, items and payments.
+
+        Returns:
+            (number of Invoice items, number of WorkOrderInvoice items)
+        """
+        with transaction.atomic():
+            ReceivableOpenItem.objects.all().delete()
+            counts = []
+            for model in RECEIVABLE_MODELS:
+                rows = build_open_items(model)
+                ReceivableOpenItem.objects.bulk_create(rows, batch_size=1000)
+                counts.append(len(rows))
+        logger.info("Rebuilt receivable open items: %s", counts)
+        return tuple(counts)
+
+
+def _open_receivables(as_of_date):
+    return ReceivableOpenItem.objects.exclude(open_balance=0).exclude(
+        issue_date__gt=as_of_date
+    )
+
+
+def _aging_aggregates(as_of_date):
+    """Conditional sums of open_balance per aging bucket, keyed by bucket name."""
+    money = DecimalField(max_digits=14, decimal_places=2)
+    aggregates = {
+        "invoice_count": Count("id"),
+        "total": Coalesce(Sum("open_balance"), ZERO, output_field=money),
+    }
+    for name, min_days, max_days in AGING_BUCKETS:
+        # Compare due dates to fixed cut-offs so the filter stays index friendly
+        condition = Q()
+        if min_days is not None:
+            condition &= Q(due_date__lte=as_of_date - timedelta(days=min_days))
+        if max_days is not None:
+            condition &= Q(due_date__gte=as_of_date - timedelta(days=max_days))
+        aggregates[name] = Coalesce(
+            Sum("open_balance", filter=condition), ZERO, output_field=money
+        )
+    return aggregates
+
+
+def build_open_items(model):
+    """Unsaved ReceivableOpenItem rows for every receivable of one model."""
+    content_type = ContentType.objects.get_for_model(model)
+    paid = dict(
+        Payment.objects.filter(content_type=content_type)
+        .order_by()
+        .values("object_id")
+        .annotate(total=Sum("amount"))
+        .values_list("object_id", "total")
+    )
+    if model is Invoice:
+        headers = Invoice.objects.values_list(
+            "id", TruncDate("created_at"), "due_date", "deal__account_id"
+        )
+        totals = _invoice_totals(None)
+    else:
+        headers = WorkOrderInvoice.objects.values_list(
+            "id", "issued_date", "due_date", "work_order__project__account_id"
+        )
+        totals = dict(WorkOrderInvoice.objects.values_list("id", "total_amount"))
+
+    rows = []
+    for object_id, issue_date, due_date, account_id in headers.iterator(
+        chunk_size=2000
+    ):
+        total_due = totals.get(object_id) or ZERO
+        total_paid = paid.get(object_id) or ZERO
+        rows.append(
+            ReceivableOpenItem(
+                content_type=content_type,
+                object_id=object_id,
+                account_id=account_id,
+                issue_date=issue_date,
+                due_date=due_date,
+                total_due=total_due,
+                total_paid=total_paid,
+                open_balance=total_due - total_paid,
+            )
+        )
+    return rows
+
+
+def _invoice_totals(invoice_ids) -> Dict[int, Decimal]:
+    """Sum quantity * unit_price per invoice (all invoices when ids is None)."""
+    qs = InvoiceItem.objects.all()
+    if invoice_ids is not None:
+        qs = qs.filter(invoice_id__in=invoice_ids)
+    line_total = ExpressionWrapper(
+        F("quantity") * F("unit_price"),
+        output_field=DecimalField(max_digits=16, decimal_places=2),
+    )
+    rows = qs.order_by().values("invoice_id").annotate(total=Sum(line_total))
+    return {row["invoice_id"]: row["total"] or ZERO for row in rows}
+
+
+def refresh_payment_targets(targets) -> None:
+    """Refresh the open items of (content_type_id, object_id) payment targets."""
+    service = get_receivables_service()
+    for content_type_id, object_id in targets:
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        if model in RECEIVABLE_MODELS:
+            service.refresh_for(model, object_id)
+
+
+# Singleton instance - created on first use
+receivables_service: Optional[ReceivablesService] = None
+
+
+def get_receivables_service():
+    """Get receivables service singleton, creating it if needed"""
+    global receivables_service
+    if receivables_service is None:
+        receivables_service = ReceivablesService()
+    return receivables_service
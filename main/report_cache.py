@@ -0,0 +1,95 @@
+"""
+Report response cache for Converge CRM financial reports.
+Cached bodies are keyed by report type, parameters and a ledger version
+counter. Writes to journal entries, invoices, expenses and work order invoices
+bump the counter, so stale entries are never read again and simply expire.
+The same key doubles as the response ETag for If-None-Match.
+"""
+
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+LEDGER_VERSION_KEY = "reports:ledger_version"
+
+# Seconds a cached report body lives; bounds staleness on per-process caches
+DEFAULT_REPORT_CACHE_TIMEOUT = 300
+
+
+def get_ledger_version() -> int:
+    """Current ledger version, seeded from the clock if the cache was cleared."""
+    version = cache.get(LEDGER_VERSION_KEY)
+    if version is None:
+        # Seeding from the clock keeps versions moving forward after a cache flush
+        cache.add(LEDGER_VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(LEDGER_VERSION_KEY)
+    return version
+
+
+def bump_ledger_version() -> None:
+    """
+    Invalidate every cached report.
+
+    Bumps immediately, so the writer's own reads are fresh, and again on
+    commit, so a report cached from pre-commit data in between is never served.
+    """
+    _increment_version()
+    transaction.on_commit(_increment_version)
+
+
+def _increment_version():
+    try:
+        cache.incr(LEDGER_VERSION_KEY)
+    except ValueError:
+        get_ledger_version()
+        cache.incr(LEDGER_VERSION_KEY)
+
+
+def report_cache_key(report_type: str, params: dict) -> str:
+    """Cache key for one report type and parameter set at the current version."""
+    digest = hashlib.sha1(
+        json.dumps(params, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return f"reports:{report_type}:{get_ledger_version()}:{digest}"
+
+
+def cached_report_response(request, report_type: str, params: dict, build):
+    """
+    Serve a report from cache with ETag validation.
+
+    Args:
+        request: DRF request (If-None-Match is honoured)
+        report_type: Name distinguishing the report in the cache key
+        params: Resolved report parameters; today's date is added so reports
+            with date defaults roll over at midnight
+        build: Zero-argument callable producing the report data on a miss
+
+    Returns:
+        Response with the report body, or an empty 304 when the client's ETag
+        is still current
+    """
+    params = dict(params, _today=timezone.now().date())
+    key = report_cache_key(report_type, params)
+    etag = '"%s"' % hashlib.sha1(key.encode()).hexdigest()
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if_none_match = request.headers.get("If-None-Match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(
+            key,
+            data,
+            getattr(settings, "REPORT_CACHE_TIMEOUT", DEFAULT_REPORT_CACHE_TIMEOUT),
+        )
+    return Response(data, headers=headers)
@@ -1,11 +1,101 @@
-from django.db.models import Q
+from collections import defaultdict
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.db.models import (
+    Case,
+    CharField,
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    Q,
+    Sum,
+    When,
+)
+from django.db.models.functions import ExtractQuarter, ExtractYear
 from django.utils import timezone
 
-from .models import JournalEntry, LedgerAccount
+from .ledger_service import ZERO, get_ledger_service
+from .models import Expense, InvoiceItem, JournalEntry, LedgerAccount, WorkOrderInvoice
+
+# Cash-flow activity by the account type on the other side of a cash posting
+CASH_FLOW_ACTIVITY = {
+    "revenue": "operating",
+    "expense": "operating",
+    "asset": "investing",
+    "liability": "financing",
+    "equity": "financing",
+}
+
+
+def _section(balances, account_type):
+    """Select one account type as {code: {"name", "balance"}} plus its total."""
+    accounts = {
+        code: {"name": row["name"], "balance": row["balance"]}
+        for code, row in sorted(balances.items())
+        if row["account_type"] == account_type
+    }
+    total = sum((row["balance"] for row in accounts.values()), ZERO)
+    return accounts, total
+
+
+def _rate(value):
+    """Settings rates may be floats; keep report arithmetic in Decimal."""
+    return Decimal(str(value))
+
+
+def _money(value):
+    return value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def _tax_summary(bucket, sales_tax_rate, tax_rate):
+    """Format one year or quarter bucket of the tax report."""
+    contractors = sorted(
+        (
+            {
+                "id": user_id,
+                "name": f"{first} {last}".strip(),
+                "tax_id": None,
+                "total_payments": total,
+            }
+            for (user_id, first, last), total in bucket["contractors"].items()
+        ),
+        key=lambda row: row["total_payments"],
+        reverse=True,
+    )
+    expenses = sorted(
+        (
+            {"category": category, "total": total}
+            for category, total in bucket["expenses"].items()
+        ),
+        key=lambda row: row["total"],
+        reverse=True,
+    )
+    total_sales = bucket["sales"]
+    total_expenses = sum(bucket["expenses"].values(), ZERO)
+    net_income = total_sales - total_expenses
+    return {
+        "contractorPayments": contractors,
+        "salesTax": {
+            "total_sales": total_sales,
+            "tax_collected": _money(total_sales * sales_tax_rate),
+            "tax_rate": sales_tax_rate,
+        },
+        "expensesByCategory": expenses,
+        "totalExpenses": total_expenses,
+        "totalRevenue": total_sales,
+        "netIncome": net_income,
+        "estimatedTax": _money(max(ZERO, net_income * tax_rate)),
+    }
 
 
 class FinancialReports:
-    """Financial reporting utilities for Converge CRM"""
+    """Financial reporting utilities for Converge CRM
+
+    Reports are computed with grouped database aggregates and return plain
+    dicts keyed by LedgerAccount.code, so query count does not grow with the
+    number of journal entries in the requested range.
+    """
 
     @staticmethod
     def get_balance_sheet(as_of_date=None):
@@ -16,56 +106,22 @@ class FinancialReports:
         if as_of_date is None:
             as_of_date = timezone.now().date()
 
-        # Get all journal entries up to the specified date
-        entries = JournalEntry.objects.filter(date__lte=as_of_date)
-
-        # Calculate account balances
-        account_balances = {}
-        for entry in entries:
-            # Debit increases assets/expenses, credit increases liabilities/equity/revenue
-            if entry.debit_account.account_type in ["asset", "expense"]:
-                account_balances[entry.debit_account] = (
-                    account_balances.get(entry.debit_account, 0) + entry.amount
-                )
-            else:
-                account_balances[entry.debit_account] = (
-                    account_balances.get(entry.debit_account, 0) - entry.amount
-                )
-
-            if entry.credit_account.account_type in ["liability", "equity", "revenue"]:
-                account_balances[entry.credit_account] = (
-                    account_balances.get(entry.credit_account, 0) + entry.amount
-                )
-            else:
-                account_balances[entry.credit_account] = (
-                    account_balances.get(entry.credit_account, 0) - entry.amount
-                )
-
-        # Organize by account type
-        assets = {
-            acc: bal
-            for acc, bal in account_balances.items()
-            if acc.account_type == "asset"
-        }
-        liabilities = {
-            acc: bal
-            for acc, bal in account_balances.items()
-            if acc.account_type == "liability"
-        }
-        equity = {
-            acc: bal
-            for acc, bal in account_balances.items()
-            if acc.account_type == "equity"
-        }
+        # Per-account totals come from the materialized daily balance table
+        balances = get_ledger_service().account_balances(
+            end_date=as_of_date, account_types=["asset", "liability", "equity"]
+        )
+        assets, total_assets = _section(balances, "asset")
+        liabilities, total_liabilities = _section(balances, "liability")
+        equity, total_equity = _section(balances, "equity")
 
         return {
             "as_of_date": as_of_date,
             "assets": assets,
             "liabilities": liabilities,
             "equity": equity,
-            "total_assets": sum(assets.values()),
-            "total_liabilities": sum(liabilities.values()),
-            "total_equity": sum(equity.values()),
+            "total_assets": total_assets,
+            "total_liabilities": total_liabilities,
+            "total_equity": total_equity,
         }
 
     @staticmethod
@@ -80,44 +136,21 @@ class FinancialReports:
         if end_date is None:
             end_date = timezone.now().date()
 
-        # Get journal entries for the period
-        entries = JournalEntry.objects.filter(date__range=[start_date, end_date])
-
-        # Calculate revenue and expenses
-        revenue_accounts = {}
-        expense_accounts = {}
-
-        for entry in entries:
-            if entry.debit_account.account_type == "revenue":
-                revenue_accounts[entry.debit_account] = (
-                    revenue_accounts.get(entry.debit_account, 0) - entry.amount
-                )
-            elif entry.credit_account.account_type == "revenue":
-                revenue_accounts[entry.credit_account] = (
-                    revenue_accounts.get(entry.credit_account, 0) + entry.amount
-                )
-
-            if entry.debit_account.account_type == "expense":
-                expense_accounts[entry.debit_account] = (
-                    expense_accounts.get(entry.debit_account, 0) + entry.amount
-                )
-            elif entry.credit_account.account_type == "expense":
-                expense_accounts[entry.credit_account] = (
-                    expense_accounts.get(entry.credit_account, 0) - entry.amount
-                )
-
-        total_revenue = sum(revenue_accounts.values())
-        total_expenses = sum(expense_accounts.values())
-        net_profit = total_revenue - total_expenses
+        # One grouped aggregate over the materialized daily balance table
+        balances = get_ledger_service().account_balances(
+            start_date, end_date, account_types=["revenue", "expense"]
+        )
+        revenue, total_revenue = _section(balances, "revenue")
+        expenses, total_expenses = _section(balances, "expense")
 
         return {
             "start_date": start_date,
             "end_date": end_date,
-            "revenue": revenue_accounts,
-            "expenses": expense_accounts,
+            "revenue": revenue,
+            "expenses": expenses,
             "total_revenue": total_revenue,
             "total_expenses": total_expenses,
-            "net_profit": net_profit,
+            "net_profit": total_revenue - total_expenses,
         }
 
     @staticmethod
@@ -132,60 +165,196 @@ class FinancialReports:
             end_date = timezone.now().date()
 
         # Get cash account (assuming there's a cash account with code '1000' or similar)
-        try:
-            cash_account = LedgerAccount.objects.get(
-                code="1000"
-            )  # Assuming cash account code
-        except LedgerAccount.DoesNotExist:
+        cash_account = (
+            LedgerAccount.objects.filter(code="1000").first()
             # Fallback: find any asset account that might represent cash
-            cash_account = LedgerAccount.objects.filter(account_type="asset").first()
-            if not cash_account:
-                return {
-                    "start_date": start_date,
-                    "end_date": end_date,
-                    "operating_activities": 0,
-                    "investing_activities": 0,
-                    "financing_activities": 0,
-                    "net_cash_flow": 0,
-                    "error": "No cash account found",
-                }
-
-        # Calculate cash flows from operations (simplified)
-        # In a real implementation, this would be more complex
-        cash_entries = JournalEntry.objects.filter(
-            Q(debit_account=cash_account) | Q(credit_account=cash_account),
-            date__range=[start_date, end_date],
+            or LedgerAccount.objects.filter(account_type="asset").first()
         )
+        if not cash_account:
+            return {
+                "start_date": start_date,
+                "end_date": end_date,
+                "operating_activities": 0,
+                "investing_activities": 0,
+                "financing_activities": 0,
+                "net_cash_flow": 0,
+                "error": "No cash account found",
+            }
 
-        operating_cash_flow = 0
-        investing_cash_flow = 0
-        financing_cash_flow = 0
-
-        for entry in cash_entries:
-            if entry.debit_account == cash_account:
-                # Cash inflow
-                if entry.credit_account.account_type in ["revenue", "expense"]:
-                    operating_cash_flow += entry.amount
-                elif entry.credit_account.account_type == "asset":
-                    investing_cash_flow += entry.amount
-                else:
-                    financing_cash_flow += entry.amount
-            else:
-                # Cash outflow
-                if entry.debit_account.account_type in ["revenue", "expense"]:
-                    operating_cash_flow -= entry.amount
-                elif entry.debit_account.account_type == "asset":
-                    investing_cash_flow -= entry.amount
-                else:
-                    financing_cash_flow -= entry.amount
-
-        net_cash_flow = operating_cash_flow + investing_cash_flow + financing_cash_flow
+        # Group cash postings by the account on the other side; inflows when
+        # cash is debited, outflows when it is credited
+        is_inflow = Q(debit_account=cash_account)
+        amount_field = DecimalField(max_digits=16, decimal_places=2)
+        rows = (
+            JournalEntry.objects.filter(
+                Q(debit_account=cash_account) | Q(credit_account=cash_account),
+                date__range=[start_date, end_date],
+            )
+            .order_by()
+            .annotate(
+                counter_code=Case(
+                    When(is_inflow, then=F("credit_account__code")),
+                    default=F("debit_account__code"),
+                    output_field=CharField(),
+                ),
+                counter_name=Case(
+                    When(is_inflow, then=F("credit_account__name")),
+                    default=F("debit_account__name"),
+                    output_field=CharField(),
+                ),
+                counter_type=Case(
+                    When(is_inflow, then=F("credit_account__account_type")),
+                    default=F("debit_account__account_type"),
+                    output_field=CharField(),
+                ),
+            )
+            .values("counter_code", "counter_name", "counter_type")
+            .annotate(
+                net=Sum(
+                    Case(
+                        When(is_inflow, then=F("amount")),
+                        default=-F("amount"),
+                        output_field=amount_field,
+                    )
+                )
+            )
+        )
+
+        activities = {
+            "operating": Decimal("0.00"),
+            "investing": Decimal("0.00"),
+            "financing": Decimal("0.00"),
+        }
+        by_account = {}
+        for row in rows:
+            activity = CASH_FLOW_ACTIVITY.get(row["counter_type"], "financing")
+            net = row["net"] or ZERO
+            activities[activity] += net
+            by_account[row["counter_code"]] = {
+                "name": row["counter_name"],
+                "activity": activity,
+                "amount": net,
+            }
 
         return {
             "start_date": start_date,
             "end_date": end_date,
-            "operating_activities": operating_cash_flow,
-            "investing_activities": investing_cash_flow,
-            "financing_activities": financing_cash_flow,
-            "net_cash_flow": net_cash_flow,
+            "cash_account": cash_account.code,
+            "operating_activities": activities["operating"],
+            "investing_activities": activities["investing"],
+            "financing_activities": activities["financing"],
+            "net_cash_flow": sum(activities.values(), ZERO),
+            "by_account": dict(sorted(by_account.items())),
         }
+
+    @staticmethod
+    def get_tax_report(years, quarterly=False):
+        """
+        Generate the tax report for one or more calendar years.
+
+        Contractor payments, sales and approved expenses are each read with one
+        query grouped by year and quarter (three queries in total, whatever the
+        number of years or contractors), then rolled up per year.
+
+        Args:
+            years: Iterable of calendar years
+            quarterly: Also include a per-quarter breakdown for each year
+
+        Returns:
+            List of per-year dicts in ascending year order
+        """
+        years = sorted(set(years))
+        sales_tax_rate = _rate(getattr(settings, "SALES_TAX_RATE", 0.085))
+        tax_rate = _rate(getattr(settings, "TAX_RATE", 0.25))
+
+        def new_bucket():
+            return {
+                "contractors": defaultdict(lambda: ZERO),
+                "sales": ZERO,
+                "expenses": defaultdict(lambda: ZERO),
+            }
+
+        buckets = defaultdict(new_bucket)
+
+        def targets(row):
+            """The year bucket and the quarter bucket a grouped row adds to."""
+            year = row["year"]
+            return buckets[(year, None)], buckets[(year, row["quarter"])]
+
+        # Contractor = the user assigned to the work order's project
+        contractor_rows = (
+            WorkOrderInvoice.objects.filter(
+                work_order__project__assigned_to__isnull=False,
+                is_paid=True,
+                paid_date__year__in=years,
+            )
+            .order_by()
+            .annotate(
+                year=ExtractYear("paid_date"), quarter=ExtractQuarter("paid_date")
+            )
+            .values(
+                "year",
+                "quarter",
+                "work_order__project__assigned_to",
+                "work_order__project__assigned_to__first_name",
+                "work_order__project__assigned_to__last_name",
+            )
+            .annotate(total=Sum("total_amount"))
+        )
+        for row in contractor_rows:
+            key = (
+                row["work_order__project__assigned_to"],
+                row["work_order__project__assigned_to__first_name"] or "",
+                row["work_order__project__assigned_to__last_name"] or "",
+            )
+            for bucket in targets(row):
+                bucket["contractors"][key] += row["total"] or ZERO
+
+        # Invoice totals are the sum of their line items
+        line_total = ExpressionWrapper(
+            F("quantity") * F("unit_price"),
+            output_field=DecimalField(max_digits=16, decimal_places=2),
+        )
+        sales_rows = (
+            InvoiceItem.objects.filter(invoice__created_at__year__in=years)
+            .order_by()
+            .annotate(
+                year=ExtractYear("invoice__created_at"),
+                quarter=ExtractQuarter("invoice__created_at"),
+            )
+            .values("year", "quarter")
+            .annotate(total=Sum(line_total))
+        )
+        for row in sales_rows:
+            for bucket in targets(row):
+                bucket["sales"] += row["total"] or ZERO
+
+        expense_rows = (
+            Expense.objects.filter(date__year__in=years, approved=True)
+            .order_by()
+            .annotate(year=ExtractYear("date"), quarter=ExtractQuarter("date"))
+            .values("year", "quarter", "category")
+            .annotate(total=Sum("amount"))
+        )
+        for row in expense_rows:
+            for bucket in targets(row):
+                bucket["expenses"][row["category"]] += row["total"] or ZERO
+
+        report = []
+        for year in years:
+            summary = {
+                "year": year,
+                **_tax_summary(buckets[(year, None)], sales_tax_rate, tax_rate),
+            }
+            if quarterly:
+                summary["quarters"] = [
+                    {
+                        "quarter": quarter,
+                        **_tax_summary(
+                            buckets[(year, quarter)], sales_tax_rate, tax_rate
+                        ),
+                    }
+                    for quarter in range(1, 5)
+                ]
+            report.append(summary)
+        return report
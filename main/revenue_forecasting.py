@@ -0,0 +1,286 @@
+"""
+Revenue forecasting for Converge CRM.
+Daily revenue (payments received, from MetricDailyRollup) is loaded into a
+NumPy array and projected with one of the RevenueForecast.forecast_method
+choices:
+
+- moving_average: flat forecast at the mean of the last MOVING_AVERAGE_WINDOW days
+- linear_regression: least-squares trend line over the history
+- seasonal_arima: linear trend plus day-of-week seasonal offsets (a seasonal
+  decomposition; no ARIMA library is required)
+
+A period forecast is the sum of its daily forecasts. The confidence interval
+assumes independent daily residuals, so its half-width is
+z * residual std * sqrt(horizon days). Every forecast is backtested with
+rolling origins over the history and the accuracy is stored in its factors.
+generate_forecasts persists one RevenueForecast per period and method and
+runs as a nightly task, so the forecast endpoint only reads rows.
+"""
+
+import logging
+import math
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Min
+from django.utils import timezone
+
+from .models import MetricDailyRollup, RevenueForecast
+from .rollup_service import get_rollup_service
+
+try:
+    import numpy as np
+except ImportError:  # Optional: forecasts cannot be computed without NumPy
+    np = None
+
+logger = logging.getLogger(__name__)
+
+REVENUE_METRIC = "payments_received"
+
+# forecast_period -> days forecast
+HORIZON_DAYS = {"monthly": 30, "quarterly": 91, "annual": 365}
+
+METHODS = ("linear_regression", "moving_average", "seasonal_arima")
+
+MOVING_AVERAGE_WINDOW = 28
+SEASON_DAYS = 7
+
+# Two-sided 95% normal quantile
+CONFIDENCE_Z = 1.96
+
+# Days of history used unless REVENUE_FORECAST_HISTORY_DAYS says otherwise
+DEFAULT_HISTORY_DAYS = 730
+
+# Fewest history days a forecast is made from
+MIN_HISTORY_DAYS = 2 * MOVING_AVERAGE_WINDOW
+
+# Rolling-origin backtest folds per forecast
+DEFAULT_BACKTEST_FOLDS = 4
+
+
+class ForecastUnavailable(Exception):
+    """A forecast cannot be computed (no NumPy, or too little history)."""
+
+
+def _require_numpy():
+    if np is None:
+        raise ForecastUnavailable("Revenue forecasting requires numpy")
+
+
+def revenue_history(end: Optional[date] = None) -> Tuple[date, "np.ndarray"]:
+    """
+    Daily revenue up to end (yesterday by default, as today is incomplete).
+
+    Returns:
+        Tuple of (first day, array of daily amounts), starting at the first
+        day with revenue or REVENUE_FORECAST_HISTORY_DAYS before end
+
+    Raises:
+        ForecastUnavailable: Without NumPy or revenue history
+    """
+    _require_numpy()
+    end = end or timezone.now().date() - timedelta(days=1)
+    history_days = getattr(
+        settings, "REVENUE_FORECAST_HISTORY_DAYS", DEFAULT_HISTORY_DAYS
+    )
+    first = MetricDailyRollup.objects.filter(
+        metric=REVENUE_METRIC, dimension="all", count__gt=0, date__lte=end
+    ).aggregate(first=Min("date"))["first"]
+    if first is None:
+        raise ForecastUnavailable("No revenue history to forecast from")
+    start = max(first, end - timedelta(days=history_days - 1))
+    series = get_rollup_service().series([REVENUE_METRIC], start, end)
+    values = series[0]["points"] if series else []
+    return start, np.array([float(point["amount"]) for point in values])
+
+
+def fit_moving_average(y, horizon: int):
+    """Flat forecast at the trailing mean; residuals are one-step errors."""
+    window = min(MOVING_AVERAGE_WINDOW, len(y))
+    forecast = np.full(horizon, y[-window:].mean())
+    means = np.convolve(y, np.ones(window) / window, mode="valid")[:-1]
+    residuals = y[window:] - means
+    return forecast, residuals, {"window": window}
+
+
+def fit_linear_regression(y, horizon: int):
+    """Least-squares trend line extended over the horizon."""
+    t = np.arange(len(y))
+    slope, intercept = np.polyfit(t, y, 1)
+    future = np.arange(len(y), len(y) + horizon)
+    residuals = y - (slope * t + intercept)
+    return (
+        slope * future + intercept,
+        residuals,
+        {"slope_per_day": float(slope), "intercept": float(intercept)},
+    )
+
+
+def fit_seasonal(y, horizon: int, start: Optional[date] = None):
+    """Linear trend plus centred day-of-week offsets of the detrended series."""
+    t = np.arange(len(y))
+    slope, intercept = np.polyfit(t, y, 1)
+    detrended = y - (slope * t + intercept)
+    phase = t % SEASON_DAYS
+    offsets = np.array(
+        [
+            detrended[phase == p].mean() if (phase == p).any() else 0.0
+            for p in range(SEASON_DAYS)
+        ]
+    )
+    offsets -= offsets.mean()
+    future = np.arange(len(y), len(y) + horizon)
+    forecast = slope * future + intercept + offsets[future % SEASON_DAYS]
+    residuals = detrended - offsets[phase]
+    parameters = {"slope_per_day": float(slope), "intercept": float(intercept)}
+    if start is not None:
+        parameters["weekday_offsets"] = {
+            (start + timedelta(days=p)).strftime("%A"): round(float(offsets[p]), 2)
+            for p in range(SEASON_DAYS)
+        }
+    return forecast, residuals, parameters
+
+
+def fit(method: str, y, horizon: int, start: Optional[date] = None):
+    """
+    Fit one method and forecast `horizon` days.
+
+    Returns:
+        Tuple of (daily forecast array, in-sample residual array, parameters)
+
+    Raises:
+        ValueError: If the method is unknown
+    """
+    if method == "moving_average":
+        return fit_moving_average(y, horizon)
+    if method == "linear_regression":
+        return fit_linear_regression(y, horizon)
+    if method == "seasonal_arima":
+        return fit_seasonal(y, horizon, start)
+    raise ValueError(f"Unknown forecast method '{method}'")
+
+
+def period_forecast(method: str, y, horizon: int, start: Optional[date] = None):
+    """
+    Total revenue over the horizon with a confidence interval.
+
+    Returns:
+        Dict with predicted, lower, upper, residual_std and parameters
+    """
+    daily, residuals, parameters = fit(method, y, horizon, start)
+    predicted = max(0.0, float(np.clip(daily, 0, None).sum()))
+    residual_std = float(residuals.std(ddof=1)) if len(residuals) > 1 else 0.0
+    half_width = CONFIDENCE_Z * residual_std * math.sqrt(horizon)
+    return {
+        "predicted": predicted,
+        "lower": max(0.0, predicted - half_width),
+        "upper": predicted + half_width,
+        "residual_std": residual_std,
+        "parameters": parameters,
+    }
+
+
+def backtest(method: str, y, horizon: int, folds: int = DEFAULT_BACKTEST_FOLDS) -> Dict:
+    """
+    Rolling-origin backtest: forecast each of the last `folds` horizons from
+    the history before it and compare with what was actually received.
+
+    Returns:
+        Dict with folds, mae, mape (None when actuals were zero), bias and
+        interval_coverage; empty when the history is too short
+    """
+    errors, percentage_errors, covered = [], [], 0
+    for fold in range(folds, 0, -1):
+        origin = len(y) - fold * horizon
+        if origin < MIN_HISTORY_DAYS:
+            continue
+        actual = float(y[origin : origin + horizon].sum())
+        result = period_forecast(method, y[:origin], horizon)
+        errors.append(result["predicted"] - actual)
+        if actual:
+            percentage_errors.append(abs(result["predicted"] - actual) / actual)
+        covered += int(result["lower"] <= actual <= result["upper"])
+    if not errors:
+        return {}
+    errors = np.array(errors)
+    return {
+        "folds": len(errors),
+        "mae": round(float(np.abs(errors).mean()), 2),
+        "mape": round(float(np.mean(percentage_errors)) * 100, 2)
+        if percentage_errors
+        else None,
+        "bias": round(float(errors.mean()), 2),
+        "interval_coverage": round(covered / len(errors), 2),
+    }
+
+
+def _money(value: float) -> Decimal:
+    return Decimal(str(round(value, 2)))
+
+
+def generate_forecasts(
+    methods: Iterable[str] = METHODS,
+    periods: Iterable[str] = HORIZON_DAYS,
+    today: Optional[date] = None,
+) -> List[RevenueForecast]:
+    """
+    Compute and persist RevenueForecast rows dated today, one per method and
+    period (replacing any made earlier the same day).
+
+    Returns:
+        The saved RevenueForecast rows
+
+    Raises:
+        ForecastUnavailable: Without NumPy or with too little history
+        ValueError: If a method or period is unknown
+    """
+    today = today or timezone.now().date()
+    start, y = revenue_history(today - timedelta(days=1))
+    if len(y) < MIN_HISTORY_DAYS:
+        raise ForecastUnavailable(
+            f"Forecasts need {MIN_HISTORY_DAYS} days of revenue history; "
+            f"found {len(y)}"
+        )
+
+    rows = []
+    for period in periods:
+        if period not in HORIZON_DAYS:
+            raise ValueError(f"Unknown forecast period '{period}'")
+        horizon = HORIZON_DAYS[period]
+        for method in methods:
+            result = period_forecast(method, y, horizon, start)
+            rows.append(
+                RevenueForecast(
+                    forecast_date=today,
+                    forecast_period=period,
+                    predicted_revenue=_money(result["predicted"]),
+                    confidence_interval_lower=_money(result["lower"]),
+                    confidence_interval_upper=_money(result["upper"]),
+                    forecast_method=method,
+                    factors={
+                        "metric": REVENUE_METRIC,
+                        "history_start": start.isoformat(),
+                        "history_days": len(y),
+                        "horizon_days": horizon,
+                        "confidence_level": 0.95,
+                        "residual_std": round(result["residual_std"], 2),
+                        "parameters": result["parameters"],
+                        "backtest": backtest(method, y, horizon),
+                    },
+                )
+            )
+    RevenueForecast.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["forecast_date", "forecast_period", "forecast_method"],
+        update_fields=[
+            "predicted_revenue",
+            "confidence_interval_lower",
+            "confidence_interval_upper",
+            "factors",
+        ],
+    )
+    logger.info("Generated %s revenue forecasts for %s", len(rows), today)
+    return rows
@@ -0,0 +1,557 @@
+"""
+Daily metric rollups for Converge CRM analytics trends.
+Every deal, project, payment, work order invoice and expense contributes one
+count (and amount) to each metric it belongs to, on that metric's day, overall
+and per owner, stage and account. Saves and deletes apply the difference
+between the stored and new contributions to MetricDailyRollup, so trend
+queries read one row per day and series instead of the source tables. Writes
+that skip signals (set-based bulk updates) are caught by refresh_changed,
+which recomputes only the days touched by rows changed since its last run,
+plus the days such writers queued with mark_changed before moving rows off
+them.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import (
+    Deal,
+    Expense,
+    MetricDailyRollup,
+    MetricRollupChange,
+    MetricRollupRefresh,
+    Payment,
+    Project,
+    WorkOrderInvoice,
+)
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal("0.00")
+
+DEAL_DIMENSIONS = {"owner": "owner", "stage": "stage", "account": "account"}
+PROJECT_DIMENSIONS = {"owner": "assigned_to", "stage": "status", "account": "account"}
+
+# metric -> source model, row filter, day fields (first non-null wins), amount
+# field and {dimension: source field}; every metric also has the "all" series
+METRICS = {
+    "deals_created": {
+        "model": Deal,
+        "filter": {},
+        "date": ("created_at",),
+        "amount": "value",
+        "dimensions": DEAL_DIMENSIONS,
+    },
+    "deals_won": {
+        "model": Deal,
+        "filter": {"status": "won"},
+        "date": ("close_date", "created_at"),
+        "amount": "value",
+        "dimensions": DEAL_DIMENSIONS,
+    },
+    "deals_lost": {
+        "model": Deal,
+        "filter": {"status": "lost"},
+        "date": ("close_date", "created_at"),
+        "amount": "value",
+        "dimensions": DEAL_DIMENSIONS,
+    },
+    "projects_created": {
+        "model": Project,
+        "filter": {},
+        "date": ("created_at",),
+        "amount": None,
+        "dimensions": PROJECT_DIMENSIONS,
+    },
+    "projects_completed": {
+        "model": Project,
+        "filter": {"status": "completed"},
+        "date": ("completed_at", "created_at"),
+        "amount": None,
+        "dimensions": PROJECT_DIMENSIONS,
+    },
+    "payments_received": {
+        "model": Payment,
+        "filter": {},
+        "date": ("payment_date",),
+        "amount": "amount",
+        "dimensions": {"owner": "received_by"},
+    },
+    "invoices_issued": {
+        "model": WorkOrderInvoice,
+        "filter": {},
+        "date": ("issued_date",),
+        "amount": "total_amount",
+        "dimensions": {},
+    },
+    "expenses_approved": {
+        "model": Expense,
+        "filter": {"approved": True},
+        "date": ("date",),
+        "amount": "amount",
+        "dimensions": {"owner": "submitted_by", "stage": "category"},
+    },
+}
+
+# Series returned by the trends endpoint when no metrics are requested
+DEFAULT_TREND_METRICS = (
+    "deals_created",
+    "deals_won",
+    "projects_completed",
+    "payments_received",
+)
+
+# Hours of changes refresh_changed reads when it has no record of a last run
+DEFAULT_REFRESH_LOOKBACK_HOURS = 26
+
+# (metric, dimension, key, day) -> [count, amount]
+Cells = Dict[Tuple[str, str, str, date], List]
+
+
+def _day(value):
+    """Calendar day of a date or datetime, in the current time zone like TruncDate."""
+    if isinstance(value, datetime):
+        return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+    return value
+
+
+def _key(value) -> str:
+    return "" if value is None else str(value)
+
+
+class RollupService:
+    """Service for maintaining and reading daily metric rollups"""
+
+    def source_fields(self, model) -> List[str]:
+        """Fields of model read by its metrics (for loading a row's stored state)."""
+        fields = set()
+        for spec in METRICS.values():
+            if spec["model"] is model:
+                fields.update(spec["filter"], spec["date"], spec["dimensions"].values())
+                if spec["amount"]:
+                    fields.add(spec["amount"])
+        return sorted(fields)
+
+    def facts(self, instance) -> Cells:
+        """Cells one source row contributes to, with its count and amount."""
+        cells: Cells = {}
+        opts = instance._meta
+        for metric, spec in METRICS.items():
+            if not isinstance(instance, spec["model"]):
+                continue
+            if any(
+                getattr(instance, name) != value
+                for name, value in spec["filter"].items()
+            ):
+                continue
+            days = [getattr(instance, name) for name in spec["date"]]
+            day = next((_day(value) for value in days if value is not None), None)
+            if day is None:
+                continue
+            amount = ZERO
+            if spec["amount"]:
+                amount = Decimal(str(getattr(instance, spec["amount"]) or 0))
+            cells[(metric, "all", "", day)] = [1, amount]
+            for dimension, name in spec["dimensions"].items():
+                value = getattr(instance, opts.get_field(name).attname)
+                cells[(metric, dimension, _key(value), day)] = [1, amount]
+        return cells
+
+    def record_change(self, previous=None, current=None) -> int:
+        """
+        Apply one source row write to the rollups.
+
+        Args:
+            previous: Stored state before the write (None when created)
+            current: State after the write (None when deleted)
+
+        Returns:
+            Number of rollup rows touched
+        """
+        deltas: Cells = defaultdict(lambda: [0, ZERO])
+        for instance, sign in ((previous, -1), (current, 1)):
+            if instance is None:
+                continue
+            for cell, (count, amount) in self.facts(instance).items():
+                deltas[cell][0] += count * sign
+                deltas[cell][1] += amount * sign
+        changed = {cell: delta for cell, delta in deltas.items() if any(delta)}
+        with transaction.atomic():
+            for cell, (count, amount) in changed.items():
+                self._apply_delta(cell, count, amount)
+        return len(changed)
+
+    def _apply_delta(self, cell, count, amount):
+        """Increment one rollup row, creating it for the first contribution."""
+        metric, dimension, key, day = cell
+        changes = {"count": F("count") + count, "amount": F("amount") + amount}
+        rows = MetricDailyRollup.objects.filter(
+            metric=metric, dimension=dimension, key=key, date=day
+        )
+        if rows.update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                MetricDailyRollup.objects.create(
+                    metric=metric,
+                    dimension=dimension,
+                    key=key,
+                    date=day,
+                    count=count,
+                    amount=amount,
+                )
+        except IntegrityError:
+            # A concurrent write created the row first; fall back to increment
+            rows.update(**changes)
+
+    def _day_expression(self, spec):
+        model = spec["model"]
+        parts = [
+            TruncDate(name)
+            if isinstance(model._meta.get_field(name), models.DateTimeField)
+            else F(name)
+            for name in spec["date"]
+        ]
+        if len(parts) == 1:
+            return parts[0]
+        return Coalesce(*parts, output_field=models.DateField())
+
+    def compute(self, metric: str, **day_lookups) -> Cells:
+        """
+        Recompute a metric's cells from its source rows with one grouped query.
+
+        Args:
+            metric: Metric name
+            **day_lookups: Lookups on the metric day, e.g. gte=..., in=[...]
+        """
+        spec = METRICS[metric]
+        dimension_fields = spec["dimensions"]
+        queryset = (
+            spec["model"]
+            .objects.filter(**spec["filter"])
+            .annotate(rollup_day=self._day_expression(spec))
+            .filter(
+                rollup_day__isnull=False,
+                **{
+                    f"rollup_day__{lookup}": value
+                    for lookup, value in day_lookups.items()
+                },
+            )
+            .order_by()
+            .values("rollup_day", *dimension_fields.values())
+            .annotate(
+                rollup_count=Count("pk"),
+                rollup_amount=Sum(spec["amount"])
+                if spec["amount"]
+                else models.Value(ZERO, output_field=models.DecimalField()),
+            )
+        )
+        cells: Cells = defaultdict(lambda: [0, ZERO])
+        for row in queryset:
+            series = [("all", "")] + [
+                (dimension, _key(row[name]))
+                for dimension, name in dimension_fields.items()
+            ]
+            for dimension, key in series:
+                cell = cells[(metric, dimension, key, row["rollup_day"])]
+                cell[0] += row["rollup_count"]
+                cell[1] += row["rollup_amount"] or ZERO
+        return cells
+
+    def rebuild(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        metrics: Optional[Iterable[str]] = None,
+        batch_size: int = 1000,
+    ) -> int:
+        """
+        Replace rollups for a date range (all history by default) with a
+        recomputation from the source tables.
+
+        Returns:
+            Number of rollup rows written
+        """
+        day_lookups = {}
+        if start:
+            day_lookups["gte"] = start
+        if end:
+            day_lookups["lte"] = end
+        written = 0
+        for metric in metrics or METRICS:
+            written += self._replace(metric, day_lookups, batch_size)
+        logger.info("Rebuilt %s metric rollup rows", written)
+        return written
+
+    def mark_changed(self, queryset) -> int:
+        """
+        Queue the days the rows of queryset contribute to for refresh_changed.
+
+        Call before changing the rows with QuerySet.update(), which skips the
+        rollup signals: refresh_changed finds the days rows move to from their
+        updated_at, but only this record keeps the days they leave.
+
+        Returns:
+            Number of (metric, day) pairs queued
+        """
+        changes = [
+            MetricRollupChange(metric=metric, date=day)
+            for metric, spec in METRICS.items()
+            if spec["model"] is queryset.model
+            for day in self._days(spec, queryset)
+        ]
+        MetricRollupChange.objects.bulk_create(changes)
+        return len(changes)
+
+    def _days(self, spec, queryset):
+        # No row filter: a row that just left the metric still marks its day
+        return set(
+            queryset.annotate(rollup_day=self._day_expression(spec))
+            .exclude(rollup_day__isnull=True)
+            .order_by()
+            .values_list("rollup_day", flat=True)
+            .distinct()
+        )
+
+    def refresh_changed(self, since: Optional[datetime] = None) -> int:
+        """
+        Recompute the days touched by source rows updated since the last run,
+        and the days queued by mark_changed.
+
+        Only models with an updated_at column (deals and projects) can be
+        read this way; the others are only written through save/delete.
+
+        Args:
+            since: Changes to read from; defaults to the previous run, or
+                ROLLUP_REFRESH_LOOKBACK_HOURS ago when there is none
+
+        Returns:
+            Number of (metric, day) pairs recomputed
+        """
+        now = timezone.now()
+        if since is None:
+            last_run = MetricRollupRefresh.objects.order_by("-refreshed_at").first()
+            if last_run is not None:
+                since = last_run.refreshed_at
+            else:
+                since = now - timedelta(
+                    hours=getattr(
+                        settings,
+                        "ROLLUP_REFRESH_LOOKBACK_HOURS",
+                        DEFAULT_REFRESH_LOOKBACK_HOURS,
+                    )
+                )
+
+        days = defaultdict(set)
+        # Changes queued while this run works are left for the next one
+        queued = (
+            MetricRollupChange.objects.order_by("-pk")
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if queued is not None:
+            for metric, day in MetricRollupChange.objects.filter(
+                pk__lte=queued
+            ).values_list("metric", "date"):
+                days[metric].add(day)
+        for metric, spec in METRICS.items():
+            model = spec["model"]
+            if any(field.name == "updated_at" for field in model._meta.fields):
+                days[metric].update(
+                    self._days(spec, model.objects.filter(updated_at__gte=since))
+                )
+
+        refreshed = 0
+        for metric, metric_days in days.items():
+            if metric_days:
+                self._replace(metric, {"in": sorted(metric_days)})
+                refreshed += len(metric_days)
+        with transaction.atomic():
+            if queued is not None:
+                MetricRollupChange.objects.filter(pk__lte=queued).delete()
+            MetricRollupRefresh.objects.create(
+                refreshed_at=now, days_refreshed=refreshed
+            )
+        return refreshed
+
+    def _replace(self, metric, day_lookups, batch_size=1000) -> int:
+        rows = [
+            MetricDailyRollup(
+                metric=metric,
+                dimension=dimension,
+                key=key,
+                date=day,
+                count=count,
+                amount=amount,
+            )
+            for (metric, dimension, key, day), (count, amount) in self.compute(
+                metric, **day_lookups
+            ).items()
+        ]
+        with transaction.atomic():
+            MetricDailyRollup.objects.filter(
+                metric=metric,
+                **{f"date__{lookup}": value for lookup, value in day_lookups.items()},
+            ).delete()
+            MetricDailyRollup.objects.bulk_create(rows, batch_size=batch_size)
+        return len(rows)
+
+    def verify(self) -> List[Dict]:
+        """
+        Compare stored rollups against a full recomputation.
+
+        Returns:
+            List of mismatch dicts (empty when the rollups are consistent)
+        """
+        expected: Cells = {}
+        for metric in METRICS:
+            expected.update(self.compute(metric))
+        actual = {
+            (row.metric, row.dimension, row.key, row.date): [row.count, row.amount]
+            for row in MetricDailyRollup.objects.all()
+        }
+        mismatches = []
+        for cell in set(expected) | set(actual):
+            want = expected.get(cell, [0, ZERO])
+            have = actual.get(cell, [0, ZERO])
+            if want != have:
+                mismatches.append(
+                    {
+                        "metric": cell[0],
+                        "dimension": cell[1],
+                        "key": cell[2],
+                        "date": cell[3],
+                        "expected": {"count": want[0], "amount": want[1]},
+                        "actual": {"count": have[0], "amount": have[1]},
+                    }
+                )
+        mismatches.sort(key=lambda m: (m["date"], m["metric"], m["dimension"]))
+        return mismatches
+
+    def series(
+        self,
+        metrics: Iterable[str],
+        start: date,
+        end: date,
+        dimension: str = "all",
+        key: Optional[str] = None,
+    ) -> List[Dict]:
+        """
+        Daily time series from the rollups, zero-filled over start..end.
+
+        Args:
+            metrics: Metric names
+            start: First day
+            end: Last day
+            dimension: "all", "owner", "stage" or "account"; other dimensions
+                return one series per key
+            key: Restrict a dimension to one owner/stage/account
+
+        Returns:
+            List of {metric, dimension, key, total_count, total_amount, points}
+        """
+        rows = MetricDailyRollup.objects.filter(
+            metric__in=list(metrics), dimension=dimension, date__range=(start, end)
+        )
+        if key is not None:
+            rows = rows.filter(key=key)
+        found = defaultdict(dict)
+        for metric, row_key, day, count, amount in rows.order_by(
+            "metric", "key", "date"
+        ).values_list("metric", "key", "date", "count", "amount"):
+            found[(metric, row_key)][day] = (count, amount)
+
+        days = [start + timedelta(days=n) for n in range((end - start).days + 1)]
+        series = []
+        for (metric, row_key), by_day in found.items():
+            points = [
+                {
+                    "date": day,
+                    "count": by_day.get(day, (0, ZERO))[0],
+                    "amount": by_day.get(day, (0, ZERO))[1],
+                }
+                for day in days
+            ]
+            series.append(
+                {
+                    "metric": metric,
+                    "dimension": dimension,
+                    "key": row_key,
+                    "total_count": sum(point["count"] for point in points),
+                    "total_amount": sum((point["amount"] for point in points), ZERO),
+                    "points": points,
+                }
+            )
+        return series
+
+    def period_comparison(self, metrics: Iterable[str], start: date, end: date):
+        """
+        Overall totals for start..end against the preceding period of the same
+        length, in one grouped query.
+
+        Returns:
+            List of {metric, current_count, previous_count, current_amount,
+            previous_amount, change_percent}; the change is by amount for
+            metrics with one, otherwise by count, and None without history
+        """
+        previous_start = start - (end - start) - timedelta(days=1)
+        current = Q(date__gte=start)
+        rows = (
+            MetricDailyRollup.objects.filter(
+                metric__in=list(metrics),
+                dimension="all",
+                date__range=(previous_start, end),
+            )
+            .values("metric")
+            .annotate(
+                current_count=Sum("count", filter=current),
+                previous_count=Sum("count", filter=~current),
+                current_amount=Sum("amount", filter=current),
+                previous_amount=Sum("amount", filter=~current),
+            )
+            .order_by("metric")
+        )
+        comparison = []
+        for row in rows:
+            figures = {
+                name: row[name] or (ZERO if name.endswith("amount") else 0)
+                for name in (
+                    "current_count",
+                    "previous_count",
+                    "current_amount",
+                    "previous_amount",
+                )
+            }
+            measure = "amount" if METRICS[row["metric"]]["amount"] else "count"
+            now, before = figures[f"current_{measure}"], figures[f"previous_{measure}"]
+            comparison.append(
+                {
+                    "metric": row["metric"],
+                    **figures,
+                    "change_percent": round((now - before) / before * 100, 2)
+                    if before
+                    else None,
+                }
+            )
+        return comparison
+
+
+# Singleton instance - created on first use
+rollup_service: Optional[RollupService] = None
+
+
+def get_rollup_service():
+    """Get rollup service singleton, creating it if needed"""
+    global rollup_service
+    if rollup_service is None:
+        rollup_service = RollupService()
+    return rollup_service
@@ -0,0 +1,209 @@
+"""
+Saved-search result cache for Converge CRM.
+Results are cached per saved search definition, viewer scope, page and a
+search data version counter. Saves and deletes of searchable records bump the
+counter, so stale results are never read again and simply expire; the
+timeout bounds staleness from writes that skip signals (queryset.update,
+bulk_update). Executions are counted in cache counters shared by every
+process, and the precompute task drains them into SavedSearch.use_count in
+batched F() increments instead of one UPDATE per execution.
+"""
+
+import logging
+import time
+from collections import defaultdict
+from typing import Callable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .search_models import SavedSearch
+
+logger = logging.getLogger(__name__)
+
+DATA_VERSION_KEY = "saved_search:data_version"
+
+# Seconds a cached result page lives
+DEFAULT_CACHE_TIMEOUT = 300
+
+USAGE_KEY_PREFIX = "saved_search:uses:"
+
+# Usage counters read per cache round trip when draining
+USAGE_DRAIN_BATCH_SIZE = 500
+
+# Most-used saved searches precomputed by precompute_popular_searches
+DEFAULT_PRECOMPUTE_COUNT = 20
+
+MANAGER_GROUPS = ["Sales Manager", "Admin"]
+
+
+def get_data_version() -> int:
+    """Current search data version, seeded from the clock if the cache was cleared."""
+    version = cache.get(DATA_VERSION_KEY)
+    if version is None:
+        cache.add(DATA_VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(DATA_VERSION_KEY)
+    return version
+
+
+def bump_data_version() -> None:
+    """
+    Invalidate every cached saved-search result.
+
+    Bumps immediately and again on commit, so results cached from
+    pre-commit data in between are never served.
+    """
+    _increment_version()
+    transaction.on_commit(_increment_version)
+
+
+def _increment_version():
+    try:
+        cache.incr(DATA_VERSION_KEY)
+    except ValueError:
+        get_data_version()
+        cache.incr(DATA_VERSION_KEY)
+
+
+def viewer_scope(user) -> str:
+    """Users who see the same rows share a scope: all managers, else one user."""
+    if user.groups.filter(name__in=MANAGER_GROUPS).exists():
+        return "all"
+    return f"user:{user.pk}"
+
+
+def result_cache_key(saved_search, scope: str, offset: int, limit: int) -> str:
+    """Cache key for one page of a saved search at the current data version."""
+    defined_at = saved_search.updated_at.timestamp() if saved_search.updated_at else 0
+    return (
+        f"saved_search:{saved_search.pk}:{defined_at}:{scope}:"
+        f"{get_data_version()}:{offset}:{limit}"
+    )
+
+
+def cached_results(
+    saved_search, user, offset: int, limit: int, build: Callable[[], Tuple]
+) -> Tuple:
+    """
+    One page of saved-search results, from cache when current.
+
+    Args:
+        saved_search: SavedSearch being executed
+        user: Executing user; decides which rows are visible
+        offset: Page offset
+        limit: Page size
+        build: Zero-argument callable returning (results, total_count) on a miss
+
+    Returns:
+        Tuple of (results, total_count)
+    """
+    key = result_cache_key(saved_search, viewer_scope(user), offset, limit)
+    cached = cache.get(key)
+    if cached is not None:
+        return tuple(cached)
+
+    results, total_count = build()
+    cache.set(
+        key,
+        [results, total_count],
+        getattr(settings, "SAVED_SEARCH_CACHE_TIMEOUT", DEFAULT_CACHE_TIMEOUT),
+    )
+    return results, total_count
+
+
+def _usage_key(saved_search_id: int) -> str:
+    return f"{USAGE_KEY_PREFIX}{saved_search_id}"
+
+
+def count_usage(saved_search_id: int) -> None:
+    """Count one execution of a saved search in its shared cache counter."""
+    key = _usage_key(saved_search_id)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add and incr
+        cache.add(key, 1, timeout=None)
+
+
+def drain_usage_counts() -> int:
+    """
+    Write counted executions with one UPDATE per distinct increment.
+
+    Each counter is decremented by the count written rather than reset, so
+    executions counted while draining are kept for the next drain.
+
+    Returns:
+        Number of saved searches updated
+    """
+    saved_search_ids = list(SavedSearch.objects.values_list("pk", flat=True))
+    by_increment = defaultdict(list)
+    for start in range(0, len(saved_search_ids), USAGE_DRAIN_BATCH_SIZE):
+        keys = {
+            _usage_key(pk): pk
+            for pk in saved_search_ids[start : start + USAGE_DRAIN_BATCH_SIZE]
+        }
+        for key, increment in cache.get_many(list(keys)).items():
+            if not increment:
+                continue
+            try:
+                cache.decr(key, increment)
+            except ValueError:
+                # Evicted since it was read; the read count is still written
+                pass
+            by_increment[increment].append(keys[key])
+
+    now = timezone.now()
+    updated = 0
+    for increment, ids in by_increment.items():
+        updated += SavedSearch.objects.filter(pk__in=ids).update(
+            use_count=F("use_count") + increment, last_used=now
+        )
+    return updated
+
+
+def precompute_popular_searches(count: Optional[int] = None, limit: int = 50) -> int:
+    """
+    Write counted usage, then warm the result cache for the most-used
+    saved searches.
+
+    Each search is run as its owner with the default first page, so it lands
+    in the scope its owner (and, for managers, every manager) reads from.
+
+    Args:
+        count: Number of searches, defaults to SAVED_SEARCH_PRECOMPUTE_COUNT
+        limit: Page size to precompute
+
+    Returns:
+        Number of saved searches precomputed
+    """
+    from .search_service import SearchService
+
+    drain_usage_counts()
+    if count is None:
+        count = getattr(
+            settings, "SAVED_SEARCH_PRECOMPUTE_COUNT", DEFAULT_PRECOMPUTE_COUNT
+        )
+    popular = (
+        SavedSearch.objects.filter(use_count__gt=0)
+        .select_related("user")
+        .order_by("-use_count", "pk")[:count]
+    )
+
+    computed = 0
+    for saved_search in popular:
+        try:
+            SearchService(saved_search.user).execute_saved_search(
+                saved_search.pk,
+                0,
+                limit,
+                saved_search=saved_search,
+                record_usage=False,
+            )
+            computed += 1
+        except Exception:
+            logger.exception("Failed to precompute saved search %s", saved_search.pk)
+    return computed
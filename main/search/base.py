@@ -33,6 +33,34 @@ class BaseSearchProvider(ABC):
         """
         pass
 
+    @abstractmethod
+    def advanced_search_page(
+        self,
+        entity_type,
+        query,
+        filters,
+        sort_by,
+        sort_order,
+        limit,
+        cursor=None,
+        count_mode=None,
+    ):
+        """
+        Keyset-paginated variant of advanced_search.
+
+        :param entity_type: The type of entity to search (e.g., 'contacts').
+        :param query: The search query string.
+        :param filters: A dictionary of filters to apply.
+        :param sort_by: The field to sort the results by.
+        :param sort_order: The sort order ('asc' or 'desc').
+        :param limit: The maximum number of results to return.
+        :param cursor: Cursor from a previous page, or None for the first page.
+        :param count_mode: 'exact', 'capped', 'estimate', or None for no count.
+        :return: A dict with results, next_cursor, previous_cursor,
+            total_count and count_is_exact.
+        """
+        pass
+
     @abstractmethod
     def get_search_suggestions(self, query, entity_type, limit):
         """
@@ -44,3 +72,16 @@ class BaseSearchProvider(ABC):
         :return: A list of suggestion dictionaries.
         """
         pass
+
+    @abstractmethod
+    def global_search(self, query, filters=None, limit=50):
+        """
+        Search every searchable entity type at once.
+
+        :param query: The search query string.
+        :param filters: Optional {entity_type: {field: value}} filters.
+        :param limit: The maximum number of results per entity type.
+        :return: A dict of entity type -> list of matching model instances,
+            best match first.
+        """
+        pass
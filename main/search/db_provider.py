@@ -4,6 +4,7 @@ from typing import Any, Dict, List, Tuple
 from django.db.models import Q
 
 from ..models import Account, Contact, Deal, Invoice, Project, Quote
+from ..pagination import Keyset, count_rows, keyset_page
 from .base import BaseSearchProvider
 
 
@@ -29,6 +30,50 @@ class DatabaseSearchProvider(BaseSearchProvider):
         self, entity_type, query, filters, sort_by, sort_order, offset, limit
     ) -> Tuple[List[Dict[str, Any]], int]:
         """Perform a search against the database with filters/sorting."""
+        queryset = self._advanced_queryset(entity_type, query, filters)
+
+        if sort_by:
+            order = f"-{sort_by}" if sort_order == "desc" else sort_by
+            queryset = queryset.order_by(order)
+
+        results = list(queryset[offset : offset + limit])
+        if offset == 0 and len(results) < limit:
+            # The whole result set fits on the first page; no count needed
+            total_count = len(results)
+        else:
+            total_count = queryset.count()
+
+        serialized_results = [self._serialize_result(obj) for obj in results]
+        return serialized_results, total_count
+
+    def advanced_search_page(
+        self,
+        entity_type,
+        query,
+        filters,
+        sort_by,
+        sort_order,
+        limit,
+        cursor=None,
+        count_mode=None,
+    ) -> Dict[str, Any]:
+        """Keyset-paginated advanced search, ordered by sort_by then id."""
+        queryset = self._advanced_queryset(entity_type, query, filters)
+        keyset = Keyset(queryset.model, sort_by or "pk", sort_order == "desc")
+        rows, next_cursor, previous_cursor = keyset_page(
+            queryset, keyset, limit, cursor
+        )
+        total_count, count_is_exact = count_rows(queryset, count_mode)
+        return {
+            "results": [self._serialize_result(obj) for obj in rows],
+            "next_cursor": next_cursor,
+            "previous_cursor": previous_cursor,
+            "total_count": total_count,
+            "count_is_exact": count_is_exact,
+        }
+
+    def _advanced_queryset(self, entity_type, query, filters):
+        """Permission-filtered queryset matching query and filters."""
         if entity_type not in self.SEARCHABLE_MODELS:
             raise ValueError(f"Entity type '{entity_type}' not supported")
 
@@ -41,17 +86,7 @@ class DatabaseSearchProvider(BaseSearchProvider):
 
         if filters:
             queryset = self.apply_filters(queryset, filters, model)
-
-        total_count = queryset.count()
-
-        if sort_by:
-            order = f"-{sort_by}" if sort_order == "desc" else sort_by
-            queryset = queryset.order_by(order)
-
-        results = queryset[offset : offset + limit]
-
-        serialized_results = [self._serialize_result(obj) for obj in results]
-        return serialized_results, total_count
+        return queryset
 
     def get_search_suggestions(
         self, query: str, entity_type: str | None = None, limit: int = 10
@@ -84,6 +119,25 @@ class DatabaseSearchProvider(BaseSearchProvider):
             )
         return suggestions
 
+    def global_search(
+        self, query: str, filters: Dict[str, Any] | None = None, limit: int = 50
+    ) -> Dict[str, list]:
+        """Search each entity table with icontains, one query per entity type."""
+        results: Dict[str, list] = {}
+        search_terms = self._extract_search_terms(query or "")
+        if not search_terms:
+            return results
+
+        for entity_type, model in self.SEARCHABLE_MODELS.items():
+            queryset = self._get_user_queryset(model, self.user)
+            queryset = self._search_in_model(queryset, search_terms, model)
+            if filters and entity_type in filters:
+                queryset = self.apply_filters(queryset, filters[entity_type], model)
+            matches = list(queryset[:limit])
+            if matches:
+                results[entity_type] = matches
+        return results
+
     def _get_user_queryset(self, model, user):
         """Get queryset filtered by user permissions"""
         if not user or not user.is_authenticated:
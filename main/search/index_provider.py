@@ -0,0 +1,242 @@
+import math
+from typing import Any, Dict, List
+
+from django.core.cache import cache
+from django.db.models import (
+    Avg,
+    Case,
+    Count,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    Q,
+    Sum,
+    Value,
+    When,
+)
+
+from ..search_models import GlobalSearchIndex, SearchPosting
+from .db_provider import DatabaseSearchProvider
+from .suggestions import get_suggestion_service
+from .tokenizer import tokenize
+
+# BM25 term-frequency saturation and document-length normalisation
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Corpus statistics and document frequencies change slowly; cache them briefly
+STATS_CACHE_TIMEOUT = 300
+STATS_CACHE_KEY = "search:corpus_stats"
+DF_CACHE_PREFIX = "search:df:"
+
+# Query terms beyond this are ignored
+MAX_QUERY_TERMS = 10
+
+# Indexed terms the last query term expands to as a prefix, most common first
+MAX_PREFIX_EXPANSIONS = 20
+
+
+class IndexedSearchProvider(DatabaseSearchProvider):
+    """
+    A search provider that serves global search from the GlobalSearchIndex
+    posting lists, ranking matches with BM25 scaled by boost_score.
+
+    Matching and ranking is one grouped query over SearchPosting rows for the
+    query terms, so its cost depends on the posting lists involved rather than
+    on the size of the searchable tables. The last query term also matches as
+    a prefix, so partial words, emails and phone numbers still find records.
+    Typeahead suggestions come from the prefix index; per-entity advanced
+    search is inherited from DatabaseSearchProvider.
+    """
+
+    def get_search_suggestions(
+        self, query: str, entity_type: str | None = None, limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Prefix-index suggestions, across all entity types if none is given."""
+        return get_suggestion_service().suggest(self.user, query, entity_type, limit)
+
+    def global_search(
+        self, query: str, filters: Dict[str, Any] | None = None, limit: int = 50
+    ) -> Dict[str, list]:
+        """Return {entity_type: [instance, ...]} ranked by BM25 score."""
+        results: Dict[str, list] = {}
+        terms = list(dict.fromkeys(tokenize(query or "")))[:MAX_QUERY_TERMS]
+        if not terms or not self.user or not self.user.is_authenticated:
+            return results
+
+        models_by_type = {
+            model.__name__.lower(): (entity_type, model)
+            for entity_type, model in self.SEARCHABLE_MODELS.items()
+        }
+        hits = self.ranked_hits(
+            terms, list(models_by_type), limit * len(models_by_type)
+        )
+
+        # Bucket ids per entity type, keeping rank order
+        ranked: Dict[str, List[tuple]] = {}
+        for hit in hits:
+            bucket = ranked.setdefault(hit["entry__entity_type"], [])
+            if len(bucket) < limit:
+                bucket.append((hit["entry__object_id"], hit["score"]))
+
+        for index_type, rows in ranked.items():
+            entity_type, model = models_by_type[index_type]
+            # The model queryset re-applies RBAC and any entity filters
+            queryset = self._get_user_queryset(model, self.user).filter(
+                pk__in=[object_id for object_id, _ in rows]
+            )
+            if filters and entity_type in filters:
+                queryset = self.apply_filters(queryset, filters[entity_type], model)
+            objects = queryset.in_bulk()
+            matches = []
+            for object_id, score in rows:
+                obj = objects.get(object_id)
+                if obj is not None:
+                    obj.search_score = score
+                    matches.append(obj)
+            if matches:
+                results[entity_type] = matches
+        return results
+
+    def ranked_hits(self, terms: List[str], entity_types: List[str], limit: int):
+        """
+        Index entries containing every term, best BM25 score first.
+
+        The last term matches as a prefix ("acm" finds "acme"): it expands to
+        the MAX_PREFIX_EXPANSIONS most common indexed terms starting with it,
+        and an entry needs at least one of them.
+
+        Returns dicts with entry_id, entry__entity_type, entry__object_id and
+        score.
+        """
+        doc_count, avg_length = self._corpus_stats()
+        if not doc_count:
+            return []
+        *exact, prefix = terms
+        frequencies = self._document_frequencies(exact)
+        if any(not frequencies.get(term) for term in exact):
+            # Every term must match, so a term with no postings means no hits
+            return []
+        expansions = self._prefix_expansions(prefix)
+        if not expansions:
+            return []
+        frequencies.update(expansions)
+
+        tf = F("term_frequency")
+        length_norm = Value(BM25_K1 * (1 - BM25_B)) + Value(
+            BM25_K1 * BM25_B / max(avg_length, 1.0)
+        ) * F("entry__term_count")
+        term_scores = [
+            When(
+                term=term,
+                then=ExpressionWrapper(
+                    Value(self._idf(doc_count, df) * (BM25_K1 + 1))
+                    * tf
+                    / (tf + length_norm),
+                    output_field=FloatField(),
+                ),
+            )
+            for term, df in frequencies.items()
+        ]
+        bm25 = Sum(Case(*term_scores, default=Value(0.0), output_field=FloatField()))
+
+        matched = {"prefix_matched": Count("term", filter=Q(term__in=list(expansions)))}
+        required = {"prefix_matched__gt": 0}
+        if exact:
+            matched["exact_matched"] = Count("term", filter=Q(term__in=exact))
+            required["exact_matched"] = len(exact)
+
+        postings = SearchPosting.objects.filter(
+            term__in=list(frequencies), entry__entity_type__in=entity_types
+        )
+        postings = postings.filter(self._index_access_filter(entity_types))
+        return list(
+            postings.values(
+                "entry_id",
+                "entry__entity_type",
+                "entry__object_id",
+                "entry__boost_score",
+            )
+            .annotate(
+                **matched,
+                score=ExpressionWrapper(
+                    bm25 * F("entry__boost_score"), output_field=FloatField()
+                ),
+            )
+            .filter(**required)
+            .order_by("-score", "entry_id")[:limit]
+        )
+
+    def _index_access_filter(self, entity_types: List[str]) -> Q:
+        """
+        Pre-filter index entries a non-manager cannot see, so other users'
+        documents do not crowd theirs out of the ranked window.
+        """
+        if self.user.groups.filter(name__in=["Sales Manager", "Admin"]).exists():
+            return Q()
+        owned = [
+            model.__name__.lower()
+            for model in self.SEARCHABLE_MODELS.values()
+            if hasattr(model, "owner")
+        ]
+        return Q(entry__entity_type__in=owned, entry__owner=self.user) | Q(
+            entry__entity_type__in=[t for t in entity_types if t not in owned]
+        )
+
+    @staticmethod
+    def _idf(doc_count: int, doc_frequency: int) -> float:
+        return math.log(1 + (doc_count - doc_frequency + 0.5) / (doc_frequency + 0.5))
+
+    def _corpus_stats(self):
+        """(number of indexed entries, average term count), briefly cached."""
+        stats = cache.get(STATS_CACHE_KEY)
+        if stats is None:
+            row = GlobalSearchIndex.objects.aggregate(
+                count=Count("id"), avg_length=Avg("term_count")
+            )
+            stats = (row["count"], float(row["avg_length"] or 0.0))
+            if stats[0]:
+                cache.set(STATS_CACHE_KEY, stats, STATS_CACHE_TIMEOUT)
+        return stats
+
+    def _document_frequencies(self, terms: List[str]) -> Dict[str, int]:
+        """Number of entries containing each term, briefly cached per term."""
+        cached = cache.get_many([DF_CACHE_PREFIX + term for term in terms])
+        frequencies = {
+            term: cached[DF_CACHE_PREFIX + term]
+            for term in terms
+            if DF_CACHE_PREFIX + term in cached
+        }
+        missing = [term for term in terms if term not in frequencies]
+        if missing:
+            counted = dict(
+                SearchPosting.objects.filter(term__in=missing)
+                .values("term")
+                .annotate(df=Count("id"))
+                .values_list("term", "df")
+            )
+            fresh = {term: counted.get(term, 0) for term in missing}
+            # Unseen terms are not cached so newly indexed ones match at once
+            cache.set_many(
+                {DF_CACHE_PREFIX + term: df for term, df in fresh.items() if df},
+                STATS_CACHE_TIMEOUT,
+            )
+            frequencies.update(fresh)
+        return frequencies
+
+    def _prefix_expansions(self, prefix: str) -> Dict[str, int]:
+        """
+        Indexed terms starting with prefix and their document frequencies:
+        the term itself if indexed, then the most common longer ones.
+        """
+        return dict(
+            SearchPosting.objects.filter(term__startswith=prefix)
+            .values("term")
+            .annotate(df=Count("id"))
+            .order_by(
+                Case(When(term=prefix, then=Value(0)), default=Value(1)),
+                "-df",
+                "term",
+            )
+            .values_list("term", "df")[:MAX_PREFIX_EXPANSIONS]
+        )
@@ -0,0 +1,164 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.db.models import Q
+
+from ..search_models import SearchSuggestion
+from .db_provider import DatabaseSearchProvider
+from .tokenizer import MIN_TERM_LENGTH, normalize_prefix
+
+# Users with cached suggestions, and cached queries per user
+DEFAULT_MAX_USERS = 1000
+DEFAULT_MAX_ENTRIES_PER_USER = 256
+
+# Seconds a cached answer (and a user's resolved access rules) stays valid;
+# bounds staleness from index writes made by other processes
+DEFAULT_CACHE_TTL = 30.0
+
+MANAGER_GROUPS = ["Sales Manager", "Admin"]
+
+
+class _UserCache:
+    """One user's access filter and LRU of recent suggestion answers."""
+
+    __slots__ = ("access", "expires", "entries")
+
+    def __init__(self, access: Q, expires: float):
+        self.access = access
+        self.expires = expires
+        self.entries: "OrderedDict[tuple, list]" = OrderedDict()
+
+
+class SuggestionService:
+    """
+    Typeahead suggestions from the SearchSuggestion prefix table.
+
+    A lookup is one indexed equality match on (prefix, entity_type) ordered
+    by label, restricted to what the user may see. Answers are kept in a
+    bounded per-user LRU so repeated keystrokes are served from memory, and
+    the user's group membership is resolved once per cache lifetime instead
+    of on every request.
+    """
+
+    def __init__(self, models: Dict[str, Any]):
+        # entity_type (e.g. "contacts") -> model
+        self.models = models
+        self._users: "OrderedDict[int, _UserCache]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def suggest(
+        self, user, query: str, entity_type: Optional[str] = None, limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Suggestions for a partial query.
+
+        Args:
+            user: Requesting user
+            query: Text typed so far
+            entity_type: Restrict to one entity type (e.g. "contacts")
+            limit: Maximum number of suggestions
+
+        Returns:
+            List of {"id", "name", "type"} dicts ordered by name
+        """
+        prefix = normalize_prefix(query)
+        if len(prefix) < MIN_TERM_LENGTH or not user or not user.is_authenticated:
+            return []
+        if entity_type and entity_type not in self.models:
+            return []
+
+        user_cache = self._user_cache(user)
+        key = (prefix, entity_type, limit)
+        with self._lock:
+            cached = user_cache.entries.get(key)
+            if cached is not None:
+                user_cache.entries.move_to_end(key)
+                return cached
+
+        suggestions = self._lookup(user_cache.access, prefix, entity_type, limit)
+
+        max_entries = getattr(
+            settings, "SEARCH_SUGGESTION_CACHE_SIZE", DEFAULT_MAX_ENTRIES_PER_USER
+        )
+        with self._lock:
+            user_cache.entries[key] = suggestions
+            user_cache.entries.move_to_end(key)
+            while len(user_cache.entries) > max_entries:
+                user_cache.entries.popitem(last=False)
+        return suggestions
+
+    def invalidate(self) -> None:
+        """Drop every cached answer, e.g. after the index changed."""
+        with self._lock:
+            self._users.clear()
+
+    def _user_cache(self, user) -> _UserCache:
+        now = time.monotonic()
+        with self._lock:
+            user_cache = self._users.get(user.pk)
+            if user_cache is not None and user_cache.expires > now:
+                self._users.move_to_end(user.pk)
+                return user_cache
+
+        ttl = getattr(settings, "SEARCH_SUGGESTION_CACHE_TTL", DEFAULT_CACHE_TTL)
+        user_cache = _UserCache(self._access_filter(user), now + ttl)
+        with self._lock:
+            self._users[user.pk] = user_cache
+            self._users.move_to_end(user.pk)
+            while len(self._users) > DEFAULT_MAX_USERS:
+                self._users.popitem(last=False)
+        return user_cache
+
+    def _access_filter(self, user) -> Q:
+        """Suggestion rows the user may see, mirroring provider RBAC."""
+        if user.groups.filter(name__in=MANAGER_GROUPS).exists():
+            return Q()
+        access = Q()
+        for model in self.models.values():
+            index_type = model.__name__.lower()
+            if hasattr(model, "owner"):
+                rule = Q(entry__owner=user)
+            elif hasattr(model, "user"):
+                visible = model.objects.filter(user=user).values("pk")
+                rule = Q(entry__object_id__in=visible)
+            elif hasattr(model, "assigned_to"):
+                visible = model.objects.filter(
+                    Q(assigned_to=user) | Q(created_by=user)
+                ).values("pk")
+                rule = Q(entry__object_id__in=visible)
+            else:
+                rule = Q()
+            access |= Q(entity_type=index_type) & rule
+        return access
+
+    def _lookup(self, access: Q, prefix: str, entity_type, limit) -> List[dict]:
+        if entity_type:
+            models = [self.models[entity_type]]
+        else:
+            models = list(self.models.values())
+        names = {model.__name__.lower(): model.__name__ for model in models}
+        rows = (
+            SearchSuggestion.objects.filter(prefix=prefix, entity_type__in=list(names))
+            .filter(access)
+            .order_by("label", "entry_id")
+            .values_list("entry__object_id", "label", "entity_type")[:limit]
+        )
+        return [
+            {"id": object_id, "name": label, "type": names[index_type]}
+            for object_id, label, index_type in rows
+        ]
+
+
+# Singleton instance - created on first use
+suggestion_service: Optional[SuggestionService] = None
+
+
+def get_suggestion_service():
+    """Get suggestion service singleton, creating it if needed"""
+    global suggestion_service
+    if suggestion_service is None:
+        suggestion_service = SuggestionService(DatabaseSearchProvider.SEARCHABLE_MODELS)
+    return suggestion_service
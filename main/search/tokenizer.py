@@ -0,0 +1,58 @@
+import re
+from collections import Counter
+from typing import Dict, List, Set
+
+# Longest term stored in a posting list; longer tokens are truncated
+MAX_TERM_LENGTH = 64
+
+# Terms shorter than this are neither indexed nor searched
+MIN_TERM_LENGTH = 2
+
+# Longest typeahead prefix stored; longer queries match on their first
+# MAX_PREFIX_LENGTH characters
+MAX_PREFIX_LENGTH = 20
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase search terms.
+
+    Used both when indexing documents and when parsing queries, so both sides
+    always agree on what a term is.
+    """
+    if not text:
+        return []
+    return [
+        token[:MAX_TERM_LENGTH]
+        for token in _TOKEN_RE.findall(text.lower())
+        if len(token) >= MIN_TERM_LENGTH
+    ]
+
+
+def term_frequencies(text: str) -> Dict[str, int]:
+    """Map each term in text to the number of times it occurs."""
+    return dict(Counter(tokenize(text)))
+
+
+def normalize_prefix(text: str) -> str:
+    """Lowercase, collapse whitespace and truncate a typeahead query."""
+    return " ".join((text or "").lower().split())[:MAX_PREFIX_LENGTH]
+
+
+def edge_ngrams(*values: str) -> Set[str]:
+    """
+    Typeahead prefixes for labels such as names, titles and emails.
+
+    Each value contributes the prefixes of its whole normalised text and of
+    every word in it, from MIN_TERM_LENGTH up to MAX_PREFIX_LENGTH characters.
+    """
+    prefixes: Set[str] = set()
+    for value in values:
+        text = " ".join((value or "").lower().split())
+        for part in [text] + _TOKEN_RE.findall(text):
+            for end in range(MIN_TERM_LENGTH, min(len(part), MAX_PREFIX_LENGTH) + 1):
+                if part[end - 1] != " ":
+                    prefixes.add(part[:end])
+    return prefixes
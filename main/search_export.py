@@ -0,0 +1,139 @@
+"""
+Search result export files for Converge CRM bulk export operations.
+Rows arrive as values_list tuples from a chunked iterator (a server-side
+cursor on PostgreSQL) and are written straight to a temporary file, which is
+then copied to default storage, so exports of any size hold at most one chunk
+in memory.
+"""
+
+import io
+import tempfile
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from .ledger_export import encode_rows
+
+try:
+    from openpyxl import Workbook
+except ImportError:  # Optional: XLSX exports are unavailable without openpyxl
+    Workbook = None
+
+# format -> (content type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "xlsx": (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "xlsx",
+    ),
+}
+
+EXPORT_DIRECTORY = "exports"
+
+# Cell values openpyxl writes natively; anything else is written as text
+XLSX_TYPES = (str, int, float, bool, Decimal, date, datetime, time)
+
+
+def check_format(export_format: str) -> None:
+    """
+    Raises:
+        ValueError: If the format is unknown or its library is not installed
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(
+            f"Unsupported export format '{export_format}'; "
+            f"use one of {', '.join(EXPORT_FORMATS)}"
+        )
+    if export_format == "xlsx" and Workbook is None:
+        raise ValueError("XLSX export requires openpyxl to be installed")
+
+
+def export_columns(
+    model, fields: Optional[Sequence[str]] = None
+) -> List[Tuple[str, str]]:
+    """
+    Header and values_list lookup for each exported column.
+
+    Args:
+        model: Model being exported
+        fields: Field names to export; all concrete fields by default.
+            Foreign keys export the related id.
+
+    Returns:
+        List of (header, lookup) pairs
+
+    Raises:
+        ValueError: If a field does not exist or is not a concrete column
+    """
+    if not fields:
+        return [(field.attname, field.attname) for field in model._meta.concrete_fields]
+    columns = []
+    for name in fields:
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise ValueError(f"Unknown field '{name}' for {model.__name__}")
+        if not field.concrete or field.many_to_many:
+            raise ValueError(f"Field '{name}' cannot be exported")
+        columns.append((name, field.attname))
+    return columns
+
+
+def write_export(
+    rows: Iterable[Sequence], header: Sequence[str], export_format: str, name: str
+) -> Tuple[str, int]:
+    """
+    Write rows to a file in default storage.
+
+    Args:
+        rows: Row tuples in header order
+        header: Column names
+        export_format: "csv", "ndjson" or "xlsx"
+        name: File name without extension, under EXPORT_DIRECTORY
+
+    Returns:
+        Tuple of (stored file name, size in bytes)
+    """
+    check_format(export_format)
+    extension = EXPORT_FORMATS[export_format][1]
+    with tempfile.TemporaryFile() as tmp:
+        if export_format == "xlsx":
+            _write_xlsx(rows, header, tmp)
+        else:
+            text = io.TextIOWrapper(tmp, encoding="utf-8", newline="")
+            for chunk in encode_rows(rows, header, export_format):
+                text.write(chunk)
+            text.flush()
+            text.detach()
+        size = tmp.tell()
+        tmp.seek(0)
+        stored = default_storage.save(
+            f"{EXPORT_DIRECTORY}/{name}.{extension}", File(tmp)
+        )
+    return stored, size
+
+
+def _write_xlsx(rows, header, fileobj):
+    # Write-only workbooks stream rows to disk instead of building a sheet
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(list(header))
+    for row in rows:
+        sheet.append([_xlsx_value(value) for value in row])
+    workbook.save(fileobj)
+    fileobj.seek(0, io.SEEK_END)
+
+
+def _xlsx_value(value):
+    # Excel has no time zones; export aware datetimes in local time
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        return timezone.make_naive(value)
+    if value is None or isinstance(value, XLSX_TYPES):
+        return value
+    return str(value)
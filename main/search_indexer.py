@@ -0,0 +1,114 @@
+"""
+Incremental maintenance of the global search index for Converge CRM.
+Model signals enqueue (content type, object id) changes; the queue coalesces
+repeated saves of the same object and is flushed once the writing transaction
+commits, either to a Celery task or processed in-process in batches.
+"""
+
+import logging
+import threading
+from collections import defaultdict
+from typing import Iterable, List, Sequence
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+
+from .search.db_provider import DatabaseSearchProvider
+from .search.suggestions import get_suggestion_service
+from .search_models import GlobalSearchIndex
+
+logger = logging.getLogger(__name__)
+
+INDEX = "index"
+DELETE = "delete"
+
+# Models whose rows are mirrored into GlobalSearchIndex
+INDEXED_MODELS = tuple(DatabaseSearchProvider.SEARCHABLE_MODELS.values())
+
+DEFAULT_BATCH_SIZE = 500
+
+_state = threading.local()
+
+
+def _pending():
+    if not hasattr(_state, "pending"):
+        _state.pending = {}
+    return _state.pending
+
+
+def enqueue(instance, delete: bool = False) -> None:
+    """
+    Queue an index update for a saved or deleted object.
+
+    Later changes to the same object replace earlier ones, so a request that
+    saves a record several times indexes it once.
+    """
+    content_type = ContentType.objects.get_for_model(type(instance))
+    _pending()[(content_type.id, instance.pk)] = DELETE if delete else INDEX
+    # Callbacks after the first find the queue drained and do nothing; items
+    # left by a rolled-back transaction are reconciled against the database
+    transaction.on_commit(flush)
+
+
+def flush() -> None:
+    """Dispatch everything queued on this thread."""
+    pending = _pending()
+    if not pending:
+        return
+    items = [[ct_id, pk, action] for (ct_id, pk), action in pending.items()]
+    pending.clear()
+
+    batch_size = getattr(settings, "SEARCH_INDEX_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+    for start in range(0, len(items), batch_size):
+        dispatch(items[start : start + batch_size])
+
+
+def dispatch(items: List[list]) -> None:
+    """Hand a batch to Celery, or process it here when configured or on failure."""
+    if getattr(settings, "SEARCH_INDEX_BACKEND", "celery") == "celery":
+        try:
+            from .celery_tasks import update_search_index
+
+            update_search_index.delay(items)
+            return
+        except Exception:
+            logger.warning(
+                "Could not queue search index update; indexing in-process",
+                exc_info=True,
+            )
+    process_batch(items)
+
+
+def process_batch(items: Iterable[Sequence]) -> int:
+    """
+    Apply queued [content_type_id, object_id, action] items to the index.
+
+    Objects are re-read from the database, so an item for a row that no
+    longer exists removes its entry whatever action was queued.
+
+    Returns:
+        Number of objects indexed
+    """
+    by_type = defaultdict(dict)
+    for content_type_id, object_id, action in items:
+        by_type[content_type_id][object_id] = action
+
+    indexed = 0
+    for content_type_id, actions in by_type.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        if model not in INDEXED_MODELS:
+            continue
+        to_index = [pk for pk, action in actions.items() if action == INDEX]
+        objects = list(model.objects.filter(pk__in=to_index))
+        indexed += GlobalSearchIndex.index_objects(objects)
+
+        found = {obj.pk for obj in objects}
+        stale = [pk for pk in actions if pk not in found]
+        if stale:
+            GlobalSearchIndex.objects.filter(
+                content_type_id=content_type_id, object_id__in=stale
+            ).delete()
+    # Cached typeahead answers in this process may now be out of date
+    get_suggestion_service().invalidate()
+    return indexed
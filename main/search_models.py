@@ -3,9 +3,16 @@ import json
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 
+from .search.tokenizer import (
+    MAX_PREFIX_LENGTH,
+    MAX_TERM_LENGTH,
+    edge_ngrams,
+    term_frequencies,
+)
+
 User = get_user_model()
 
 
@@ -96,6 +103,9 @@ class GlobalSearchIndex(models.Model):
     boost_score = models.FloatField(
         default=1.0, help_text="Boost score for search ranking"
     )
+    term_count = models.PositiveIntegerField(
+        default=0, help_text="Number of indexed terms (document length for BM25)"
+    )
 
     class Meta:
         indexes = [
@@ -134,21 +144,155 @@ class GlobalSearchIndex(models.Model):
             or getattr(obj, "created_by", None)
         )
 
-        index, created = cls.objects.update_or_create(
-            content_type=content_type,
-            object_id=obj.pk,
-            defaults={
-                "title": title[:200],  # Truncate to field limit
-                "content": content,
-                "tags": tags,
-                "entity_type": obj.__class__.__name__.lower(),
-                "owner": owner,
-                "updated_at": timezone.now(),
-                "search_vector": cls._generate_search_vector(title, content, tags),
-            },
-        )
+        search_vector = cls._generate_search_vector(title, content, tags)
+        frequencies = term_frequencies(search_vector)
+        with transaction.atomic():
+            index, created = cls.objects.update_or_create(
+                content_type=content_type,
+                object_id=obj.pk,
+                defaults={
+                    "title": title[:200],  # Truncate to field limit
+                    "content": content,
+                    "tags": tags,
+                    "entity_type": obj.__class__.__name__.lower(),
+                    "owner": owner,
+                    "updated_at": timezone.now(),
+                    "search_vector": search_vector,
+                    "term_count": sum(frequencies.values()),
+                },
+            )
+            index.replace_postings(frequencies, created=created)
+            index.replace_suggestions(cls._suggestion_prefixes(obj, title), created)
         return index
 
+    @classmethod
+    def index_objects(cls, objs):
+        """
+        Index many objects of one model in a fixed number of queries.
+
+        Existing entries keep their id, created_at and boost_score; their
+        posting lists are replaced wholesale.
+
+        Returns:
+            Number of objects indexed
+        """
+        objs = list(objs)
+        if not objs:
+            return 0
+        content_type = ContentType.objects.get_for_model(objs[0])
+        now = timezone.now()
+
+        rows = {}
+        for obj in objs:
+            title = str(obj)
+            content = cls._extract_searchable_content(obj)
+            tags = cls._extract_tags(obj)
+            search_vector = cls._generate_search_vector(title, content, tags)
+            frequencies = term_frequencies(search_vector)
+            rows[obj.pk] = (
+                {
+                    "title": title[:200],
+                    "content": content,
+                    "tags": tags,
+                    "entity_type": obj.__class__.__name__.lower(),
+                    "owner_id": cls._owner_id(obj),
+                    "updated_at": now,
+                    "search_vector": search_vector,
+                    "term_count": sum(frequencies.values()),
+                },
+                frequencies,
+                cls._suggestion_prefixes(obj, title),
+            )
+
+        with transaction.atomic():
+            existing = {
+                entry.object_id: entry
+                for entry in cls.objects.filter(
+                    content_type=content_type, object_id__in=list(rows)
+                )
+            }
+            for object_id, entry in existing.items():
+                for field, value in rows[object_id][0].items():
+                    setattr(entry, field, value)
+            cls.objects.bulk_update(
+                existing.values(), list(rows[objs[0].pk][0]), batch_size=500
+            )
+            created = cls.objects.bulk_create(
+                [
+                    cls(content_type=content_type, object_id=object_id, **fields)
+                    for object_id, (fields, _, _) in rows.items()
+                    if object_id not in existing
+                ],
+                batch_size=500,
+            )
+
+            entries = list(existing.values()) + created
+            SearchPosting.objects.filter(entry__in=list(existing.values())).delete()
+            SearchPosting.objects.bulk_create(
+                [
+                    SearchPosting(entry=entry, term=term, term_frequency=count)
+                    for entry in entries
+                    for term, count in rows[entry.object_id][1].items()
+                ],
+                batch_size=2000,
+            )
+            SearchSuggestion.objects.filter(entry__in=list(existing.values())).delete()
+            SearchSuggestion.objects.bulk_create(
+                [
+                    SearchSuggestion(
+                        entry=entry,
+                        prefix=prefix,
+                        label=entry.title,
+                        entity_type=entry.entity_type,
+                    )
+                    for entry in entries
+                    for prefix in rows[entry.object_id][2]
+                ],
+                batch_size=2000,
+            )
+        return len(rows)
+
+    @staticmethod
+    def _suggestion_prefixes(obj, title):
+        """Typeahead prefixes of the object's label and email, if it has one."""
+        return edge_ngrams(title, getattr(obj, "email", "") or "")
+
+    @staticmethod
+    def _owner_id(obj):
+        """Owner id without loading the related user row."""
+        for field in ("owner_id", "user_id", "created_by_id"):
+            value = getattr(obj, field, None)
+            if value:
+                return value
+        return None
+
+    def replace_postings(self, frequencies, created=False):
+        """Rewrite this entry's posting-list rows from a term -> count map."""
+        if not created:
+            self.postings.all().delete()
+        SearchPosting.objects.bulk_create(
+            [
+                SearchPosting(entry=self, term=term, term_frequency=count)
+                for term, count in frequencies.items()
+            ]
+        )
+
+    def replace_suggestions(self, prefixes, created=False):
+        """Rewrite this entry's typeahead prefix rows."""
+        if not created:
+            self.suggestions.all().delete()
+        SearchSuggestion.objects.bulk_create(
+            [
+                SearchSuggestion(
+                    entry=self,
+                    prefix=prefix,
+                    label=self.title,
+                    entity_type=self.entity_type,
+                )
+                for prefix in prefixes
+            ]
+        )
+
     @classmethod
     def _extract_searchable_content(cls, obj):
         """Extract searchable content from an object"""
@@ -211,6 +355,61 @@ class GlobalSearchIndex(models.Model):
         cls.objects.filter(content_type=content_type, object_id=obj.pk).delete()
 
 
+class SearchPosting(models.Model):
+    """
+    Inverted-index row: one term occurring in one GlobalSearchIndex entry.
+    Queries look up their terms here through the (term, entry) index instead
+    of scanning every searchable table.
+    """
+
+    entry = models.ForeignKey(
+        GlobalSearchIndex, on_delete=models.CASCADE, related_name="postings"
+    )
+    term = models.CharField(max_length=MAX_TERM_LENGTH)
+    term_frequency = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["term", "entry"], name="search_posting_term_entry"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.term} -> {self.entry_id} ({self.term_frequency})"
+
+
+class SearchSuggestion(models.Model):
+    """
+    Typeahead prefix row: one edge n-gram of an index entry's label or email.
+    Suggestions are an equality lookup on (prefix, entity_type), ordered by
+    label straight from the index.
+    """
+
+    entry = models.ForeignKey(
+        GlobalSearchIndex, on_delete=models.CASCADE, related_name="suggestions"
+    )
+    prefix = models.CharField(max_length=MAX_PREFIX_LENGTH)
+    label = models.CharField(max_length=200)
+    entity_type = models.CharField(max_length=50)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["prefix", "entry"], name="search_suggestion_prefix_entry"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["prefix", "entity_type", "label"],
+                name="search_suggestion_lookup_idx",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.prefix} -> {self.label}"
+
+
 class BulkOperation(models.Model):
     """Track bulk operations for auditing and progress"""
 
@@ -1,10 +1,15 @@
-import re
-from typing import Any, Dict, List, Tuple, cast
+from typing import Any, Dict, Tuple, cast
 
 from django.db.models import Q
 
+from . import bulk_operations
+from .bulk_operations import resolve_update_fields
+from .pagination import Keyset
+from .saved_search_cache import cached_results, count_usage
+from .search.db_provider import DatabaseSearchProvider
 from .search.factory import SearchProviderFactory
-from .search_models import GlobalSearchIndex, SavedSearch
+from .search_export import check_format, export_columns
+from .search_models import BulkOperation, SavedSearch
 
 
 class SearchService:
@@ -14,6 +19,8 @@ class SearchService:
     delegating search-related tasks to it.
     """
 
+    SEARCHABLE_MODELS = DatabaseSearchProvider.SEARCHABLE_MODELS
+
     def __init__(self, user=None):
         self.user = user
         self.provider_factory = SearchProviderFactory()
@@ -40,6 +47,34 @@ class SearchService:
             ),
         )
 
+    def advanced_search_page(
+        self,
+        entity_type: str,
+        query: str = "",
+        filters: Dict[str, Any] = None,
+        sort_by: str = None,
+        sort_order: str = "desc",
+        limit: int = 50,
+        cursor: str | None = None,
+        count_mode: str | None = None,
+    ) -> Dict[str, Any]:
+        """
+        Cursor-paginated advanced search; pages cost the same at any depth.
+        """
+        return cast(
+            Dict[str, Any],
+            self.provider.advanced_search_page(
+                entity_type,
+                query,
+                filters,
+                sort_by,
+                sort_order,
+                limit,
+                cursor,
+                count_mode,
+            ),
+        )
+
     def get_search_suggestions(
         self, query: str, entity_type: str | None = None, limit: int = 10
     ) -> list[dict]:
@@ -82,73 +117,66 @@ class SearchService:
         return saved_search
 
     def execute_saved_search(
-        self, saved_search_id: int, offset: int = 0, limit: int = 50
+        self,
+        saved_search_id: int,
+        offset: int = 0,
+        limit: int = 50,
+        saved_search: SavedSearch | None = None,
+        record_usage: bool = True,
     ) -> Tuple[list, int]:
-        """Execute a saved search"""
-
-        saved_search_temp = SavedSearch.objects.get(id=saved_search_id)
-        saved_search = SavedSearch.objects.get(
-            id=saved_search_id,
-            user=self.user
-            if not saved_search_temp.is_public
-            else saved_search_temp.user,
-        )
+        """
+        Execute a saved search the user owns or that is public.
 
-        # Increment usage
-        saved_search.increment_usage()
+        Results are served from the saved-search cache while the search
+        definition and the searchable data are unchanged; usage is counted in the
+        cache and written in batches by the precompute task.
+        """
+        if saved_search is None:
+            saved_search = SavedSearch.objects.get(
+                Q(user=self.user) | Q(is_public=True), id=saved_search_id
+            )
+
+        if record_usage:
+            count_usage(saved_search.pk)
 
-        # Execute the search
+        return cached_results(
+            saved_search,
+            self.user,
+            offset,
+            limit,
+            lambda: self._run_saved_search(saved_search, offset, limit),
+        )
+
+    def _run_saved_search(
+        self, saved_search: SavedSearch, offset: int, limit: int
+    ) -> Tuple[Any, int]:
         if saved_search.search_type == "global":
             results = self.global_search(
                 saved_search.search_query, saved_search.get_filters_dict()
             )
             return results, sum(len(v) for v in results.values())
-        else:
-            return self.advanced_search(
-                saved_search.search_type,
-                saved_search.search_query,
-                saved_search.get_filters_dict(),
-                saved_search.sort_by,
-                saved_search.sort_order,
-                offset,
-                limit,
-            )
+        return self.advanced_search(
+            saved_search.search_type,
+            saved_search.search_query,
+            saved_search.get_filters_dict(),
+            saved_search.sort_by,
+            saved_search.sort_order,
+            offset,
+            limit,
+        )
 
     def global_search(
         self, query: str, filters: Dict[str, Any] | None = None, limit: int = 50
     ) -> dict[str, list]:
-        """Perform global search across all entities"""
-        results = {}
-
+        """Perform global search across all entities via the search provider"""
         if not query or len(query.strip()) < 2:
-            return results
-
-        # Normalize query
-        query = query.strip().lower()
-        search_terms = self._extract_search_terms(query)
-
-        for entity_type, model in self.SEARCHABLE_MODELS.items():
-            # Apply user-based filtering
-            queryset = self._get_user_queryset(model)
+            return {}
 
-            # Apply search
-            search_results = self._search_in_model(queryset, search_terms, model)
-
-            # Apply additional filters if provided
-            if filters and entity_type in filters:
-                search_results = self._apply_filters(
-                    search_results, filters[entity_type], model
-                )
-
-            # Limit results
-            search_results = search_results[:limit]
-
-            if search_results:
-                results[entity_type] = [
-                    self._serialize_search_result(obj) for obj in search_results
-                ]
-
-        return results
+        matches = self.provider.global_search(query.strip(), filters, limit)
+        return {
+            entity_type: [self._serialize_search_result(obj) for obj in objects]
+            for entity_type, objects in matches.items()
+        }
 
     def get_search_models(self):
         """Return the list of searchable models"""
@@ -177,50 +205,6 @@ class SearchService:
 
         return queryset
 
-    def _extract_search_terms(self, query: str) -> List[str]:
-        """Extract search terms from query string"""
-        # Remove special characters and split by spaces
-        clean_query = re.sub(r"[^\w\s]", " ", query)
-        terms = [term.strip() for term in clean_query.split() if len(term.strip()) >= 2]
-        return terms
-
-    def _search_in_model(self, queryset, search_terms: List[str], model):
-        """Apply search terms to a model queryset"""
-        if not search_terms:
-            return queryset
-
-        search_fields = self._get_search_fields(model)
-        query = Q()
-
-        for term in search_terms:
-            term_query = Q()
-            for field in search_fields:
-                term_query |= Q(**{f"{field}__icontains": term})
-            query &= term_query
-
-        return queryset.filter(query).distinct()
-
-    def _get_search_fields(self, model) -> List[str]:
-        """Get searchable fields for a model"""
-        search_fields_map = {
-            "Account": ["name", "website", "description", "phone", "email"],
-            "Contact": [
-                "first_name",
-                "last_name",
-                "email",
-                "phone",
-                "title",
-                "company",
-            ],
-            "Project": ["title", "description"],
-            "Deal": ["name", "description"],
-            "Quote": ["quote_number", "notes"],
-            "Invoice": ["invoice_number", "notes"],
-        }
-
-        model_name = model.__name__
-        return search_fields_map.get(model_name, ["name"])
-
     def _apply_filters(self, queryset, filters: Dict[str, Any], model):
         """Apply filters to queryset"""
         filter_kwargs = {}
@@ -297,12 +281,19 @@ class SearchService:
             result["due_date"] = obj.due_date.isoformat() if obj.due_date else None
         if hasattr(obj, "created_at"):
             result["created_at"] = obj.created_at.isoformat()
+        if hasattr(obj, "search_score"):
+            result["score"] = obj.search_score
 
         return result
 
 
 class BulkOperationService:
-    """Service for handling bulk operations"""
+    """
+    Service for handling bulk operations.
+
+    Operations are recorded as pending BulkOperation rows and executed in the
+    background by main.bulk_operations once the request commits.
+    """
 
     def __init__(self, user):
         self.user = user
@@ -312,96 +303,98 @@ class BulkOperationService:
         entity_type: str,
         filters: Dict[str, Any],
         update_data: Dict[str, Any],
-        batch_size: int = 100,
+        batch_size: int | None = None,
     ):
-        """Perform bulk update operation"""
-        from django.utils import timezone
-
-        from .search_models import BulkOperation
-
-        if entity_type not in SearchService.SEARCHABLE_MODELS:
-            raise ValueError(f"Entity type '{entity_type}' not supported")
-
-        model = SearchService.SEARCHABLE_MODELS[entity_type]
+        """
+        Queue a bulk update of the user's records matching filters.
 
-        # Create bulk operation record
-        bulk_op = BulkOperation.objects.create(
-            operation_type="update",
-            user=self.user,
-            entity_type=entity_type,
-            filters=filters,
-            operation_data=update_data,
+        Raises:
+            ValueError: If the entity type, a field or a value is invalid
+        """
+        model = self._model(entity_type)
+        resolve_update_fields(model, update_data)
+        return self._queue(
+            "update",
+            entity_type,
+            filters,
+            {"update_data": update_data, "batch_size": batch_size},
         )
 
-        try:
-            # Get search service
-            search_service = SearchService(self.user)
-
-            # Get queryset to update
-            queryset = search_service._get_user_queryset(model)
-            queryset = search_service._apply_filters(queryset, filters, model)
-
-            bulk_op.total_records = queryset.count()
-            bulk_op.status = "running"
-            bulk_op.started_at = timezone.now()
-            bulk_op.save()
-
-            # Process in batches
-            processed = 0
-            successful = 0
-
-            for batch in self._batch_queryset(queryset, batch_size):
-                for obj in batch:
-                    try:
-                        # Update object
-                        for field, value in update_data.items():
-                            if hasattr(obj, field):
-                                setattr(obj, field, value)
-                        obj.save()
-
-                        successful += 1
-
-                        # Update search index
-                        GlobalSearchIndex.update_or_create_for_object(obj)
+    def bulk_delete(
+        self, entity_type: str, filters: Dict[str, Any], batch_size: int | None = None
+    ):
+        """
+        Queue a bulk delete of the user's records matching filters.
 
-                    except Exception:
-                        bulk_op.failed_records += 1
+        Raises:
+            ValueError: If the entity type is not supported
+        """
+        self._model(entity_type)
+        return self._queue("delete", entity_type, filters, {"batch_size": batch_size})
 
-                    processed += 1
+    def bulk_export(
+        self,
+        entity_type: str | None = None,
+        query: str = "",
+        filters: Dict[str, Any] | None = None,
+        export_format: str = "csv",
+        fields: list | None = None,
+        sort_by: str | None = None,
+        sort_order: str = "asc",
+        saved_search_id: int | None = None,
+    ):
+        """
+        Queue an export of the user's records matching a search to a file.
 
-                # Update progress
-                bulk_op.processed_records = processed
-                bulk_op.successful_records = successful
-                bulk_op.save()
+        A saved search, when given, supplies the entity type, query, filters
+        and sort order.
 
-            # Mark as completed
-            bulk_op.status = "completed"
-            bulk_op.completed_at = timezone.now()
-            bulk_op.save()
+        Raises:
+            ValueError: If the search, format, fields or sort field is invalid
+            SavedSearch.DoesNotExist: If the saved search is not visible
+        """
+        if saved_search_id:
+            saved_search = SavedSearch.objects.get(
+                Q(user=self.user) | Q(is_public=True), id=saved_search_id
+            )
+            entity_type = saved_search.search_type
+            query = saved_search.search_query
+            filters = saved_search.get_filters_dict()
+            sort_by = saved_search.sort_by
+            sort_order = saved_search.sort_order
+
+        model = self._model(entity_type)
+        check_format(export_format)
+        export_columns(model, fields)
+        Keyset(model, sort_by or "pk", sort_order == "desc")
+        return self._queue(
+            "export",
+            entity_type,
+            filters,
+            {
+                "query": query,
+                "format": export_format,
+                "fields": fields,
+                "sort_by": sort_by,
+                "sort_order": sort_order,
+                "saved_search_id": saved_search_id,
+            },
+        )
 
-        except Exception as e:
-            bulk_op.status = "failed"
-            bulk_op.error_message = str(e)
-            bulk_op.completed_at = timezone.now()
-            bulk_op.save()
-            raise
+    def _model(self, entity_type: str):
+        if entity_type not in SearchService.SEARCHABLE_MODELS:
+            raise ValueError(f"Entity type '{entity_type}' not supported")
+        return SearchService.SEARCHABLE_MODELS[entity_type]
 
+    def _queue(self, operation_type, entity_type, filters, operation_data):
+        bulk_op = BulkOperation.objects.create(
+            operation_type=operation_type,
+            user=self.user,
+            entity_type=entity_type,
+            filters=filters or {},
+            operation_data=operation_data,
+        )
+        bulk_operations.queue(bulk_op.pk)
+        # Runs already when not inside a transaction and the backend is sync
+        bulk_op.refresh_from_db()
         return bulk_op
-
-    def bulk_delete(
-        self, entity_type: str, filters: Dict[str, Any], batch_size: int = 100
-    ):
-        """Perform bulk delete operation"""
-        # Similar implementation to bulk_update but for deletion
-        # Implementation would be similar to bulk_update
-        pass
-
-    def _batch_queryset(self, queryset, batch_size):
-        """Yield batches of queryset"""
-        start = 0
-        while True:
-            batch = list(queryset[start : start + batch_size])
-            if not batch:
-                break
-            yield batch
-            start += batch_size
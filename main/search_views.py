@@ -1,6 +1,9 @@
 import json
+import os
 
+from django.core.files.storage import default_storage
 from django.db.models import Q
+from django.http import FileResponse
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
@@ -9,6 +12,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .search_export import EXPORT_FORMATS
 from .search_models import BulkOperation, SavedSearch
 from .search_service import BulkOperationService, SearchService
 from .serializers import BulkOperationSerializer, SavedSearchSerializer
@@ -73,6 +77,27 @@ class SearchAPIView(APIView):
                         "message": "Global search aggregates results from multiple entities.",
                     }
                 )
+            elif "cursor" in request.query_params:
+                # Keyset pagination: ?cursor= (empty) for the first page, then
+                # next_cursor/previous_cursor; totals only when ?count= asks
+                page = search_service.advanced_search_page(
+                    search_type,
+                    query,
+                    filters,
+                    sort_by,
+                    sort_order,
+                    limit,
+                    cursor=request.query_params.get("cursor") or None,
+                    count_mode=request.query_params.get("count"),
+                )
+                return Response(
+                    {
+                        **page,
+                        "limit": limit,
+                        "query": query,
+                        "type": search_type,
+                    }
+                )
             else:
                 results, total_count = search_service.advanced_search(
                     search_type, query, filters, sort_by, sort_order, offset, limit
@@ -147,7 +172,7 @@ class SavedSearchViewSet(viewsets.ModelViewSet):
 
         try:
             results, total_count = search_service.execute_saved_search(
-                saved_search.id, offset, limit
+                saved_search.id, offset, limit, saved_search=saved_search
             )
 
             return Response(
@@ -216,6 +241,35 @@ class BulkOperationViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+    @action(detail=True, methods=["get"])
+    def download(self, request, pk=None):
+        """Download the file produced by a completed export"""
+        bulk_operation = self.get_object()
+        file_name = (bulk_operation.results or {}).get("file")
+
+        if (
+            bulk_operation.operation_type != "export"
+            or bulk_operation.status != "completed"
+            or not file_name
+        ):
+            return Response(
+                {"error": "No export file is available for this operation"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        if not default_storage.exists(file_name):
+            return Response(
+                {"error": "Export file has been removed"},
+                status=status.HTTP_410_GONE,
+            )
+
+        content_type = EXPORT_FORMATS[bulk_operation.results["format"]][0]
+        return FileResponse(
+            default_storage.open(file_name, "rb"),
+            as_attachment=True,
+            filename=os.path.basename(file_name),
+            content_type=content_type,
+        )
+
 
 class BulkUpdateAPIView(APIView):
     """API endpoint for bulk update operations"""
@@ -227,7 +281,8 @@ class BulkUpdateAPIView(APIView):
         entity_type = request.data.get("entity_type")
         filters = request.data.get("filters", {})
         update_data = request.data.get("update_data", {})
-        batch_size = int(request.data.get("batch_size", 100))
+        batch_size = request.data.get("batch_size")
+        batch_size = int(batch_size) if batch_size else None
 
         if not entity_type or not update_data:
             return Response(
@@ -252,6 +307,79 @@ class BulkUpdateAPIView(APIView):
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
+class BulkDeleteAPIView(APIView):
+    """API endpoint for bulk delete operations"""
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """Queue a bulk delete"""
+        entity_type = request.data.get("entity_type")
+        filters = request.data.get("filters", {})
+        batch_size = request.data.get("batch_size")
+        batch_size = int(batch_size) if batch_size else None
+
+        if not entity_type:
+            return Response(
+                {"error": "entity_type is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        bulk_service = BulkOperationService(request.user)
+
+        try:
+            bulk_operation = bulk_service.bulk_delete(entity_type, filters, batch_size)
+
+            return Response(
+                {
+                    "bulk_operation": BulkOperationSerializer(bulk_operation).data,
+                    "message": "Bulk delete operation started",
+                }
+            )
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class BulkExportAPIView(APIView):
+    """API endpoint for bulk export operations"""
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """Queue an export of search results to CSV, XLSX or NDJSON"""
+        entity_type = request.data.get("entity_type")
+        saved_search_id = request.data.get("saved_search_id")
+
+        if not entity_type and not saved_search_id:
+            return Response(
+                {"error": "entity_type or saved_search_id is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        bulk_service = BulkOperationService(request.user)
+
+        try:
+            bulk_operation = bulk_service.bulk_export(
+                entity_type,
+                query=request.data.get("q", ""),
+                filters=request.data.get("filters", {}),
+                export_format=request.data.get("format", "csv"),
+                fields=request.data.get("fields"),
+                sort_by=request.data.get("sort_by"),
+                sort_order=request.data.get("sort_order", "asc"),
+                saved_search_id=saved_search_id,
+            )
+
+            return Response(
+                {
+                    "bulk_operation": BulkOperationSerializer(bulk_operation).data,
+                    "message": "Bulk export operation started",
+                }
+            )
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
 class SearchFiltersAPIView(APIView):
     """API endpoint for getting available search filters"""
 
@@ -33,6 +33,7 @@ from .models import (
     InvoiceItem,
     JournalEntry,
     LedgerAccount,
+    LedgerPeriod,
     LineItem,
     LogEntry,
     MonthlyDistribution,
@@ -712,7 +713,47 @@ class JournalEntrySerializer(serializers.ModelSerializer):
             "credit_account_id",
             "amount",
             "created_at",
+            "source_type",
+            "source_id",
+            "posting_kind",
+            "currency",
+            "amount_minor",
         ]
+        read_only_fields = [
+            "source_type",
+            "source_id",
+            "posting_kind",
+            "currency",
+            "amount_minor",
+        ]
+
+    def validate_date(self, value):
+        """Reject postings (and edits of postings) inside a closed period."""
+        from django.core.exceptions import ValidationError as DjangoValidationError
+
+        from .ledger_service import get_ledger_service
+
+        service = get_ledger_service()
+        try:
+            service.assert_period_open(value)
+            if self.instance is not None:
+                service.assert_period_open(self.instance.date)
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError(exc.messages)
+        return value
+
+
+class LedgerPeriodSerializer(serializers.ModelSerializer):
+    closed_by = serializers.StringRelatedField(read_only=True)
+    account_count = serializers.SerializerMethodField()
+
+    class Meta:
+        model = LedgerPeriod
+        fields = ["id", "period_end", "closed_at", "closed_by", "account_count"]
+        read_only_fields = fields
+
+    def get_account_count(self, obj):
+        return obj.closing_balances.count()
 
 
 class LineItemSerializer(serializers.ModelSerializer):
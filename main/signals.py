@@ -1,16 +1,28 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 from django_mailbox.signals import message_received
 
+from . import search_indexer
 from .models import (
+    Account,
     ActivityLog,
     Contact,
     Deal,
+    Expense,
     Interaction,
+    Invoice,
+    InvoiceItem,
+    JournalEntry,
+    LineItem,
     MonthlyDistribution,
+    Payment,
     Project,
+    Quote,
     ScheduledEvent,
+    TimeEntry,
+    WarehouseItem,
     WorkOrder,
+    WorkOrderInvoice,
 )
 
 
@@ -351,3 +363,331 @@ def monthly_distribution_post_delete(sender, instance, created, **kwargs):
     rows atomically inside a transaction.
     """
     return
+
+
+# ---------------------------------------------------------------------------
+# Ledger: keep materialized daily balances in step with JournalEntry writes
+# ---------------------------------------------------------------------------
+
+
+@receiver(pre_save, sender=JournalEntry)
+def journal_entry_capture_previous(sender, instance, raw=False, **kwargs):
+    """
+    Reject postings into closed periods and remember the stored posting so an
+    edit can be reversed before re-applying.
+    """
+    instance._ledger_previous = None
+    if raw:
+        return
+    from .ledger_service import get_ledger_service
+
+    service = get_ledger_service()
+    service.assert_period_open(instance.date)
+    if instance.pk:
+        instance._ledger_previous = (
+            JournalEntry.objects.filter(pk=instance.pk)
+            .only("date", "debit_account_id", "credit_account_id", "amount")
+            .first()
+        )
+        if instance._ledger_previous is not None:
+            service.assert_period_open(instance._ledger_previous.date)
+
+
+@receiver(pre_delete, sender=JournalEntry)
+def journal_entry_guard_delete(sender, instance, **kwargs):
+    """Entries inside a closed period cannot be deleted."""
+    from .ledger_service import get_ledger_service
+
+    get_ledger_service().assert_period_open(instance.date)
+
+
+@receiver(post_save, sender=JournalEntry)
+def journal_entry_update_balances(sender, instance, created, raw=False, **kwargs):
+    """Apply a new or edited JournalEntry to LedgerDailyBalance."""
+    if raw:
+        return
+    from .ledger_service import get_ledger_service
+
+    service = get_ledger_service()
+    previous = getattr(instance, "_ledger_previous", None)
+    if previous is not None:
+        service.record_entries([previous], sign=-1)
+    service.record_entries([instance])
+
+
+@receiver(post_delete, sender=JournalEntry)
+def journal_entry_reverse_balances(sender, instance, **kwargs):
+    """Remove a deleted JournalEntry from LedgerDailyBalance."""
+    from .ledger_service import get_ledger_service
+
+    get_ledger_service().record_entries([instance], sign=-1)
+
+
+# ---------------------------------------------------------------------------
+# Reports: invalidate cached financial reports when their source data changes.
+# JournalEntry writes bump the version in LedgerService.record_entries, which
+# also covers bulk posting.
+# ---------------------------------------------------------------------------
+
+
+@receiver(post_save, sender=Invoice)
+@receiver(post_delete, sender=Invoice)
+@receiver(post_save, sender=InvoiceItem)
+@receiver(post_delete, sender=InvoiceItem)
+@receiver(post_save, sender=Expense)
+@receiver(post_delete, sender=Expense)
+@receiver(post_save, sender=WorkOrderInvoice)
+@receiver(post_delete, sender=WorkOrderInvoice)
+def report_source_changed(sender, instance, raw=False, **kwargs):
+    """Bump the ledger version so cached reports are recomputed."""
+    if raw:
+        return
+    from .report_cache import bump_ledger_version
+
+    bump_ledger_version()
+
+
+# ---------------------------------------------------------------------------
+# Receivables: keep ReceivableOpenItem balances in step with invoices, invoice
+# items and payments (same transaction as the triggering write)
+# ---------------------------------------------------------------------------
+
+
+@receiver(post_save, sender=Invoice)
+@receiver(post_save, sender=WorkOrderInvoice)
+def receivable_saved(sender, instance, raw=False, **kwargs):
+    """Refresh the open item of a created or edited invoice."""
+    if raw:
+        return
+    from .receivables_service import get_receivables_service
+
+    get_receivables_service().refresh(instance)
+
+
+@receiver(post_delete, sender=Invoice)
+@receiver(post_delete, sender=WorkOrderInvoice)
+def receivable_deleted(sender, instance, **kwargs):
+    """Drop the open item of a deleted invoice."""
+    from .receivables_service import get_receivables_service
+
+    get_receivables_service().remove(instance)
+
+
+@receiver(post_save, sender=InvoiceItem)
+@receiver(post_delete, sender=InvoiceItem)
+def invoice_item_changed(sender, instance, raw=False, **kwargs):
+    """Invoice totals come from their items; refresh the parent open item."""
+    if raw:
+        return
+    from .receivables_service import get_receivables_service
+
+    get_receivables_service().refresh_for(Invoice, instance.invoice_id)
+
+
+def _account_may_have_changed(kwargs, field) -> bool:
+    update_fields = kwargs.get("update_fields")
+    return not kwargs.get("created") and (
+        update_fields is None or field in update_fields
+    )
+
+
+@receiver(post_save, sender=Deal)
+def deal_account_changed(sender, instance, raw=False, **kwargs):
+    """Keep the customer account cached on the deal's invoice open items."""
+    if raw or not _account_may_have_changed(kwargs, "account"):
+        return
+    from .receivables_service import get_receivables_service
+
+    get_receivables_service().sync_account(
+        Invoice,
+        Invoice.objects.filter(deal=instance).values("id"),
+        instance.account_id,
+    )
+
+
+@receiver(post_save, sender=Project)
+def project_account_changed(sender, instance, raw=False, **kwargs):
+    """Work order invoices take their customer account from the project."""
+    if raw or not _account_may_have_changed(kwargs, "account"):
+        return
+    from .receivables_service import get_receivables_service
+
+    get_receivables_service().sync_account(
+        WorkOrderInvoice,
+        WorkOrderInvoice.objects.filter(work_order__project=instance).values("id"),
+        instance.account_id,
+    )
+
+
+@receiver(post_save, sender=WorkOrder)
+def work_order_project_changed(sender, instance, raw=False, **kwargs):
+    """A work order moved to another project moves its invoices' account."""
+    if raw or not _account_may_have_changed(kwargs, "project"):
+        return
+    from .receivables_service import get_receivables_service
+
+    get_receivables_service().sync_account(
+        WorkOrderInvoice,
+        WorkOrderInvoice.objects.filter(work_order=instance).values("id"),
+        Project.objects.filter(pk=instance.project_id)
+        .values_list("account_id", flat=True)
+        .first(),
+    )
+
+
+@receiver(pre_save, sender=Payment)
+def payment_capture_previous_target(sender, instance, raw=False, **kwargs):
+    """Remember the stored target so a re-pointed payment refreshes both."""
+    instance._receivable_previous = None
+    if raw or not instance.pk:
+        return
+    instance._receivable_previous = (
+        Payment.objects.filter(pk=instance.pk)
+        .values_list("content_type_id", "object_id")
+        .first()
+    )
+
+
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+def payment_changed(sender, instance, raw=False, **kwargs):
+    """Refresh total_paid on the open item(s) a payment applies to."""
+    if raw:
+        return
+    from .receivables_service import refresh_payment_targets
+
+    targets = {(instance.content_type_id, instance.object_id)}
+    previous = getattr(instance, "_receivable_previous", None)
+    if previous:
+        targets.add(previous)
+    refresh_payment_targets(targets)
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_save, sender=Contact)
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Deal)
+@receiver(post_save, sender=Quote)
+@receiver(post_save, sender=Invoice)
+def search_index_saved(sender, instance, raw=False, **kwargs):
+    """Queue a global search index update for saved searchable records."""
+    if not raw:
+        search_indexer.enqueue(instance)
+
+
+@receiver(post_delete, sender=Account)
+@receiver(post_delete, sender=Contact)
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Deal)
+@receiver(post_delete, sender=Quote)
+@receiver(post_delete, sender=Invoice)
+def search_index_deleted(sender, instance, **kwargs):
+    """Queue removal of deleted searchable records from the search index."""
+    search_indexer.enqueue(instance, delete=True)
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_save, sender=Contact)
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Deal)
+@receiver(post_save, sender=Quote)
+@receiver(post_save, sender=Invoice)
+@receiver(post_delete, sender=Account)
+@receiver(post_delete, sender=Contact)
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Deal)
+@receiver(post_delete, sender=Quote)
+@receiver(post_delete, sender=Invoice)
+def saved_search_source_changed(sender, instance, raw=False, **kwargs):
+    """Bump the search data version so cached saved-search results are rerun."""
+    if raw:
+        return
+    from .saved_search_cache import bump_data_version
+
+    bump_data_version()
+
+
+# ---------------------------------------------------------------------------
+# Dashboard: invalidate the cached analytics payload when its sources change
+# ---------------------------------------------------------------------------
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+@receiver(post_save, sender=Deal)
+@receiver(post_delete, sender=Deal)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=WorkOrder)
+@receiver(post_delete, sender=WorkOrder)
+@receiver(post_save, sender=LineItem)
+@receiver(post_delete, sender=LineItem)
+@receiver(post_save, sender=WorkOrderInvoice)
+@receiver(post_delete, sender=WorkOrderInvoice)
+@receiver(post_save, sender=Expense)
+@receiver(post_delete, sender=Expense)
+@receiver(post_save, sender=TimeEntry)
+@receiver(post_delete, sender=TimeEntry)
+@receiver(post_save, sender=WarehouseItem)
+@receiver(post_delete, sender=WarehouseItem)
+def dashboard_source_changed(sender, instance, raw=False, **kwargs):
+    """Bump the dashboard data version so the cached payload is rebuilt."""
+    if raw:
+        return
+    from .dashboard_analytics import bump_data_version
+
+    bump_data_version()
+
+
+# ---------------------------------------------------------------------------
+# Metric rollups: apply each source row write to MetricDailyRollup (same
+# transaction as the write); the stored row is loaded first so an edit moves
+# its contribution instead of adding a second one
+# ---------------------------------------------------------------------------
+
+
+@receiver(pre_save, sender=Deal)
+@receiver(pre_save, sender=Project)
+@receiver(pre_save, sender=Payment)
+@receiver(pre_save, sender=WorkOrderInvoice)
+@receiver(pre_save, sender=Expense)
+def rollup_capture_previous(sender, instance, raw=False, **kwargs):
+    """Remember the stored state of an edited row."""
+    instance._rollup_previous = None
+    if raw or not instance.pk:
+        return
+    from .rollup_service import get_rollup_service
+
+    instance._rollup_previous = (
+        sender.objects.filter(pk=instance.pk)
+        .only(*get_rollup_service().source_fields(sender))
+        .first()
+    )
+
+
+@receiver(post_save, sender=Deal)
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Payment)
+@receiver(post_save, sender=WorkOrderInvoice)
+@receiver(post_save, sender=Expense)
+def rollup_saved(sender, instance, raw=False, **kwargs):
+    """Move a created or edited row's contribution to its current cells."""
+    if raw:
+        return
+    from .rollup_service import get_rollup_service
+
+    get_rollup_service().record_change(
+        getattr(instance, "_rollup_previous", None), instance
+    )
+
+
+@receiver(post_delete, sender=Deal)
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Payment)
+@receiver(post_delete, sender=WorkOrderInvoice)
+@receiver(post_delete, sender=Expense)
+def rollup_deleted(sender, instance, **kwargs):
+    """Remove a deleted row's contribution."""
+    from .rollup_service import get_rollup_service
+
+    get_rollup_service().record_change(previous=instance)
@@ -0,0 +1,185 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from main.analytics_backfill import backfill, split_range
+from main.models import (
+    Account,
+    AnalyticsSnapshot,
+    CustomUser,
+    Deal,
+    DealStage,
+    Payment,
+    Project,
+    ScheduledEvent,
+    SchedulingAnalytics,
+    Technician,
+    WorkOrder,
+    WorkOrderInvoice,
+)
+
+
+class AnalyticsBackfillTests(TestCase):
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.start = self.today - timedelta(days=2)
+        user = CustomUser.objects.create_user(username="backfill", password="p")
+        account = Account.objects.create(name="Backfill Co", owner=user)
+        stage = DealStage.objects.create(name="qualified", order=1)
+        for days_ago, status in [(5, "won"), (1, "lost"), (0, "in_progress")]:
+            deal = Deal.objects.create(
+                title=f"Deal {days_ago}",
+                account=account,
+                value=Decimal("100.00"),
+                owner=user,
+                stage=stage,
+                status=status,
+            )
+            Deal.objects.filter(pk=deal.pk).update(
+                created_at=timezone.now() - timedelta(days=days_ago)
+            )
+        Account.objects.filter(pk=account.pk).update(
+            created_at=timezone.now() - timedelta(days=10)
+        )
+
+        self.project = Project.objects.create(title="Backfill", created_by=user)
+        work_order = WorkOrder.objects.create(project=self.project, description="WO")
+        invoice = WorkOrderInvoice.objects.create(
+            work_order=work_order,
+            issued_date=self.today - timedelta(days=4),
+            due_date=self.today - timedelta(days=2),
+            total_amount=Decimal("80.00"),
+            is_paid=True,
+            paid_date=self.today,
+        )
+        for days_ago, amount in [(3, "30.00"), (1, "50.00")]:
+            Payment.objects.create(
+                amount=Decimal(amount),
+                payment_date=self.today - timedelta(days=days_ago),
+                content_type=ContentType.objects.get_for_model(invoice),
+                object_id=invoice.pk,
+            )
+
+        self.technician = Technician.objects.create(first_name="T", last_name="One")
+        Technician.objects.create(
+            first_name="T", last_name="Two", employee_id="T2", is_active=False
+        )
+        Technician.objects.update(created_at=timezone.now() - timedelta(days=10))
+        # bulk_create skips the notification and reservation signals
+        ScheduledEvent.objects.bulk_create(
+            ScheduledEvent(
+                work_order=work_order,
+                technician=self.technician,
+                start_time=timezone.now() - timedelta(days=1),
+                end_time=timezone.now() - timedelta(days=1) + timedelta(hours=1),
+                status=status,
+            )
+            for status in ["completed", "cancelled"]
+        )
+
+    def test_snapshots_are_running_totals_per_day(self):
+        written = backfill(self.start, self.today, ["snapshots"])
+        self.assertEqual(written, {"snapshots": 3})
+
+        first, middle, last = AnalyticsSnapshot.objects.order_by("date")
+        self.assertEqual(first.date, self.start)
+        self.assertEqual(first.total_deals, 1)
+        self.assertEqual(first.won_deals, 1)
+        self.assertEqual(first.total_revenue, Decimal("30.00"))
+        self.assertEqual(first.outstanding_invoices, Decimal("80.00"))
+        self.assertEqual(first.overdue_invoices, Decimal("0.00"))
+
+        self.assertEqual(middle.total_deals, 2)
+        self.assertEqual(middle.lost_deals, 1)
+        self.assertEqual(middle.total_revenue, Decimal("80.00"))
+        self.assertEqual(middle.overdue_invoices, Decimal("80.00"))
+
+        # Paid today, so no longer outstanding at the end of today
+        self.assertEqual(last.total_deals, 3)
+        self.assertEqual(last.outstanding_invoices, Decimal("0.00"))
+        self.assertEqual(last.total_accounts, 1)
+
+    def test_backfilled_today_matches_the_daily_snapshot(self):
+        backfill(self.today, self.today, ["snapshots"])
+        backfilled = AnalyticsSnapshot.objects.get(date=self.today)
+        daily = AnalyticsSnapshot.create_daily_snapshot()
+        for field in [
+            "total_revenue",
+            "total_deals",
+            "won_deals",
+            "lost_deals",
+            "active_projects",
+            "completed_projects",
+            "total_contacts",
+            "total_accounts",
+        ]:
+            self.assertEqual(getattr(backfilled, field), getattr(daily, field), field)
+
+    def test_rerun_upserts_instead_of_duplicating(self):
+        backfill(self.start, self.today)
+        Deal.objects.filter(title="Deal 1").update(status="won")
+        backfill(self.start, self.today)
+        self.assertEqual(AnalyticsSnapshot.objects.count(), 3)
+        yesterday = AnalyticsSnapshot.objects.get(date=self.today - timedelta(days=1))
+        self.assertEqual(yesterday.won_deals, 2)
+
+    def test_scheduling_analytics(self):
+        backfill(self.start, self.today, ["scheduling"])
+        row = SchedulingAnalytics.objects.get(date=self.today - timedelta(days=1))
+        self.assertEqual(row.total_scheduled_events, 2)
+        self.assertEqual(row.completed_events, 1)
+        self.assertEqual(row.cancelled_events, 1)
+        self.assertEqual(row.total_technicians, 2)
+        self.assertEqual(row.active_technicians, 1)
+        self.assertEqual(row.average_utilization_rate, Decimal("100.00"))
+        self.assertEqual(row.on_time_completion_rate, Decimal("50.00"))
+        self.assertEqual(
+            SchedulingAnalytics.objects.get(date=self.today).total_scheduled_events, 0
+        )
+
+    def test_backfilled_today_matches_the_daily_scheduling_snapshot(self):
+        backfill(self.today, self.today, ["scheduling"])
+        backfilled = SchedulingAnalytics.objects.get(date=self.today)
+        daily = SchedulingAnalytics.create_daily_snapshot()
+        for field in [
+            "total_technicians",
+            "active_technicians",
+            "total_scheduled_events",
+            "completed_events",
+            "cancelled_events",
+        ]:
+            self.assertEqual(getattr(backfilled, field), getattr(daily, field), field)
+
+    def test_workers_fall_back_to_one_process_without_fork(self):
+        with mock.patch(
+            "main.analytics_backfill.multiprocessing.get_all_start_methods",
+            return_value=["spawn"],
+        ):
+            written = backfill(self.start, self.today, workers=3)
+        self.assertEqual(written, {"snapshots": 3, "scheduling": 3})
+
+    def test_split_range(self):
+        chunks = split_range(self.start, self.today + timedelta(days=7), 3)
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(chunks[0][0], self.start)
+        self.assertEqual(chunks[-1][1], self.today + timedelta(days=7))
+        for (_, last), (first, _) in zip(chunks, chunks[1:]):
+            self.assertEqual(first, last + timedelta(days=1))
+        self.assertEqual(len(split_range(self.today, self.today, 4)), 1)
+
+    def test_command(self):
+        out = StringIO()
+        call_command(
+            "backfill_analytics",
+            f"--start={self.start}",
+            f"--end={self.today}",
+            stdout=out,
+        )
+        self.assertIn("Backfilled 3 snapshots row(s)", out.getvalue())
+        self.assertEqual(SchedulingAnalytics.objects.count(), 3)
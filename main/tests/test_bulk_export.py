@@ -0,0 +1,119 @@
+import csv
+import io
+import json
+import shutil
+import tempfile
+import unittest
+
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from main import search_export
+from main.models import Account, CustomUser
+from main.search_models import SavedSearch
+from main.search_service import BulkOperationService
+
+
+class BulkExportTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        override = override_settings(MEDIA_ROOT=media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.user = CustomUser.objects.create_user(username="exporter", password="p")
+        self.other = CustomUser.objects.create_user(username="outsider", password="p")
+        for name in ["Gamma Labs", "Alpha Labs", "Beta Labs", "Beta Foods"]:
+            Account.objects.create(name=name, industry="Tech", owner=self.user)
+        Account.objects.create(name="Delta Labs", owner=self.other)
+        self.service = BulkOperationService(self.user)
+
+    def _export(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_op = self.service.bulk_export(**kwargs)
+        bulk_op.refresh_from_db()
+        return bulk_op
+
+    def _read(self, bulk_op):
+        with default_storage.open(bulk_op.results["file"], "rb") as f:
+            return f.read().decode("utf-8")
+
+    def test_csv_export_streams_matching_rows(self):
+        with self.settings(BULK_OPERATION_CHUNK_SIZE=2):
+            bulk_op = self._export(
+                entity_type="accounts",
+                query="labs",
+                fields=["name", "industry", "owner"],
+                sort_by="name",
+            )
+        self.assertEqual(bulk_op.status, "completed")
+        self.assertEqual(bulk_op.total_records, 3)
+        self.assertEqual(bulk_op.processed_records, 3)
+        self.assertEqual(bulk_op.results["format"], "csv")
+
+        rows = list(csv.reader(io.StringIO(self._read(bulk_op))))
+        self.assertEqual(rows[0], ["name", "industry", "owner"])
+        # Only the user's own accounts, in name order
+        self.assertEqual(
+            [row[0] for row in rows[1:]], ["Alpha Labs", "Beta Labs", "Gamma Labs"]
+        )
+        self.assertEqual(rows[1][2], str(self.user.pk))
+
+    def test_ndjson_export_from_saved_search(self):
+        saved = SavedSearch.objects.create(
+            name="Betas",
+            user=self.user,
+            search_type="accounts",
+            search_query="beta",
+            sort_by="name",
+            sort_order="desc",
+        )
+        bulk_op = self._export(
+            saved_search_id=saved.pk, export_format="ndjson", fields=["name"]
+        )
+        lines = [json.loads(line) for line in self._read(bulk_op).splitlines()]
+        self.assertEqual(lines, [{"name": "Beta Labs"}, {"name": "Beta Foods"}])
+
+    @unittest.skipIf(search_export.Workbook is None, "openpyxl not installed")
+    def test_xlsx_export(self):
+        from openpyxl import load_workbook
+
+        bulk_op = self._export(entity_type="accounts", export_format="xlsx")
+        with default_storage.open(bulk_op.results["file"], "rb") as f:
+            sheet = load_workbook(f).active
+            rows = list(sheet.values)
+        self.assertIn("name", rows[0])
+        self.assertEqual(len(rows), 5)
+
+    def test_invalid_requests_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.service.bulk_export(entity_type="accounts", export_format="pdf")
+        with self.assertRaises(ValueError):
+            self.service.bulk_export(entity_type="accounts", fields=["nope"])
+        with self.assertRaises(ValueError):
+            self.service.bulk_export(entity_type="accounts", sort_by="tags")
+
+    def test_download_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = client.post(
+                "/api/bulk/export/",
+                {"entity_type": "accounts", "fields": ["name"], "sort_by": "name"},
+                format="json",
+            )
+        self.assertEqual(resp.status_code, 200)
+        op_id = resp.json()["bulk_operation"]["id"]
+
+        resp = client.get(f"/api/bulk-operations/{op_id}/download/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("attachment", resp["Content-Disposition"])
+        body = b"".join(resp.streaming_content).decode("utf-8")
+        self.assertTrue(body.startswith("name\r\nAlpha Labs"))
+
+        outsider = APIClient()
+        outsider.force_authenticate(self.other)
+        resp = outsider.get(f"/api/bulk-operations/{op_id}/download/")
+        self.assertEqual(resp.status_code, 404)
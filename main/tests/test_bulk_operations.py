@@ -0,0 +1,212 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from main import bulk_operations, search_indexer
+from main.models import (
+    Account,
+    CustomUser,
+    Deal,
+    DealStage,
+    MetricRollupChange,
+    Project,
+    WorkOrder,
+)
+from main.rollup_service import get_rollup_service
+from main.search_models import BulkOperation, GlobalSearchIndex
+from main.search_service import BulkOperationService
+
+
+class BulkOperationServiceTests(TestCase):
+    def setUp(self):
+        search_indexer._pending().clear()
+        self.user = CustomUser.objects.create_user(username="bulk", password="p")
+        self.other = CustomUser.objects.create_user(username="bulk2", password="p")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.accounts = [
+                Account.objects.create(
+                    name=f"Bulk {index}", industry="Retail", owner=self.user
+                )
+                for index in range(5)
+            ]
+            Account.objects.create(name="Not mine", industry="Retail", owner=self.other)
+        self.service = BulkOperationService(self.user)
+
+    def _run(self, method, *args):
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_op = method(*args)
+        bulk_op.refresh_from_db()
+        return bulk_op
+
+    def test_set_based_update_covers_every_chunk(self):
+        bulk_op = self._run(
+            self.service.bulk_update,
+            "accounts",
+            {"industry": "Retail"},
+            {"industry": "Finance", "notes": "migrated"},
+            2,
+        )
+        self.assertEqual(bulk_op.status, "completed")
+        self.assertEqual(bulk_op.total_records, 5)
+        self.assertEqual(bulk_op.processed_records, 5)
+        self.assertEqual(bulk_op.successful_records, 5)
+        self.assertEqual(bulk_op.results["mode"], "set")
+        self.assertEqual(bulk_op.results["chunks"], 3)
+        self.assertIn("records_per_second", bulk_op.results)
+
+        # Rows leave the filter as they are updated; keyset chunks miss none
+        self.assertEqual(
+            Account.objects.filter(owner=self.user, industry="Finance").count(), 5
+        )
+        self.assertEqual(Account.objects.get(name="Not mine").industry, "Retail")
+
+        # Search entries were refreshed without per-row saves
+        entry = GlobalSearchIndex.objects.get(
+            entity_type="account", object_id=self.accounts[0].pk
+        )
+        self.assertTrue(entry.postings.filter(term="migrated").exists())
+
+    def test_side_effect_fields_save_row_by_row(self):
+        deal = Deal.objects.create(
+            title="Big one",
+            account=self.accounts[0],
+            stage=DealStage.objects.create(name="qualified", order=1),
+            value=Decimal("100.00"),
+            owner=self.user,
+        )
+        bulk_op = self._run(
+            self.service.bulk_update,
+            "deals",
+            {"title": "Big"},
+            {"status": "won"},
+        )
+        self.assertEqual(bulk_op.results["mode"], "row")
+        self.assertEqual(bulk_op.successful_records, 1)
+        # The post_save handler for won deals still ran
+        self.assertTrue(WorkOrder.objects.filter(project__deal=deal).exists())
+
+    def test_set_based_update_queues_the_rollup_days_rows_leave(self):
+        yesterday = timezone.now() - timedelta(days=1)
+        project = Project.objects.create(
+            title="Fit-out",
+            status="completed",
+            completed_at=yesterday,
+            assigned_to=self.user,
+            created_by=self.user,
+        )
+        bulk_op = self._run(
+            self.service.bulk_update,
+            "projects",
+            {"title": "Fit-out"},
+            {"completed_at": timezone.now().isoformat()},
+        )
+        self.assertEqual(bulk_op.results["mode"], "set")
+        self.assertEqual(bulk_op.successful_records, 1)
+        self.assertTrue(
+            MetricRollupChange.objects.filter(
+                metric="projects_completed", date=timezone.localdate(yesterday)
+            ).exists()
+        )
+
+        get_rollup_service().refresh_changed()
+        self.assertEqual(get_rollup_service().verify(), [])
+        project.refresh_from_db()
+        self.assertEqual(timezone.localdate(project.completed_at), timezone.localdate())
+
+    @override_settings(BULK_OPERATION_BACKEND="celery")
+    def test_celery_backend_queues_the_operation(self):
+        with mock.patch("main.celery_tasks.run_bulk_operation.delay") as delay:
+            bulk_op = self._run(
+                self.service.bulk_delete, "accounts", {"industry": "Retail"}
+            )
+        delay.assert_called_once_with(bulk_op.pk)
+        self.assertEqual(bulk_op.status, "pending")
+        self.assertEqual(Account.objects.count(), 6)
+
+    def test_bulk_delete(self):
+        bulk_op = self._run(
+            self.service.bulk_delete, "accounts", {"industry": "Retail"}, 2
+        )
+        self.assertEqual(bulk_op.status, "completed")
+        self.assertEqual(bulk_op.successful_records, 5)
+        remaining = Account.objects.values_list("name", flat=True)
+        self.assertEqual(list(remaining), ["Not mine"])
+        self.assertFalse(
+            GlobalSearchIndex.objects.filter(
+                entity_type="account", object_id=self.accounts[0].pk
+            ).exists()
+        )
+
+    def test_invalid_update_is_rejected_up_front(self):
+        with self.assertRaises(ValueError):
+            self.service.bulk_update("accounts", {}, {"nope": 1})
+        with self.assertRaises(ValueError):
+            self.service.bulk_update("projects", {}, {"priority": "whenever"})
+        with self.assertRaises(ValueError):
+            self.service.bulk_update("widgets", {}, {"name": "x"})
+        self.assertFalse(BulkOperation.objects.exists())
+
+    def test_cancel_stops_a_running_operation(self):
+        real_write = bulk_operations._Job.write_progress
+
+        def cancel_then_write(job, *args, **kwargs):
+            if not kwargs.get("final"):
+                BulkOperation.objects.filter(pk=job.bulk_op.pk).update(
+                    status="cancelled"
+                )
+            return real_write(job, *args, **kwargs)
+
+        with self.settings(BULK_OPERATION_PROGRESS_INTERVAL=0), mock.patch.object(
+            bulk_operations._Job, "write_progress", cancel_then_write
+        ):
+            bulk_op = self._run(
+                self.service.bulk_update,
+                "accounts",
+                {},
+                {"notes": "halfway"},
+                2,
+            )
+        self.assertEqual(bulk_op.status, "cancelled")
+        self.assertEqual(bulk_op.processed_records, 2)
+        self.assertEqual(Account.objects.filter(notes="halfway").count(), 2)
+
+    def test_cancelled_before_start_never_runs(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            bulk_op = self.service.bulk_update("accounts", {}, {"notes": "never"})
+        BulkOperation.objects.filter(pk=bulk_op.pk).update(status="cancelled")
+        for callback in callbacks:
+            callback()
+        self.assertFalse(Account.objects.filter(notes="never").exists())
+
+
+class BulkOperationAPITests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="bulkapi", password="p")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Project.objects.create(title="Alpha", created_by=self.user)
+
+    def test_update_endpoint_queues_and_reports(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post(
+                "/api/bulk/update/",
+                {"entity_type": "projects", "update_data": {"priority": "high"}},
+                format="json",
+            )
+        self.assertEqual(resp.status_code, 200)
+        op_id = resp.json()["bulk_operation"]["id"]
+        detail = self.client.get(f"/api/bulk-operations/{op_id}/").json()
+        self.assertEqual(detail["status"], "completed")
+        self.assertEqual(Project.objects.get().priority, "high")
+
+    def test_bad_field_is_a_400(self):
+        resp = self.client.post(
+            "/api/bulk/update/",
+            {"entity_type": "projects", "update_data": {"nope": 1}},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 400)
@@ -0,0 +1,151 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import Group
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from main.ledger_service import get_ledger_service
+from main.models import CustomUser, Invoice, InvoiceItem, JournalEntry, Payment
+from main.posting_service import get_posting_service
+
+from .utils_gl import seed_simple_invoice
+
+
+class BulkPostingTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="manager", password="pass")
+        mgr, _ = Group.objects.get_or_create(name="Sales Manager")
+        self.user.groups.add(mgr)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.invoice, _, _ = seed_simple_invoice(self.user)
+
+    def _more_invoices(self, count):
+        invoices = []
+        for _ in range(count):
+            inv = Invoice.objects.create(
+                deal=self.invoice.deal, due_date=self.invoice.due_date
+            )
+            InvoiceItem.objects.create(
+                invoice=inv, description="Line", quantity=2, unit_price=25
+            )
+            invoices.append(inv)
+        return invoices
+
+    def test_bulk_post_invoices_and_payments(self):
+        other = self._more_invoices(1)[0]
+        payment = Payment.objects.create(
+            amount=40,
+            payment_date=timezone.now().date(),
+            method="card",
+            content_type=ContentType.objects.get_for_model(Invoice),
+            object_id=self.invoice.id,
+        )
+
+        resp = self.client.post(
+            "/api/journal-entries/bulk-post/",
+            {
+                "invoices": [self.invoice.id, other.id, 999999],
+                "payments": [payment.id],
+            },
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 200)
+        data = resp.json()
+        self.assertEqual(data["summary"], {"posted": 3, "not_found": 1})
+        by_key = {(r["type"], r["id"]): r for r in data["results"]}
+        self.assertEqual(by_key[("payment", payment.id)]["status"], "posted")
+        self.assertEqual(by_key[("payment", payment.id)]["open_balance"], "60.00")
+        self.assertEqual(by_key[("payment", payment.id)]["settled"], "partial")
+
+        self.invoice.refresh_from_db()
+        self.assertEqual(
+            self.invoice.posted_journal_id,
+            by_key[("invoice", self.invoice.id)]["journal_entry_id"],
+        )
+        self.assertEqual(JournalEntry.objects.count(), 3)
+        self.assertEqual(get_ledger_service().verify_balances(), [])
+
+        # Re-posting the same batch is a no-op
+        resp = self.client.post(
+            "/api/journal-entries/bulk-post/",
+            {"invoices": [self.invoice.id, other.id], "payments": [payment.id]},
+            format="json",
+        )
+        self.assertEqual(resp.json()["summary"], {"already_posted": 3})
+        self.assertEqual(JournalEntry.objects.count(), 3)
+
+    def test_overpayment_rejected_without_posting(self):
+        payment = Payment.objects.create(
+            amount=150,
+            payment_date=timezone.now().date(),
+            method="card",
+            content_type=ContentType.objects.get_for_model(Invoice),
+            object_id=self.invoice.id,
+        )
+        result = get_posting_service().post_batch(payment_ids=[payment.id])
+        self.assertEqual(result["results"][0]["status"], "rejected")
+        self.assertFalse(JournalEntry.objects.exists())
+
+    def test_non_integer_ids_rejected(self):
+        resp = self.client.post(
+            "/api/journal-entries/bulk-post/", {"invoices": ["abc"]}, format="json"
+        )
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.json()["error"], "Ids must be integers")
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        service = get_posting_service()
+        small = [inv.id for inv in self._more_invoices(2)]
+        large = [inv.id for inv in self._more_invoices(20)]
+        # Warm up: create default accounts and today's balance rows
+        service.post_batch(invoice_ids=[self.invoice.id])
+
+        with CaptureQueriesContext(connection) as small_ctx:
+            service.post_batch(invoice_ids=small)
+        with CaptureQueriesContext(connection) as large_ctx:
+            service.post_batch(invoice_ids=large)
+
+        self.assertEqual(
+            len(small_ctx.captured_queries), len(large_ctx.captured_queries)
+        )
+        self.assertEqual(JournalEntry.objects.count(), 23)
+        self.assertEqual(
+            JournalEntry.objects.get(description=f"Invoice {large[0]} posting").amount,
+            Decimal("50.00"),
+        )
+
+    def test_closed_period_rejects_batch(self):
+        get_ledger_service().close_period(timezone.now().date())
+        resp = self.client.post(
+            "/api/journal-entries/bulk-post/",
+            {"invoices": [self.invoice.id]},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 400)
+        self.assertFalse(JournalEntry.objects.exists())
+
+    def test_postings_carry_unique_source_key(self):
+        from django.db import IntegrityError, transaction
+
+        get_posting_service().post_batch(invoice_ids=[self.invoice.id])
+        entry = JournalEntry.objects.get(
+            source_type="invoice", source_id=self.invoice.id
+        )
+        self.assertEqual(entry.posting_kind, "posting")
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            JournalEntry.objects.create(
+                date=entry.date,
+                description="duplicate",
+                debit_account_id=entry.debit_account_id,
+                credit_account_id=entry.credit_account_id,
+                amount=1,
+                source_type="invoice",
+                source_id=self.invoice.id,
+                posting_kind="posting",
+            )
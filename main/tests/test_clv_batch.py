@@ -0,0 +1,112 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from main.clv_service import calculate_all
+from main.models import (
+    Account,
+    Contact,
+    CustomerLifetimeValue,
+    CustomUser,
+    Deal,
+    DealStage,
+)
+
+
+class CLVBatchTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="clv", password="p")
+        self.account = Account.objects.create(name="CLV Co", owner=self.user)
+        self.stage = DealStage.objects.create(name="qualified", order=1)
+
+    def _contact(self, index, deals):
+        contact = Contact.objects.create(
+            account=self.account,
+            first_name=f"C{index}",
+            last_name="Batch",
+            email=f"c{index}@clv.test",
+            owner=self.user,
+        )
+        for value, status in deals:
+            Deal.objects.create(
+                title=f"Deal {index}",
+                account=self.account,
+                primary_contact=contact,
+                value=Decimal(value),
+                status=status,
+                stage=self.stage,
+                owner=self.user,
+            )
+        return contact
+
+    def test_batch_matches_per_contact_calculation(self):
+        loyal = self._contact(
+            1, [("8000.00", "won"), ("4000.00", "won"), ("500.00", "lost")]
+        )
+        Contact.objects.filter(pk=loyal.pk).update(
+            created_at=timezone.now() - timedelta(days=800)
+        )
+        self._contact(2, [("100.00", "in_progress")])
+        self._contact(3, [])
+
+        self.assertEqual(calculate_all(), 2)
+        batch = {clv.contact_id: clv for clv in CustomerLifetimeValue.objects.all()}
+        self.assertEqual(len(batch), 2)
+        fields = [
+            "total_revenue",
+            "total_deals",
+            "average_deal_size",
+            "deal_win_rate",
+            "customer_since",
+            "last_activity",
+            "predicted_clv",
+            "clv_confidence",
+            "segments",
+        ]
+        for contact in Contact.objects.filter(pk__in=batch):
+            single = CustomerLifetimeValue.calculate_for_contact(contact)
+            for field in fields:
+                self.assertEqual(
+                    getattr(batch[contact.pk], field), getattr(single, field), field
+                )
+
+        clv = CustomerLifetimeValue.objects.get(contact=loyal)
+        self.assertEqual(clv.total_revenue, Decimal("12000.00"))
+        self.assertEqual(clv.total_deals, 3)
+        self.assertEqual(clv.average_deal_size, Decimal("6000.00"))
+        self.assertEqual(clv.deal_win_rate, Decimal("0.67"))
+        self.assertEqual(clv.segments, ["high_value", "loyal"])
+        self.assertGreater(clv.predicted_clv, 0)
+
+    def test_query_count_does_not_grow_with_contacts(self):
+        def queries_for(count):
+            CustomerLifetimeValue.objects.all().delete()
+            Contact.objects.all().delete()
+            for index in range(count):
+                self._contact(index, [("100.00", "won")])
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(calculate_all(), count)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(queries_for(2), queries_for(8))
+
+    def test_rerun_updates_in_place(self):
+        contact = self._contact(1, [("100.00", "won")])
+        calculate_all()
+        Deal.objects.create(
+            title="Another",
+            account=self.account,
+            primary_contact=contact,
+            value=Decimal("300.00"),
+            status="won",
+            stage=self.stage,
+            owner=self.user,
+        )
+        calculate_all(contact_ids=[contact.pk])
+        clv = CustomerLifetimeValue.objects.get()
+        self.assertEqual(clv.total_revenue, Decimal("400.00"))
+        self.assertEqual(clv.total_deals, 2)
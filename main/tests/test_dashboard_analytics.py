@@ -0,0 +1,150 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from main.dashboard_analytics import build_dashboard, cached_dashboard
+from main.models import (
+    Account,
+    CustomUser,
+    Deal,
+    DealStage,
+    LineItem,
+    Project,
+    TimeEntry,
+    Warehouse,
+    WarehouseItem,
+    WorkOrder,
+    WorkOrderInvoice,
+)
+
+
+class DashboardAnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username="dash", password="p")
+        self.today = timezone.now().date()
+        stage = DealStage.objects.create(name="qualified", order=1)
+        for index, value in enumerate(["100.00", "250.00", "50.00"]):
+            account = Account.objects.create(name=f"Account {index}", owner=self.user)
+            Deal.objects.create(
+                title=f"Won {index}",
+                account=account,
+                value=Decimal(value),
+                status="won",
+                stage=stage,
+                owner=self.user,
+            )
+        self.top = Account.objects.get(name="Account 1")
+        Deal.objects.create(
+            title="Second win",
+            account=self.top,
+            value=Decimal("10.00"),
+            status="won",
+            stage=stage,
+            owner=self.user,
+        )
+        Deal.objects.create(
+            title="Still open",
+            account=self.top,
+            value=Decimal("999.00"),
+            stage=stage,
+            owner=self.user,
+        )
+
+    def test_conditional_aggregates(self):
+        TimeEntry.objects.create(
+            project=Project.objects.create(title="Hours", created_by=self.user),
+            user=self.user,
+            date=self.today,
+            hours=Decimal("3"),
+            description="Build",
+        )
+        TimeEntry.objects.create(
+            project=Project.objects.get(title="Hours"),
+            user=self.user,
+            date=self.today,
+            hours=Decimal("1"),
+            description="Admin",
+            billable=False,
+        )
+
+        data = build_dashboard(30)
+        self.assertEqual(data["sales"]["total_deals"], 5)
+        self.assertEqual(data["sales"]["won_deals"], 4)
+        self.assertEqual(data["sales"]["total_value"], Decimal("410.00"))
+        self.assertEqual(data["time_tracking"]["total_hours"], 4.0)
+        self.assertEqual(data["time_tracking"]["billable_percentage"], 75.0)
+
+        clv = data["customer_lifetime_value"]
+        self.assertEqual(clv[0]["account"], "Account 1")
+        self.assertEqual(clv[0]["total_value"], Decimal("260.00"))
+        self.assertEqual(clv[0]["deal_count"], 2)
+        self.assertEqual([row["deal_count"] for row in clv[1:]], [1, 1])
+
+    def test_profitability_is_not_inflated_by_joins(self):
+        project = Project.objects.create(title="Fit-out", created_by=self.user)
+        work_order = WorkOrder.objects.create(project=project, description="Fit")
+        for amount in ["300.00", "200.00"]:
+            WorkOrderInvoice.objects.create(
+                work_order=work_order,
+                issued_date=self.today,
+                due_date=self.today + timedelta(days=30),
+                total_amount=Decimal(amount),
+            )
+        for price in ["40.00", "60.00", "100.00"]:
+            LineItem.objects.create(
+                work_order=work_order, description="Part", unit_price=Decimal(price)
+            )
+
+        rows = {
+            row["project"]: row for row in build_dashboard(30)["project_profitability"]
+        }
+        self.assertEqual(rows["Fit-out"]["revenue"], Decimal("500.00"))
+        self.assertEqual(rows["Fit-out"]["costs"], Decimal("200.00"))
+        self.assertEqual(rows["Fit-out"]["profit"], Decimal("300.00"))
+
+    def test_low_stock_list_is_capped_but_counted(self):
+        warehouse = Warehouse.objects.create(name="Main")
+        for index in range(4):
+            WarehouseItem.objects.create(
+                warehouse=warehouse,
+                name=f"Part {index}",
+                sku=f"P{index}",
+                quantity=1,
+                minimum_stock=5,
+            )
+        WarehouseItem.objects.create(
+            warehouse=warehouse, name="Plenty", sku="PL", quantity=9, minimum_stock=5
+        )
+        with self.settings(DASHBOARD_LOW_STOCK_LIMIT=2):
+            inventory = build_dashboard(30)["inventory"]
+        self.assertEqual(len(inventory["low_stock_items"]), 2)
+        self.assertEqual(inventory["low_stock_count"], 4)
+
+    def test_payload_is_cached_until_a_source_changes(self):
+        first = cached_dashboard(30)
+        with self.assertNumQueries(0):
+            self.assertEqual(cached_dashboard(30), first)
+
+        # queryset.update() skips signals, so the cached payload is still served
+        Deal.objects.filter(title="Still open").update(status="won")
+        self.assertEqual(cached_dashboard(30)["sales"]["won_deals"], 4)
+
+        Deal.objects.get(title="Second win").save()
+        self.assertEqual(cached_dashboard(30)["sales"]["won_deals"], 5)
+
+    def test_endpoint_window(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        resp = client.get("/api/analytics/dashboard/", {"days": 7})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["period"]["days"], 7)
+        self.assertEqual(resp.json()["sales"]["won_deals"], 4)
+
+        for days in ["0", "10000", "week"]:
+            resp = client.get("/api/analytics/dashboard/", {"days": days})
+            self.assertEqual(resp.status_code, 400)
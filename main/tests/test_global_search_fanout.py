@@ -0,0 +1,70 @@
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from main import global_search
+from main.models import Account
+
+
+def _fast(name, count=1):
+    return lambda query: [{"type": name, "n": i} for i in range(count)]
+
+
+def _slow(query):
+    time.sleep(0.3)
+    return [{"type": "slow"}]
+
+
+def _broken(query):
+    raise RuntimeError("source down")
+
+
+class FanOutTests(SimpleTestCase):
+    def test_sources_run_concurrently_under_deadline(self):
+        sources = {"a": _fast("a"), "slow": _slow, "b": _fast("b")}
+        started = time.monotonic()
+        results, incomplete = global_search.fan_out("q", sources, deadline=0.1)
+        self.assertLess(time.monotonic() - started, 0.25)
+        self.assertEqual([row["type"] for row in results], ["a", "b"])
+        self.assertEqual(incomplete, ["slow"])
+
+    def test_failed_source_is_incomplete(self):
+        results, incomplete = global_search.fan_out(
+            "q", {"broken": _broken, "a": _fast("a")}, deadline=1
+        )
+        self.assertEqual(results, [{"type": "a", "n": 0}])
+        self.assertEqual(incomplete, ["broken"])
+
+    def test_results_keep_source_order_and_cap(self):
+        sources = {"a": _fast("a", 15), "b": _fast("b", 15)}
+        results, incomplete = global_search.fan_out("q", sources, deadline=1)
+        self.assertEqual(len(results), global_search.RESULT_LIMIT)
+        self.assertEqual([row["type"] for row in results[:15]], ["a"] * 15)
+        self.assertEqual(incomplete, [])
+
+
+class GlobalSearchViewTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="searcher", password="pass"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Account.objects.create(name="Acme Corp", owner=self.user)
+
+    def test_results_from_database_sources(self):
+        resp = self.client.get("/api/search/", {"q": "Acme"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("Acme Corp", [row.get("name") for row in resp.json()])
+        self.assertNotIn("X-Search-Incomplete", resp)
+
+    @override_settings(GLOBAL_SEARCH_DEADLINE=0.01)
+    def test_sources_past_deadline_are_reported(self):
+        sources = {"slow": lambda q: time.sleep(0.05) or [], "late": _fast("late")}
+        with mock.patch.object(global_search, "SEARCH_SOURCES", sources):
+            resp = self.client.get("/api/search/", {"q": "Acme"})
+        self.assertEqual(resp.json(), [])
+        self.assertEqual(resp["X-Search-Incomplete"], "late")
@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from main import kb_index
+from main.kb_index import KnowledgeBaseIndex
+
+
+class KBDirectoryMixin:
+    def make_kb(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.write(directory, "setup.md", "# Setup Guide\n\nInstall the CRM.\n")
+        self.write(directory, "billing.md", "Invoices and Payments explained.\n")
+        self.write(directory, "notes.txt", "not markdown")
+        return directory
+
+    def write(self, directory, name, content):
+        with open(os.path.join(directory, name), "w", encoding="utf-8") as f:
+            f.write(content)
+
+
+class KnowledgeBaseIndexTests(KBDirectoryMixin, SimpleTestCase):
+    def setUp(self):
+        self.directory = self.make_kb()
+        self.index = KnowledgeBaseIndex(self.directory, check_interval=3600)
+
+    def test_articles_are_parsed(self):
+        articles = self.index.articles()
+        self.assertEqual([a.name for a in articles], ["billing", "setup"])
+        setup = self.index.get("setup")
+        self.assertEqual(setup.title, "Setup Guide")
+        self.assertEqual(self.index.get("billing").title, "billing")
+        self.assertTrue(setup.snippet.startswith("# Setup Guide"))
+
+    def test_search_is_case_insensitive(self):
+        self.assertEqual([a.name for a in self.index.search("PAYMENTS")], ["billing"])
+        self.assertEqual(self.index.search("missing"), [])
+
+    def test_reads_are_served_from_memory_until_refresh(self):
+        self.index.articles()
+        self.write(self.directory, "setup.md", "# Setup Guide\n\nUpdated text.\n")
+        with mock.patch("main.kb_index.open", create=True, wraps=open) as opened:
+            self.assertEqual(self.index.search("updated"), [])
+            opened.assert_not_called()
+
+            self.index.refresh()
+            self.assertEqual([a.name for a in self.index.search("updated")], ["setup"])
+            # Only the changed file is re-read
+            self.assertEqual(opened.call_count, 1)
+
+    def test_deleted_files_drop_out(self):
+        self.index.articles()
+        os.remove(os.path.join(self.directory, "billing.md"))
+        self.index.refresh()
+        self.assertIsNone(self.index.get("billing"))
+
+    def test_missing_directory(self):
+        index = KnowledgeBaseIndex(os.path.join(self.directory, "nope"))
+        self.assertFalse(index.exists())
+        self.assertEqual(index.articles(), [])
+
+
+class KnowledgeBaseViewTests(KBDirectoryMixin, TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="kb", password="pass")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        patcher = mock.patch.object(
+            kb_index, "kb_index", KnowledgeBaseIndex(self.make_kb())
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_list_and_read(self):
+        self.assertEqual(self.client.get("/api/kb/").json(), ["billing", "setup"])
+        resp = self.client.get("/api/kb/setup/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("Install the CRM", resp.json()["content"])
+        self.assertEqual(self.client.get("/api/kb/unknown/").status_code, 404)
+
+    def test_global_search_includes_notes(self):
+        results = self.client.get("/api/search/", {"q": "invoices"}).json()
+        notes = [row for row in results if row["type"] == "note"]
+        self.assertEqual([row["file_name"] for row in notes], ["billing.md"])
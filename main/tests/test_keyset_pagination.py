@@ -0,0 +1,146 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import Group
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from main.models import Account, ActivityLog, Contact, CustomUser, Deal, DealStage
+from main.pagination import Keyset, count_rows, keyset_page
+
+
+def _walk(queryset, keyset, limit):
+    """All rows of queryset by following next cursors."""
+    seen, cursor = [], None
+    while True:
+        rows, cursor, _ = keyset_page(queryset, keyset, limit, cursor)
+        seen.extend(rows)
+        if cursor is None:
+            return seen
+
+
+class KeysetPageTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="keyset", password="p")
+        account = Account.objects.create(name="Keyset Co", owner=self.user)
+        last_names = ["Young", "Adams", "Young", "Baker", "Adams"]
+        for index, last_name in enumerate(last_names):
+            Contact.objects.create(
+                account=account,
+                first_name=f"C{index}",
+                last_name=last_name,
+                email=f"c{index}@keyset.test",
+                owner=self.user,
+            )
+        stage = DealStage.objects.create(name="qualified", order=1)
+        self.deals = [
+            Deal.objects.create(
+                title=f"Deal {index}",
+                account=account,
+                stage=stage,
+                value=Decimal(value),
+                owner=self.user,
+            )
+            for index, value in enumerate(["10.00", "20.00", "10.00", "30.00"])
+        ]
+
+    def test_pages_cover_ties_without_gaps_or_repeats(self):
+        queryset = Contact.objects.all()
+        for descending in (False, True):
+            keyset = Keyset(Contact, "last_name", descending)
+            expected = list(keyset.order(queryset))
+            self.assertEqual(_walk(queryset, keyset, 2), expected)
+
+    def test_previous_cursor_returns_prior_page(self):
+        keyset = Keyset(Deal, "value", descending=True)
+        queryset = Deal.objects.all()
+        first, next_cursor, previous = keyset_page(queryset, keyset, 2)
+        self.assertIsNone(previous)
+        second, _, previous = keyset_page(queryset, keyset, 2, next_cursor)
+        self.assertEqual(len(first) + len(second), 4)
+        back, forward, _ = keyset_page(queryset, keyset, 2, previous)
+        self.assertEqual(back, first)
+        self.assertEqual(forward, next_cursor)
+
+    def test_null_sort_values_come_last(self):
+        contact = Contact.objects.order_by("pk").first()
+        Contact.objects.filter(pk=contact.pk).update(account=None)
+        keyset = Keyset(Contact, "account")
+        rows = _walk(Contact.objects.all(), keyset, 1)
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[-1].pk, contact.pk)
+
+    def test_unknown_sort_field_is_rejected(self):
+        with self.assertRaises(ValueError):
+            Keyset(Contact, "nope")
+        with self.assertRaises(ValueError):
+            keyset_page(Contact.objects.all(), Keyset(Contact), 2, "garbage!")
+
+    def test_count_modes(self):
+        queryset = Contact.objects.all()
+        self.assertEqual(count_rows(queryset, None), (None, False))
+        self.assertEqual(count_rows(queryset, "exact"), (5, True))
+        with self.settings(PAGINATION_COUNT_CAP=3):
+            self.assertEqual(count_rows(queryset, "capped"), (3, False))
+        self.assertEqual(count_rows(queryset, "capped"), (5, True))
+
+
+class KeysetEndpointTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="kmgr", password="p")
+        group, _ = Group.objects.get_or_create(name="Sales Manager")
+        self.user.groups.add(group)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for name in ["Delta", "Alpha", "Echo", "Bravo", "Charlie"]:
+            Account.objects.create(name=name, owner=self.user)
+
+    def test_accounts_cursor_pages_follow_ordering(self):
+        url = "/api/accounts/?ordering=name&page_size=2&cursor=&count=exact"
+        names = []
+        while url:
+            body = self.client.get(url).json()
+            self.assertIn("count_is_exact", body)
+            names.extend(row["name"] for row in body["results"])
+            url = body["next"]
+        self.assertEqual(names, ["Alpha", "Bravo", "Charlie", "Delta", "Echo"])
+
+        first = self.client.get("/api/accounts/?ordering=name&page_size=2&cursor=")
+        self.assertIsNone(first.json()["count"])
+
+    def test_page_number_pagination_is_unchanged(self):
+        body = self.client.get("/api/accounts/?page=1").json()
+        self.assertEqual(body["count"], 5)
+        self.assertNotIn("count_is_exact", body)
+
+    def test_invalid_cursor(self):
+        resp = self.client.get("/api/accounts/?cursor=not-a-cursor")
+        self.assertEqual(resp.status_code, 404)
+
+    def test_activity_log_uses_model_ordering(self):
+        for index in range(3):
+            ActivityLog.objects.create(
+                user=self.user, action="create", description=f"entry {index}"
+            )
+        body = self.client.get("/api/activity-logs/?cursor=&page_size=2").json()
+        self.assertEqual(len(body["results"]), 2)
+        self.assertIsNotNone(body["next"])
+
+    def test_search_api_cursor_mode(self):
+        params = {
+            "q": "ha",  # Alpha, Charlie
+            "type": "accounts",
+            "sort_by": "name",
+            "sort_order": "asc",
+            "limit": 1,
+            "cursor": "",
+            "count": "exact",
+        }
+        body = self.client.get("/api/search/v2/", params).json()
+        self.assertEqual([r["name"] for r in body["results"]], ["Alpha"])
+        self.assertEqual(body["total_count"], 2)
+        self.assertIsNone(body["previous_cursor"])
+
+        params["cursor"] = body["next_cursor"]
+        body = self.client.get("/api/search/v2/", params).json()
+        self.assertEqual([r["name"] for r in body["results"]], ["Charlie"])
+        self.assertIsNone(body["next_cursor"])
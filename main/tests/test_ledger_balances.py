@@ -0,0 +1,301 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import Group
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from main.ledger_service import get_ledger_service
+from main.models import CustomUser, JournalEntry, LedgerAccount, LedgerDailyBalance
+from main.reports import FinancialReports
+
+
+class LedgerDailyBalanceTests(TestCase):
+    def setUp(self):
+        self.cash = LedgerAccount.objects.create(
+            name="Cash", code="1000", account_type="asset"
+        )
+        self.revenue = LedgerAccount.objects.create(
+            name="Revenue", code="4000", account_type="revenue"
+        )
+        self.rent = LedgerAccount.objects.create(
+            name="Rent", code="5100", account_type="expense"
+        )
+
+    def _post(self, day, debit, credit, amount):
+        return JournalEntry.objects.create(
+            date=day,
+            description="test",
+            debit_account=debit,
+            credit_account=credit,
+            amount=amount,
+        )
+
+    def test_create_update_delete_maintain_balances(self):
+        entry = self._post(date(2025, 1, 5), self.cash, self.revenue, 100)
+        self._post(date(2025, 1, 5), self.cash, self.revenue, 50)
+
+        row = LedgerDailyBalance.objects.get(account=self.cash, date=date(2025, 1, 5))
+        self.assertEqual(row.debit_total, Decimal("150.00"))
+        self.assertEqual(row.entry_count, 2)
+
+        entry.amount = Decimal("30.00")
+        entry.credit_account = self.rent
+        entry.save()
+        self.assertEqual(get_ledger_service().verify_balances(), [])
+
+        entry.delete()
+        row.refresh_from_db()
+        self.assertEqual(row.debit_total, Decimal("50.00"))
+        self.assertEqual(get_ledger_service().verify_balances(), [])
+
+    def test_reports_read_materialized_totals(self):
+        self._post(date(2025, 1, 5), self.cash, self.revenue, 1000)
+        self._post(date(2025, 2, 1), self.rent, self.cash, 400)
+
+        sheet = FinancialReports.get_balance_sheet(date(2025, 1, 31))
+        self.assertEqual(sheet["total_assets"], Decimal("1000.00"))
+
+        sheet = FinancialReports.get_balance_sheet(date(2025, 2, 28))
+        self.assertEqual(sheet["assets"]["1000"]["balance"], Decimal("600.00"))
+
+        pnl = FinancialReports.get_profit_loss(date(2025, 1, 1), date(2025, 2, 28))
+        self.assertEqual(pnl["total_revenue"], Decimal("1000.00"))
+        self.assertEqual(pnl["total_expenses"], Decimal("400.00"))
+        self.assertEqual(pnl["net_profit"], Decimal("600.00"))
+
+    def test_pnl_and_cash_flow_use_constant_queries(self):
+        equity = LedgerAccount.objects.create(
+            name="Equity", code="3000", account_type="equity"
+        )
+        for month in range(1, 13):
+            self._post(date(2024, month, 1), self.cash, self.revenue, 100)
+            self._post(date(2024, month, 2), self.rent, self.cash, 40)
+        self._post(date(2024, 6, 1), self.cash, equity, 500)
+
+        with self.assertNumQueries(1):
+            pnl = FinancialReports.get_profit_loss(date(2024, 1, 1), date(2024, 12, 31))
+        self.assertEqual(pnl["revenue"]["4000"]["balance"], Decimal("1200.00"))
+        self.assertEqual(pnl["net_profit"], Decimal("720.00"))
+
+        with self.assertNumQueries(2):
+            flow = FinancialReports.get_cash_flow(date(2024, 1, 1), date(2024, 12, 31))
+        self.assertEqual(flow["operating_activities"], Decimal("720.00"))
+        self.assertEqual(flow["financing_activities"], Decimal("500.00"))
+        self.assertEqual(flow["net_cash_flow"], Decimal("1220.00"))
+        self.assertEqual(flow["by_account"]["5100"]["amount"], Decimal("-480.00"))
+
+    def test_command_verifies_and_rebuilds(self):
+        self._post(date(2025, 3, 1), self.cash, self.revenue, 75)
+        LedgerDailyBalance.objects.filter(account=self.cash).update(debit_total=1)
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_ledger_balances", "--verify", stdout=StringIO())
+
+        call_command("rebuild_ledger_balances", stdout=StringIO())
+        out = StringIO()
+        call_command("rebuild_ledger_balances", "--verify", stdout=out)
+        self.assertIn("consistent", out.getvalue())
+
+
+class LedgerPeriodCloseTests(TestCase):
+    def setUp(self):
+        self.cash = LedgerAccount.objects.create(
+            name="Cash", code="1000", account_type="asset"
+        )
+        self.equity = LedgerAccount.objects.create(
+            name="Equity", code="3000", account_type="equity"
+        )
+        for day in (date(2025, 1, 10), date(2025, 1, 20), date(2025, 2, 5)):
+            JournalEntry.objects.create(
+                date=day,
+                description="capital",
+                debit_account=self.cash,
+                credit_account=self.equity,
+                amount=100,
+            )
+
+    def test_as_of_report_starts_from_closing_balance(self):
+        period = get_ledger_service().close_period(date(2025, 1, 31))
+        closing = period.closing_balances.get(account=self.cash)
+        self.assertEqual(closing.debit_total, Decimal("200.00"))
+
+        with self.assertNumQueries(3):
+            sheet = FinancialReports.get_balance_sheet(date(2025, 2, 28))
+        self.assertEqual(sheet["total_assets"], Decimal("300.00"))
+        self.assertEqual(sheet["total_equity"], Decimal("300.00"))
+
+        # Reports dated before the close still come from daily balances
+        sheet = FinancialReports.get_balance_sheet(date(2025, 1, 15))
+        self.assertEqual(sheet["total_assets"], Decimal("100.00"))
+
+    def test_closed_period_rejects_changes(self):
+        get_ledger_service().close_period(date(2025, 1, 31))
+        with self.assertRaises(ValidationError):
+            JournalEntry.objects.create(
+                date=date(2025, 1, 31),
+                description="late",
+                debit_account=self.cash,
+                credit_account=self.equity,
+                amount=5,
+            )
+        with self.assertRaises(ValidationError), transaction.atomic():
+            JournalEntry.objects.filter(date=date(2025, 1, 10)).first().delete()
+        with self.assertRaises(ValidationError):
+            get_ledger_service().close_period(date(2025, 1, 15))
+
+    def test_close_endpoint(self):
+        user = CustomUser.objects.create_user(username="controller", password="x")
+        user.groups.add(Group.objects.get_or_create(name="Sales Manager")[0])
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        resp = client.post("/api/ledger-periods/close/", {"month": "2025-01"})
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.data["period_end"], "2025-01-31")
+        self.assertEqual(resp.data["account_count"], 2)
+
+        resp = client.post("/api/ledger-periods/close/", {"month": "2025-01"})
+        self.assertEqual(resp.status_code, 409)
+
+
+class LedgerExportTests(TestCase):
+    def setUp(self):
+        self.cash = LedgerAccount.objects.create(
+            name="Cash", code="1000", account_type="asset"
+        )
+        self.revenue = LedgerAccount.objects.create(
+            name="Revenue", code="4000", account_type="revenue"
+        )
+        self.rent = LedgerAccount.objects.create(
+            name="Rent", code="5100", account_type="expense"
+        )
+        JournalEntry.objects.create(
+            date=date(2025, 1, 5),
+            description="sale, with comma",
+            debit_account=self.cash,
+            credit_account=self.revenue,
+            amount=100,
+        )
+        JournalEntry.objects.create(
+            date=date(2025, 2, 1),
+            description="rent",
+            debit_account=self.rent,
+            credit_account=self.cash,
+            amount=40,
+        )
+        user = CustomUser.objects.create_user(username="controller", password="x")
+        user.groups.add(Group.objects.get_or_create(name="Sales Manager")[0])
+        self.client = APIClient()
+        self.client.force_authenticate(user=user)
+
+    def _body(self, resp):
+        self.assertTrue(resp.streaming)
+        return b"".join(resp.streaming_content).decode()
+
+    def test_journal_csv_export_filters_by_date_and_account(self):
+        resp = self.client.get("/api/ledger/export/", {"start_date": "2025-01-01"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["Content-Type"], "text/csv")
+        lines = self._body(resp).splitlines()
+        self.assertEqual(lines[0].split(",")[:3], ["id", "date", "description"])
+        self.assertEqual(len(lines), 3)
+        self.assertIn('"sale, with comma"', lines[1])
+
+        resp = self.client.get(
+            "/api/ledger/export/", {"account": "5100", "end_date": "2025-12-31"}
+        )
+        lines = self._body(resp).splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn("rent", lines[1])
+
+    def test_ndjson_exports(self):
+        import json
+
+        resp = self.client.get("/api/ledger/export/", {"file_format": "ndjson"})
+        rows = [json.loads(line) for line in self._body(resp).splitlines()]
+        self.assertEqual([r["debit_account"] for r in rows], ["1000", "5100"])
+        self.assertEqual(rows[0]["amount"], "100.00")
+
+        resp = self.client.get(
+            "/api/ledger/balances/export/", {"file_format": "ndjson"}
+        )
+        rows = {r["code"]: r for r in map(json.loads, self._body(resp).splitlines())}
+        self.assertEqual(rows["1000"]["balance"], "60.00")
+
+    def test_rejects_bad_parameters(self):
+        resp = self.client.get("/api/ledger/export/", {"file_format": "xml"})
+        self.assertEqual(resp.status_code, 400)
+        resp = self.client.get("/api/ledger/export/", {"start_date": "01/02/2025"})
+        self.assertEqual(resp.status_code, 400)
+
+
+class MinorUnitTotalsTests(TestCase):
+    def setUp(self):
+        self.cash = LedgerAccount.objects.create(
+            name="Cash", code="1000", account_type="asset"
+        )
+        self.revenue = LedgerAccount.objects.create(
+            name="Revenue", code="4000", account_type="revenue"
+        )
+
+    def _post(self, day, amount):
+        return JournalEntry.objects.create(
+            date=day,
+            description="sale",
+            debit_account=self.cash,
+            credit_account=self.revenue,
+            amount=amount,
+        )
+
+    def test_amount_minor_follows_amount(self):
+        entry = self._post(date(2025, 1, 1), Decimal("0.29"))
+        self.assertEqual(entry.amount_minor, 29)
+        entry.amount = Decimal("1234.56")
+        entry.save(update_fields=["amount"])
+        entry.refresh_from_db()
+        self.assertEqual(entry.amount_minor, 123456)
+
+    def test_currency_is_read_only_in_the_api(self):
+        user = CustomUser.objects.create_user(username="bookkeeper", password="x")
+        user.groups.add(Group.objects.get_or_create(name="Sales Manager")[0])
+        client = APIClient()
+        client.force_authenticate(user=user)
+        resp = client.post(
+            "/api/journal-entries/",
+            {
+                "date": "2025-01-03",
+                "description": "sale",
+                "debit_account_id": self.cash.id,
+                "credit_account_id": self.revenue.id,
+                "amount": "10.00",
+                "currency": "EUR",
+            },
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.data["currency"], "USD")
+        self.assertEqual(JournalEntry.objects.get().currency, "USD")
+
+    def test_minor_unit_totals_match_decimal_sums(self):
+        from main.money import from_minor, group_sum_minor, to_minor
+
+        amounts = [Decimal("0.10"), Decimal("0.20"), Decimal("999999.99")]
+        for amount in amounts:
+            self._post(date(2025, 1, 2), amount)
+        self._post(date(2024, 12, 31), Decimal("5.00"))
+
+        totals = get_ledger_service().minor_unit_totals(
+            start_date=date(2025, 1, 1), chunk_size=2
+        )
+        self.assertEqual(totals[self.cash.id]["debit"], sum(amounts))
+        self.assertEqual(totals[self.revenue.id]["credit"], Decimal("1000000.29"))
+        self.assertEqual(totals[self.cash.id]["entries"], 3)
+
+        self.assertEqual(to_minor("100", "JPY"), 100)
+        self.assertEqual(from_minor(1234, "KWD"), Decimal("1.234"))
+        self.assertEqual(group_sum_minor([2, 1, 2], [5, 7, 9]), {1: (7, 1), 2: (14, 2)})
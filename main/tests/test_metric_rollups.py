@@ -0,0 +1,180 @@
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from main.models import (
+    Account,
+    CustomUser,
+    Deal,
+    DealStage,
+    MetricDailyRollup,
+    MetricRollupRefresh,
+)
+from main.rollup_service import get_rollup_service
+
+
+def cell(metric, dimension="all", key="", day=None):
+    row = MetricDailyRollup.objects.filter(
+        metric=metric, dimension=dimension, key=key, date=day or timezone.localdate()
+    ).first()
+    return (row.count, row.amount) if row else (0, Decimal("0"))
+
+
+class MetricRollupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username="rollup", password="p")
+        self.other = CustomUser.objects.create_user(username="rollup2", password="p")
+        self.account = Account.objects.create(name="Rollup Co", owner=self.user)
+        self.stage = DealStage.objects.create(name="Qualify", order=1)
+        self.service = get_rollup_service()
+        self.today = timezone.localdate()
+
+    def _deal(self, value="100.00", **kwargs):
+        return Deal.objects.create(
+            title="Deal",
+            account=self.account,
+            value=Decimal(value),
+            owner=self.user,
+            stage=self.stage,
+            close_date=self.today,
+            **kwargs,
+        )
+
+    def test_saves_and_deletes_move_contributions(self):
+        deal = self._deal()
+        self.assertEqual(cell("deals_created"), (1, Decimal("100.00")))
+        self.assertEqual(
+            cell("deals_created", "owner", str(self.user.pk)), (1, Decimal("100.00"))
+        )
+        self.assertEqual(cell("deals_won"), (0, Decimal("0")))
+
+        deal.owner = self.other
+        deal.value = Decimal("150.00")
+        deal.status = "won"
+        deal.save()
+        self.assertEqual(cell("deals_created"), (1, Decimal("150.00")))
+        self.assertEqual(cell("deals_created", "owner", str(self.user.pk))[0], 0)
+        self.assertEqual(cell("deals_created", "owner", str(self.other.pk))[0], 1)
+        self.assertEqual(
+            cell("deals_won", "account", str(self.account.pk)), (1, Decimal("150.00"))
+        )
+
+        deal.delete()
+        self.assertEqual(cell("deals_created"), (0, Decimal("0")))
+        self.assertEqual(cell("deals_won"), (0, Decimal("0")))
+        self.assertEqual(self.service.verify(), [])
+
+    def test_rebuild_matches_incremental_rollups(self):
+        self._deal(status="won")
+        self._deal(value="40.00", status="lost")
+        before = sorted(
+            MetricDailyRollup.objects.exclude(count=0).values_list(
+                "metric", "dimension", "key", "date", "count", "amount"
+            )
+        )
+        MetricDailyRollup.objects.all().delete()
+        self.service.rebuild()
+        after = sorted(
+            MetricDailyRollup.objects.values_list(
+                "metric", "dimension", "key", "date", "count", "amount"
+            )
+        )
+        self.assertEqual(after, before)
+
+    def test_refresh_changed_catches_set_based_updates(self):
+        self._deal()
+        start = timezone.now()
+        Deal.objects.update(status="won", updated_at=timezone.now())
+        self.assertEqual(cell("deals_won")[0], 0)
+        self.assertEqual(self.service.refresh_changed(since=start), 3)
+        self.assertEqual(cell("deals_won"), (1, Decimal("100.00")))
+        self.assertEqual(self.service.verify(), [])
+
+    def test_refresh_changed_recomputes_days_rows_left(self):
+        yesterday = self.today - timedelta(days=1)
+        deal = self._deal(status="won")
+        Deal.objects.filter(pk=deal.pk).update(close_date=yesterday)
+        self.service.rebuild()
+
+        get_rollup_service().mark_changed(Deal.objects.all())
+        Deal.objects.update(close_date=self.today, updated_at=timezone.now())
+        self.service.refresh_changed()
+        self.assertEqual(cell("deals_won", day=yesterday)[0], 0)
+        self.assertEqual(cell("deals_won"), (1, Decimal("100.00")))
+        self.assertEqual(self.service.verify(), [])
+
+    def test_refresh_changed_resumes_from_the_last_run_in_the_database(self):
+        self._deal()
+        self.assertGreater(self.service.refresh_changed(), 0)
+        cache.clear()
+        self.assertEqual(self.service.refresh_changed(), 0)
+        self.assertEqual(MetricRollupRefresh.objects.count(), 2)
+
+    def test_trends_endpoint_serves_series_from_rollups(self):
+        self._deal()
+        self._deal(value="50.00")
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        resp = client.get(
+            "/api/analytics-snapshots/trends/",
+            {"metrics": "deals_created", "days": 7},
+        )
+        self.assertEqual(resp.status_code, 200)
+        trend = resp.json()["trends"][0]
+        self.assertEqual(trend["metric"], "deals_created")
+        self.assertEqual(len(trend["points"]), 7)
+        self.assertEqual(trend["points"][-1]["count"], 2)
+        self.assertEqual(trend["total_count"], 2)
+        insight = resp.json()["insights"][0]
+        self.assertEqual(insight["current_count"], 2)
+        self.assertIsNone(insight["change_percent"])
+
+        resp = client.get(
+            "/api/analytics-snapshots/trends/",
+            {"metrics": "deals_created", "dimension": "stage", "days": 7},
+        )
+        self.assertEqual(
+            [t["key"] for t in resp.json()["trends"]], [str(self.stage.pk)]
+        )
+
+        start = (self.today - timedelta(days=2)).isoformat()
+        resp = client.get(
+            "/api/analytics-snapshots/trends/",
+            {"metrics": "deals_created", "date_from": start},
+        )
+        self.assertEqual(len(resp.json()["trends"][0]["points"]), 3)
+
+    def test_trends_window_ends_on_the_local_day(self):
+        # Just after midnight UTC it is still the previous day in New York
+        now = datetime(2026, 3, 10, 0, 30, tzinfo=dt_timezone.utc)
+        with mock.patch("django.utils.timezone.now", return_value=now):
+            self._deal()
+            client = APIClient()
+            client.force_authenticate(self.user)
+            resp = client.get(
+                "/api/analytics-snapshots/trends/",
+                {"metrics": "deals_created", "days": 7},
+            )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["period"]["end_date"], "2026-03-09")
+        self.assertEqual(resp.json()["trends"][0]["points"][-1]["count"], 1)
+
+    def test_trends_rejects_bad_requests(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        for params in [
+            {"metrics": "nope"},
+            {"metrics": "invoices_issued", "dimension": "owner"},
+            {"days": "0"},
+            {"days": "5000"},
+        ]:
+            resp = client.get("/api/analytics-snapshots/trends/", params)
+            self.assertEqual(resp.status_code, 400, params)
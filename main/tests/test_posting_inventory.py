@@ -1,3 +1,5 @@
+from unittest import mock
+
 from django.contrib.auth.models import Group
 from django.test import TestCase
 from django.utils import timezone
@@ -15,6 +17,7 @@ from main.models import (
     WarehouseItem,
     WorkOrder,
 )
+from main.posting_service import posting_key
 
 
 class TestWorkOrderConsumptionPosting(TestCase):
@@ -91,3 +94,19 @@ class TestWorkOrderConsumptionPosting(TestCase):
         resp = self.client.post(f"/api/work-orders/{self.wo.id}/complete/")
         self.assertEqual(resp.status_code, 409)
         self.assertIn("error", resp.json())
+
+    def test_concurrent_duplicate_completion_conflicts_and_rolls_back(self):
+        # Another request posted between the idempotency check and the insert
+        JournalEntry.objects.create(
+            date=timezone.now().date(),
+            description="Concurrent",
+            debit_account=LedgerAccount.objects.get(code="5000"),
+            credit_account=LedgerAccount.objects.get(code="1200"),
+            amount=10,
+            **posting_key("work_order", self.wo.id),
+        )
+        with mock.patch("main.api_views.is_posted", return_value=False):
+            resp = self.client.post(f"/api/work-orders/{self.wo.id}/complete/")
+        self.assertEqual(resp.status_code, 409)
+        self.item.refresh_from_db()
+        self.assertEqual(float(self.item.quantity), 10.0)
@@ -1,3 +1,5 @@
+from unittest import mock
+
 from django.contrib.auth.models import Group
 from django.contrib.contenttypes.models import ContentType
 from django.test import TestCase
@@ -15,6 +17,7 @@ from main.models import (
     LedgerAccount,
     Payment,
 )
+from main.posting_service import posting_key
 
 
 class TestPaymentPostingGL(TestCase):
@@ -108,6 +111,28 @@ class TestPaymentPostingGL(TestCase):
         self.assertIn(r2.status_code, (200, 201))
         self.assertAlmostEqual(r2.json().get("open_balance"), 0.0)
 
+    def test_concurrent_duplicate_allocation_conflicts(self):
+        payment = Payment.objects.create(
+            amount=100,
+            payment_date=timezone.now().date(),
+            method="card",
+            content_type=ContentType.objects.get_for_model(Invoice),
+            object_id=self.invoice.id,
+        )
+        # Another request posted between the idempotency check and the insert
+        JournalEntry.objects.create(
+            date=timezone.now().date(),
+            description="Concurrent",
+            debit_account=LedgerAccount.objects.get(code="1000"),
+            credit_account=LedgerAccount.objects.get(code="1100"),
+            amount=100,
+            **posting_key("payment", payment.id),
+        )
+        with mock.patch("main.api_views.is_posted", return_value=False):
+            resp = self.client.post(f"/api/payments/{payment.id}/allocate/")
+        self.assertEqual(resp.status_code, 409)
+        self.assertEqual(resp.json()["allocation_status"], "already-posted")
+
 
 """
 AC-GL-002: Payment Receipt → Journal Entry and AR Settlement
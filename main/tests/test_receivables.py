@@ -0,0 +1,195 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import Group
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from main.models import (
+    Account,
+    CustomUser,
+    Invoice,
+    InvoiceItem,
+    Payment,
+    ReceivableOpenItem,
+)
+from main.receivables_service import get_receivables_service
+from main.tests.utils_gl import ensure_account, seed_simple_invoice
+
+
+class ReceivableOpenItemTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="ar", password="pass")
+        group, _ = Group.objects.get_or_create(name="Sales Manager")
+        self.user.groups.add(group)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        ensure_account("1000", "Cash", "asset")
+        self.invoice, _, _ = seed_simple_invoice(self.user)
+        self.invoice_ct = ContentType.objects.get_for_model(self.invoice)
+
+    def _open_item(self):
+        return ReceivableOpenItem.objects.get(
+            content_type=self.invoice_ct, object_id=self.invoice.id
+        )
+
+    def _pay(self, amount):
+        return Payment.objects.create(
+            amount=amount,
+            payment_date=timezone.now().date(),
+            method="card",
+            content_type=self.invoice_ct,
+            object_id=self.invoice.id,
+        )
+
+    def test_items_and_payments_maintain_open_balance(self):
+        item = self._open_item()
+        self.assertEqual(item.total_due, Decimal("100.00"))
+        self.assertEqual(item.open_balance, Decimal("100.00"))
+        self.assertEqual(item.account_id, self.invoice.deal.account_id)
+
+        InvoiceItem.objects.create(
+            invoice=self.invoice, description="Extra", quantity=2, unit_price=25
+        )
+        payment = self._pay(60)
+        item = self._open_item()
+        self.assertEqual(item.total_due, Decimal("150.00"))
+        self.assertEqual(item.total_paid, Decimal("60.00"))
+        self.assertEqual(item.open_balance, Decimal("90.00"))
+
+        payment.delete()
+        self.assertEqual(self._open_item().open_balance, Decimal("150.00"))
+
+    def test_reassigning_the_deal_moves_the_open_item_account(self):
+        other = Account.objects.create(name="New Owner Co", owner=self.user)
+        deal = self.invoice.deal
+        deal.account = other
+        deal.save()
+        self.assertEqual(self._open_item().account_id, other.id)
+
+    def test_deleting_invoice_removes_open_item(self):
+        self.invoice.delete()
+        self.assertFalse(ReceivableOpenItem.objects.exists())
+
+    def test_allocate_reads_open_item(self):
+        payment = self._pay(40)
+        resp = self.client.post(f"/api/payments/{payment.id}/allocate/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(Decimal(str(resp.json()["open_balance"])), Decimal("60.00"))
+
+        overpay = self._pay(100)
+        resp = self.client.post(f"/api/payments/{overpay.id}/allocate/")
+        self.assertEqual(resp.status_code, 400)
+
+    def test_rebuild_command_recreates_items(self):
+        self._pay(30)
+        ReceivableOpenItem.objects.all().delete()
+        call_command("rebuild_open_items", verbosity=0)
+        item = self._open_item()
+        self.assertEqual(item.total_paid, Decimal("30.00"))
+        self.assertEqual(item.open_balance, Decimal("70.00"))
+
+    def test_open_items_builds_missing_rows(self):
+        ReceivableOpenItem.objects.all().delete()
+        items = get_receivables_service().open_items(
+            type(self.invoice), [self.invoice.id, 999999]
+        )
+        self.assertEqual(list(items), [self.invoice.id])
+        self.assertEqual(items[self.invoice.id].total_due, Decimal("100.00"))
+
+
+class ARAgingReportTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="aging", password="pass")
+        group, _ = Group.objects.get_or_create(name="Sales Manager")
+        self.user.groups.add(group)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.as_of = date(2025, 6, 30)
+
+        # Invoices of 100 each, due 0, 10, 45, 75 and 120 days before as_of
+        first, _, _ = seed_simple_invoice(self.user)
+        self.deal = first.deal
+        self.invoices = [first] + [self._invoice(self.deal) for _ in range(4)]
+        for invoice, days in zip(self.invoices, (0, 10, 45, 75, 120)):
+            invoice.due_date = self.as_of - timedelta(days=days)
+            invoice.save()
+        self._issue(self.invoices, self.as_of - timedelta(days=150))
+
+    def _issue(self, invoices, day):
+        Invoice.objects.filter(pk__in=[invoice.pk for invoice in invoices]).update(
+            created_at=timezone.make_aware(datetime.combine(day, time(12)))
+        )
+        for invoice in invoices:
+            get_receivables_service().refresh(invoice)
+
+    def _invoice(self, deal):
+        invoice = Invoice.objects.create(deal=deal, due_date=self.as_of)
+        InvoiceItem.objects.create(
+            invoice=invoice, description="Line", quantity=1, unit_price=100
+        )
+        return invoice
+
+    def _get(self, **params):
+        params.setdefault("as_of_date", self.as_of.isoformat())
+        return self.client.get("/api/reports/ar-aging/", params)
+
+    def test_buckets_per_account_and_total(self):
+        Payment.objects.create(
+            amount=40,
+            payment_date=self.as_of,
+            method="card",
+            content_type=ContentType.objects.get_for_model(Invoice),
+            object_id=self.invoices[1].id,
+        )
+        resp = self._get()
+        self.assertEqual(resp.status_code, 200)
+        data = resp.json()
+        self.assertEqual(data["count"], 1)
+        row = data["results"][0]
+        self.assertEqual(row["account_id"], self.deal.account_id)
+        self.assertEqual(row["invoice_count"], 5)
+        expected = {
+            "current": "100.00",
+            "days_1_30": "60.00",
+            "days_31_60": "100.00",
+            "days_61_90": "100.00",
+            "days_over_90": "100.00",
+            "total": "460.00",
+        }
+        for bucket, amount in expected.items():
+            self.assertEqual(Decimal(str(row[bucket])), Decimal(amount), bucket)
+            self.assertEqual(
+                Decimal(str(data["totals"][bucket])), Decimal(amount), bucket
+            )
+
+    def test_paginates_by_customer(self):
+        other = Account.objects.create(name="Zeta Ltd", owner=self.user)
+        self.deal.pk = None
+        self.deal.account = other
+        self.deal.save()
+        self._issue([self._invoice(self.deal)], self.as_of)
+
+        resp = self._get(page_size=1)
+        data = resp.json()
+        self.assertEqual(data["count"], 2)
+        self.assertEqual(len(data["results"]), 1)
+        self.assertEqual(Decimal(str(data["totals"]["total"])), Decimal("600.00"))
+
+        resp = self._get(page_size=1, page=2)
+        self.assertEqual(resp.json()["results"][0]["account_name"], "Zeta Ltd")
+
+    def test_leaves_out_invoices_issued_after_as_of_date(self):
+        self._issue([self._invoice(self.deal)], self.as_of + timedelta(days=1))
+        data = self._get().json()
+        self.assertEqual(data["results"][0]["invoice_count"], 5)
+        self.assertEqual(Decimal(str(data["totals"]["total"])), Decimal("500.00"))
+
+        later = self._get(as_of_date=(self.as_of + timedelta(days=1)).isoformat())
+        self.assertEqual(later.json()["results"][0]["invoice_count"], 6)
+
+    def test_invalid_date(self):
+        self.assertEqual(self._get(as_of_date="30-06-2025").status_code, 400)
@@ -0,0 +1,67 @@
+from datetime import date
+
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from main.models import CustomUser, JournalEntry, LedgerAccount
+
+
+class ReportCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.cash = LedgerAccount.objects.create(
+            name="Cash", code="1000", account_type="asset"
+        )
+        self.revenue = LedgerAccount.objects.create(
+            name="Revenue", code="4000", account_type="revenue"
+        )
+        user = CustomUser.objects.create_user(username="controller", password="x")
+        user.groups.add(Group.objects.get_or_create(name="Sales Manager")[0])
+        self.client = APIClient()
+        self.client.force_authenticate(user=user)
+
+    def _post(self, amount):
+        JournalEntry.objects.create(
+            date=date(2025, 1, 5),
+            description="sale",
+            debit_account=self.cash,
+            credit_account=self.revenue,
+            amount=amount,
+        )
+
+    def test_cached_body_and_etag_revalidation(self):
+        self._post(100)
+        url = "/api/reports/pnl/"
+        params = {"start_date": "2025-01-01", "end_date": "2025-01-31"}
+
+        first = self.client.get(url, params)
+        self.assertEqual(first.status_code, 200)
+        etag = first["ETag"]
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+
+        with self.assertNumQueries(0):
+            again = self.client.get(url, params)
+        self.assertEqual(again.json(), first.json())
+
+        # Posting bumps the ledger version, so both the ETag and body change
+        self._post(50)
+        fresh = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(fresh.status_code, 200)
+        self.assertNotEqual(fresh["ETag"], etag)
+        self.assertEqual(fresh.json()["total_revenue"], 150.0)
+
+    def test_parameters_are_part_of_the_key(self):
+        self._post(100)
+        jan = self.client.get(
+            "/api/reports/balance-sheet/", {"as_of_date": "2025-01-31"}
+        )
+        dec = self.client.get(
+            "/api/reports/balance-sheet/", {"as_of_date": "2024-12-31"}
+        )
+        self.assertNotEqual(jan["ETag"], dec["ETag"])
+        self.assertEqual(dec.json()["total_assets"], 0.0)
@@ -0,0 +1,119 @@
+import unittest
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from main import revenue_forecasting
+from main.models import CustomUser, MetricDailyRollup, RevenueForecast
+from main.revenue_forecasting import (
+    ForecastUnavailable,
+    backtest,
+    generate_forecasts,
+    period_forecast,
+)
+
+np = revenue_forecasting.np
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class ForecastMethodTests(unittest.TestCase):
+    def test_linear_regression_extends_the_trend(self):
+        y = 10.0 + 2.0 * np.arange(100)
+        result = period_forecast("linear_regression", y, 30)
+        expected = sum(10.0 + 2.0 * t for t in range(100, 130))
+        self.assertAlmostEqual(result["predicted"], expected, places=4)
+        self.assertAlmostEqual(result["lower"], result["upper"], places=4)
+
+    def test_moving_average_is_flat_at_the_trailing_mean(self):
+        y = np.concatenate([np.zeros(50), np.full(28, 5.0)])
+        result = period_forecast("moving_average", y, 10)
+        self.assertAlmostEqual(result["predicted"], 50.0)
+        self.assertEqual(result["parameters"]["window"], 28)
+        self.assertGreater(result["upper"], result["predicted"])
+
+    def test_seasonal_recovers_weekday_pattern(self):
+        week = np.array([0.0, 10.0, 10.0, 10.0, 10.0, 10.0, 0.0])
+        y = np.tile(week, 16)
+        result = period_forecast("seasonal_arima", y, 7)
+        self.assertAlmostEqual(result["predicted"], 50.0, places=4)
+        self.assertAlmostEqual(result["residual_std"], 0.0, places=4)
+
+    def test_backtest_scores_rolling_origins(self):
+        y = 100.0 + np.arange(200)
+        metrics = backtest("linear_regression", y, 30, folds=3)
+        self.assertEqual(metrics["folds"], 3)
+        self.assertAlmostEqual(metrics["mape"], 0.0)
+        self.assertEqual(backtest("linear_regression", y[:60], 30), {})
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            period_forecast("prophet", np.ones(60), 30)
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class RevenueForecastGenerationTests(TestCase):
+    def setUp(self):
+        self.today = timezone.now().date()
+
+    def _history(self, days):
+        MetricDailyRollup.objects.bulk_create(
+            MetricDailyRollup(
+                date=self.today - timedelta(days=days - n),
+                metric="payments_received",
+                dimension="all",
+                key="",
+                count=1,
+                amount=Decimal(100 + n),
+            )
+            for n in range(days)
+        )
+
+    def test_generate_persists_each_method_and_period(self):
+        self._history(180)
+        generate_forecasts()
+        self.assertEqual(RevenueForecast.objects.count(), 9)
+        monthly = RevenueForecast.objects.get(
+            forecast_date=self.today,
+            forecast_period="monthly",
+            forecast_method="linear_regression",
+        )
+        self.assertAlmostEqual(
+            float(monthly.predicted_revenue), sum(100 + n for n in range(180, 210)), 0
+        )
+        self.assertEqual(monthly.factors["history_days"], 180)
+        self.assertEqual(monthly.factors["backtest"]["folds"], 4)
+
+        # Rerunning the same day replaces the rows
+        generate_forecasts(methods=["moving_average"], periods=["monthly"])
+        self.assertEqual(RevenueForecast.objects.count(), 9)
+
+    def test_short_history_is_unavailable(self):
+        self._history(20)
+        with self.assertRaises(ForecastUnavailable):
+            generate_forecasts()
+        self.assertFalse(RevenueForecast.objects.exists())
+
+    def test_endpoint_serves_persisted_forecasts(self):
+        self._history(180)
+        generate_forecasts()
+        RevenueForecast.objects.filter(
+            forecast_method="moving_average", forecast_period="quarterly"
+        ).update(predicted_revenue=Decimal("1234.00"))
+
+        client = APIClient()
+        client.force_authenticate(
+            CustomUser.objects.create_user(username="forecast", password="p")
+        )
+        response = client.get(
+            "/api/analytics/forecast/",
+            {"period": "quarterly", "method": "moving_average"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["data_source"], "persistent_model")
+        self.assertEqual(response.data["predicted_revenue"], 1234.0)
+        self.assertEqual(response.data["next_quarter"]["predicted_revenue"], 1234.0)
+        self.assertIn("confidence_interval", response.data["next_year"])
+        self.assertEqual(response.data["accuracy_metrics"]["folds"], 1)
@@ -0,0 +1,107 @@
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from main import saved_search_cache
+from main.models import Account, CustomUser
+from main.saved_search_cache import (
+    count_usage,
+    drain_usage_counts,
+    precompute_popular_searches,
+)
+from main.search_models import SavedSearch
+from main.search_service import SearchService
+
+
+class SavedSearchCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = CustomUser.objects.create_user(username="owner", password="p")
+        self.other = CustomUser.objects.create_user(username="other", password="p")
+        group, _ = Group.objects.get_or_create(name="Sales Manager")
+        self.owner.groups.add(group)
+        Account.objects.create(name="Orbit One", owner=self.owner)
+        self.search = SavedSearch.objects.create(
+            name="Orbit accounts",
+            user=self.owner,
+            search_type="accounts",
+            search_query="orbit",
+            sort_by="name",
+            sort_order="asc",
+        )
+        self.service = SearchService(self.owner)
+
+    def _names(self, service=None):
+        results, _ = (service or self.service).execute_saved_search(self.search.pk)
+        return [row["name"] for row in results]
+
+    def test_results_are_cached_until_data_changes(self):
+        self.assertEqual(self._names(), ["Orbit One"])
+
+        # bulk_create skips signals, so the cached page is still served
+        Account.objects.bulk_create([Account(name="Orbit Two", owner=self.owner)])
+        self.assertEqual(self._names(), ["Orbit One"])
+
+        Account.objects.create(name="Orbit Three", owner=self.owner)
+        self.assertEqual(self._names(), ["Orbit One", "Orbit Three", "Orbit Two"])
+
+    def test_editing_the_search_invalidates_its_results(self):
+        self.assertEqual(self._names(), ["Orbit One"])
+        Account.objects.bulk_create([Account(name="Zeta Orbit", owner=self.owner)])
+        self.search.sort_order = "desc"
+        self.search.save()
+        self.assertEqual(self._names(), ["Zeta Orbit", "Orbit One"])
+
+    def test_private_searches_are_owner_only(self):
+        other_service = SearchService(self.other)
+        with self.assertRaises(SavedSearch.DoesNotExist):
+            other_service.execute_saved_search(self.search.pk)
+
+        self.search.is_public = True
+        self.search.save()
+        # The other user is not a manager, so sees only their own accounts
+        self.assertEqual(self._names(other_service), [])
+        self.assertEqual(self._names(), ["Orbit One"])
+
+    def test_usage_is_counted_in_the_cache_and_drained_in_one_update(self):
+        for _ in range(3):
+            count_usage(self.search.pk)
+        self.search.refresh_from_db()
+        self.assertEqual(self.search.use_count, 0)
+
+        # One query lists the saved searches, one writes the counts
+        with self.assertNumQueries(2):
+            self.assertEqual(drain_usage_counts(), 1)
+        self.search.refresh_from_db()
+        self.assertEqual(self.search.use_count, 3)
+        self.assertIsNotNone(self.search.last_used)
+
+        # Drained counters start again from zero
+        self.assertEqual(drain_usage_counts(), 0)
+        count_usage(self.search.pk)
+        drain_usage_counts()
+        self.search.refresh_from_db()
+        self.assertEqual(self.search.use_count, 4)
+
+    def test_precompute_drains_usage_counted_elsewhere(self):
+        self._names()
+        self._names()
+        self.assertEqual(precompute_popular_searches(), 1)
+        self.search.refresh_from_db()
+        self.assertEqual(self.search.use_count, 2)
+
+    def test_precompute_warms_popular_searches(self):
+        SavedSearch.objects.filter(pk=self.search.pk).update(use_count=5)
+        self.search.refresh_from_db()
+        self.assertEqual(precompute_popular_searches(), 1)
+
+        key = saved_search_cache.result_cache_key(self.search, "all", 0, 50)
+        self.assertIsNotNone(cache.get(key))
+
+    def test_execute_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        resp = client.post(f"/api/saved-searches/{self.search.pk}/execute/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["total_count"], 1)
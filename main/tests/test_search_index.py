@@ -0,0 +1,180 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from main import search_indexer
+from main.models import Account, Contact
+from main.search.index_provider import IndexedSearchProvider
+from main.search.tokenizer import tokenize
+from main.search_models import GlobalSearchIndex, SearchPosting
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.manager = User.objects.create_user(username="mgr", password="pass")
+        group, _ = Group.objects.get_or_create(name="Sales Manager")
+        self.manager.groups.add(group)
+        self.rep = User.objects.create_user(username="rep", password="pass")
+
+        self.acme = Account.objects.create(
+            name="Acme Rockets", notes="rockets and rocket parts", owner=self.rep
+        )
+        self.globex = Account.objects.create(
+            name="Globex", notes="acme supplier", owner=self.manager
+        )
+        self.contact = Contact.objects.create(
+            first_name="Wile",
+            last_name="Coyote",
+            email="wile@acme.test",
+            account=self.acme,
+            owner=self.rep,
+        )
+        for obj in (self.acme, self.globex, self.contact):
+            GlobalSearchIndex.update_or_create_for_object(obj)
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("Acme-Rockets, a b C3!"), ["acme", "rockets", "c3"])
+
+    def test_postings_rewritten_on_reindex(self):
+        entry = GlobalSearchIndex.objects.get(
+            object_id=self.acme.pk, entity_type="account"
+        )
+        self.assertEqual(entry.postings.get(term="rockets").term_frequency, 3)
+        self.assertEqual(
+            entry.term_count, sum(p.term_frequency for p in entry.postings.all())
+        )
+
+        self.acme.notes = "spacecraft"
+        self.acme.save()
+        GlobalSearchIndex.update_or_create_for_object(self.acme)
+        self.assertEqual(entry.postings.get(term="rockets").term_frequency, 2)
+        self.assertFalse(entry.postings.filter(term="parts").exists())
+        self.assertTrue(entry.postings.filter(term="spacecraft").exists())
+
+    def test_ranked_across_entities(self):
+        results = IndexedSearchProvider(self.manager).global_search("acme")
+        self.assertEqual(set(results), {"accounts", "contacts"})
+        accounts = results["accounts"]
+        # Both accounts match; the title hit outranks the note mention
+        self.assertEqual([a.pk for a in accounts], [self.acme.pk, self.globex.pk])
+        self.assertGreater(accounts[0].search_score, accounts[1].search_score)
+
+    def test_boost_score_reorders(self):
+        GlobalSearchIndex.objects.filter(object_id=self.globex.pk).update(
+            boost_score=10.0
+        )
+        accounts = IndexedSearchProvider(self.manager).global_search("acme")["accounts"]
+        self.assertEqual(accounts[0].pk, self.globex.pk)
+
+    def test_all_terms_must_match(self):
+        results = IndexedSearchProvider(self.manager).global_search("acme supplier")
+        self.assertEqual([a.pk for a in results["accounts"]], [self.globex.pk])
+        self.assertEqual(
+            IndexedSearchProvider(self.manager).global_search("acme nothing"), {}
+        )
+
+    def test_last_term_matches_as_prefix(self):
+        results = IndexedSearchProvider(self.manager).global_search("acm")
+        self.assertEqual(
+            {a.pk for a in results["accounts"]}, {self.acme.pk, self.globex.pk}
+        )
+        self.assertEqual([c.pk for c in results["contacts"]], [self.contact.pk])
+        results = IndexedSearchProvider(self.manager).global_search("acme rock")
+        self.assertEqual([a.pk for a in results["accounts"]], [self.acme.pk])
+
+    def test_non_manager_sees_own_records(self):
+        results = IndexedSearchProvider(self.rep).global_search("acme")
+        self.assertEqual([a.pk for a in results["accounts"]], [self.acme.pk])
+
+    def test_search_uses_posting_lists(self):
+        provider = IndexedSearchProvider(self.manager)
+        provider.global_search("rockets")  # warm corpus statistics
+        with self.assertNumQueries(5):
+            # two group checks, document frequency, ranked postings, contact load
+            provider.global_search("coyote")
+        self.assertTrue(SearchPosting.objects.filter(term="coyote").exists())
+
+
+class SearchIndexMaintenanceTests(TestCase):
+    def setUp(self):
+        search_indexer._pending().clear()
+        self.user = get_user_model().objects.create_user(
+            username="indexer", password="pass"
+        )
+
+    def _entries(self, obj):
+        return GlobalSearchIndex.objects.filter(
+            entity_type=type(obj).__name__.lower(), object_id=obj.pk
+        )
+
+    def test_saves_and_deletes_reach_index_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            account = Account.objects.create(name="Initech", owner=self.user)
+        entry = self._entries(account).get()
+        self.assertEqual(entry.owner_id, self.user.pk)
+        self.assertTrue(entry.postings.filter(term="initech").exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            account.name = "Initrode"
+            account.save()
+        self.assertTrue(
+            self._entries(account).get().postings.filter(term="initrode").exists()
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            account.delete()
+        self.assertFalse(self._entries(account).exists())
+
+    def test_repeated_saves_are_coalesced(self):
+        with mock.patch.object(
+            search_indexer, "process_batch", wraps=search_indexer.process_batch
+        ) as process_batch:
+            with self.captureOnCommitCallbacks(execute=True):
+                account = Account.objects.create(name="Hooli", owner=self.user)
+                for note in ("one", "two", "three"):
+                    account.notes = note
+                    account.save()
+        process_batch.assert_called_once()
+        self.assertEqual(len(process_batch.call_args.args[0]), 1)
+        self.assertTrue(
+            self._entries(account).get().postings.filter(term="three").exists()
+        )
+
+    @override_settings(SEARCH_INDEX_BACKEND="celery")
+    def test_celery_backend_queues_batches(self):
+        with mock.patch("main.celery_tasks.update_search_index.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                account = Account.objects.create(name="Vandelay", owner=self.user)
+        delay.assert_called_once()
+        self.assertFalse(self._entries(account).exists())
+
+        search_indexer.process_batch(delay.call_args.args[0])
+        self.assertTrue(self._entries(account).exists())
+
+    def test_rebuild_command_reindexes_and_prunes(self):
+        account = Account.objects.create(name="Massive Dynamic", owner=self.user)
+        Contact.objects.create(
+            first_name="Nina",
+            last_name="Sharp",
+            email="nina@massive.test",
+            account=account,
+            owner=self.user,
+        )
+        stale = Account.objects.create(name="Gone Corp", owner=self.user)
+        GlobalSearchIndex.update_or_create_for_object(stale)
+        Account.objects.filter(pk=stale.pk).delete()
+        search_indexer._pending().clear()
+
+        call_command("rebuild_search_index", batch_size=1, verbosity=0)
+        self.assertTrue(self._entries(account).exists())
+        self.assertEqual(
+            GlobalSearchIndex.objects.filter(entity_type="contact").count(), 1
+        )
+        self.assertFalse(self._entries(stale).exists())
+        self.assertTrue(SearchPosting.objects.filter(term="sharp").exists())
@@ -0,0 +1,83 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from main import search_indexer
+from main.models import Account, Contact
+from main.search import suggestions
+from main.search.db_provider import DatabaseSearchProvider
+from main.search.suggestions import SuggestionService
+
+
+class SuggestionServiceTests(TestCase):
+    def setUp(self):
+        search_indexer._pending().clear()
+        suggestions.get_suggestion_service().invalidate()
+        User = get_user_model()
+        self.manager = User.objects.create_user(username="mgr", password="pass")
+        group, _ = Group.objects.get_or_create(name="Sales Manager")
+        self.manager.groups.add(group)
+        self.rep = User.objects.create_user(username="rep", password="pass")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.acme = Account.objects.create(name="Acme Rockets", owner=self.rep)
+            self.acorn = Account.objects.create(name="Acorn Labs", owner=self.manager)
+            self.contact = Contact.objects.create(
+                first_name="Wile",
+                last_name="Coyote",
+                email="wile@acme.test",
+                account=self.acme,
+                owner=self.rep,
+            )
+        self.service = SuggestionService(DatabaseSearchProvider.SEARCHABLE_MODELS)
+
+    def _names(self, user, query, entity_type=None):
+        return [s["name"] for s in self.service.suggest(user, query, entity_type)]
+
+    def test_prefix_matches_words_and_emails(self):
+        self.assertEqual(
+            self._names(self.manager, "ac", "accounts"), ["Acme Rockets", "Acorn Labs"]
+        )
+        self.assertEqual(self._names(self.manager, "rock"), ["Acme Rockets"])
+        contact = self.service.suggest(self.manager, "wile@ac", "contacts")
+        self.assertEqual(contact[0]["id"], self.contact.pk)
+        self.assertEqual(contact[0]["type"], "Contact")
+        self.assertEqual(self._names(self.manager, "a"), [])
+
+    def test_rbac_filters_suggestions(self):
+        self.assertEqual(self._names(self.rep, "ac", "accounts"), ["Acme Rockets"])
+
+    def test_repeat_queries_are_served_from_cache(self):
+        first = self.service.suggest(self.manager, "acm")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.service.suggest(self.manager, "acm"), first)
+
+    def test_signals_keep_suggestions_current(self):
+        service = suggestions.get_suggestion_service()
+        self.assertEqual(
+            [s["name"] for s in service.suggest(self.manager, "acme", "accounts")],
+            ["Acme Rockets"],
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.acme.name = "Apex Rockets"
+            self.acme.save()
+        self.assertEqual(service.suggest(self.manager, "acme", "accounts"), [])
+        self.assertEqual(
+            [s["name"] for s in service.suggest(self.manager, "apex", "accounts")],
+            ["Apex Rockets"],
+        )
+
+    def test_lru_is_bounded_per_user(self):
+        with self.settings(SEARCH_SUGGESTION_CACHE_SIZE=2):
+            for query in ("ac", "acm", "aco"):
+                self.service.suggest(self.manager, query)
+        entries = self.service._users[self.manager.pk].entries
+        self.assertEqual([key[0] for key in entries], ["acm", "aco"])
+
+    def test_api_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.manager)
+        resp = client.get("/api/search/suggestions/", {"q": "coy"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["suggestions"][0]["name"], str(self.contact))
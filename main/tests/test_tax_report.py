@@ -0,0 +1,88 @@
+from datetime import date
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from main.models import CustomUser, Expense, Project, WorkOrder, WorkOrderInvoice
+from main.reports import FinancialReports
+
+
+class TaxReportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username="accountant", password="x", first_name="Ada", last_name="Lee"
+        )
+        for index, contractor_name in enumerate(["Sam", "Kim", "Ola"]):
+            contractor = CustomUser.objects.create_user(
+                username=f"contractor{index}",
+                password="x",
+                first_name=contractor_name,
+            )
+            project = Project.objects.create(
+                title=f"P{index}", created_by=self.user, assigned_to=contractor
+            )
+            work_order = WorkOrder.objects.create(project=project, description="job")
+            for paid in (date(2024, 2, 1), date(2024, 8, 1), date(2025, 1, 15)):
+                WorkOrderInvoice.objects.create(
+                    work_order=work_order,
+                    issued_date=paid,
+                    due_date=paid,
+                    total_amount=Decimal("100.00") * (index + 1),
+                    is_paid=True,
+                    paid_date=paid,
+                )
+        Expense.objects.create(
+            date=date(2024, 5, 1),
+            amount=Decimal("75.00"),
+            category="travel",
+            description="trip",
+            submitted_by=self.user,
+            approved=True,
+        )
+
+    def test_multi_year_quarterly_in_constant_queries(self):
+        with self.assertNumQueries(3):
+            report = FinancialReports.get_tax_report([2024, 2025], quarterly=True)
+
+        year_2024, year_2025 = report
+        self.assertEqual(year_2024["year"], 2024)
+        contractors = year_2024["contractorPayments"]
+        self.assertEqual([c["name"] for c in contractors], ["Ola", "Kim", "Sam"])
+        self.assertEqual(contractors[0]["total_payments"], Decimal("600.00"))
+        self.assertEqual(year_2024["totalExpenses"], Decimal("75.00"))
+        self.assertEqual(year_2024["estimatedTax"], Decimal("0.00"))
+
+        q1, q2, q3, _ = year_2024["quarters"]
+        self.assertEqual(
+            q1["contractorPayments"][0]["total_payments"], Decimal("300.00")
+        )
+        self.assertEqual(
+            q2["expensesByCategory"],
+            [{"category": "travel", "total": Decimal("75.00")}],
+        )
+        self.assertEqual(len(q3["contractorPayments"]), 3)
+        self.assertEqual(
+            year_2025["contractorPayments"][-1]["total_payments"], Decimal("100.00")
+        )
+
+    def test_endpoint_single_and_range(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        resp = client.get("/api/tax-report/", {"year": 2024})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["year"], 2024)
+        self.assertNotIn("quarters", resp.json())
+
+        resp = client.get(
+            "/api/tax-report/",
+            {"start_year": 2024, "end_year": 2025, "quarterly": "true"},
+        )
+        self.assertEqual([y["year"] for y in resp.json()["years"]], [2024, 2025])
+        self.assertEqual(len(resp.json()["years"][0]["quarters"]), 4)
+
+        resp = client.get("/api/tax-report/", {"years": "2024,abc"})
+        self.assertEqual(resp.status_code, 400)
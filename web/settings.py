@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import sys
 from pathlib import Path
 
 from celery.schedules import crontab
@@ -32,6 +33,10 @@ SECRET_KEY = "django-insecure-dtv=t!u_mhydni64gs6l9v$scub!w2*ocsl4v99$@s-*5$k$96
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
+# Test runs do background work (search indexing, bulk operations) in-process
+# rather than queueing it on Celery
+TESTING = len(sys.argv) > 1 and sys.argv[1] == "test"
+
 ALLOWED_HOSTS = ["testserver", "localhost", "127.0.0.1"]
 
 
@@ -104,6 +109,27 @@ DATABASES = {
     }
 }
 
+# Cache
+# Set CACHE_URL (e.g. redis://localhost:6379/1) so all workers share report
+# caches and the ledger version counter; the in-process default suits dev/tests.
+CACHE_URL = os.environ.get("CACHE_URL", "")
+if CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Seconds a cached financial report body is kept (see main.report_cache)
+REPORT_CACHE_TIMEOUT = int(os.environ.get("REPORT_CACHE_TIMEOUT", "300"))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -209,8 +235,64 @@ REST_FRAMEWORK = {
     "EXCEPTION_HANDLER": "main.exceptions.custom_exception_handler",
 }
 
+# Keyset-paginated endpoints (?cursor=) count at most this many rows when
+# asked for ?count=capped
+PAGINATION_COUNT_CAP = 10000
+
 # Search Service Provider
-SEARCH_PROVIDER = "main.search.db_provider.DatabaseSearchProvider"
+# Global search is served from the GlobalSearchIndex posting lists with BM25
+# ranking; main.search.db_provider.DatabaseSearchProvider scans tables instead.
+SEARCH_PROVIDER = "main.search.index_provider.IndexedSearchProvider"
+
+# Index updates queued by model signals are flushed after commit to the
+# update_search_index Celery task ("celery"), or in-process ("sync") in tests
+SEARCH_INDEX_BACKEND = os.environ.get(
+    "SEARCH_INDEX_BACKEND", "sync" if TESTING else "celery"
+)
+SEARCH_INDEX_BATCH_SIZE = 500
+
+# Typeahead answers are cached per user (LRU of this many queries) for up to
+# TTL seconds, which also bounds staleness from other processes' index writes
+SEARCH_SUGGESTION_CACHE_SIZE = 256
+SEARCH_SUGGESTION_CACHE_TTL = 30.0
+
+# Saved-search results are cached until searchable data changes or this many
+# seconds pass; usage counts are written back by precompute_saved_searches
+SAVED_SEARCH_CACHE_TIMEOUT = 300
+SAVED_SEARCH_PRECOMPUTE_COUNT = 20
+
+# Dashboard analytics window (overridable per request with ?days= up to the
+# maximum) and seconds the shared payload is cached between source writes
+DASHBOARD_ANALYTICS_DAYS = 30
+DASHBOARD_ANALYTICS_MAX_DAYS = 365
+DASHBOARD_CACHE_TIMEOUT = 60
+DASHBOARD_LOW_STOCK_LIMIT = 50
+
+# Metric rollup trends: longest series served, and hours of changes the
+# refresh job reads when it has no record of its previous run
+ROLLUP_TRENDS_MAX_DAYS = 730
+ROLLUP_REFRESH_LOOKBACK_HOURS = 26
+
+# Days of daily revenue the nightly revenue forecasts are fitted on
+REVENUE_FORECAST_HISTORY_DAYS = 730
+
+# Bulk update/delete and export jobs run after the request commits, on the
+# run_bulk_operation Celery task ("celery") or in-process ("sync") in tests,
+# in keyset chunks
+BULK_OPERATION_BACKEND = os.environ.get(
+    "BULK_OPERATION_BACKEND", "sync" if TESTING else "celery"
+)
+BULK_OPERATION_CHUNK_SIZE = 1000
+BULK_OPERATION_PROGRESS_INTERVAL = 1.0
+
+# GlobalSearchView fans out to its sources on a thread pool; sources still
+# running after the deadline (seconds) are left out of the response
+GLOBAL_SEARCH_DEADLINE = 0.5
+GLOBAL_SEARCH_WORKERS = 8
+
+# Seconds between checks of static/kb for changed articles; in between, the
+# knowledge base is served from the in-memory index
+KB_INDEX_CHECK_INTERVAL = 2.0
 
 # Add this for django-mailbox
 DJANGO_MAILBOX = {
@@ -313,6 +395,22 @@ CELERY_BEAT_SCHEDULE = {
         "task": "main.celery_tasks.cleanup_old_notification_logs",
         "schedule": crontab(hour=2, minute=0, day_of_week=0),  # 2:00 AM every Sunday
     },
+    "precompute-saved-searches": {
+        "task": "main.celery_tasks.precompute_saved_searches",
+        "schedule": crontab(minute="*/5"),  # every 5 minutes
+    },
+    "refresh-metric-rollups": {
+        "task": "main.celery_tasks.refresh_metric_rollups",
+        "schedule": crontab(hour=0, minute=30),  # 12:30 AM daily
+    },
+    "recalculate-customer-lifetime-values": {
+        "task": "main.celery_tasks.recalculate_customer_lifetime_values",
+        "schedule": crontab(hour=3, minute=0),  # 3:00 AM daily
+    },
+    "generate-revenue-forecasts": {
+        "task": "main.celery_tasks.generate_revenue_forecasts",
+        "schedule": crontab(hour=1, minute=30),  # 1:30 AM daily, after rollups
+    },
 }
 
 # External Service API Keys (Phase 2: Field Service Management)